@@ -10,15 +10,19 @@ class ChargeResolutionCalculator:
     interative approach, allowing the contribution of data/events
     without reading the entire dataset into memory.
 
-    Utilises Pandas DataFrames, and makes no assumptions on the order of
-    the data, and does not require the true charge to be integer (as may
-    be the case for lab measurements where an average illumination
-    is used).
-
-    A list is filled with a dataframe for each contribution, and only
-    amalgamated into a single dataframe (reducing memory) once the memory
-    of the list becomes large (or at the end of the filling),
-    reducing the time required to produce the output.
+    The squared differences, true charges and number of entries are
+    accumulated in NumPy arrays indexed by pixel and true charge bin. The
+    calculator makes no assumptions on the order of the data, and does not
+    require the true charge to be integer (as may be the case for lab
+    measurements where an average illumination is used). The true charges
+    are sorted into fixed, log-spaced bins, and the charge resolution of a
+    bin is reported at the mean true charge of its entries. With the default
+    binning, integer true charges up to ~20 p.e. have a bin of their own.
+    Entries with a true charge of 0 are ignored.
+
+    Calculators filled in different processes (e.g. for different input
+    files) can be combined with `merge`, or recreated from the pixel
+    dataframe returned by `finish` with `from_dataframe`.
 
     Parameters
     ----------
@@ -26,22 +30,41 @@ class ChargeResolutionCalculator:
         Indicate if the "true charge" values are from the sim_telarray
         files, and therefore without poisson error. The poisson error will
         therefore be included in the charge resolution calculation.
+    min_charge : float
+        Lower edge of the first true charge bin, smaller true charges are
+        collected in one underflow bin
+    max_charge : float
+        Upper edge of the last true charge bin, larger true charges are
+        collected in one overflow bin
+    bins_per_decade : int
+        Number of log-spaced true charge bins per decade
 
     Attributes
     ----------
     self._mc_true : bool
-    self._df_list : list
-    self._df : pd.DataFrame
-    self._n_bytes : int
-        Monitors the number of bytes being held in memory
+    self._bin_edges : ndarray
+        Edges of the true charge bins
+    self._sum : ndarray
+        Sum of the squared differences per pixel and true charge bin
+    self._true_sum : ndarray
+        Sum of the true charges per pixel and true charge bin
+    self._n : ndarray
+        Number of entries per pixel and true charge bin
     """
 
-    def __init__(self, mc_true=True):
+    def __init__(
+        self, mc_true=True, min_charge=0.1, max_charge=1e4, bins_per_decade=50
+    ):
         self._mc_true = mc_true
-        self._df_list = []
-        self._df = pd.DataFrame()
-        self._n_bytes = 0
-        self._max_bytes = 1e9
+        n_decades = np.log10(max_charge / min_charge)
+        self._bin_edges = np.geomspace(
+            min_charge, max_charge, int(round(n_decades * bins_per_decade)) + 1
+        )
+        # underflow and overflow bins on both sides of the edges
+        n_bins = len(self._bin_edges) + 1
+        self._sum = np.zeros((0, n_bins))
+        self._true_sum = np.zeros((0, n_bins))
+        self._n = np.zeros((0, n_bins), dtype=np.int64)
 
     @staticmethod
     def rmse_abs(sum_, n):
@@ -72,27 +95,118 @@ class ChargeResolutionCalculator:
         measured : ndarray
             1D array containing the measured charge for each entry
         """
+        pixel, true, measured = np.broadcast_arrays(pixel, true, measured)
         diff2 = (measured - true) ** 2
-        df = pd.DataFrame(dict(pixel=pixel, true=true, sum=diff2, n=np.uint32(1)))
-        self._df_list.append(df)
-        self._n_bytes += df.memory_usage(index=True, deep=True).sum()
-        if self._n_bytes > self._max_bytes:
-            self._amalgamate()
+        self._accumulate(pixel, true, diff2, 1)
+
+    def merge(self, other):
+        """
+        Add the values contributed to another calculator to this one,
+        e.g. to combine the results obtained in parallel processes.
+
+        Parameters
+        ----------
+        other : ChargeResolutionCalculator
+
+        Returns
+        -------
+        self : ChargeResolutionCalculator
+        """
+        pixel, true_bin = np.nonzero(other._n)
+        n = other._n[pixel, true_bin]
+        true_sum = other._true_sum[pixel, true_bin]
+        self._accumulate(
+            pixel, true_sum / n, other._sum[pixel, true_bin], n, true_sum=true_sum,
+        )
+        return self
+
+    @classmethod
+    def from_dataframe(cls, df_p, mc_true=True):
+        """
+        Recreate a calculator from the pixel dataframe returned by `finish`
+        (e.g. stored in the output file of ``ctapipe-chargeres-extract``).
+
+        Parameters
+        ----------
+        df_p : pd.DataFrame
+            Dataframe containing the "pixel", "true", "sum" and "n" columns
+        mc_true : bool
+
+        Returns
+        -------
+        ChargeResolutionCalculator
+        """
+        calculator = cls(mc_true=mc_true)
+        calculator._accumulate(
+            df_p["pixel"].values,
+            df_p["true"].values,
+            df_p["sum"].values,
+            df_p["n"].values,
+        )
+        return calculator
+
+    def _accumulate(self, pixel, true, sum_, n, true_sum=None):
+        """
+        Add the sums and counts of the entries to the accumulator arrays of
+        the true charge bins, adding rows if new pixels are encountered.
+        """
+        if true_sum is None:
+            true_sum = np.multiply(true, n)
+        pixel, true, sum_, n, true_sum = (
+            np.ravel(a) for a in np.broadcast_arrays(pixel, true, sum_, n, true_sum)
+        )
+        nonzero = true != 0
+        pixel, true, sum_, n, true_sum = (
+            a[nonzero] for a in (pixel, true, sum_, n, true_sum)
+        )
+        if pixel.size == 0:
+            return
+
+        pixel = pixel.astype(np.int64)
+        n_pixels = pixel.max() + 1
+        if n_pixels > self._sum.shape[0]:
+            self._add_pixels(n_pixels)
+
+        true_bin = np.searchsorted(self._bin_edges, true, side="right")
+        index = np.ravel_multi_index((pixel, true_bin), self._sum.shape)
+
+        # reduce duplicate indices before scattering into the accumulators
+        unique_index, inverse = np.unique(index, return_inverse=True)
+        self._sum.ravel()[unique_index] += np.bincount(inverse, weights=sum_)
+        self._true_sum.ravel()[unique_index] += np.bincount(inverse, weights=true_sum)
+        counts = np.bincount(inverse, weights=n)
+        self._n.ravel()[unique_index] += counts.astype(np.int64)
+
+    def _add_pixels(self, n_pixels):
+        """
+        Enlarge the accumulator arrays to n_pixels rows, keeping the current
+        content.
+        """
+        for name in ("_sum", "_true_sum", "_n"):
+            old = getattr(self, name)
+            new = np.zeros((n_pixels, old.shape[1]), dtype=old.dtype)
+            new[: old.shape[0]] = old
+            setattr(self, name, new)
 
-    def _amalgamate(self):
+    def _add_charge_resolution(self, df):
         """
-        Concatenate the dataframes inside the list, and sum together
-        values per pixel and true charge in order to reduce memory use.
+        Calculate the charge resolution columns from the sums in the dataframe
         """
-        self._df = pd.concat([self._df, *self._df_list], ignore_index=True)
-        self._df = self._df.groupby(["pixel", "true"]).sum().reset_index()
-        self._n_bytes = 0
-        self._df_list = []
+        true = df["true"].values
+        sum_ = df["sum"].values
+        n = df["n"].values
+        if self._mc_true:
+            df["charge_resolution"] = self.charge_res(true, sum_, n)
+            df["charge_resolution_abs"] = self.charge_res_abs(true, sum_, n)
+        else:
+            df["charge_resolution"] = self.rmse(true, sum_, n)
+            df["charge_resolution_abs"] = self.rmse_abs(sum_, n)
+        return df
 
     def finish(self):
         """
-        Perform the final amalgamation, and calculate the charge resolution
-        from the resulting sums
+        Calculate the charge resolution from the accumulated sums.
+        More values can still be added afterwards.
 
         Returns
         -------
@@ -101,30 +215,25 @@ class ChargeResolutionCalculator:
         df_c : pd.DataFrame
             Dataframe containing the charge resolution for the entire camera
         """
-        self._amalgamate()
-
-        self._df = self._df.loc[self._df["true"] != 0]
-
-        df_p = self._df.copy()
-        true = df_p["true"].values
-        sum_ = df_p["sum"].values
-        n = df_p["n"].values
-        if self._mc_true:
-            df_p["charge_resolution"] = self.charge_res(true, sum_, n)
-            df_p["charge_resolution_abs"] = self.charge_res_abs(true, sum_, n)
-        else:
-            df_p["charge_resolution"] = self.rmse(true, sum_, n)
-            df_p["charge_resolution_abs"] = self.rmse_abs(sum_, n)
-        df_c = self._df.copy().groupby("true").sum().reset_index()
-        df_c = df_c.drop(columns="pixel")
-        true = df_c["true"].values
-        sum_ = df_c["sum"].values
-        n = df_c["n"].values
-        if self._mc_true:
-            df_c["charge_resolution"] = self.charge_res(true, sum_, n)
-            df_c["charge_resolution_abs"] = self.charge_res_abs(true, sum_, n)
-        else:
-            df_c["charge_resolution"] = self.rmse(true, sum_, n)
-            df_c["charge_resolution_abs"] = self.rmse_abs(sum_, n)
-
-        return df_p, df_c
+        pixel, true_bin = np.nonzero(self._n)
+        n = self._n[pixel, true_bin]
+        df_p = pd.DataFrame(
+            dict(
+                pixel=pixel,
+                true=self._true_sum[pixel, true_bin] / n,
+                sum=self._sum[pixel, true_bin],
+                n=n,
+            )
+        )
+
+        n_camera = self._n.sum(axis=0)
+        filled = n_camera > 0
+        df_c = pd.DataFrame(
+            dict(
+                true=self._true_sum.sum(axis=0)[filled] / n_camera[filled],
+                sum=self._sum.sum(axis=0)[filled],
+                n=n_camera[filled],
+            )
+        )
+
+        return self._add_charge_resolution(df_p), self._add_charge_resolution(df_c)
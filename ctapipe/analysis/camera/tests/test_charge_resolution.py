@@ -8,32 +8,73 @@ def test_add():
     true_charge = np.arange(100)
     measured_charge = np.arange(100)
     chargeres.add(0, true_charge, measured_charge)
-    assert len(chargeres._df_list) == 1
-    assert chargeres._df_list[0].index.size == 100
+    n_bins = chargeres._sum.shape[1]
+    assert chargeres._sum.shape == (1, n_bins)
+    # true charge 0 is ignored
+    assert chargeres._n.sum() == 99
+    # small integer true charges have a bin of their own
+    assert np.all(chargeres._n[0, np.flatnonzero(chargeres._n[0])[:20]] == 1)
 
 
-def test_amalgamate():
+def test_accumulate():
     chargeres = ChargeResolutionCalculator()
-    true_charge = np.arange(100)
-    measured_charge = np.arange(100)
+    true_charge = np.arange(1, 101)
+    measured_charge = true_charge + 1
     chargeres.add(0, true_charge, measured_charge)
     chargeres.add(0, true_charge, measured_charge)
     chargeres.add(1, true_charge, measured_charge)
-    assert len(chargeres._df_list) == 3
-    chargeres._amalgamate()
-    assert len(chargeres._df_list) == 0
-    assert chargeres._df.index.size == 200
+    n_bins = chargeres._sum.shape[1]
+    assert chargeres._sum.shape == (2, n_bins)
+    assert np.all(chargeres._n[0] == 2 * chargeres._n[1])
+    assert np.all(chargeres._sum[0] == chargeres._n[0])
+    assert chargeres._true_sum[0].sum() == 2 * true_charge.sum()
+
+    # new pixels add rows, new true charges are sorted into the existing bins
+    chargeres.add(np.array([1, 5]), np.array([0.5, 200]), np.array([1, 201]))
+    assert chargeres._sum.shape == (6, n_bins)
+    assert chargeres._n.sum() == 302
+
+
+def test_float_true_charge():
+    """ the accumulators do not grow with the number of distinct true charges """
+    rng = np.random.RandomState(0)
+    chargeres = ChargeResolutionCalculator(bins_per_decade=10)
+    shape = None
+    for _ in range(5):
+        true_charge = rng.uniform(1, 1000, 1000)
+        chargeres.add(0, true_charge, rng.normal(true_charge, 1))
+        if shape is None:
+            shape = chargeres._sum.shape
+        assert chargeres._sum.shape == shape
 
+    df_p, df_c = chargeres.finish()
+    assert len(df_p) <= 31
+    assert df_p["n"].sum() == 5000
+    assert np.all((df_p["true"] >= 1) & (df_p["true"] <= 1000))
+    assert np.all(np.diff(df_p["true"]) > 0)
 
-def test_memory_limit():
-    chargeres = ChargeResolutionCalculator()
-    chargeres._max_bytes = 1
+
+def test_merge():
     true_charge = np.arange(100)
-    measured_charge = np.arange(100)
-    chargeres.add(0, true_charge, measured_charge)
-    assert len(chargeres._df_list) == 0
+    measured_charge = np.arange(100) + 0.5
+
+    chargeres = ChargeResolutionCalculator()
     chargeres.add(0, true_charge, measured_charge)
-    assert len(chargeres._df_list) == 0
+    chargeres.add(1, true_charge, measured_charge)
+
+    first = ChargeResolutionCalculator()
+    first.add(0, true_charge, measured_charge)
+    second = ChargeResolutionCalculator()
+    second.add(1, true_charge, measured_charge)
+    first.merge(second)
+
+    df_p, df_c = chargeres.finish()
+    df_p_merged, df_c_merged = first.finish()
+    assert df_p.equals(df_p_merged)
+    assert df_c.equals(df_c_merged)
+
+    df_p_restored, _ = ChargeResolutionCalculator.from_dataframe(df_p).finish()
+    assert df_p.equals(df_p_restored)
 
 
 def test_finish():
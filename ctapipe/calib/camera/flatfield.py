@@ -7,7 +7,8 @@ import numpy as np
 from astropy import units as u
 from ctapipe.core import Component
 from ctapipe.image.extractor import ImageExtractor
-from ctapipe.core.traits import Int, Unicode, List
+from ctapipe.core.traits import Int, Unicode, List, Bool
+from .streaming import RunningStatistics, StreamingQuantile
 
 
 __all__ = ["FlatFieldCalculator", "FlasherFlatFieldCalculator"]
@@ -35,6 +36,8 @@ class FlatFieldCalculator(Component):
          number of waveform channel to be considered
     charge_product : str
         Name of the charge extractor to be used
+    streaming : bool
+        If True, accumulate running statistics instead of buffering the sample
     config : traitlets.loader.Config
         Configuration specified by config file or cmdline arguments.
         Used to set traitlet values.
@@ -53,6 +56,14 @@ class FlatFieldCalculator(Component):
     charge_product = Unicode(
         "LocalPeakWindowSum", help="Name of the charge extractor to be used"
     ).tag(config=True)
+    streaming = Bool(
+        False,
+        help=(
+            "If True, use running statistics (Welford mean and std, P² median)"
+            " with memory independent of the sample size"
+            " instead of buffering all events of the sample"
+        ),
+    ).tag(config=True)
 
     def __init__(self, subarray, **kwargs):
 
@@ -164,6 +175,9 @@ class FlasherFlatFieldCalculator(FlatFieldCalculator):
         self.charges = None  # charge per event in sample
         self.arrival_times = None  # arrival time per event in sample
         self.sample_masked_pixels = None  # masked pixels per event in sample
+        # running statistics and medians per quantity (streaming mode)
+        self.stats = None
+        self.median_estimators = None
 
     def _extract_charge(self, event):
         """
@@ -244,15 +258,23 @@ class FlasherFlatFieldCalculator(FlatFieldCalculator):
             sample_age > self.sample_duration
             or self.num_events_seen == self.sample_size
         ):
-            relative_gain_results = self.calculate_relative_gain_results(
-                self.charge_medians, self.charges, self.sample_masked_pixels
-            )
-            time_results = self.calculate_time_results(
-                self.arrival_times,
-                self.sample_masked_pixels,
-                self.time_start,
-                trigger_time,
-            )
+            if self.streaming:
+                relative_gain_results = (
+                    self.calculate_relative_gain_results_from_statistics()
+                )
+                time_results = self.calculate_time_results_from_statistics(
+                    self.time_start, trigger_time
+                )
+            else:
+                relative_gain_results = self.calculate_relative_gain_results(
+                    self.charge_medians, self.charges, self.sample_masked_pixels
+                )
+                time_results = self.calculate_time_results(
+                    self.arrival_times,
+                    self.sample_masked_pixels,
+                    self.time_start,
+                    trigger_time,
+                )
 
             result = {
                 "n_events": self.num_events_seen,
@@ -273,6 +295,17 @@ class FlasherFlatFieldCalculator(FlatFieldCalculator):
 
         n_channels = waveform.shape[0]
         n_pix = waveform.shape[1]
+
+        if self.streaming:
+            quantities = ("charge", "relative_gain", "time")
+            self.stats = {
+                name: RunningStatistics((n_channels, n_pix)) for name in quantities
+            }
+            self.median_estimators = {
+                name: StreamingQuantile((n_channels, n_pix)) for name in quantities
+            }
+            return
+
         shape = (sample_size, n_channels, n_pix)
 
         self.charge_medians = np.zeros((sample_size, n_channels))
@@ -289,6 +322,18 @@ class FlasherFlatFieldCalculator(FlatFieldCalculator):
         good_charge = np.ma.array(charge, mask=pixel_mask)
         charge_median = np.ma.median(good_charge, axis=1)
 
+        if self.streaming:
+            values = {
+                "charge": charge,
+                "relative_gain": charge / np.ma.getdata(charge_median)[:, np.newaxis],
+                "time": arrival_time,
+            }
+            for name, value in values.items():
+                self.stats[name].add(value, pixel_mask)
+                self.median_estimators[name].add(value, pixel_mask)
+            self.num_events_seen += 1
+            return
+
         self.charges[self.num_events_seen] = charge
         self.arrival_times[self.num_events_seen] = arrival_time
         self.sample_masked_pixels[self.num_events_seen] = pixel_mask
@@ -310,6 +355,25 @@ class FlasherFlatFieldCalculator(FlatFieldCalculator):
         # std over the sample per pixel
         pixel_std = np.ma.std(masked_trace_time, axis=0)
 
+        return self._time_outlier_results(
+            pixel_median, pixel_mean, pixel_std, time_start, trigger_time
+        )
+
+    def calculate_time_results_from_statistics(self, time_start, trigger_time):
+        """Calculate and return the time results from the running statistics"""
+        # pixels never collected have nan statistics and are masked
+        return self._time_outlier_results(
+            np.ma.masked_invalid(self.median_estimators["time"].value),
+            np.ma.masked_invalid(self.stats["time"].mean),
+            np.ma.masked_invalid(self.stats["time"].std),
+            time_start,
+            trigger_time,
+        )
+
+    def _time_outlier_results(
+        self, pixel_median, pixel_mean, pixel_std, time_start, trigger_time
+    ):
+        """Find the time outliers from the per pixel sample statistics"""
         # median of the median over the camera
         median_of_pixel_median = np.ma.median(pixel_median, axis=1)
 
@@ -349,12 +413,45 @@ class FlasherFlatFieldCalculator(FlatFieldCalculator):
         # std over the sample per pixel
         pixel_std = np.ma.std(masked_trace_integral, axis=0)
 
-        # median of the median over the camera
-        median_of_pixel_median = np.ma.median(pixel_median, axis=1)
-
         # relative gain
         relative_gain_event = masked_trace_integral / event_median[:, :, np.newaxis]
 
+        return self._charge_outlier_results(
+            pixel_median,
+            pixel_mean,
+            pixel_std,
+            np.ma.median(relative_gain_event, axis=0),
+            np.ma.mean(relative_gain_event, axis=0),
+            np.ma.std(relative_gain_event, axis=0),
+        )
+
+    def calculate_relative_gain_results_from_statistics(self):
+        """Calculate and return the sample statistics from the running statistics"""
+        # pixels never collected have nan statistics and are masked
+        charge = self.stats["charge"]
+        gain = self.stats["relative_gain"]
+        return self._charge_outlier_results(
+            np.ma.masked_invalid(self.median_estimators["charge"].value),
+            np.ma.masked_invalid(charge.mean),
+            np.ma.masked_invalid(charge.std),
+            np.ma.masked_invalid(self.median_estimators["relative_gain"].value),
+            np.ma.masked_invalid(gain.mean),
+            np.ma.masked_invalid(gain.std),
+        )
+
+    def _charge_outlier_results(
+        self,
+        pixel_median,
+        pixel_mean,
+        pixel_std,
+        relative_gain_median,
+        relative_gain_mean,
+        relative_gain_std,
+    ):
+        """Find the charge outliers from the per pixel sample statistics"""
+        # median of the median over the camera
+        median_of_pixel_median = np.ma.median(pixel_median, axis=1)
+
         # outliers from median
         charge_deviation = pixel_median - median_of_pixel_median[:, np.newaxis]
 
@@ -366,13 +463,9 @@ class FlasherFlatFieldCalculator(FlatFieldCalculator):
         )
 
         return {
-            "relative_gain_median": np.ma.getdata(
-                np.ma.median(relative_gain_event, axis=0)
-            ),
-            "relative_gain_mean": np.ma.getdata(
-                np.ma.mean(relative_gain_event, axis=0)
-            ),
-            "relative_gain_std": np.ma.getdata(np.ma.std(relative_gain_event, axis=0)),
+            "relative_gain_median": np.ma.getdata(relative_gain_median),
+            "relative_gain_mean": np.ma.getdata(relative_gain_mean),
+            "relative_gain_std": np.ma.getdata(relative_gain_std),
             "charge_median": np.ma.getdata(pixel_median),
             "charge_mean": np.ma.getdata(pixel_mean),
             "charge_std": np.ma.getdata(pixel_std),
@@ -9,7 +9,8 @@ from ctapipe.core import Component
 
 
 from ctapipe.image.extractor import ImageExtractor
-from ctapipe.core.traits import Int, Unicode, List
+from ctapipe.core.traits import Int, Unicode, List, Bool
+from .streaming import RunningStatistics, StreamingQuantile
 
 __all__ = ["calc_pedestals_from_traces", "PedestalCalculator", "PedestalIntegrator"]
 
@@ -65,6 +66,8 @@ class PedestalCalculator(Component):
          number of waveform channel to be considered
     charge_product : str
         Name of the charge extractor to be used
+    streaming : bool
+        If True, accumulate running statistics instead of buffering the sample
     config : traitlets.loader.Config
         Configuration specified by config file or cmdline arguments.
         Used to set traitlet values.
@@ -83,6 +86,14 @@ class PedestalCalculator(Component):
     charge_product = Unicode(
         "FixedWindowSum", help="Name of the charge extractor to be used"
     ).tag(config=True)
+    streaming = Bool(
+        False,
+        help=(
+            "If True, use running statistics (Welford mean and std, P² median)"
+            " with memory independent of the sample size"
+            " instead of buffering all events of the sample"
+        ),
+    ).tag(config=True)
 
     def __init__(self, subarray, **kwargs):
         """
@@ -194,6 +205,8 @@ class PedestalIntegrator(PedestalCalculator):
         self.charge_medians = None  # med. charge in camera per event in sample
         self.charges = None  # charge per event in sample
         self.sample_masked_pixels = None  # pixels tp be masked per event in sample
+        self.charge_stats = None  # running charge statistics (streaming mode)
+        self.charge_median_estimator = None  # running charge median (streaming mode)
 
     def _extract_charge(self, event):
         """
@@ -270,9 +283,14 @@ class PedestalIntegrator(PedestalCalculator):
             sample_age > self.sample_duration
             or self.num_events_seen == self.sample_size
         ):
-            pedestal_results = calculate_pedestal_results(
-                self, self.charges, self.sample_masked_pixels,
-            )
+            if self.streaming:
+                pedestal_results = calculate_pedestal_results_from_statistics(
+                    self, self.charge_median_estimator.value, self.charge_stats,
+                )
+            else:
+                pedestal_results = calculate_pedestal_results(
+                    self, self.charges, self.sample_masked_pixels,
+                )
             time_results = calculate_time_results(self.time_start, trigger_time,)
 
             result = {
@@ -294,6 +312,12 @@ class PedestalIntegrator(PedestalCalculator):
 
         n_channels = waveform.shape[0]
         n_pix = waveform.shape[1]
+
+        if self.streaming:
+            self.charge_stats = RunningStatistics((n_channels, n_pix))
+            self.charge_median_estimator = StreamingQuantile((n_channels, n_pix))
+            return
+
         shape = (sample_size, n_channels, n_pix)
 
         self.charge_medians = np.zeros((sample_size, n_channels))
@@ -303,6 +327,12 @@ class PedestalIntegrator(PedestalCalculator):
     def collect_sample(self, charge, pixel_mask):
         """Collect the sample data"""
 
+        if self.streaming:
+            self.charge_stats.add(charge, pixel_mask)
+            self.charge_median_estimator.add(charge, pixel_mask)
+            self.num_events_seen += 1
+            return
+
         good_charge = np.ma.array(charge, mask=pixel_mask)
         charge_median = np.ma.median(good_charge, axis=1)
 
@@ -338,6 +368,30 @@ def calculate_pedestal_results(
     # std over the sample per pixel
     pixel_std = np.ma.std(masked_trace_integral, axis=0)
 
+    return calculate_outlier_results(self, pixel_median, pixel_mean, pixel_std)
+
+
+def calculate_pedestal_results_from_statistics(self, pixel_median, charge_stats):
+    """Calculate and return the sample statistics from running statistics
+
+    Parameters
+    ----------
+    pixel_median: np.ndarray
+        (approximate) median over the sample per pixel
+    charge_stats: ctapipe.calib.camera.streaming.RunningStatistics
+        running mean and std over the sample per pixel
+    """
+    # pixels never collected have nan statistics and are masked
+    return calculate_outlier_results(
+        self,
+        np.ma.masked_invalid(pixel_median),
+        np.ma.masked_invalid(charge_stats.mean),
+        np.ma.masked_invalid(charge_stats.std),
+    )
+
+
+def calculate_outlier_results(self, pixel_median, pixel_mean, pixel_std):
+    """Find the outlier pixels from the per pixel sample statistics"""
     # median over the camera
     median_of_pixel_median = np.ma.median(pixel_median, axis=1)
 
@@ -0,0 +1,204 @@
+"""
+Constant-memory running statistics for the camera calibration calculators.
+
+The pedestal and flat-field calculators need per-pixel moments and medians
+over a sample of events. Instead of buffering the whole sample, the classes
+in this module update their estimates event by event, so memory does not
+depend on the sample size and results are available at any time.
+"""
+import numpy as np
+
+__all__ = ["RunningStatistics", "StreamingQuantile"]
+
+
+def _valid_mask(shape, mask):
+    """Return the boolean array of entries to be used for an update"""
+    if mask is None:
+        return np.ones(shape, dtype=bool)
+    return ~np.broadcast_to(np.asanyarray(mask, dtype=bool), shape)
+
+
+class RunningStatistics:
+    """Running mean and variance of an array of quantities (Welford's algorithm).
+
+    Every element of the array of shape ``shape`` is treated as an independent
+    quantity, e.g. the charge of each channel and pixel of a camera.
+    Masked entries are not taken into account in the update.
+
+    Parameters
+    ----------
+    shape: tuple
+        shape of the array of quantities
+    """
+
+    def __init__(self, shape):
+        self.n = np.zeros(shape, dtype=np.int64)
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+
+    def add(self, values, mask=None):
+        """Update the statistics with one new value per element
+
+        Parameters
+        ----------
+        values: array-like
+            new values, broadcastable to ``shape``
+        mask: array-like or None
+            entries that are ``True`` are ignored in this update
+        """
+        values = np.broadcast_to(np.asanyarray(values, dtype=np.float64), self.n.shape)
+        valid = _valid_mask(self.n.shape, mask)
+
+        self.n += valid
+        delta = np.where(valid, values - self._mean, 0.0)
+        self._mean += np.divide(delta, self.n, out=np.zeros_like(delta), where=valid)
+        self._m2 += np.where(valid, delta * (values - self._mean), 0.0)
+
+    def merge(self, other):
+        """Combine with the statistics accumulated on another sample
+        (Chan et al. parallel update)"""
+        n = self.n + other.n
+        delta = other._mean - self._mean
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(n > 0, other.n / n, 0.0)
+            self._m2 += other._m2 + delta ** 2 * self.n * weight
+        self._mean += delta * weight
+        self.n = n
+
+    @property
+    def mean(self):
+        """mean per element, NaN where no value was collected"""
+        return np.where(self.n > 0, self._mean, np.nan)
+
+    @property
+    def var(self):
+        """population variance (ddof=0) per element, NaN where no value was collected"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.n > 0, self._m2 / self.n, np.nan)
+
+    @property
+    def std(self):
+        """population standard deviation per element"""
+        return np.sqrt(self.var)
+
+
+class StreamingQuantile:
+    """Approximate running quantile of an array of quantities.
+
+    Implements the P² algorithm (Jain & Chlamtac, Comm. ACM 28, 1985),
+    which tracks five markers per element and adjusts them with a
+    piecewise-parabolic prediction after each new value.
+    The estimate is exact up to five values per element.
+    Masked entries are not taken into account in the update.
+
+    Parameters
+    ----------
+    shape: tuple
+        shape of the array of quantities
+    quantile: float
+        quantile to estimate, between 0 and 1 (0.5 for the median)
+    """
+
+    def __init__(self, shape, quantile=0.5):
+        if not 0 < quantile < 1:
+            raise ValueError(f"quantile must be in (0, 1), got {quantile}")
+
+        p = quantile
+        self.quantile = p
+        self.n = np.zeros(shape, dtype=np.int64)
+        self._heights = np.zeros(tuple(shape) + (5,))
+        self._positions = np.tile(np.arange(1.0, 6.0), tuple(shape) + (1,))
+        self._desired = np.tile(
+            np.array([1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]), tuple(shape) + (1,)
+        )
+        self._increments = np.array([0, p / 2, p, (1 + p) / 2, 1])
+
+    def add(self, values, mask=None):
+        """Update the estimate with one new value per element
+
+        Parameters
+        ----------
+        values: array-like
+            new values, broadcastable to ``shape``
+        mask: array-like or None
+            entries that are ``True`` are ignored in this update
+        """
+        values = np.broadcast_to(np.asanyarray(values, dtype=np.float64), self.n.shape)
+        valid = _valid_mask(self.n.shape, mask)
+
+        # the first five values per element are only stored
+        init = valid & (self.n < 5)
+        update = valid & ~init
+
+        if np.any(init):
+            self._heights[init, self.n[init]] = values[init]
+            self.n[init] += 1
+            full = init & (self.n == 5)
+            if np.any(full):
+                self._heights[full] = np.sort(self._heights[full], axis=-1)
+
+        if np.any(update):
+            self.n[update] += 1
+            heights, positions, desired = self._update_markers(
+                values[update],
+                self._heights[update],
+                self._positions[update],
+                self._desired[update],
+            )
+            self._heights[update] = heights
+            self._positions[update] = positions
+            self._desired[update] = desired
+
+    def _update_markers(self, x, q, n, desired):
+        """P² marker update for flattened arrays of elements"""
+        q[:, 0] = np.minimum(q[:, 0], x)
+        q[:, 4] = np.maximum(q[:, 4], x)
+
+        # cell k with q[k] <= x < q[k + 1], markers above it move up by one
+        k = np.sum(x[:, np.newaxis] >= q[:, 1:4], axis=1)
+        n += np.arange(5) > k[:, np.newaxis]
+        desired += self._increments
+
+        for i in (1, 2, 3):
+            d = desired[:, i] - n[:, i]
+            up = (d >= 1) & (n[:, i + 1] - n[:, i] > 1)
+            down = (d <= -1) & (n[:, i - 1] - n[:, i] < -1)
+            adjust = up | down
+            if not np.any(adjust):
+                continue
+
+            s = np.where(up, 1.0, -1.0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                parabolic = q[:, i] + s / (n[:, i + 1] - n[:, i - 1]) * (
+                    (n[:, i] - n[:, i - 1] + s)
+                    * (q[:, i + 1] - q[:, i])
+                    / (n[:, i + 1] - n[:, i])
+                    + (n[:, i + 1] - n[:, i] - s)
+                    * (q[:, i] - q[:, i - 1])
+                    / (n[:, i] - n[:, i - 1])
+                )
+                q_neighbor = np.where(up, q[:, i + 1], q[:, i - 1])
+                n_neighbor = np.where(up, n[:, i + 1], n[:, i - 1])
+                linear = q[:, i] + s * (q_neighbor - q[:, i]) / (n_neighbor - n[:, i])
+
+            use_parabolic = (q[:, i - 1] < parabolic) & (parabolic < q[:, i + 1])
+            new_height = np.where(use_parabolic, parabolic, linear)
+            q[:, i] = np.where(adjust, new_height, q[:, i])
+            n[:, i] += np.where(adjust, s, 0.0)
+
+        return q, n, desired
+
+    @property
+    def value(self):
+        """current quantile estimate per element, NaN where no value was collected"""
+        result = self._heights[..., 2].copy()
+
+        # the middle marker is only the median of the first five values
+        few = (self.n > 0) & (self.n <= 5)
+        if np.any(few):
+            stored = self._heights[few]
+            stored[np.arange(5) >= self.n[few][:, np.newaxis]] = np.nan
+            result[few] = np.nanquantile(stored, self.quantile, axis=-1)
+
+        result[self.n == 0] = np.nan
+        return result
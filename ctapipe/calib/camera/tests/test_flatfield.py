@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 from ctapipe.calib.camera.flatfield import *
 from ctapipe.containers import EventAndMonDataContainer
 from traitlets.config.loader import Config
@@ -6,7 +7,8 @@ import astropy.units as u
 from ctapipe.instrument import SubarrayDescription, TelescopeDescription
 
 
-def test_flasherflatfieldcalculator():
+@pytest.mark.parametrize("streaming", [False, True])
+def test_flasherflatfieldcalculator(streaming):
     """test of flasherFlatFieldCalculator"""
     tel_id = 0
     n_gain = 2
@@ -33,6 +35,7 @@ def test_flasherflatfieldcalculator():
         sample_size=n_events,
         tel_id=tel_id,
         config=config,
+        streaming=streaming,
     )
     # create one event
     data = EventAndMonDataContainer()
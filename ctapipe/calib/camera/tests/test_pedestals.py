@@ -3,13 +3,15 @@ Tests for pedestal calculator functionality
 """
 import astropy.units as u
 import numpy as np
+import pytest
 
 from ctapipe.calib.camera.pedestals import *
 from ctapipe.instrument import SubarrayDescription, TelescopeDescription
 from ctapipe.containers import EventAndMonDataContainer
 
 
-def test_pedestal_calculator():
+@pytest.mark.parametrize("streaming", [False, True])
+def test_pedestal_calculator(streaming):
     """ test of PedestalIntegrator """
 
     tel_id = 0
@@ -35,6 +37,7 @@ def test_pedestal_calculator():
         charge_product="FixedWindowSum",
         sample_size=n_events,
         tel_id=tel_id,
+        streaming=streaming,
     )
     # create one event
     data = EventAndMonDataContainer()
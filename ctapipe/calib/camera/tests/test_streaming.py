@@ -0,0 +1,90 @@
+"""
+Tests for the running statistics of the camera calibration
+"""
+import numpy as np
+import pytest
+
+from ctapipe.calib.camera.streaming import RunningStatistics, StreamingQuantile
+
+
+@pytest.fixture
+def sample():
+    rng = np.random.RandomState(0)
+    values = rng.normal(10, 2, size=(5000, 2, 50))
+    mask = rng.uniform(size=values.shape) < 0.1
+    return values, mask
+
+
+def test_running_statistics(sample):
+    """ mean and std agree with the masked numpy result """
+    values, mask = sample
+    stats = RunningStatistics(values.shape[1:])
+    for value, pixel_mask in zip(values, mask):
+        stats.add(value, pixel_mask)
+
+    masked = np.ma.array(values, mask=mask)
+    assert np.all(stats.n == (~mask).sum(axis=0))
+    assert np.allclose(stats.mean, np.ma.mean(masked, axis=0))
+    assert np.allclose(stats.std, np.ma.std(masked, axis=0))
+
+
+def test_running_statistics_merge(sample):
+    """ merging partial statistics gives the statistics of the full sample """
+    values, mask = sample
+    first = RunningStatistics(values.shape[1:])
+    second = RunningStatistics(values.shape[1:])
+    for value, pixel_mask in zip(values[:1000], mask[:1000]):
+        first.add(value, pixel_mask)
+    for value, pixel_mask in zip(values[1000:], mask[1000:]):
+        second.add(value, pixel_mask)
+    first.merge(second)
+
+    masked = np.ma.array(values, mask=mask)
+    assert np.allclose(first.mean, np.ma.mean(masked, axis=0))
+    assert np.allclose(first.std, np.ma.std(masked, axis=0))
+
+
+def test_running_statistics_empty():
+    """ elements without values have nan statistics """
+    stats = RunningStatistics((3,))
+    stats.add([1.0, 2.0, 3.0], mask=[False, True, False])
+    stats.add([2.0, 2.0, 3.0], mask=[False, True, False])
+    assert np.allclose(stats.mean[[0, 2]], [1.5, 3])
+    assert np.allclose(stats.std[[0, 2]], [0.5, 0])
+    assert np.isnan(stats.mean[1]) and np.isnan(stats.std[1])
+
+
+@pytest.mark.parametrize("quantile", [0.5, 0.9])
+def test_streaming_quantile(sample, quantile):
+    """ P² estimate is close to the exact quantile """
+    values, mask = sample
+    estimator = StreamingQuantile(values.shape[1:], quantile=quantile)
+    for value, pixel_mask in zip(values, mask):
+        estimator.add(value, pixel_mask)
+
+    exact = np.nanquantile(np.where(mask, np.nan, values), quantile, axis=0)
+    # well below the statistical uncertainty of the quantile itself
+    assert np.allclose(estimator.value, exact, atol=0.1)
+
+
+def test_streaming_quantile_few_values():
+    """ quantile is exact for up to five values """
+    estimator = StreamingQuantile((2,))
+    assert np.all(np.isnan(estimator.value))
+
+    for value in [5, 1, 3]:
+        estimator.add([value, 2 * value], mask=[False, value == 3])
+    assert np.allclose(estimator.value, [3, 6])
+
+    with pytest.raises(ValueError):
+        StreamingQuantile((2,), quantile=1.5)
+
+
+def test_streaming_quantile_five_values():
+    """ also with exactly five values, the quantile is the exact one """
+    values = [4.0, 9.0, 1.0, 7.0, 3.0]
+    estimator = StreamingQuantile((1,), quantile=0.9)
+    for value in values:
+        estimator.add([value])
+
+    assert np.isclose(estimator.value[0], np.quantile(values, 0.9))
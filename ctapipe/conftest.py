@@ -2,6 +2,7 @@
 common pytest fixtures for tests in ctapipe
 """
 
+import os
 import pytest
 
 from copy import deepcopy
@@ -10,6 +11,21 @@ from ctapipe.io import SimTelEventSource
 from ctapipe.utils import get_dataset_path
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _cache_dir(tmp_path_factory):
+    """
+    Use a temporary cache directory for all tests, so tests do not
+    depend on or modify the cache of the user
+    """
+    previous = os.environ.get("CTAPIPE_CACHE_DIR")
+    os.environ["CTAPIPE_CACHE_DIR"] = str(tmp_path_factory.mktemp("ctapipe_cache"))
+    yield
+    if previous is None:
+        del os.environ["CTAPIPE_CACHE_DIR"]
+    else:
+        os.environ["CTAPIPE_CACHE_DIR"] = previous
+
+
 @pytest.fixture(scope="session")
 def _global_example_event():
     """
@@ -12,6 +12,19 @@ from .telescope_frame import TelescopeFrame
 from .nominal_frame import NominalFrame
 from .ground_frames import GroundFrame, TiltedGroundFrame, project_to_ground
 from .camera_frame import CameraFrame, EngineeringCameraFrame
+from .fast_transforms import (
+    camera_to_fov,
+    fov_to_camera,
+    altaz_to_fov,
+    fov_to_altaz,
+    fov_to_fov,
+    camera_to_altaz,
+    camera_to_horizon_cartesian,
+    shower_trans_matrix,
+    cached_shower_trans_matrix,
+    ground_to_tilted_positions,
+    tilted_to_ground_positions,
+)
 
 
 __all__ = [
@@ -23,6 +36,17 @@ __all__ = [
     "TiltedGroundFrame",
     "project_to_ground",
     "MissingFrameAttributeWarning",
+    "camera_to_fov",
+    "fov_to_camera",
+    "altaz_to_fov",
+    "fov_to_altaz",
+    "fov_to_fov",
+    "camera_to_altaz",
+    "camera_to_horizon_cartesian",
+    "shower_trans_matrix",
+    "cached_shower_trans_matrix",
+    "ground_to_tilted_positions",
+    "tilted_to_ground_positions",
 ]
 
 
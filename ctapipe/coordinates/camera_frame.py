@@ -17,6 +17,7 @@ from astropy.coordinates import (
 
 from .telescope_frame import TelescopeFrame
 from .representation import PlanarRepresentation
+from .fast_transforms import camera_to_fov, fov_to_camera
 
 
 class MirrorAttribute(Attribute):
@@ -116,37 +117,20 @@ def camera_to_telescope(camera_coord, telescope_frame):
     Transformation between CameraFrame and TelescopeFrame.
     Is called when a SkyCoord is transformed from CameraFrame into TelescopeFrame
     """
-    x_pos = camera_coord.cartesian.x
-    y_pos = camera_coord.cartesian.y
-
-    rot = camera_coord.rotation
-    if rot == 0:  # if no rotation applied save a few cycles
-        x_rotated = x_pos
-        y_rotated = y_pos
-    else:
-        cosrot = np.cos(rot)
-        sinrot = np.sin(rot)
-        x_rotated = x_pos * cosrot - y_pos * sinrot
-        y_rotated = x_pos * sinrot + y_pos * cosrot
-
-    focal_length = camera_coord.focal_length
-
     # this assumes an equidistant mapping function of the telescope optics
     # or a small angle approximation of most other mapping functions
     # this could be replaced by actually defining the mapping function
     # as an Attribute of `CameraFrame` that maps f(r, focal_length) -> theta,
     # where theta is the angle to the optical axis and r is the distance
     # to the camera center in the focal plane
-    fov_lat = u.Quantity(
-        (x_rotated / focal_length).to_value(u.dimensionless_unscaled),
-        u.rad,
-        copy=False,
-    )
-    fov_lon = u.Quantity(
-        (y_rotated / focal_length).to_value(u.dimensionless_unscaled),
-        u.rad,
-        copy=False,
+    fov_lon, fov_lat = camera_to_fov(
+        camera_coord.cartesian.x.to_value(u.m),
+        camera_coord.cartesian.y.to_value(u.m),
+        camera_coord.focal_length.to_value(u.m),
+        camera_coord.rotation.to_value(u.rad),
     )
+    fov_lat = u.Quantity(fov_lat, u.rad, copy=False)
+    fov_lon = u.Quantity(fov_lon, u.rad, copy=False)
 
     representation = UnitSphericalRepresentation(lat=fov_lat, lon=fov_lon)
 
@@ -160,32 +144,20 @@ def telescope_to_camera(telescope_coord, camera_frame):
 
     Is called when a SkyCoord is transformed from TelescopeFrame into CameraFrame
     """
-    x_pos = telescope_coord.fov_lat
-    y_pos = telescope_coord.fov_lon
-    # reverse the rotation applied to get to this system
-    rot = -camera_frame.rotation
-
-    if rot.value == 0.0:  # if no rotation applied save a few cycles
-        x_rotated = x_pos
-        y_rotated = y_pos
-    else:  # or else rotate all positions around the camera centre
-        cosrot = np.cos(rot)
-        sinrot = np.sin(rot)
-        x_rotated = x_pos * cosrot - y_pos * sinrot
-        y_rotated = x_pos * sinrot + y_pos * cosrot
-
-    focal_length = camera_frame.focal_length
-
     # this assumes an equidistant mapping function of the telescope optics
     # or a small angle approximation of most other mapping functions
     # this could be replaced by actually defining the mapping function
     # as an Attribute of `CameraFrame` that maps f(theta, focal_length) -> r,
     # where theta is the angle to the optical axis and r is the distance
     # to the camera center in the focal plane
-    x_rotated = x_rotated.to_value(u.rad) * focal_length
-    y_rotated = y_rotated.to_value(u.rad) * focal_length
+    x_pos, y_pos = fov_to_camera(
+        telescope_coord.fov_lon.to_value(u.rad),
+        telescope_coord.fov_lat.to_value(u.rad),
+        camera_frame.focal_length.to_value(u.m),
+        camera_frame.rotation.to_value(u.rad),
+    )
 
-    representation = CartesianRepresentation(x_rotated, y_rotated, 0 * u.m)
+    representation = CartesianRepresentation(x_pos * u.m, y_pos * u.m, 0 * u.m)
 
     return camera_frame.realize_frame(representation)
 
@@ -0,0 +1,476 @@
+"""
+Coordinate transformations between the camera, telescope, nominal and
+horizontal frames on plain numpy arrays.
+
+These implement the same transformations as the astropy frames in
+this package, but without the overhead of the astropy frame transformation
+graph, which dominates when transforming only a few points at a time,
+e.g. the hillas parameters of every event.
+
+All angles are in radians, lengths in the camera plane can be in any
+unit, as long as the focal length is given in the same unit.
+Angles in the field of view (``fov_lon``, ``fov_lat``) are those of
+`~ctapipe.coordinates.TelescopeFrame` and `~ctapipe.coordinates.NominalFrame`,
+with ``fov_lon`` aligned with azimuth and ``fov_lat`` aligned with altitude.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+__all__ = [
+    "camera_to_fov",
+    "fov_to_camera",
+    "altaz_to_fov",
+    "fov_to_altaz",
+    "fov_to_fov",
+    "camera_to_altaz",
+    "camera_to_horizon_cartesian",
+    "shower_trans_matrix",
+    "cached_shower_trans_matrix",
+    "ground_to_tilted_positions",
+    "tilted_to_ground_positions",
+    "TRANS_MATRIX_QUANTUM",
+]
+
+#: resolution in rad of the pointing angles used as cache keys for the
+#: ground to tilted system transformation matrices
+TRANS_MATRIX_QUANTUM = 1e-10
+
+
+def _rotate(x, y, rotation):
+    """ rotate positions around the origin counter clockwise by ``rotation``"""
+    if np.all(rotation == 0):
+        return x, y
+
+    cos_rot = np.cos(rotation)
+    sin_rot = np.sin(rotation)
+    return x * cos_rot - y * sin_rot, x * sin_rot + y * cos_rot
+
+
+def camera_to_fov(x, y, focal_length, rotation=0.0):
+    """
+    Transform positions in the camera plane to angles in the field of view,
+    the same as transforming from `~ctapipe.coordinates.CameraFrame`
+    to `~ctapipe.coordinates.TelescopeFrame`.
+
+    As in `~ctapipe.coordinates.CameraFrame`, an equidistant mapping function
+    of the telescope optics is assumed.
+
+    Parameters
+    ----------
+    x: float or ndarray
+        x coordinate in the camera frame
+    y: float or ndarray
+        y coordinate in the camera frame
+    focal_length: float or ndarray
+        focal length of the telescope in the same unit as x and y
+    rotation: float or ndarray
+        rotation angle of the camera in rad
+
+    Returns
+    -------
+    fov_lon: float or ndarray
+        longitude in the field of view in rad
+    fov_lat: float or ndarray
+        latitude in the field of view in rad
+    """
+    x_rotated, y_rotated = _rotate(x, y, rotation)
+    return y_rotated / focal_length, x_rotated / focal_length
+
+
+def fov_to_camera(fov_lon, fov_lat, focal_length, rotation=0.0):
+    """
+    Transform angles in the field of view to positions in the camera plane,
+    the inverse of `camera_to_fov`.
+
+    Parameters
+    ----------
+    fov_lon: float or ndarray
+        longitude in the field of view in rad
+    fov_lat: float or ndarray
+        latitude in the field of view in rad
+    focal_length: float or ndarray
+        focal length of the telescope, determines the unit of the result
+    rotation: float or ndarray
+        rotation angle of the camera in rad
+
+    Returns
+    -------
+    x: float or ndarray
+        x coordinate in the camera frame
+    y: float or ndarray
+        y coordinate in the camera frame
+    """
+    x_rotated, y_rotated = _rotate(fov_lat, fov_lon, -np.asanyarray(rotation))
+    return x_rotated * focal_length, y_rotated * focal_length
+
+
+def _to_cartesian(lon, lat):
+    cos_lat = np.cos(lat)
+    return np.stack(
+        np.broadcast_arrays(cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat))
+    )
+
+
+def _to_spherical(cartesian):
+    x, y, z = cartesian
+    return np.arctan2(y, x), np.arctan2(z, np.hypot(x, y))
+
+
+def _altaz_to_fov_matrix(pointing_az, pointing_alt):
+    """
+    The rotation matrix from horizontal to field of view cartesian coordinates,
+    the same as astropy's ``rotation_matrix(-alt, "y") @ rotation_matrix(az, "z")``
+    as used by the `~ctapipe.coordinates.TelescopeFrame`.
+    Returns a (3, 3, ...) array for array inputs.
+    """
+    pointing_az, pointing_alt = np.broadcast_arrays(pointing_az, pointing_alt)
+    cos_az, sin_az = np.cos(pointing_az), np.sin(pointing_az)
+    cos_alt, sin_alt = np.cos(pointing_alt), np.sin(pointing_alt)
+    zero = np.zeros_like(cos_az)
+    return np.array(
+        [
+            [cos_alt * cos_az, cos_alt * sin_az, sin_alt],
+            [-sin_az, cos_az, zero],
+            [-sin_alt * cos_az, -sin_alt * sin_az, cos_alt],
+        ]
+    )
+
+
+def _rotate_vectors(matrix, vectors, transpose=False):
+    """ apply (3, 3, ...) matrices to (3, ...) vectors """
+    subscripts = "ji...,j...->i..." if transpose else "ij...,j...->i..."
+    return np.einsum(subscripts, matrix, vectors)
+
+
+def altaz_to_fov(az, alt, pointing_az, pointing_alt):
+    """
+    Transform horizontal coordinates to angles in the field of view of a
+    telescope pointing to ``pointing_az``, ``pointing_alt``, the same as
+    transforming from `~astropy.coordinates.AltAz` to
+    `~ctapipe.coordinates.TelescopeFrame` or `~ctapipe.coordinates.NominalFrame`.
+
+    Parameters
+    ----------
+    az: float or ndarray
+        azimuth in rad
+    alt: float or ndarray
+        altitude in rad
+    pointing_az: float or ndarray
+        azimuth of the pointing direction in rad
+    pointing_alt: float or ndarray
+        altitude of the pointing direction in rad
+
+    Returns
+    -------
+    fov_lon: float or ndarray
+        longitude in the field of view in rad, in the range [-pi, pi]
+    fov_lat: float or ndarray
+        latitude in the field of view in rad
+    """
+    matrix = _altaz_to_fov_matrix(pointing_az, pointing_alt)
+    return _to_spherical(_rotate_vectors(matrix, _to_cartesian(az, alt)))
+
+
+def fov_to_altaz(fov_lon, fov_lat, pointing_az, pointing_alt):
+    """
+    Transform angles in the field of view of a telescope pointing to
+    ``pointing_az``, ``pointing_alt`` to horizontal coordinates,
+    the inverse of `altaz_to_fov`.
+
+    Parameters
+    ----------
+    fov_lon: float or ndarray
+        longitude in the field of view in rad
+    fov_lat: float or ndarray
+        latitude in the field of view in rad
+    pointing_az: float or ndarray
+        azimuth of the pointing direction in rad
+    pointing_alt: float or ndarray
+        altitude of the pointing direction in rad
+
+    Returns
+    -------
+    az: float or ndarray
+        azimuth in rad, in the range [0, 2 pi)
+    alt: float or ndarray
+        altitude in rad
+    """
+    matrix = _altaz_to_fov_matrix(pointing_az, pointing_alt)
+    vectors = _rotate_vectors(matrix, _to_cartesian(fov_lon, fov_lat), transpose=True)
+    az, alt = _to_spherical(vectors)
+    return np.mod(az, 2 * np.pi), alt
+
+
+def fov_to_fov(fov_lon, fov_lat, from_az, from_alt, to_az, to_alt):
+    """
+    Transform angles in the field of view of one pointing direction to those
+    of another, e.g. from the `~ctapipe.coordinates.TelescopeFrame` of a
+    telescope to the `~ctapipe.coordinates.NominalFrame` of the array.
+
+    Parameters
+    ----------
+    fov_lon: float or ndarray
+        longitude in the field of view in rad
+    fov_lat: float or ndarray
+        latitude in the field of view in rad
+    from_az: float or ndarray
+        azimuth of the pointing of the input coordinates in rad
+    from_alt: float or ndarray
+        altitude of the pointing of the input coordinates in rad
+    to_az: float or ndarray
+        azimuth of the pointing of the output coordinates in rad
+    to_alt: float or ndarray
+        altitude of the pointing of the output coordinates in rad
+
+    Returns
+    -------
+    fov_lon: float or ndarray
+        longitude in the new field of view in rad
+    fov_lat: float or ndarray
+        latitude in the new field of view in rad
+    """
+    from_matrix = _altaz_to_fov_matrix(from_az, from_alt)
+    to_matrix = _altaz_to_fov_matrix(to_az, to_alt)
+    vectors = _to_cartesian(fov_lon, fov_lat)
+    vectors = _rotate_vectors(from_matrix, vectors, transpose=True)
+    return _to_spherical(_rotate_vectors(to_matrix, vectors))
+
+
+def camera_to_altaz(x, y, focal_length, pointing_az, pointing_alt, rotation=0.0):
+    """
+    Transform positions in the camera plane to horizontal coordinates,
+    the same as transforming from `~ctapipe.coordinates.CameraFrame`
+    to `~astropy.coordinates.AltAz`.
+
+    Parameters
+    ----------
+    x: float or ndarray
+        x coordinate in the camera frame
+    y: float or ndarray
+        y coordinate in the camera frame
+    focal_length: float or ndarray
+        focal length of the telescope in the same unit as x and y
+    pointing_az: float or ndarray
+        azimuth of the telescope pointing in rad
+    pointing_alt: float or ndarray
+        altitude of the telescope pointing in rad
+    rotation: float or ndarray
+        rotation angle of the camera in rad
+
+    Returns
+    -------
+    az: float or ndarray
+        azimuth in rad, in the range [0, 2 pi)
+    alt: float or ndarray
+        altitude in rad
+    """
+    fov_lon, fov_lat = camera_to_fov(x, y, focal_length, rotation)
+    return fov_to_altaz(fov_lon, fov_lat, pointing_az, pointing_alt)
+
+
+def camera_to_horizon_cartesian(x, y, focal_length, pointing_az, pointing_alt):
+    """
+    Direction of camera positions as (n, 3) cartesian vectors in the
+    convention of `~ctapipe.reco.HillasReconstructor.HillasPlane`,
+    equivalent to `camera_to_altaz` followed by
+    ``spherical_to_cartesian(1, alt, -az)``.
+
+    Parameters
+    ----------
+    x: ndarray
+        x coordinates in the camera frame
+    y: ndarray
+        y coordinates in the camera frame
+    focal_length: float or ndarray
+        focal length of the telescope in the same unit as x and y
+    pointing_az: float or ndarray
+        azimuth of the telescope pointing in rad
+    pointing_alt: float or ndarray
+        altitude of the telescope pointing in rad
+
+    Returns
+    -------
+    ndarray:
+        (n, 3) array of unit vectors
+    """
+    fov_lon, fov_lat = camera_to_fov(x, y, focal_length)
+    matrix = _altaz_to_fov_matrix(pointing_az, pointing_alt)
+    vectors = _rotate_vectors(matrix, _to_cartesian(fov_lon, fov_lat), transpose=True)
+
+    # astropy's coordinates system rotates counter clockwise.
+    # Apparently we assume it to be clockwise
+    vectors[1] *= -1
+    return vectors.T
+
+
+def _quantize(angle):
+    """ integer cache key of an angle in rad """
+    return np.round(np.asanyarray(angle, dtype=np.float64) / TRANS_MATRIX_QUANTUM)
+
+
+def _compute_shower_trans_matrix(azimuth, altitude):
+    """ (n, 3, 3) ground to tilted matrices for arrays of angles in rad """
+    cos_z = np.sin(altitude)
+    sin_z = np.cos(altitude)
+    cos_az = np.cos(azimuth)
+    sin_az = np.sin(azimuth)
+
+    trans = np.zeros((len(azimuth), 3, 3))
+    trans[:, 0, 0] = cos_z * cos_az
+    trans[:, 1, 0] = sin_az
+    trans[:, 2, 0] = sin_z * cos_az
+
+    trans[:, 0, 1] = -cos_z * sin_az
+    trans[:, 1, 1] = cos_az
+    trans[:, 2, 1] = -sin_z * sin_az
+
+    trans[:, 0, 2] = -sin_z
+    trans[:, 1, 2] = 0.0
+    trans[:, 2, 2] = cos_z
+    return trans
+
+
+@lru_cache(maxsize=1024)
+def _cached_shower_trans_matrix(azimuth_key, altitude_key):
+    trans = _compute_shower_trans_matrix(
+        np.array([azimuth_key * TRANS_MATRIX_QUANTUM]),
+        np.array([altitude_key * TRANS_MATRIX_QUANTUM]),
+    )[0]
+    trans.setflags(write=False)
+    return trans
+
+
+def cached_shower_trans_matrix(azimuth, altitude):
+    """
+    Memoized transformation matrix from the ground to the tilted system
+    for a single pointing direction, see
+    `~ctapipe.coordinates.ground_frames.get_shower_trans_matrix`.
+
+    The angles are quantized to `TRANS_MATRIX_QUANTUM` and the matrix
+    of the quantized angles is cached, so calling this for every event of
+    a run with a fixed pointing computes the matrix only once.
+
+    Parameters
+    ----------
+    azimuth: float
+        azimuth angle of the tilted system in rad
+    altitude: float
+        altitude angle of the tilted system in rad
+
+    Returns
+    -------
+    trans: ndarray
+        read-only (3, 3) transformation matrix
+    """
+    return _cached_shower_trans_matrix(
+        int(_quantize(azimuth)), int(_quantize(altitude))
+    )
+
+
+def shower_trans_matrix(azimuth, altitude):
+    """
+    Array version of `~ctapipe.coordinates.ground_frames.get_shower_trans_matrix`.
+
+    As `cached_shower_trans_matrix`, the angles are quantized
+    to `TRANS_MATRIX_QUANTUM` and the matrix is only computed once for
+    each distinct pointing.
+
+    Parameters
+    ----------
+    azimuth: ndarray
+        azimuth angles of the tilted systems in rad
+    altitude: ndarray
+        altitude angles of the tilted systems in rad
+
+    Returns
+    -------
+    trans: ndarray
+        (n, 3, 3) transformation matrices from the ground to the tilted system
+    """
+    azimuth, altitude = np.broadcast_arrays(
+        np.atleast_1d(_quantize(azimuth)), np.atleast_1d(_quantize(altitude))
+    )
+    keys, inverse = np.unique(
+        np.column_stack([azimuth, altitude]), axis=0, return_inverse=True
+    )
+    keys = keys * TRANS_MATRIX_QUANTUM
+    return _compute_shower_trans_matrix(keys[:, 0], keys[:, 1])[inverse.ravel()]
+
+
+def ground_to_tilted_positions(x, y, z, azimuth, altitude):
+    """
+    Transform ground positions to the tilted system, the same as transforming
+    from `~ctapipe.coordinates.GroundFrame` to
+    `~ctapipe.coordinates.TiltedGroundFrame`, for many positions and
+    pointings at once.
+
+    Parameters
+    ----------
+    x, y, z: float or ndarray
+        positions in the ground frame
+    azimuth: float or ndarray
+        azimuth of the pointing direction of the tilted system in rad,
+        either one for all positions or one per position
+    altitude: float or ndarray
+        altitude of the pointing direction of the tilted system in rad
+
+    Returns
+    -------
+    x, y: ndarray
+        positions in the tilted frame, in the unit of the input
+    """
+    x, y, z = np.broadcast_arrays(x, y, z)
+    trans = shower_trans_matrix(azimuth, altitude)
+    if len(trans) == 1:
+        trans = trans[0]
+    else:
+        trans = np.moveaxis(trans.reshape(x.shape + (3, 3)), (-2, -1), (0, 1))
+
+    x_tilt = trans[0, 0] * x + trans[0, 1] * y + trans[0, 2] * z
+    y_tilt = trans[1, 0] * x + trans[1, 1] * y + trans[1, 2] * z
+    return x_tilt, y_tilt
+
+
+def tilted_to_ground_positions(x, y, azimuth, altitude, project=False):
+    """
+    Transform positions in the tilted system to the ground system, the same
+    as transforming from `~ctapipe.coordinates.TiltedGroundFrame` to
+    `~ctapipe.coordinates.GroundFrame` for many positions and pointings at once.
+
+    Parameters
+    ----------
+    x, y: float or ndarray
+        positions in the tilted frame
+    azimuth: float or ndarray
+        azimuth of the pointing direction of the tilted system in rad,
+        either one for all positions or one per position
+    altitude: float or ndarray
+        altitude of the pointing direction of the tilted system in rad
+    project: bool
+        if True, project the positions along the pointing direction
+        onto the ground, as `~ctapipe.coordinates.project_to_ground` does
+
+    Returns
+    -------
+    x, y, z: ndarray
+        positions in the ground frame, in the unit of the input,
+        z is zero if ``project`` is True
+    """
+    x, y = np.broadcast_arrays(x, y)
+    trans = shower_trans_matrix(azimuth, altitude)
+    if len(trans) == 1:
+        trans = trans[0]
+    else:
+        trans = np.moveaxis(trans.reshape(x.shape + (3, 3)), (-2, -1), (0, 1))
+
+    x_grd = trans[0, 0] * x + trans[1, 0] * y
+    y_grd = trans[0, 1] * x + trans[1, 1] * y
+    z_grd = trans[0, 2] * x + trans[1, 2] * y
+
+    if project:
+        x_grd = x_grd - trans[2, 0] * z_grd / trans[2, 2]
+        y_grd = y_grd - trans[2, 1] * z_grd / trans[2, 2]
+        z_grd = np.zeros_like(z_grd)
+
+    return x_grd, y_grd, z_grd
@@ -14,7 +14,6 @@ TODO:
 - Tests Tests Tests!
 """
 import astropy.units as u
-import numpy as np
 from astropy.coordinates import (
     BaseCoordinateFrame,
     CartesianRepresentation,
@@ -23,9 +22,8 @@ from astropy.coordinates import (
     AltAz,
 )
 from astropy.coordinates import frame_transform_graph
-from numpy import cos, sin
-
 from .representation import PlanarRepresentation
+from .fast_transforms import cached_shower_trans_matrix
 
 __all__ = [
     "GroundFrame",
@@ -76,37 +74,24 @@ def get_shower_trans_matrix(azimuth, altitude):
     from read_hess, probably could be streamlined using python
     functionality)
 
+    The matrices are memoized, see
+    `~ctapipe.coordinates.fast_transforms.cached_shower_trans_matrix`.
+
     Parameters
     ----------
-    azimuth: float
-        Azimuth angle of the tilted system used
-    altitude: float
-        Altitude angle of the tilted system used
+    azimuth: float or u.Quantity
+        Azimuth angle of the tilted system used, in rad if a float
+    altitude: float or u.Quantity
+        Altitude angle of the tilted system used, in rad if a float
 
     Returns
     -------
-    trans: 3x3 ndarray transformation matrix
+    trans: 3x3 ndarray transformation matrix, read-only
     """
-
-    cos_z = sin(altitude)
-    sin_z = cos(altitude)
-    cos_az = cos(azimuth)
-    sin_az = sin(azimuth)
-
-    trans = np.zeros([3, 3])
-    trans[0][0] = cos_z * cos_az
-    trans[1][0] = sin_az
-    trans[2][0] = sin_z * cos_az
-
-    trans[0][1] = -cos_z * sin_az
-    trans[1][1] = cos_az
-    trans[2][1] = -sin_z * sin_az
-
-    trans[0][2] = -sin_z
-    trans[1][2] = 0.0
-    trans[2][2] = cos_z
-
-    return trans
+    return cached_shower_trans_matrix(
+        u.Quantity(azimuth, u.rad).to_value(u.rad),
+        u.Quantity(altitude, u.rad).to_value(u.rad),
+    )
 
 
 @frame_transform_graph.transform(FunctionTransform, GroundFrame, TiltedGroundFrame)
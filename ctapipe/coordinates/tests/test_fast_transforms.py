@@ -0,0 +1,179 @@
+import numpy as np
+import astropy.units as u
+from astropy.coordinates import AltAz, SkyCoord
+
+from ctapipe.coordinates import (
+    CameraFrame,
+    NominalFrame,
+    TelescopeFrame,
+    GroundFrame,
+    TiltedGroundFrame,
+    camera_to_fov,
+    fov_to_camera,
+    altaz_to_fov,
+    fov_to_altaz,
+    fov_to_fov,
+    camera_to_altaz,
+    shower_trans_matrix,
+    cached_shower_trans_matrix,
+    ground_to_tilted_positions,
+    tilted_to_ground_positions,
+    project_to_ground,
+)
+from ctapipe.coordinates.ground_frames import get_shower_trans_matrix
+
+rng = np.random.RandomState(0)
+x = rng.uniform(-1, 1, 100)
+y = rng.uniform(-1, 1, 100)
+focal_length = 16.0
+pointing = SkyCoord(alt=70 * u.deg, az=350 * u.deg, frame=AltAz())
+pointing_az = pointing.az.to_value(u.rad)
+pointing_alt = pointing.alt.to_value(u.rad)
+
+
+def test_camera_fov():
+    """ compare to the transformation between CameraFrame and TelescopeFrame """
+    for rotation in (0, np.deg2rad(10)):
+        camera_frame = CameraFrame(
+            focal_length=focal_length * u.m, rotation=rotation * u.rad
+        )
+        camera_coord = SkyCoord(x=x * u.m, y=y * u.m, frame=camera_frame)
+        telescope_coord = camera_coord.transform_to(TelescopeFrame())
+
+        fov_lon, fov_lat = camera_to_fov(x, y, focal_length, rotation)
+        assert np.allclose(fov_lon, telescope_coord.fov_lon.to_value(u.rad))
+        assert np.allclose(fov_lat, telescope_coord.fov_lat.to_value(u.rad))
+
+        back_x, back_y = fov_to_camera(fov_lon, fov_lat, focal_length, rotation)
+        assert np.allclose(back_x, x)
+        assert np.allclose(back_y, y)
+
+
+def test_altaz_fov():
+    """ compare to the transformation between AltAz and TelescopeFrame """
+    fov_lon, fov_lat = camera_to_fov(x, y, focal_length)
+
+    telescope_frame = TelescopeFrame(telescope_pointing=pointing)
+    telescope_coord = SkyCoord(
+        fov_lon=fov_lon * u.rad, fov_lat=fov_lat * u.rad, frame=telescope_frame
+    )
+    altaz = telescope_coord.transform_to(AltAz())
+
+    az, alt = fov_to_altaz(fov_lon, fov_lat, pointing_az, pointing_alt)
+    assert np.allclose(az, altaz.az.to_value(u.rad), rtol=0, atol=1e-12)
+    assert np.allclose(alt, altaz.alt.to_value(u.rad), rtol=0, atol=1e-12)
+    assert np.all((az >= 0) & (az < 2 * np.pi))
+
+    back_lon, back_lat = altaz_to_fov(az, alt, pointing_az, pointing_alt)
+    assert np.allclose(back_lon, fov_lon, rtol=0, atol=1e-12)
+    assert np.allclose(back_lat, fov_lat, rtol=0, atol=1e-12)
+
+    # one pointing per coordinate
+    az_array, alt_array = fov_to_altaz(
+        fov_lon, fov_lat, np.full(len(x), pointing_az), pointing_alt
+    )
+    assert np.allclose(az_array, az, rtol=0, atol=1e-12)
+    assert np.allclose(alt_array, alt, rtol=0, atol=1e-12)
+
+    # the camera center is the pointing direction
+    az, alt = camera_to_altaz(0.0, 0.0, focal_length, pointing_az, pointing_alt)
+    assert np.isclose(az, pointing_az)
+    assert np.isclose(alt, pointing_alt)
+
+
+def test_fov_to_fov():
+    """ compare to the transformation from TelescopeFrame to NominalFrame """
+    fov_lon, fov_lat = camera_to_fov(x, y, focal_length)
+    array_pointing = SkyCoord(alt=72 * u.deg, az=5 * u.deg, frame=AltAz())
+
+    telescope_coord = SkyCoord(
+        fov_lon=fov_lon * u.rad,
+        fov_lat=fov_lat * u.rad,
+        frame=TelescopeFrame(telescope_pointing=pointing),
+    )
+    nominal = telescope_coord.transform_to(NominalFrame(origin=array_pointing))
+
+    nominal_lon, nominal_lat = fov_to_fov(
+        fov_lon,
+        fov_lat,
+        pointing_az,
+        pointing_alt,
+        array_pointing.az.to_value(u.rad),
+        array_pointing.alt.to_value(u.rad),
+    )
+    assert np.allclose(nominal_lon, nominal.fov_lon.to_value(u.rad), atol=1e-12)
+    assert np.allclose(nominal_lat, nominal.fov_lat.to_value(u.rad), atol=1e-12)
+
+
+def test_shower_trans_matrix():
+    azimuth = rng.uniform(0, 2 * np.pi, 5)
+    altitude = rng.uniform(0.5, 1.5, 5)
+    trans = shower_trans_matrix(azimuth, altitude)
+
+    for i in range(5):
+        assert np.allclose(trans[i], get_shower_trans_matrix(azimuth[i], altitude[i]))
+
+    # same as the transformation to the TiltedGroundFrame
+    ground = GroundFrame(x=[10, 20] * u.m, y=[-5, 30] * u.m, z=[0, 0] * u.m)
+    pointing = SkyCoord(alt=altitude[0] * u.rad, az=azimuth[0] * u.rad, frame=AltAz())
+    tilted = ground.transform_to(TiltedGroundFrame(pointing_direction=pointing))
+    positions = np.array([[10, -5, 0], [20, 30, 0]])
+    tilted_x, tilted_y, _ = trans[0] @ positions.T
+    assert np.allclose(tilted_x, tilted.x.to_value(u.m))
+    assert np.allclose(tilted_y, tilted.y.to_value(u.m))
+
+
+def test_cached_shower_trans_matrix():
+    from ctapipe.coordinates.fast_transforms import _cached_shower_trans_matrix
+
+    azimuth, altitude = 0.3, 1.2
+    trans = cached_shower_trans_matrix(azimuth, altitude)
+    assert not trans.flags.writeable
+    assert np.allclose(trans, shower_trans_matrix([azimuth], [altitude])[0])
+
+    # quantized angles share the cached matrix
+    hits = _cached_shower_trans_matrix.cache_info().hits
+    assert cached_shower_trans_matrix(azimuth + 1e-12, altitude) is trans
+    assert (
+        get_shower_trans_matrix(azimuth * u.rad, np.rad2deg(altitude) * u.deg) is trans
+    )
+    assert _cached_shower_trans_matrix.cache_info().hits == hits + 2
+
+
+def test_ground_tilted_positions():
+    """ compare to the transformations between GroundFrame and TiltedGroundFrame """
+    ground_x = rng.uniform(-500, 500, 10)
+    ground_y = rng.uniform(-500, 500, 10)
+    ground_z = rng.uniform(-5, 5, 10)
+    azimuth = rng.choice([0.1, 3.0], 10)
+    altitude = rng.choice([1.0, 1.3], 10)
+
+    tilt_x, tilt_y = ground_to_tilted_positions(
+        ground_x, ground_y, ground_z, azimuth, altitude
+    )
+    core_x, core_y, _ = tilted_to_ground_positions(
+        tilt_x, tilt_y, azimuth, altitude, project=True
+    )
+
+    for i in range(10):
+        pointing = SkyCoord(
+            alt=altitude[i] * u.rad, az=azimuth[i] * u.rad, frame=AltAz()
+        )
+        tilted = GroundFrame(
+            x=ground_x[i] * u.m, y=ground_y[i] * u.m, z=ground_z[i] * u.m
+        ).transform_to(TiltedGroundFrame(pointing_direction=pointing))
+        assert np.isclose(tilt_x[i], tilted.x.to_value(u.m))
+        assert np.isclose(tilt_y[i], tilted.y.to_value(u.m))
+
+        ground = project_to_ground(tilted)
+        assert np.isclose(core_x[i], ground.x.to_value(u.m))
+        assert np.isclose(core_y[i], ground.y.to_value(u.m))
+
+    # one pointing for all positions
+    tilt_x, tilt_y = ground_to_tilted_positions(
+        ground_x, ground_y, ground_z, azimuth[0], altitude[0]
+    )
+    x, y, z = tilted_to_ground_positions(tilt_x, tilt_y, azimuth[0], altitude[0])
+    assert np.allclose(
+        ground_to_tilted_positions(x, y, z, azimuth[0], altitude[0]), (tilt_x, tilt_y)
+    )
@@ -4,7 +4,14 @@ Core functionality of ctapipe
 """
 
 from .component import Component, TelescopeComponent, non_abstract_children
-from .container import Container, Field, DeprecatedField, Map, FieldValidationError
+from .container import (
+    Container,
+    ContainerBatch,
+    Field,
+    DeprecatedField,
+    Map,
+    FieldValidationError,
+)
 from .provenance import Provenance, get_module_version
 from .tool import Tool, ToolConfigurationError, run_tool
 from .qualityquery import QualityQuery, QualityCriteriaError
@@ -13,6 +20,7 @@ __all__ = [
     "Component",
     "TelescopeComponent",
     "Container",
+    "ContainerBatch",
     "Tool",
     "Field",
     "DeprecatedField",
@@ -1,11 +1,22 @@
 from collections import defaultdict
 from copy import deepcopy
+from enum import Enum
 from pprint import pformat
 from textwrap import wrap
+from numbers import Number
 import warnings
 import numpy as np
 from astropy.units import UnitConversionError, Quantity, Unit
 
+__all__ = [
+    "Container",
+    "ContainerBatch",
+    "DeprecatedField",
+    "Field",
+    "FieldValidationError",
+    "Map",
+]
+
 
 class FieldValidationError(ValueError):
     pass
@@ -232,6 +243,14 @@ class Container(metaclass=ContainerMeta):
     def __setitem__(self, key, value):
         return setattr(self, key, value)
 
+    @classmethod
+    def batch(cls, n):
+        """
+        Create a `ContainerBatch` holding the fields of ``n`` instances
+        of this container in columns, filled with the default values.
+        """
+        return ContainerBatch(cls, n)
+
     def items(self, add_prefix=False):
         """Generator over (key, value) pairs for the items"""
         if not add_prefix or self.prefix == "":
@@ -337,6 +356,191 @@ class Container(metaclass=ContainerMeta):
                 )
 
 
+def _make_column(field, n):
+    """Preallocate the column for ``n`` values of a `Field`, filled with its default"""
+    default = field.default
+
+    if isinstance(default, Container):
+        return ContainerBatch(type(default), n)
+
+    unit = field.unit
+    if unit is None and isinstance(default, Quantity):
+        unit = default.unit
+
+    value = default
+    if isinstance(value, Quantity) and value.isscalar:
+        value = value.to_value(unit)
+    elif value is None and unit is not None:
+        value = np.nan
+
+    is_number = isinstance(value, (Number, np.bool_)) and not isinstance(value, Enum)
+    if field.ndim is None and is_number:
+        dtype = field.dtype if field.dtype is not None else np.asarray(value).dtype
+        column = np.full(n, value, dtype=dtype)
+        if unit is not None:
+            column = Quantity(column, unit, copy=False)
+        return column
+
+    # everything that is not a scalar number is stored as python object
+    column = np.empty(n, dtype=object)
+    if isinstance(default, (str, Enum)) or default is None:
+        column[:] = default
+    else:
+        for i in range(n):
+            column[i] = deepcopy(default)
+    return column
+
+
+class ContainerBatch:
+    """
+    Columnar storage of the `Field` values of many instances of a `Container`
+    class, e.g. the results of many events.
+
+    Each `Field` becomes a preallocated numpy column, a `~astropy.units.Quantity`
+    for fields with units and a nested `ContainerBatch` for fields holding
+    sub-containers. Fields that are not scalar numbers (arrays, strings,
+    enums, maps, ...) are stored in columns of dtype object.
+
+    Columns are accessed like the fields of a container (``batch.x``),
+    integer indexing returns or sets the values of one row as `Container`
+    and slicing or indexing with arrays returns a new `ContainerBatch`.
+
+    >>>    batch = MyContainer.batch(100)
+    >>>    batch.energy[:] = energies
+    >>>    batch[0] = MyContainer(x=5)
+    >>>    writer.write_batch("table", batch)
+
+    Parameters
+    ----------
+    container_class: type
+        subclass of `Container` defining the fields
+    n: int
+        number of rows
+    """
+
+    def __init__(self, container_class, n=0, meta=None, _columns=None):
+        object.__setattr__(self, "container_class", container_class)
+        object.__setattr__(self, "prefix", container_class.container_prefix)
+        object.__setattr__(self, "meta", meta if meta is not None else {})
+
+        if _columns is None:
+            _columns = {
+                name: _make_column(field, n)
+                for name, field in container_class.fields.items()
+            }
+        object.__setattr__(self, "_columns", _columns)
+        object.__setattr__(self, "_n", n)
+
+    @property
+    def fields(self):
+        return self.container_class.fields
+
+    @classmethod
+    def from_containers(cls, containers):
+        """Create a batch from a sequence of instances of the same `Container` class"""
+        containers = list(containers)
+        if len(containers) == 0:
+            raise ValueError("Need at least one container to infer the class")
+
+        batch = cls(type(containers[0]), len(containers), meta=containers[0].meta)
+        for i, container in enumerate(containers):
+            batch[i] = container
+        return batch
+
+    @classmethod
+    def concatenate(cls, batches):
+        """Join batches of the same `Container` class into a new one"""
+        batches = list(batches)
+        container_class = batches[0].container_class
+        if any(b.container_class is not container_class for b in batches):
+            raise TypeError("Can only concatenate batches of the same Container class")
+
+        columns = {}
+        for name in container_class.fields:
+            parts = [b._columns[name] for b in batches]
+            if isinstance(parts[0], ContainerBatch):
+                columns[name] = cls.concatenate(parts)
+            elif isinstance(parts[0], Quantity):
+                unit = parts[0].unit
+                columns[name] = Quantity(
+                    np.concatenate([p.to_value(unit) for p in parts]), unit, copy=False
+                )
+            else:
+                columns[name] = np.concatenate(parts)
+
+        n = sum(len(b) for b in batches)
+        return cls(container_class, n, meta=batches[0].meta, _columns=columns)
+
+    def __len__(self):
+        return self._n
+
+    def __getattr__(self, key):
+        try:
+            return self._columns[key]
+        except KeyError:
+            raise AttributeError(
+                f"{self.container_class.__name__} has no field '{key}'"
+            ) from None
+
+    def __setattr__(self, key, value):
+        if key not in self._columns:
+            raise AttributeError(
+                f"{self.container_class.__name__} has no field '{key}'"
+            )
+        self._columns[key][...] = value
+
+    def __getitem__(self, index):
+        if isinstance(index, str):
+            return self._columns[index]
+
+        if isinstance(index, (int, np.integer)):
+            return self.container_class(
+                **{name: column[index] for name, column in self._columns.items()}
+            )
+
+        columns = {name: column[index] for name, column in self._columns.items()}
+        n = len(np.arange(self._n)[index])
+        return ContainerBatch(self.container_class, n, meta=self.meta, _columns=columns)
+
+    def __setitem__(self, index, container):
+        if isinstance(index, str):
+            return self.__setattr__(index, container)
+
+        for name, column in self._columns.items():
+            value = container[name]
+            is_float = isinstance(column, np.ndarray) and column.dtype.kind == "f"
+            if value is None and is_float:
+                value = np.nan
+            column[index] = value
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self[i]
+
+    def items(self, add_prefix=False):
+        """Generator over (key, column) pairs"""
+        if not add_prefix or self.prefix == "":
+            return iter(self._columns.items())
+        return ((self.prefix + "_" + k, v) for k, v in self._columns.items())
+
+    def keys(self):
+        """Get the keys of the batch, the field names of the container"""
+        return self._columns.keys()
+
+    def values(self):
+        """Get the columns of the batch"""
+        return self._columns.values()
+
+    def as_dict(self, add_prefix=False):
+        """convert the batch into a dictionary of columns"""
+        return dict(self.items(add_prefix=add_prefix))
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}({self.container_class.__name__}, n={self._n})"
+        )
+
+
 class Map(defaultdict):
     """A dictionary of sub-containers that can be added to a Container. This
     may be used e.g. to store a set of identical sub-Containers (e.g. indexed
@@ -10,7 +10,7 @@ import astropy.units as u  # for use in selection functions
 import numpy as np  # for use in selection functions
 
 from .component import Component
-from .traits import List
+from .traits import List, Unicode
 
 # the following are what are allowed to be used
 # in selection functions (passed to eval())
@@ -33,6 +33,10 @@ class QualityQuery(Component):
     returns a boolean array of whether or not each criterion passed. It  also keeps
     track of the total number of times each criterium is passed, as well as a
     cumulative product of criterium (i.e. the criteria applied in-order)
+
+    Many entries (e.g. a column or a table of DL1 parameters) can be checked at
+    once using `evaluate_batch`. Criteria listed in ``vectorized_criteria`` are
+    then applied to all entries in a single call.
     """
 
     quality_criteria = List(
@@ -44,11 +48,26 @@ class QualityQuery(Component):
         )
     ).tag(config=True)
 
+    vectorized_criteria = List(
+        Unicode(),
+        default_value=[],
+        help=(
+            "names of the quality criteria whose functions work element-wise on "
+            "arrays, e.g. `lambda x: x > 3` or `lambda p: p['intensity'] > 100`. "
+            "`evaluate_batch` calls these once with all values instead of once "
+            "per value. Functions reducing over their input or using python's "
+            "`and`, `or` or `if` must not be listed."
+        ),
+    ).tag(config=True)
+
     def __init__(self, config=None, parent=None, **kwargs):
         super().__init__(config=config, parent=parent, **kwargs)
 
-        # add a selection to count all entries and make it the first one
-        self.quality_criteria.insert(0, ("TOTAL", "lambda x: True"))
+        # add a selection to count all entries and make it the first one,
+        # without modifying the list passed in the configuration
+        self.quality_criteria = [("TOTAL", "lambda x: True")] + list(
+            self.quality_criteria
+        )
         self.criteria_names = []
         self.selection_function_strings = []
         self._selectors = []
@@ -75,9 +94,18 @@ class QualityQuery(Component):
                     f"because: {err}"
                 )
 
+        unknown = set(self.vectorized_criteria) - set(self.criteria_names[1:])
+        if unknown:
+            raise QualityCriteriaError(
+                f"Vectorized criteria {sorted(unknown)} are not quality criteria"
+            )
+        self._vectorized = [
+            name in self.vectorized_criteria for name in self.criteria_names
+        ]
+
         # arrays for recording overall statistics
-        self._counts = np.zeros(len(self._selectors), dtype=np.int)
-        self._cumulative_counts = np.zeros(len(self._selectors), dtype=np.int)
+        self._counts = np.zeros(len(self._selectors), dtype=np.int64)
+        self._cumulative_counts = np.zeros(len(self._selectors), dtype=np.int64)
 
     def __len__(self):
         """ return number of events processed"""
@@ -130,7 +158,62 @@ class QualityQuery(Component):
         np.ndarray:
             array of booleans with results of each selection criterion in order
         """
-        result = np.array(list(map(lambda f: f(value), self._selectors)))
-        self._counts += result.astype(int)
-        self._cumulative_counts += result.cumprod()
+        result = np.array([f(value) for f in self._selectors], dtype=bool)
+        self._update_counts(result[np.newaxis])
         return result[1:]  # strip off TOTAL criterion, since redundant
+
+    def evaluate_batch(self, values) -> np.ndarray:
+        """
+        Test many values at once, e.g. all entries of a column, an array or
+        the rows of a table or structured array.
+
+        The functions of the criteria in ``vectorized_criteria`` are called
+        once with all ``values``, the other ones once for each entry.
+        Vectorized functions that fail on the whole input or do not return
+        one result per entry are also applied to each entry.
+
+        Parameters
+        ----------
+        values:
+            sequence of values supporting ``len()``, each entry is what would
+            be passed to `__call__`
+
+        Returns
+        -------
+        np.ndarray:
+            boolean array of shape ``(len(values), n_criteria)`` with the
+            results of each selection criterion in order
+        """
+        n_entries = len(values)
+        result = np.empty((n_entries, len(self._selectors)), dtype=bool)
+        result[:, 0] = True  # TOTAL
+
+        for i in range(1, len(self._selectors)):
+            result[:, i] = self._evaluate_selector(i, values)
+
+        self._update_counts(result)
+        return result[:, 1:]  # strip off TOTAL criterion, since redundant
+
+    def _evaluate_selector(self, index, values):
+        """ results of one selection function for all values """
+        selector = self._selectors[index]
+        n_entries = len(values)
+
+        if self._vectorized[index]:
+            try:
+                passed = np.asanyarray(selector(values))
+            except Exception:
+                # the function does not support arrays, the loop below
+                # raises any error that also happens for single values
+                passed = None
+            if passed is not None and passed.shape == (n_entries,):
+                return passed
+
+        return np.array([selector(value) for value in values], dtype=bool)
+
+    def _update_counts(self, result):
+        """ add the results of shape (n_entries, n_criteria) to the statistics"""
+        self._counts += np.count_nonzero(result, axis=0)
+        self._cumulative_counts += np.count_nonzero(
+            np.logical_and.accumulate(result, axis=1), axis=0
+        )
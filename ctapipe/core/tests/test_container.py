@@ -260,3 +260,71 @@ def test_container_validation():
         MyContainer().validate()  # fails since 3.2 has no units
 
     MyContainer(x=6.4 * u.m).validate()  # works
+
+
+def test_container_batch():
+    from ctapipe.core import ContainerBatch
+
+    class ChildContainer(Container):
+        z = Field(1, "sub-item")
+
+    class ExampleContainer(Container):
+        x = Field(-1, "x value")
+        energy = Field(np.nan * u.TeV, "energy", unit=u.TeV)
+        flag = Field(True, "a flag")
+        name = Field("muon", "a string")
+        image = Field(None, "an array", dtype=np.float32, ndim=1)
+        child = Field(ChildContainer(), "child container")
+
+    batch = ExampleContainer.batch(4)
+    assert len(batch) == 4
+    assert batch.x.dtype == np.int64
+    assert np.all(batch.x == -1)
+    assert batch.energy.unit == u.TeV
+    assert np.all(np.isnan(batch.energy))
+    assert batch.flag.dtype == bool
+    assert np.all(batch.name == "muon")
+    assert isinstance(batch.child, ContainerBatch)
+    assert np.all(batch.child.z == 1)
+
+    # columns can be set as a whole and rows from containers
+    batch.x = np.arange(4)
+    batch[2] = ExampleContainer(
+        x=10,
+        energy=500 * u.GeV,
+        image=np.ones(3, dtype=np.float32),
+        child=ChildContainer(z=5),
+    )
+    assert batch.x.tolist() == [0, 1, 10, 3]
+    assert u.isclose(batch.energy[2], 0.5 * u.TeV)
+    assert batch.child.z[2] == 5
+
+    row = batch[2]
+    assert isinstance(row, ExampleContainer)
+    assert row.x == 10
+    assert row.child.z == 5
+    assert np.all(row.image == 1)
+    row.validate()
+
+    # slicing and masks return batches
+    sliced = batch[1:3]
+    assert isinstance(sliced, ContainerBatch)
+    assert sliced.x.tolist() == [1, 10]
+    assert batch[batch.x > 2].x.tolist() == [10, 3]
+
+    joined = ContainerBatch.concatenate([batch, sliced])
+    assert len(joined) == 6
+    assert joined.x.tolist() == [0, 1, 10, 3, 1, 10]
+    assert joined.child.z.tolist() == [1, 1, 5, 1, 1, 5]
+
+    from_rows = ContainerBatch.from_containers(
+        [ExampleContainer(x=i) for i in range(3)]
+    )
+    assert from_rows.x.tolist() == [0, 1, 2]
+    assert [c.x for c in from_rows] == [0, 1, 2]
+
+    with pytest.raises(AttributeError):
+        batch.y = 5
+
+    with pytest.raises(TypeError):
+        ContainerBatch.concatenate([batch, ChildContainer.batch(2)])
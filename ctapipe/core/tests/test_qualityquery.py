@@ -1,5 +1,7 @@
 """ Tests of Selectors """
+import numpy as np
 import pytest
+from astropy.table import Table
 
 from ctapipe.core.qualityquery import QualityQuery, QualityCriteriaError
 from ctapipe.core.traits import List
@@ -66,6 +68,82 @@ def test_selector():
     assert len(query) == 4  # 4 events counted
 
 
+def test_evaluate_batch():
+    """ batch evaluation gives the same results and statistics as single calls"""
+    criteria = [
+        ("high_enough", "lambda x: x > 3"),
+        ("a_value_not_too_high", "lambda x: x < 100"),
+        ("smallish", "lambda x: x < np.sqrt(100)"),
+    ]
+    values = np.array([0, 20, 200, 8, 3.5])
+
+    single = QualityQuery(quality_criteria=criteria)
+    expected = np.array([single(value) for value in values])
+
+    batch = QualityQuery(
+        quality_criteria=criteria,
+        vectorized_criteria=["high_enough", "a_value_not_too_high", "smallish"],
+    )
+    result = batch.evaluate_batch(values[:2])
+    assert result.shape == (2, 3)
+    result = np.concatenate([result, batch.evaluate_batch(values[2:])])
+
+    assert np.all(result == expected)
+    assert len(batch) == 5
+    assert np.all(batch.to_table()["counts"] == single.to_table()["counts"])
+    assert np.all(
+        batch.to_table()["cumulative_counts"] == single.to_table()["cumulative_counts"]
+    )
+
+    # criteria on the columns of a table
+    table = Table({"intensity": [10, 200, 500], "width": [0.1, 0.0, 0.2]})
+    query = QualityQuery(
+        quality_criteria=[
+            ("bright", "lambda p: p['intensity'] > 50"),
+            ("valid_width", "lambda p: p['width'] > 0"),
+        ],
+        vectorized_criteria=["bright", "valid_width"],
+    )
+    result = query.evaluate_batch(table)
+    assert np.all(result == [[False, True], [True, False], [True, True]])
+    assert np.all(query.to_table()["cumulative_counts"] == [3, 2, 1])
+
+    # functions reducing over their input are applied to each entry
+    images = np.array([[0, 0, 0], [0, 1, 2], [1, 1, 1]])
+    query = QualityQuery(
+        quality_criteria=[("size_greater_0", "lambda image: image.sum() > 0")]
+    )
+    assert np.all(query.evaluate_batch(images)[:, 0] == [False, True, True])
+
+
+def test_evaluate_batch_not_vectorized():
+    """ only the functions of vectorized criteria get all entries at once """
+    criteria = [
+        # reduces over the whole input, but keeps its shape
+        ("above_mean", "lambda x: x > x.mean()"),
+        # python logic does not work on arrays
+        ("in_range", "lambda x: x > 3 and x < 100"),
+        ("not_zero", "lambda x: True if x != 0 else False"),
+        ("smallish", "lambda x: x < 10"),
+    ]
+    values = np.array([5.0, 0, 20, 200, 8, 3.5])
+
+    single = QualityQuery(quality_criteria=criteria)
+    expected = np.array([single(value) for value in values])
+
+    batch = QualityQuery(
+        quality_criteria=criteria, vectorized_criteria=["in_range", "smallish"]
+    )
+    # a first batch with a single entry, where x > x.mean() agrees for
+    # the whole input and the entry, does not change later results
+    result = [batch.evaluate_batch(values[:1]), batch.evaluate_batch(values[1:])]
+    assert np.all(np.concatenate(result) == expected)
+    assert np.all(batch.to_table()["counts"] == single.to_table()["counts"])
+
+    with pytest.raises(QualityCriteriaError):
+        QualityQuery(quality_criteria=criteria, vectorized_criteria=["unknown"])
+
+
 def test_bad_selector():
     """ ensure failure if a selector function is not a function or can't be evaluated"""
 
@@ -1,6 +1,7 @@
 import tempfile
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 from traitlets import CaselessStrEnum, HasTraits, Int
 import pathlib
@@ -424,3 +425,37 @@ def test_time_none():
     c = NoNone()
     with pytest.raises(TraitError):
         c.time = None
+
+
+def test_telescope_parameter_array(mock_subarray):
+    """ check the values by tel_index for vectorized code """
+
+    class SomeComponent(Component):
+        tel_param = FloatTelescopeParameter(
+            default_value=[("type", "*", 10.0), ("id", 3, 200.0)]
+        )
+        partial_param = IntTelescopeParameter(default_value=[("type", "LST*", 5)])
+
+    comp = SomeComponent()
+    with pytest.raises(ValueError):
+        comp.tel_param.tel.array
+
+    comp.tel_param.attach_subarray(mock_subarray)
+    comp.partial_param.attach_subarray(mock_subarray)
+
+    array = comp.tel_param.tel.array
+    assert array.dtype == np.float64
+    assert np.all(array == [10.0, 10.0, 200.0, 10.0])
+    assert not array.flags.writeable
+    for tel_index, tel_id in enumerate(mock_subarray.tel_ids):
+        assert array[tel_index] == comp.tel_param.tel[tel_id]
+
+    # telescopes without a value are masked
+    array = comp.partial_param.tel.array
+    assert array.dtype == np.int64
+    assert np.all(array.mask == [True, True, False, False])
+    assert np.all(array.compressed() == [5, 5])
+
+    # setting a new value keeps the subarray and updates the array
+    comp.tel_param = 4.0
+    assert np.all(comp.tel_param.tel.array == 4.0)
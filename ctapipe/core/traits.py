@@ -2,6 +2,7 @@ from collections import UserList
 from fnmatch import fnmatch
 from typing import Optional
 import copy
+import numpy as np
 from astropy.time import Time
 import pathlib
 from urllib.parse import urlparse
@@ -245,6 +246,7 @@ class TelescopeParameterLookup:
         # self._telescope_parameter_list = copy.deepcopy(telescope_parameter_list)
         self._telescope_parameter_list = copy.deepcopy(telescope_parameter_list)
         self._value_for_tel_id = None
+        self._value_array = None
         self._subarray = None
         self._subarray_global_value = None
         for param in telescope_parameter_list:
@@ -284,6 +286,45 @@ class TelescopeParameterLookup:
             else:
                 raise ValueError(f"Unrecognized command: {command}")
 
+        # compiled lazily on first access of `.array`
+        self._value_array = None
+
+    def _compile_array(self):
+        """ resolve the values of all telescopes into an array by tel_index"""
+        values = [
+            self._value_for_tel_id.get(tel_id) for tel_id in self._subarray.tel_ids
+        ]
+        missing = np.array([value is None for value in values], dtype=bool)
+        present = np.array([value for value in values if value is not None])
+
+        dtype = present.dtype if len(present) > 0 else np.float64
+        array = np.zeros(len(values), dtype=dtype)
+        array[~missing] = present
+        array.flags.writeable = False
+
+        if missing.any():
+            return np.ma.array(array, mask=missing, copy=False)
+        return array
+
+    @property
+    def array(self):
+        """
+        The resolved parameter values of all telescopes of the attached
+        subarray as an array indexed by tel_index, e.g. for use in vectorized
+        code: ``param.tel.array[subarray.tel_ids_to_indices(tel_ids)]``.
+
+        If there are telescopes without a value, a `numpy.ma.MaskedArray`
+        is returned with these telescopes masked.
+        """
+        if self._value_for_tel_id is None:
+            raise ValueError(
+                "TelescopeParameterLookup: No subarray attached, call "
+                "`attach_subarray` first before trying to access the value array"
+            )
+        if self._value_array is None:
+            self._value_array = self._compile_array()
+        return self._value_array
+
     def __getitem__(self, tel_id: Optional[int]):
         """
         Returns the resolved parameter for the given telescope id
@@ -326,6 +367,10 @@ class TelescopeParameter(List):
     These are evaluated in-order, so you can first set a default value, and then set
     values for specific telescopes or types to override them.
 
+    After ``attach_subarray``, the value for a telescope is accessed via
+    ``param.tel[tel_id]``, the values of all telescopes as an array by tel_index
+    (e.g. for vectorized code) via ``param.tel.array``.
+
     Examples
     --------
 
@@ -77,7 +77,7 @@ def hillas_parameters(geom, image):
     >>> geom, image, clean_mask = create_sample_image(psi='0d')
     >>>
     >>> # Fastest
-    >>> geom_selected = geom[clean_mask]
+    >>> geom_selected = geom.select(clean_mask)
     >>> image_selected = image[clean_mask]
     >>> hillas_selected = hillas_parameters(geom_selected, image_selected)
     >>>
@@ -97,8 +97,8 @@ def hillas_parameters(geom, image):
 
     Parameters
     ----------
-    geom: ctapipe.instrument.CameraGeometry
-        Camera geometry
+    geom: ctapipe.instrument.CameraGeometry or ctapipe.instrument.GeometryView
+        Camera geometry or a selection of its pixels
     image : array_like
         Charge in each pixel
 
@@ -1,12 +1,13 @@
 import numpy as np
-from iminuit import Minuit
 from astropy.units import Quantity
 
 from ctapipe.utils.quantities import all_to_value
 
 __all__ = [
     "kundu_chaudhuri_circle_fit",
+    "kundu_chaudhuri_circle_fit_batch",
     "taubin_circle_fit",
+    "taubin_circle_fit_batch",
 ]
 
 
@@ -24,28 +25,42 @@ def kundu_chaudhuri_circle_fit(x, y, weights):
     y: array-like or astropy quantity
         y coordinates of the points
     weights: array-like
-        weights of the points
+        weights of the points.
+        A 2D array fits one circle per row, points that should not be
+        used in a fit need a weight of 0.
 
     """
 
-    weights_sum = np.sum(weights)
-    mean_x = np.sum(x * weights) / weights_sum
-    mean_y = np.sum(y * weights) / weights_sum
+    weights_sum = np.sum(weights, axis=-1)
+    mean_x = np.sum(x * weights, axis=-1) / weights_sum
+    mean_y = np.sum(y * weights, axis=-1) / weights_sum
+
+    # add an axis for the points, so that several images can be fitted at once
+    delta_x = x - mean_x[..., np.newaxis]
+    delta_y = y - mean_y[..., np.newaxis]
 
-    a1 = np.sum(weights * (x - mean_x) * x)
-    a2 = np.sum(weights * (y - mean_y) * x)
+    a1 = np.sum(weights * delta_x * x, axis=-1)
+    a2 = np.sum(weights * delta_y * x, axis=-1)
 
-    b1 = np.sum(weights * (x - mean_x) * y)
-    b2 = np.sum(weights * (y - mean_y) * y)
+    b1 = np.sum(weights * delta_x * y, axis=-1)
+    b2 = np.sum(weights * delta_y * y, axis=-1)
 
-    c1 = 0.5 * np.sum(weights * (x - mean_x) * (x ** 2 + y ** 2))
-    c2 = 0.5 * np.sum(weights * (y - mean_y) * (x ** 2 + y ** 2))
+    c1 = 0.5 * np.sum(weights * delta_x * (x ** 2 + y ** 2), axis=-1)
+    c2 = 0.5 * np.sum(weights * delta_y * (x ** 2 + y ** 2), axis=-1)
 
     center_x = (b2 * c1 - b1 * c2) / (a1 * b2 - a2 * b1)
     center_y = (a2 * c1 - a1 * c2) / (a2 * b1 - a1 * b2)
 
     radius = np.sqrt(
-        np.sum(weights * ((center_x - x) ** 2 + (center_y - y) ** 2)) / weights_sum
+        np.sum(
+            weights
+            * (
+                (center_x[..., np.newaxis] - x) ** 2
+                + (center_y[..., np.newaxis] - y) ** 2
+            ),
+            axis=-1,
+        )
+        / weights_sum
     )
 
     return radius, center_x, center_y
@@ -53,6 +68,8 @@ def kundu_chaudhuri_circle_fit(x, y, weights):
 
 def taubin_circle_fit(x, y, mask):
     """
+    Algebraic circle fit of [taubin91]_, minimizing the same loss as
+    `make_taubin_loss_function` in closed form.
     reference : Barcelona_Muons_TPA_final.pdf (slide 6)
 
     Parameters
@@ -64,42 +81,216 @@ def taubin_circle_fit(x, y, mask):
     mask: array-like boolean
         true for pixels surviving the cleaning
     """
-    original_unit = x.unit
-    x, y = all_to_value(x, y, unit=original_unit)
-
-    x_masked = x[mask]
-    y_masked = y[mask]
-
-    R = x.max()  # x.max() just happens to be identical with R in many cases.
-
-    taubin_r_initial = R / 2
-    taubin_error = R * 0.1
-    xc = 0
-    yc = 0
-
-    # minimization method
-    fit = Minuit(
-        make_taubin_loss_function(x_masked, y_masked),
-        xc=xc,
-        yc=yc,
-        r=taubin_r_initial,
-        error_xc=taubin_error,
-        error_yc=taubin_error,
-        error_r=taubin_error,
-        limit_xc=(-2 * R, 2 * R),
-        limit_yc=(-2 * R, 2 * R),
-        limit_r=(0, R),
-        pedantic=False,
+    mask = np.asanyarray(mask, dtype=bool)
+    radius, center_x, center_y = taubin_circle_fit_batch(x, y, mask[np.newaxis])
+    return radius[0], center_x[0], center_y[0]
+
+
+def _to_points(x, y, weights, offsets):
+    """
+    Bring padded or ragged input into a flat list of the points with non-zero
+    weight and the index of the image each point belongs to.
+    """
+    if offsets is None:
+        weights = np.asanyarray(weights)
+        if weights.ndim != 2:
+            raise ValueError(
+                "weights need shape (n_images, n_points) if no offsets are given"
+            )
+        n_images = len(weights)
+        x = np.broadcast_to(x, weights.shape)
+        y = np.broadcast_to(y, weights.shape)
+        image_index, point = np.nonzero(weights)
+        return (
+            x[image_index, point],
+            y[image_index, point],
+            weights[image_index, point],
+            image_index,
+            n_images,
+        )
+
+    offsets = np.asanyarray(offsets)
+    n_images = len(offsets) - 1
+    image_index = np.repeat(np.arange(n_images), np.diff(offsets))
+    points = slice(offsets[0], offsets[-1])
+    x, y = np.asanyarray(x)[points], np.asanyarray(y)[points]
+    if weights is None:
+        weights = np.ones(len(x))
+    else:
+        weights = np.asanyarray(weights)[points]
+    used = weights != 0
+    return x[used], y[used], weights[used], image_index[used], n_images
+
+
+def _fit_batch(fit_function, x, y, weights, offsets):
+    """Strip units, flatten the input and call a batched fit on the points"""
+    unit = x.unit if isinstance(x, Quantity) else None
+    if unit is not None:
+        x, y = all_to_value(x, y, unit=unit)
+
+    x, y, weights, image_index, n_images = _to_points(x, y, weights, offsets)
+    weights = weights.astype(np.float64)
+
+    def image_sum(values):
+        return np.bincount(image_index, weights=weights * values, minlength=n_images)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        radius, center_x, center_y = fit_function(x, y, image_index, image_sum)
+
+    if unit is not None:
+        return (
+            Quantity(radius, unit),
+            Quantity(center_x, unit),
+            Quantity(center_y, unit),
+        )
+    return radius, center_x, center_y
+
+
+def _kundu_chaudhuri_points(x, y, image_index, image_sum):
+    weights_sum = image_sum(1)
+    mean_x = image_sum(x) / weights_sum
+    mean_y = image_sum(y) / weights_sum
+
+    delta_x = x - mean_x[image_index]
+    delta_y = y - mean_y[image_index]
+
+    a1 = image_sum(delta_x * x)
+    a2 = image_sum(delta_y * x)
+    b1 = image_sum(delta_x * y)
+    b2 = image_sum(delta_y * y)
+    c1 = 0.5 * image_sum(delta_x * (x ** 2 + y ** 2))
+    c2 = 0.5 * image_sum(delta_y * (x ** 2 + y ** 2))
+
+    center_x = (b2 * c1 - b1 * c2) / (a1 * b2 - a2 * b1)
+    center_y = (a2 * c1 - a1 * c2) / (a2 * b1 - a1 * b2)
+
+    radius = np.sqrt(
+        image_sum((center_x[image_index] - x) ** 2 + (center_y[image_index] - y) ** 2)
+        / weights_sum
     )
-    fit.migrad()
+    return radius, center_x, center_y
+
+
+def _taubin_points(x, y, image_index, image_sum):
+    weights_sum = image_sum(1)
+    n_points = np.bincount(image_index, minlength=len(weights_sum))
+
+    # center the points of each image for numerical stability
+    mean_x = image_sum(x) / weights_sum
+    mean_y = image_sum(y) / weights_sum
+    x = x - mean_x[image_index]
+    y = y - mean_y[image_index]
+    z = x ** 2 + y ** 2
+
+    mean_z = image_sum(z) / weights_sum
+    dz = z - mean_z[image_index]
+
+    # The circle is the zero set of A z + B x + C y + D. Taubin's method
+    # minimizes the algebraic distance sum((A z + B x + C y + D)^2)
+    # under the constraint of unit mean gradient, A^2 4 mean(z) + B^2 + C^2 = 1.
+    # With centered data, D = -A mean(z) and the solution is the eigenvector
+    # of the smallest eigenvalue of the generalized eigenproblem
+    # M v = eta N v with M the moments of (z - mean(z), x, y) and N = diag(4 mean(z), 1, 1).
+    moments = np.empty((len(weights_sum), 3, 3))
+    columns = (dz, x, y)
+    for i in range(3):
+        for j in range(i, 3):
+            moments[:, i, j] = moments[:, j, i] = (
+                image_sum(columns[i] * columns[j]) / weights_sum
+            )
+
+    # at least three points are needed to define a circle
+    valid = (n_points >= 3) & (mean_z > 0)
+    moments[~valid] = np.identity(3)
+    mean_z = np.where(valid, mean_z, 1.0)
+
+    # symmetric form N^-1/2 M N^-1/2 of the eigenproblem
+    scale = np.ones((len(weights_sum), 3))
+    scale[:, 0] = 1 / np.sqrt(4 * mean_z)
+    moments *= scale[:, :, np.newaxis] * scale[:, np.newaxis, :]
+    _, eigenvectors = np.linalg.eigh(moments)
 
-    radius = Quantity(fit.values["r"], original_unit)
-    center_x = Quantity(fit.values["xc"], original_unit)
-    center_y = Quantity(fit.values["yc"], original_unit)
+    # eigenvalues are sorted ascending, take the first eigenvector
+    a, b, c = (eigenvectors[:, :, 0] * scale).T
+    d = -a * mean_z
+
+    center_x = -b / (2 * a)
+    center_y = -c / (2 * a)
+    radius = np.sqrt(center_x ** 2 + center_y ** 2 - d / a)
+
+    center_x += mean_x
+    center_y += mean_y
+    for array in (radius, center_x, center_y):
+        array[~valid] = np.nan
 
     return radius, center_x, center_y
 
 
+def kundu_chaudhuri_circle_fit_batch(x, y, weights, offsets=None):
+    """
+    Kundu-Chaudhuri circle fit of many images at once, see
+    `kundu_chaudhuri_circle_fit`.
+
+    The points of the images are either given padded, with ``weights``
+    of shape ``(n_images, n_points)`` and ``x``, ``y`` broadcastable to it
+    (e.g. the pixel coordinates of one camera), or ragged: all points of all
+    images concatenated into 1d arrays and ``offsets`` of length
+    ``n_images + 1``, so that the points of image ``i`` are
+    ``offsets[i]:offsets[i + 1]``.
+    Points with a weight of 0 are not used.
+
+    Parameters
+    ----------
+    x: array-like or astropy quantity
+        x coordinates of the points
+    y: array-like or astropy quantity
+        y coordinates of the points
+    weights: array-like
+        weights of the points
+    offsets: array-like or None
+        start of the points of each image for ragged input
+
+    Returns
+    -------
+    radius, center_x, center_y: array-like or astropy quantity
+        fit results, one entry per image
+    """
+    return _fit_batch(_kundu_chaudhuri_points, x, y, weights, offsets)
+
+
+def taubin_circle_fit_batch(x, y, mask=None, offsets=None):
+    """
+    Taubin circle fit of many images at once, solved algebraically as an
+    eigenvalue problem instead of an iterative minimization [taubin91]_.
+
+    Input is either padded, ``mask`` of shape ``(n_images, n_points)``
+    and ``x``, ``y`` broadcastable to it, or ragged with ``offsets``,
+    see `kundu_chaudhuri_circle_fit_batch`.
+    Images with less than three points give NaN.
+
+    Parameters
+    ----------
+    x: array-like or astropy quantity
+        x coordinates of the points
+    y: array-like or astropy quantity
+        y coordinates of the points
+    mask: array-like boolean or None
+        true for the points to use, optional for ragged input
+    offsets: array-like or None
+        start of the points of each image for ragged input
+
+    Returns
+    -------
+    radius, center_x, center_y: array-like or astropy quantity
+        fit results, one entry per image
+    """
+    if mask is not None:
+        mask = np.asanyarray(mask, dtype=bool)
+    elif offsets is None:
+        raise ValueError("Either mask or offsets are required")
+    return _fit_batch(_taubin_points, x, y, mask, offsets)
+
+
 def make_taubin_loss_function(x, y):
     """closure around taubin_loss_function to make
     surviving pixel positions availaboe inside.
@@ -7,19 +7,20 @@ To do:
     - create container class for output
 
 """
+
 import numpy as np
 from scipy.ndimage.filters import correlate1d
 from iminuit import Minuit
 from astropy import units as u
 from scipy.constants import alpha
-from scipy.stats import norm
+from scipy.special import ndtr
 from astropy.coordinates import SkyCoord
 from functools import lru_cache
 
 from ...containers import MuonEfficiencyContainer
 from ...coordinates import CameraFrame, TelescopeFrame
 from ...core import TelescopeComponent
-from ...core.traits import FloatTelescopeParameter, IntTelescopeParameter
+from ...core.traits import Bool, FloatTelescopeParameter, IntTelescopeParameter
 
 
 # ratio of the areas of the unit circle and a square of side lengths 2
@@ -63,6 +64,47 @@ def chord_length(radius, rho, phi):
     return chord
 
 
+def chord_length_gradient(radius, rho, phi):
+    """
+    Derivatives of `chord_length` with respect to ``rho`` and ``phi``
+
+    Parameters
+    ----------
+    radius: float
+        radius of circle
+    rho: float
+        fractional distance of impact point from circle center
+    phi: ndarray in radians
+        rotation angles to calculate length
+
+    Returns
+    -------
+    ndarray, ndarray: derivatives of the chord length by rho and phi
+    """
+    phi = np.array(phi, ndmin=1, copy=False)
+    sin_phi = np.sin(phi)
+    cos_phi = np.cos(phi)
+
+    chord = 1 - (rho ** 2 * sin_phi ** 2)
+    # the derivative diverges where the chord becomes tangent to the circle
+    valid = chord > 0
+    sqrt_chord = np.sqrt(np.where(valid, chord, 1))
+
+    d_rho = -rho * sin_phi ** 2 / sqrt_chord
+    d_phi = -(rho ** 2) * sin_phi * cos_phi / sqrt_chord
+
+    if rho <= 1.0:
+        d_rho = radius * (d_rho + cos_phi)
+        d_phi = radius * (d_phi - rho * sin_phi)
+    else:
+        d_rho *= 2 * radius
+        d_phi *= 2 * radius
+
+    d_rho[~valid] = 0
+    d_phi[~valid] = 0
+    return d_rho, d_phi
+
+
 def intersect_circle(mirror_radius, r, angle, hole_radius=0):
     """Perform line integration along a given axis in the mirror frame
     given an impact point on the mirror
@@ -86,6 +128,26 @@ def intersect_circle(mirror_radius, r, angle, hole_radius=0):
     return mirror_length - hole_length
 
 
+def intersect_circle_gradient(mirror_radius, r, angle, hole_radius=0):
+    """Derivatives of `intersect_circle` with respect to the impact
+    distance ``r`` and the ``angle``
+
+    Returns
+    --------
+    ndarray, ndarray: derivatives of the length by r and angle
+    """
+    d_r, d_angle = chord_length_gradient(mirror_radius, (r / mirror_radius), angle)
+    d_r /= mirror_radius
+
+    if hole_radius == 0:
+        return d_r, d_angle
+
+    hole_d_r, hole_d_angle = chord_length_gradient(
+        hole_radius, (r / hole_radius), angle
+    )
+    return d_r - hole_d_r / hole_radius, d_angle - hole_d_angle
+
+
 def pixels_on_ring(radius, pixel_diameter):
     """Calculate number of pixels of diameter ``pixel_diameter`` on the circumference
     of a circle with radius ``radius``
@@ -138,6 +200,112 @@ def create_profile(
     return ang, length
 
 
+def create_profile_gradient(
+    mirror_radius,
+    hole_radius,
+    impact_parameter,
+    radius,
+    phi,
+    pixel_diameter,
+    oversampling=3,
+):
+    """
+    Derivatives of the profile of `create_profile` with respect to the
+    impact parameter and the rotation angle ``phi``.
+
+    Returns
+    -------
+    ndarray, ndarray
+        derivatives of the chord length for each angle
+    """
+    circumference = 2 * np.pi * radius
+    pixels_on_circle = int(circumference / pixel_diameter)
+
+    ang = phi + linspace_two_pi(pixels_on_circle * oversampling)
+
+    # the profile is shifted with phi, so the derivative by phi
+    # is the derivative by the angle
+    gradient = intersect_circle_gradient(
+        mirror_radius, impact_parameter, ang, hole_radius
+    )
+    gradient = correlate1d(
+        np.array(gradient), np.ones(oversampling), mode="wrap", axis=1
+    )
+    gradient /= oversampling
+
+    return gradient[0], gradient[1]
+
+
+# ndtr is exactly 1 above and exactly 0 below these values in double precision
+_NDTR_ONE = 8.5
+_NDTR_ZERO = -40.0
+
+
+def _image_prediction(
+    pixel_angle,
+    pixel_distance,
+    mirror_radius_m,
+    hole_radius_m,
+    impact_parameter_m,
+    phi_rad,
+    radius_rad,
+    ring_width_rad,
+    pixel_diameter_rad,
+    oversampling,
+    min_lambda_m,
+    max_lambda_m,
+):
+    """
+    Prediction of the muon image for pixels at angles ``pixel_angle`` and
+    distances ``pixel_distance`` from the ring center, see
+    `image_prediction_no_units`.
+
+    All floating point operations are the same as in the original
+    implementation, so that fits do not depend on rounding differences along
+    flat directions of the likelihood. The gaussian ring profile is only
+    evaluated for pixels close to the ring, the prediction is exactly 0 for
+    all others.
+    """
+    ang_prof, profile = create_profile(
+        mirror_radius_m,
+        hole_radius_m,
+        impact_parameter_m,
+        radius_rad,
+        phi_rad,
+        pixel_diameter_rad,
+        oversampling=oversampling,
+    )
+
+    # the cdf of the gaussian radial profile is exactly 1 above _NDTR_ONE
+    # and exactly 0 below _NDTR_ZERO in double precision
+    delta = pixel_diameter_rad / 2
+    z_outer = (pixel_distance + delta - radius_rad) / ring_width_rad
+    z_inner = (pixel_distance - delta - radius_rad) / ring_width_rad
+    near = np.nonzero((z_inner <= _NDTR_ONE) & (z_outer >= _NDTR_ZERO))[0]
+    gauss = ndtr(z_outer[near]) - ndtr(z_inner[near])
+
+    prediction = np.zeros(len(pixel_angle))
+    pred = np.interp(pixel_angle[near] + phi_rad, ang_prof, profile)
+    pred *= alpha * (min_lambda_m ** -1 - max_lambda_m ** -1)
+    pred *= pixel_diameter_rad / radius_rad
+    pred *= np.sin(2 * radius_rad)
+    pred *= gauss
+    pred *= CIRCLE_SQUARE_AREA_RATIO
+    prediction[near] = pred
+
+    return prediction, near
+
+
+def _log_pixel_likelihood(image, prediction, spe_width, pedestal):
+    """Logarithm of the gaussian approx of the pixel likelihood,
+    as in `calc_likelihood`"""
+    sq = 1 / np.sqrt(2 * np.pi * (pedestal ** 2 + prediction * (1 + spe_width ** 2)))
+    diff = (image - prediction) ** 2
+    denom = 2 * (pedestal ** 2 + prediction * (1 + spe_width ** 2))
+    expo = np.exp(-diff / denom) + 1e-16  # add small epsilon to avoid nans
+    return np.log(sq * expo)
+
+
 def image_prediction(
     mirror_radius,
     hole_radius,
@@ -214,16 +382,85 @@ def image_prediction_no_units(
     """Function for producing the expected image for a given set of trial
     muon parameters without using astropy units but expecting the input to
     be in the correct ones.
+
+    The chord length profile of the mirror is integrated over
+    ``oversampling`` points per pixel on the ring circumference, interpolated
+    at the angle of each pixel with respect to the ring center and
+    multiplied by the fraction of the ring's gaussian radial profile
+    inside the pixel.
+
+    To get the total number of photons per pixel, this is multiplied with
+    the integrated emissivity between ``min_lambda_m`` and ``max_lambda_m``
+    (per radian, the factor would cancel anyway) and the angle
+    subtended by the pixel width as seen from the ring center.
+
+    Then it would be the total light in an area S delimited by: two radii of
+    the ring, tangent to the sides of the pixel in question, and two circles
+    concentric with the ring, also tangent to the sides of the pixel.
+    A rough correction, assuming pixel is round, is introduced:
+    [pi*(pixel_diameter/2)**2]/ S. Actually, for the large rings (relative to
+    pixel size) we are concerned with, a good enough approximation is the
+    ratio between a circle's area and that of the square whose side is equal
+    to the circle's diameter. In any case, since in the end we do a data-MC
+    comparison of the muon ring analysis outputs, it is not critical that
+    this value is exact.
     """
+    # angular position and distance of each pixel w.r.t muon center
+    dx = pixel_x_rad - center_x_rad
+    dy = pixel_y_rad - center_y_rad
+
+    prediction, _ = _image_prediction(
+        np.arctan2(dy, dx),
+        np.sqrt(dx ** 2 + dy ** 2),
+        mirror_radius_m,
+        hole_radius_m,
+        impact_parameter_m,
+        phi_rad,
+        radius_rad,
+        ring_width_rad,
+        pixel_diameter_rad,
+        oversampling,
+        min_lambda_m,
+        max_lambda_m,
+    )
+    return prediction
+
 
-    # First produce angular position of each pixel w.r.t muon center
+def image_prediction_gradient_no_units(
+    mirror_radius_m,
+    hole_radius_m,
+    impact_parameter_m,
+    phi_rad,
+    center_x_rad,
+    center_y_rad,
+    radius_rad,
+    ring_width_rad,
+    pixel_x_rad,
+    pixel_y_rad,
+    pixel_diameter_rad,
+    oversampling=3,
+    min_lambda_m=300e-9,
+    max_lambda_m=600e-9,
+):
+    """Analytic derivatives of `image_prediction_no_units` with respect to
+    the impact parameter, phi, center_x, center_y, radius and ring_width.
+
+    The number of points of the chord length profile depends on the
+    radius only in discrete steps, which is neglected in the derivative
+    by the radius.
+
+    Returns
+    -------
+    prediction: ndarray
+        Predicted signal
+    gradient: ndarray
+        (n_pixels, 6) derivatives of the predicted signal
+    """
     dx = pixel_x_rad - center_x_rad
     dy = pixel_y_rad - center_y_rad
     ang = np.arctan2(dy, dx)
-    # Add muon rotation angle
     ang += phi_rad
 
-    # Produce smoothed muon profile
     ang_prof, profile = create_profile(
         mirror_radius_m,
         hole_radius_m,
@@ -233,46 +470,82 @@ def image_prediction_no_units(
         pixel_diameter_rad,
         oversampling=oversampling,
     )
-
-    # Produce gaussian weight for each pixel given ring width
-    radial_dist = np.sqrt(dx ** 2 + dy ** 2)
-    # The weight is the integral of the ring's radial gaussian profile inside the
-    # ring's width
-    delta = pixel_diameter_rad / 2
-    cdfs = norm.cdf(
-        [radial_dist + delta, radial_dist - delta], radius_rad, ring_width_rad
+    profile_d_impact, profile_d_phi = create_profile_gradient(
+        mirror_radius_m,
+        hole_radius_m,
+        impact_parameter_m,
+        radius_rad,
+        phi_rad,
+        pixel_diameter_rad,
+        oversampling=oversampling,
     )
-    gauss = cdfs[0] - cdfs[1]
 
-    # interpolate profile to find prediction for each pixel
-    pred = np.interp(ang, ang_prof, profile)
+    # linear interpolation of the profile (as np.interp), which is linear in
+    # the profile values and its slope along the angle is the one of the
+    # interpolation segment
+    segment = np.clip(
+        np.searchsorted(ang_prof, ang, side="right") - 1, 0, len(ang_prof) - 2
+    )
+    segment_width = ang_prof[segment + 1] - ang_prof[segment]
+    fraction = np.clip((ang - ang_prof[segment]) / segment_width, 0, 1)
 
-    # Multiply by integrated emissivity between 300 and 600 nm, and rest of factors to
-    # get total number of photons per pixel
-    # ^ would be per radian, but no need to put it here, would anyway cancel out below
+    def interpolate(values):
+        return values[segment] + fraction * (values[segment + 1] - values[segment])
 
-    pred *= alpha * (min_lambda_m ** -1 - max_lambda_m ** -1)
-    pred *= pixel_diameter_rad / radius_rad
-    # multiply by angle (in radians) subtended by pixel width as seen from ring center
+    profile_value = interpolate(profile)
+    profile_d_impact = interpolate(profile_d_impact)
+    profile_d_phi = interpolate(profile_d_phi)
 
-    pred *= np.sin(2 * radius_rad)
+    slope = (profile[segment + 1] - profile[segment]) / segment_width
+    slope[(ang < ang_prof[0]) | (ang > ang_prof[-1])] = 0
 
-    # multiply by gaussian weight, to account for "fraction of muon ring" which falls
-    # within the pixel
-    pred *= gauss
+    # gaussian weight and its derivatives by the radial distance,
+    # the ring radius and the ring width
+    radial_dist = np.sqrt(dx ** 2 + dy ** 2)
+    delta = pixel_diameter_rad / 2
+    z = (np.array([radial_dist + delta, radial_dist - delta]) - radius_rad) / (
+        ring_width_rad
+    )
+    cdfs = ndtr(z)
+    gauss = cdfs[0] - cdfs[1]
 
-    # Now it would be the total light in an area S delimited by: two radii of the
-    # ring, tangent to the sides of the pixel in question, and two circles concentric
-    # with the ring, also tangent to the sides of the pixel.
-    # A rough correction, assuming pixel is round, is introduced here:
-    # [pi*(pixel_diameter/2)**2]/ S. Actually, for the large rings (relative to pixel
-    # size) we are concerned with, a good enough approximation is the ratio between a
-    # circle's area and that of the square whose side is equal to the circle's
-    # diameter. In any case, since in the end we do a data-MC comparison of the muon
-    # ring analysis outputs, it is not critical that this value is exact.
-    pred *= CIRCLE_SQUARE_AREA_RATIO
+    pdfs = np.exp(-0.5 * z ** 2) / (np.sqrt(2 * np.pi) * ring_width_rad)
+    gauss_d_dist = pdfs[0] - pdfs[1]
+    gauss_d_width = -(pdfs[0] * z[0] - pdfs[1] * z[1])
+
+    factor = alpha * (min_lambda_m ** -1 - max_lambda_m ** -1)
+    factor *= pixel_diameter_rad / radius_rad
+    factor *= np.sin(2 * radius_rad)
+    factor *= CIRCLE_SQUARE_AREA_RATIO
+    factor_d_radius = factor * (2 / np.tan(2 * radius_rad) - 1 / radius_rad)
+
+    # derivatives of the pixel angle and radial distance by the center
+    ang_d_center_x = dy / radial_dist ** 2
+    ang_d_center_y = -dx / radial_dist ** 2
+    dist_d_center_x = -dx / radial_dist
+    dist_d_center_y = -dy / radial_dist
+
+    prediction = factor * profile_value * gauss
+    gradient = np.column_stack(
+        (
+            factor * profile_d_impact * gauss,
+            factor * profile_d_phi * gauss,
+            factor
+            * (
+                slope * ang_d_center_x * gauss
+                + profile_value * gauss_d_dist * dist_d_center_x
+            ),
+            factor
+            * (
+                slope * ang_d_center_y * gauss
+                + profile_value * gauss_d_dist * dist_d_center_y
+            ),
+            profile_value * (factor_d_radius * gauss - factor * gauss_d_dist),
+            factor * profile_value * gauss_d_width,
+        )
+    )
 
-    return pred
+    return prediction, gradient
 
 
 def calc_likelihood(image, pred, spe_width, ped):
@@ -308,22 +581,26 @@ def calc_likelihood(image, pred, spe_width, ped):
     return likelihood_value
 
 
-def build_negative_log_likelihood(
-    image,
-    telescope_description,
-    oversampling,
-    min_lambda,
-    max_lambda,
-    spe_width,
-    pedestal,
-    hole_radius=0 * u.m,
-):
-    """Create an efficient negative log_likelihood function that does
-    not rely on astropy units internally by defining needed values as closures
-    in this function
-    """
+def telescope_geometry(telescope_description):
+    """Geometry of a telescope needed for the muon image prediction, which
+    only has to be calculated once per telescope.
 
-    # get all the neeed values and transform them into appropriate units
+    Parameters
+    ----------
+    telescope_description: TelescopeDescription
+        the telescope
+
+    Returns
+    -------
+    mirror_radius: float
+        radius of a circle with the mirror area in m
+    pixel_x: ndarray
+        pixel x coordinates in the telescope frame in rad
+    pixel_y: ndarray
+        pixel y coordinates in the telescope frame in rad
+    pixel_diameter: float
+        diameter of a circle with the pixel area in rad
+    """
     optics = telescope_description.optics
     mirror_area = optics.mirror_area.to_value(u.m ** 2)
     mirror_radius = np.sqrt(mirror_area / np.pi)
@@ -331,6 +608,7 @@ def build_negative_log_likelihood(
     focal_length = optics.equivalent_focal_length
 
     cam = telescope_description.camera.geometry
+    # only done once per telescope, so the frame transformation is fast enough
     camera_frame = CameraFrame(focal_length=focal_length, rotation=cam.cam_rotation)
     cam_coords = SkyCoord(x=cam.pix_x, y=cam.pix_y, frame=camera_frame)
     tel_coords = cam_coords.transform_to(TelescopeFrame())
@@ -341,11 +619,67 @@ def build_negative_log_likelihood(
         np.sqrt(cam.pix_area[0] / np.pi) / focal_length * u.rad
     ).to_value(u.rad)
 
+    return mirror_radius, pixel_x, pixel_y, pixel_diameter
+
+
+def build_negative_log_likelihood(
+    image,
+    telescope_description,
+    oversampling,
+    min_lambda,
+    max_lambda,
+    spe_width,
+    pedestal,
+    hole_radius=0 * u.m,
+    with_gradient=False,
+    geometry=None,
+):
+    """Create an efficient negative log_likelihood function that does
+    not rely on astropy units internally by defining needed values as closures
+    in this function.
+
+    The pixel positions relative to the ring are only recalculated when
+    the ring center or radius change, as they are fixed in the fit.
+    The likelihood of pixels far from the ring, where the prediction is 0,
+    is only calculated once.
+
+    If ``with_gradient`` is True, a second function with the same arguments
+    is returned, which calculates the analytic gradient of the
+    negative log likelihood.
+
+    ``geometry`` is the result of `telescope_geometry` for the telescope,
+    it is calculated if not given.
+    """
+
+    # get all the neeed values and transform them into appropriate units
+    if geometry is None:
+        geometry = telescope_geometry(telescope_description)
+    mirror_radius, pixel_x, pixel_y, pixel_diameter = geometry
+
     min_lambda = min_lambda.to_value(u.m)
     max_lambda = max_lambda.to_value(u.m)
 
     hole_radius_m = hole_radius.to_value(u.m)
 
+    image = np.asanyarray(image)
+    pedestal_values = np.broadcast_to(np.asanyarray(pedestal), image.shape)
+    log_likelihood_zero = _log_pixel_likelihood(
+        image, np.zeros(image.shape), spe_width, pedestal_values
+    )
+
+    ring = {}
+
+    def ring_geometry(center_x, center_y, radius):
+        """angles and distances of the pixels w.r.t the ring center"""
+        key = (center_x, center_y, radius)
+        if ring.get("key") != key:
+            dx = pixel_x - center_x
+            dy = pixel_y - center_y
+            ring.update(
+                key=key, angle=np.arctan2(dy, dx), distance=np.sqrt(dx ** 2 + dy ** 2),
+            )
+        return ring
+
     def negative_log_likelihood(
         impact_parameter,
         phi,
@@ -377,15 +711,53 @@ def build_negative_log_likelihood(
         -------
         float: Likelihood that model matches data
         """
-        # center_x *= self.unit
-        # center_y *= self.unit
-        # radius *= self.unit
-        # ring_width *= self.unit
-        # impact_parameter *= u.m
-        # phi *= u.rad
-
         # Generate model prediction
-        prediction = image_prediction_no_units(
+        geometry = ring_geometry(center_x, center_y, radius)
+        prediction, near = _image_prediction(
+            geometry["angle"],
+            geometry["distance"],
+            mirror_radius,
+            hole_radius_m,
+            impact_parameter,
+            phi,
+            radius,
+            ring_width,
+            pixel_diameter,
+            oversampling,
+            min_lambda,
+            max_lambda,
+        )
+
+        # scale prediction by optical efficiency of array
+        log_likelihood = log_likelihood_zero.copy()
+        log_likelihood[near] = _log_pixel_likelihood(
+            image[near],
+            prediction[near] * optical_efficiency_muon,
+            spe_width,
+            pedestal_values[near],
+        )
+        return -2 * log_likelihood.sum()
+
+    if not with_gradient:
+        return negative_log_likelihood
+
+    def negative_log_likelihood_gradient(
+        impact_parameter,
+        phi,
+        center_x,
+        center_y,
+        radius,
+        ring_width,
+        optical_efficiency_muon,
+    ):
+        """
+        Gradient of the likelihood function, see ``negative_log_likelihood``
+
+        Returns
+        -------
+        list: derivatives of the likelihood by all parameters
+        """
+        prediction, gradient = image_prediction_gradient_no_units(
             mirror_radius_m=mirror_radius,
             hole_radius_m=hole_radius_m,
             impact_parameter_m=impact_parameter,
@@ -402,20 +774,21 @@ def build_negative_log_likelihood(
             max_lambda_m=max_lambda,
         )
 
-        # scale prediction by optical efficiency of array
-        prediction *= optical_efficiency_muon
-
-        sq = 1 / np.sqrt(
-            2 * np.pi * (pedestal ** 2 + prediction * (1 + spe_width ** 2))
+        # derivative of the pixel likelihoods by the scaled prediction
+        width_factor = 1 + spe_width ** 2
+        scaled = prediction * optical_efficiency_muon
+        var = pedestal ** 2 + scaled * width_factor
+        diff = image - scaled
+        expo = np.exp(-(diff ** 2) / (2 * var))
+        derivative = width_factor / var - 2 * expo / (expo + 1e-16) * (
+            diff / var + diff ** 2 * width_factor / (2 * var ** 2)
         )
-        diff = (image - prediction) ** 2
-        denom = 2 * (pedestal ** 2 + prediction * (1 + spe_width ** 2))
-        expo = np.exp(-diff / denom) + 1e-16  # add small epsilon to avoid nans
-        value = sq * expo
 
-        return -2 * np.log(value).sum()
+        return list(derivative @ gradient * optical_efficiency_muon) + [
+            np.sum(derivative * prediction)
+        ]
 
-    return negative_log_likelihood
+    return negative_log_likelihood, negative_log_likelihood_gradient
 
 
 def create_initial_guess(center_x, center_y, radius, telescope_description):
@@ -466,6 +839,21 @@ class MuonIntensityFitter(TelescopeComponent):
         help="Oversampling for the line integration", default_value=3
     ).tag(config=True)
 
+    use_gradient = Bool(
+        default_value=False,
+        help="Pass the analytic gradient of the likelihood to the minimiser",
+    ).tag(config=True)
+
+    @lru_cache(maxsize=128)
+    def _telescope_geometry(self, tel_id):
+        """
+        Geometry of the telescope used in the image prediction.
+
+        This method is decorated with @lru_cache to ensure it is only
+        calculated once per telescope.
+        """
+        return telescope_geometry(self.subarray.tel[tel_id])
+
     def __call__(
         self, tel_id, center_x, center_y, radius, image, pedestal,
     ):
@@ -497,7 +885,7 @@ class MuonIntensityFitter(TelescopeComponent):
                 f" are supported in {self.__class__.__name__}"
             )
 
-        negative_log_likelihood = build_negative_log_likelihood(
+        likelihood = build_negative_log_likelihood(
             image,
             telescope,
             oversampling=self.oversampling.tel[tel_id],
@@ -506,7 +894,13 @@ class MuonIntensityFitter(TelescopeComponent):
             spe_width=self.spe_width.tel[tel_id],
             pedestal=pedestal,
             hole_radius=self.hole_radius_m.tel[tel_id] * u.m,
+            with_gradient=self.use_gradient,
+            geometry=self._telescope_geometry(tel_id),
         )
+        if self.use_gradient:
+            negative_log_likelihood, gradient = likelihood
+        else:
+            negative_log_likelihood, gradient = likelihood, None
 
         initial_guess = create_initial_guess(center_x, center_y, radius, telescope,)
 
@@ -530,6 +924,7 @@ class MuonIntensityFitter(TelescopeComponent):
 
         minuit = Minuit(
             negative_log_likelihood,
+            grad=gradient,
             # forced_parameters=parameter_names,
             **initial_guess,
             **step_sizes,
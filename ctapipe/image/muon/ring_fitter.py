@@ -1,7 +1,12 @@
 import numpy as np
 from ctapipe.core import Component
 from ctapipe.containers import MuonRingContainer
-from .fitting import kundu_chaudhuri_circle_fit, taubin_circle_fit
+from .fitting import (
+    kundu_chaudhuri_circle_fit,
+    kundu_chaudhuri_circle_fit_batch,
+    taubin_circle_fit,
+    taubin_circle_fit_batch,
+)
 import traitlets as traits
 
 
@@ -21,7 +26,21 @@ def taubin(x, y, weights, mask):
     return taubin_circle_fit(x, y, mask)
 
 
+def kundu_chaudhuri_batch(x, y, images, masks):
+    """kundu_chaudhuri_circle_fit_batch with x, y, images, masks interface"""
+    return kundu_chaudhuri_circle_fit_batch(x, y, np.where(masks, images, 0))
+
+
+def taubin_batch(x, y, images, masks):
+    """taubin_circle_fit_batch with x, y, images, masks interface"""
+    return taubin_circle_fit_batch(x, y, masks)
+
+
 FIT_METHOD_BY_NAME = {m.__name__: m for m in [kundu_chaudhuri, taubin]}
+BATCH_FIT_METHOD_BY_NAME = {
+    "kundu_chaudhuri": kundu_chaudhuri_batch,
+    "taubin": taubin_batch,
+}
 
 __all__ = ["MuonRingFitter"]
 
@@ -41,6 +60,37 @@ class MuonRingFitter(Component):
         fit_function = FIT_METHOD_BY_NAME[self.fit_method]
         radius, center_x, center_y = fit_function(x, y, img, mask)
 
+        return self._ring_container(radius, center_x, center_y)
+
+    def fit_batch(self, x, y, images, masks):
+        """Fit rings to many images of the same camera at once
+
+        Parameters
+        ----------
+        x: array-like or astropy quantity
+            x coordinates of the camera pixels
+        y: array-like or astropy quantity
+            y coordinates of the camera pixels
+        images: array-like
+            (n_images, n_pixels) pixel amplitudes
+        masks: array-like boolean
+            (n_images, n_pixels), true for the pixels to use in each fit
+
+        Returns
+        -------
+        MuonRingContainer:
+            container filled with arrays of the fit results of all images
+        """
+        images = np.asanyarray(images)
+        masks = np.asanyarray(masks, dtype=bool)
+
+        fit_function = BATCH_FIT_METHOD_BY_NAME[self.fit_method]
+        radius, center_x, center_y = fit_function(x, y, images, masks)
+
+        return self._ring_container(radius, center_x, center_y)
+
+    @staticmethod
+    def _ring_container(radius, center_x, center_y):
         return MuonRingContainer(
             center_x=center_x,
             center_y=center_y,
@@ -19,7 +19,253 @@ def test_chord_length():
     assert np.isclose(length, 0, atol=1e-15)
 
 
-def test_muon_efficiency_fit():
+@pytest.mark.parametrize("hole_radius", [0.0, 0.3])
+@pytest.mark.parametrize("impact_parameter", [3.0, 15.0])
+def test_image_prediction_gradient(hole_radius, impact_parameter):
+    from ctapipe.image.muon.intensity_fitter import (
+        image_prediction_no_units,
+        image_prediction_gradient_no_units,
+    )
+
+    x, y = np.meshgrid(np.linspace(-0.04, 0.04, 50), np.linspace(-0.04, 0.04, 50))
+    parameters = np.array(
+        [
+            impact_parameter,
+            0.3,
+            np.deg2rad(0.8),
+            np.deg2rad(0.4),
+            np.deg2rad(1.2),
+            np.deg2rad(0.05),
+        ]
+    )
+
+    def prediction(parameters):
+        return image_prediction_no_units(
+            11.0, hole_radius, *parameters, x.ravel(), y.ravel(), 0.002
+        )
+
+    values, gradient = image_prediction_gradient_no_units(
+        11.0, hole_radius, *parameters, x.ravel(), y.ravel(), 0.002
+    )
+    assert np.allclose(values, prediction(parameters))
+
+    steps = [1e-6, 1e-6, 1e-9, 1e-9, 1e-9, 1e-9]
+    for i, step in enumerate(steps):
+        shift = np.zeros(6)
+        shift[i] = step
+        expected = (prediction(parameters + shift) - prediction(parameters - shift)) / (
+            2 * step
+        )
+        assert np.allclose(gradient[:, i], expected, atol=1e-6 * np.abs(expected).max())
+
+
+def reference_prediction(
+    mirror_radius,
+    hole_radius,
+    impact_parameter,
+    phi,
+    center_x,
+    center_y,
+    radius,
+    ring_width,
+    x,
+    y,
+    pixel_diameter,
+    oversampling=3,
+    min_lambda=300e-9,
+    max_lambda=600e-9,
+):
+    """ plain numpy ring prediction, independent of the optimized one """
+    from scipy.constants import alpha
+    from scipy.stats import norm
+    from ctapipe.image.muon.intensity_fitter import create_profile
+
+    dx = x - center_x
+    dy = y - center_y
+    ang = np.arctan2(dy, dx) + phi
+    ang_prof, profile = create_profile(
+        mirror_radius,
+        hole_radius,
+        impact_parameter,
+        radius,
+        phi,
+        pixel_diameter,
+        oversampling=oversampling,
+    )
+
+    radial_dist = np.sqrt(dx ** 2 + dy ** 2)
+    delta = pixel_diameter / 2
+    cdfs = norm.cdf([radial_dist + delta, radial_dist - delta], radius, ring_width)
+
+    pred = np.interp(ang, ang_prof, profile)
+    pred *= alpha * (min_lambda ** -1 - max_lambda ** -1)
+    pred *= pixel_diameter / radius
+    pred *= np.sin(2 * radius)
+    pred *= cdfs[0] - cdfs[1]
+    pred *= np.pi / 4
+    return pred
+
+
+def build_reference_likelihood(
+    image,
+    telescope_description,
+    oversampling,
+    min_lambda,
+    max_lambda,
+    spe_width,
+    pedestal,
+    hole_radius=0 * u.m,
+    with_gradient=False,
+    geometry=None,
+):
+    """ plain numpy version of ``build_negative_log_likelihood`` """
+    from ctapipe.image.muon.intensity_fitter import calc_likelihood
+
+    mirror_radius, x, y, pixel_diameter = geometry
+
+    def negative_log_likelihood(
+        impact_parameter,
+        phi,
+        center_x,
+        center_y,
+        radius,
+        ring_width,
+        optical_efficiency_muon,
+    ):
+        prediction = reference_prediction(
+            mirror_radius,
+            hole_radius.to_value(u.m),
+            impact_parameter,
+            phi,
+            center_x,
+            center_y,
+            radius,
+            ring_width,
+            x,
+            y,
+            pixel_diameter,
+            oversampling=oversampling,
+            min_lambda=min_lambda.to_value(u.m),
+            max_lambda=max_lambda.to_value(u.m),
+        )
+        prediction *= optical_efficiency_muon
+        return calc_likelihood(image, prediction, spe_width, pedestal).sum()
+
+    return negative_log_likelihood
+
+
+def test_negative_log_likelihood():
+    """ optimized likelihood is identical to the plain numpy one """
+    from ctapipe.image.muon.intensity_fitter import (
+        build_negative_log_likelihood,
+        image_prediction_no_units,
+    )
+
+    x, y = np.meshgrid(np.linspace(-0.04, 0.04, 50), np.linspace(-0.04, 0.04, 50))
+    geometry = (11.0, x.ravel(), y.ravel(), 0.002)
+    rng = np.random.RandomState(0)
+    image = rng.normal(1, 1, x.size)
+
+    kwargs = dict(
+        oversampling=3,
+        min_lambda=300 * u.nm,
+        max_lambda=600 * u.nm,
+        spe_width=0.5,
+        pedestal=1.1,
+        hole_radius=0.3 * u.m,
+        geometry=geometry,
+    )
+    negative_log_likelihood = build_negative_log_likelihood(image, None, **kwargs)
+    reference_likelihood = build_reference_likelihood(image, None, **kwargs)
+
+    # the ring geometry is cached, so also change the ring between calls
+    for parameters in [
+        (5.0, 0.3, 0.01, 0.005, 0.02, 1e-3, 0.5),
+        (12.0, -1.0, 0.01, 0.005, 0.02, 2e-3, 0.2),
+        (3.0, 0.3, -0.01, 0.0, 0.015, 1e-3, 0.5),
+    ]:
+        prediction = image_prediction_no_units(
+            11.0, 0.3, *parameters[:-1], x.ravel(), y.ravel(), 0.002
+        )
+        reference = reference_prediction(
+            11.0, 0.3, *parameters[:-1], x.ravel(), y.ravel(), 0.002
+        )
+        assert np.array_equal(prediction, reference)
+        assert negative_log_likelihood(*parameters) == reference_likelihood(*parameters)
+
+
+def test_muon_efficiency_fit_reference(monkeypatch):
+    """
+    Fits of noisy rings with the optimized likelihood give the same results
+    as with the plain numpy one, also where the likelihood is flat in the
+    impact parameter
+    """
+    from ctapipe.instrument import (
+        CameraDescription,
+        CameraGeometry,
+        CameraReadout,
+        OpticsDescription,
+        SubarrayDescription,
+        TelescopeDescription,
+    )
+    from ctapipe.image.muon import intensity_fitter
+
+    geometry = CameraGeometry.make_rectangular(
+        60, 60, range_x=(-1.2, 1.2), range_y=(-1.2, 1.2)
+    )
+    readout = CameraReadout(
+        "test",
+        sampling_rate=1 * u.GHz,
+        reference_pulse_shape=np.ones((1, 2)),
+        reference_pulse_sample_width=1 * u.ns,
+    )
+    optics = OpticsDescription(
+        "LST",
+        num_mirrors=1,
+        equivalent_focal_length=28 * u.m,
+        mirror_area=386 * u.m ** 2,
+        num_mirror_tiles=198,
+    )
+    telescope = TelescopeDescription(
+        "LST", "LST", optics, CameraDescription("test", geometry, readout)
+    )
+    subarray = SubarrayDescription("LSTMono", {0: [0, 0, 0] * u.m}, {0: telescope})
+
+    center_x, center_y, radius = 0.8 * u.deg, 0.4 * u.deg, 1.2 * u.deg
+    mirror_radius, x, y, pixel_diameter = intensity_fitter.telescope_geometry(telescope)
+    image = 0.5 * reference_prediction(
+        mirror_radius,
+        0.0,
+        0.0,
+        0.0,
+        center_x.to_value(u.rad),
+        center_y.to_value(u.rad),
+        radius.to_value(u.rad),
+        np.deg2rad(0.05),
+        x,
+        y,
+        pixel_diameter,
+    )
+    rng = np.random.RandomState(0)
+    images = [image + rng.normal(0, 1.1, len(image)) for _ in range(4)]
+    pedestal = np.full(len(image), 1.1)
+
+    def fit(image):
+        fitter = intensity_fitter.MuonIntensityFitter(subarray=subarray)
+        result = fitter(0, center_x, center_y, radius, image, pedestal)
+        return result.impact, result.width, result.optical_efficiency
+
+    results = [fit(image) for image in images]
+
+    monkeypatch.setattr(
+        intensity_fitter, "build_negative_log_likelihood", build_reference_likelihood
+    )
+    for image, result in zip(images, results):
+        assert fit(image) == result
+
+
+@pytest.mark.parametrize("use_gradient", [False, True])
+def test_muon_efficiency_fit(use_gradient):
     from ctapipe.instrument import TelescopeDescription, SubarrayDescription
     from ctapipe.coordinates import TelescopeFrame, CameraFrame
     from ctapipe.image.muon.intensity_fitter import (
@@ -72,7 +318,7 @@ def test_muon_efficiency_fit():
         pixel_diameter=pixel_diameter[0],
     )
 
-    fitter = MuonIntensityFitter(subarray=subarray)
+    fitter = MuonIntensityFitter(subarray=subarray, use_gradient=use_gradient)
     result = fitter(
         tel_id=0,
         center_x=center_x,
@@ -108,4 +354,4 @@ def test_scts():
 
 if __name__ == "__main__":
     # test_chord_length()
-    test_muon_efficiency_fit()
+    test_muon_efficiency_fit(use_gradient=False)
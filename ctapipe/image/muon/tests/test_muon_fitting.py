@@ -2,6 +2,12 @@ import numpy as np
 import astropy.units as u
 
 from ctapipe.image.muon import kundu_chaudhuri_circle_fit
+from ctapipe.image.muon.fitting import (
+    kundu_chaudhuri_circle_fit_batch,
+    taubin_circle_fit,
+    taubin_circle_fit_batch,
+    make_taubin_loss_function,
+)
 
 np.random.seed(0)
 
@@ -45,3 +51,87 @@ def test_kundu_chaudhuri_with_units():
     assert fit_x.unit == center_x.unit
     assert fit_y.unit == center_y.unit
     assert fit_radius.unit == radius.unit
+
+
+def make_circles(n_images, n_points, noise=0.0, seed=0):
+    rng = np.random.RandomState(seed)
+    center_x = rng.uniform(-1, 1, n_images)
+    center_y = rng.uniform(-1, 1, n_images)
+    radius = rng.uniform(0.2, 1.5, n_images)
+
+    phi = rng.uniform(0, 2 * np.pi, (n_images, n_points))
+    x = center_x[:, np.newaxis] + radius[:, np.newaxis] * np.cos(phi)
+    y = center_y[:, np.newaxis] + radius[:, np.newaxis] * np.sin(phi)
+    x += rng.normal(0, noise, x.shape)
+    y += rng.normal(0, noise, y.shape)
+    return x, y, radius, center_x, center_y
+
+
+def test_kundu_chaudhuri_batch():
+    x, y, radius, center_x, center_y = make_circles(5, 50, noise=0.02)
+    weights = np.random.uniform(0.5, 2, x.shape)
+    # the last points of the first image are not used
+    weights[0, -10:] = 0
+
+    expected = np.array(
+        [
+            kundu_chaudhuri_circle_fit(x[i][w > 0], y[i][w > 0], w[w > 0])
+            for i, w in enumerate(weights)
+        ]
+    ).T
+
+    padded = kundu_chaudhuri_circle_fit_batch(x, y, weights)
+    assert np.allclose(padded, expected, rtol=1e-10)
+
+    offsets = np.arange(0, x.size + 1, x.shape[1])
+    ragged = kundu_chaudhuri_circle_fit_batch(
+        x.ravel(), y.ravel(), weights.ravel(), offsets=offsets
+    )
+    assert np.allclose(ragged, expected, rtol=1e-10)
+
+    fit_radius, fit_x, fit_y = kundu_chaudhuri_circle_fit_batch(
+        x * u.m, y * u.m, weights
+    )
+    assert fit_radius.unit == u.m
+    assert u.isclose(fit_x[1], expected[1, 1] * u.m)
+
+
+def test_taubin_batch():
+    # exact circles are recovered
+    x, y, radius, center_x, center_y = make_circles(5, 30)
+    mask = np.ones(x.shape, dtype=bool)
+    fit_radius, fit_x, fit_y = taubin_circle_fit_batch(x, y, mask)
+    assert np.allclose(fit_radius, radius)
+    assert np.allclose(fit_x, center_x)
+    assert np.allclose(fit_y, center_y)
+
+    # noisy circles: the algebraic solution minimizes the taubin loss
+    x, y, radius, center_x, center_y = make_circles(5, 100, noise=0.05)
+    mask = np.random.uniform(0, 1, x.shape) < 0.8
+    fit_radius, fit_x, fit_y = taubin_circle_fit_batch(x, y, mask)
+    for i in range(5):
+        loss = make_taubin_loss_function(x[i][mask[i]], y[i][mask[i]])
+        best = loss(fit_x[i], fit_y[i], fit_radius[i])
+        for shift in np.identity(3) * 1e-3:
+            assert best < loss(
+                fit_x[i] + shift[0], fit_y[i] + shift[1], fit_radius[i] + shift[2]
+            )
+            assert best < loss(
+                fit_x[i] - shift[0], fit_y[i] - shift[1], fit_radius[i] - shift[2]
+            )
+
+        single = taubin_circle_fit(x[i] * u.m, y[i] * u.m, mask[i])
+        assert u.isclose(single[0], fit_radius[i] * u.m)
+
+    # ragged input without the masked points
+    counts = mask.sum(axis=1)
+    offsets = np.append(0, np.cumsum(counts))
+    ragged = taubin_circle_fit_batch(x[mask], y[mask], offsets=offsets)
+    assert np.allclose(ragged, (fit_radius, fit_x, fit_y), rtol=1e-10)
+
+    # less than three points cannot be fitted
+    mask[0] = False
+    mask[0, :2] = True
+    fit_radius, fit_x, fit_y = taubin_circle_fit_batch(x, y, mask)
+    assert np.isnan(fit_radius[0]) and np.isnan(fit_x[0])
+    assert np.all(np.isfinite(fit_radius[1:]))
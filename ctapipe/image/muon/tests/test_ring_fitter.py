@@ -38,3 +38,30 @@ def test_MuonRingFitter(method):
     assert u.isclose(fit_result.center_x, center_xs, 5e-2)
     assert u.isclose(fit_result.center_y, center_ys, 5e-2)
     assert u.isclose(fit_result.radius, radius, 5e-2)
+
+
+@pytest.mark.parametrize("method", MuonRingFitter.fit_method.values)
+def test_MuonRingFitter_batch(method):
+    """test fitting several images at once gives the single image results"""
+    geom = CameraGeometry.make_rectangular(
+        60, 60, range_x=(-1.2, 1.2), range_y=(-1.2, 1.2)
+    )
+    muonfit = MuonRingFitter(fit_method=method)
+
+    images = []
+    masks = []
+    for center_x, center_y, radius in [(0.3, 0.1, 0.5), (-0.2, 0.2, 0.4), (0, 0, 0.6)]:
+        muon_model = toymodel.RingGaussian(
+            x=center_x * u.m, y=center_y * u.m, radius=radius * u.m, sigma=0.05 * u.m,
+        )
+        charge, _, _ = muon_model.generate_image(geom, intensity=1000, nsb_level_pe=5)
+        images.append(charge)
+        masks.append(tailcuts_clean(geom, charge, 10, 12))
+
+    rings = muonfit.fit_batch(geom.pix_x, geom.pix_y, images, masks)
+    assert len(rings.radius) == 3
+
+    for i, (charge, mask) in enumerate(zip(images, masks)):
+        ring = muonfit(geom.pix_x, geom.pix_y, charge, mask)
+        for key in ("center_x", "center_y", "radius", "center_phi", "center_distance"):
+            assert u.isclose(rings[key][i], ring[key], rtol=1e-8)
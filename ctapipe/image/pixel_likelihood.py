@@ -24,26 +24,54 @@ poisson_likelihood_full(image, prediction, spe, ped)
 poisson_likelihood(image, prediction, spe, ped)
 59.9 µs per loop
 
+For array scale use, `PixelLikelihoodTable` precomputes the full likelihood
+and its mean on a grid and interpolates, speed tests for 2000 pixels:
+
+poisson_likelihood_gaussian(image, prediction, spe, ped)
+26 µs per loop
+
+poisson_likelihood_full(image, prediction, spe, ped)
+1040 µs per loop
+
+table.likelihood(image, prediction, ped)
+43 µs per loop
+
+mean_poisson_likelihood_full(prediction, spe, ped)
+17 ms per pixel
+
+table.mean_likelihood(prediction, ped)
+45 µs per loop
+
 TODO:
 =====
 - Need to implement more tests, particularly checking for error states
 - Additional terms may be useful to add to the likelihood
 """
 
+import hashlib
+import json
 import math
+import os
+import tempfile
+from pathlib import Path
 
 import numpy as np
+from numba import njit, prange, vectorize, float32, float64
 from scipy.integrate import quad
 from scipy.special import factorial
 
+from ..utils.datasets import get_cache_dir
+
 __all__ = [
     "poisson_likelihood_gaussian",
+    "poisson_likelihood_gaussian_derivative",
     "poisson_likelihood_full",
     "poisson_likelihood",
     "mean_poisson_likelihood_gaussian",
     "mean_poisson_likelihood_full",
     "PixelLikelihoodError",
     "chi_squared",
+    "PixelLikelihoodTable",
 ]
 
 
@@ -51,6 +79,263 @@ class PixelLikelihoodError(RuntimeError):
     pass
 
 
+def _max_exponent(*arrays):
+    """
+    Largest value of the exponent in the gaussian likelihood, the probability
+    is clipped at the smallest positive number of the datatype of the result
+    """
+    dtype = np.result_type(*arrays, 1.0)
+    return -2 * np.log(np.finfo(dtype).tiny)
+
+
+@njit()
+def _gaussian_likelihood(image, prediction, spe_width, ped, max_exponent):
+    """Gaussian approximation of the likelihood for a single pixel"""
+    var = ped * ped + prediction * (1 + spe_width * spe_width)
+    exponent = (image - prediction) ** 2 / var
+    if exponent > max_exponent:
+        exponent = max_exponent
+    return np.log(2 * np.pi * var) + exponent
+
+
+@njit()
+def _gaussian_likelihood_derivative(image, prediction, spe_width, ped, max_exponent):
+    """Derivative of `_gaussian_likelihood` with respect to the prediction"""
+    # likelihood is log(2 pi var) + (image - prediction)**2 / var
+    width_factor = 1 + spe_width * spe_width
+    var = ped * ped + prediction * width_factor
+    diff = image - prediction
+
+    derivative = width_factor / var
+    # the exponent is constant where the probability is clipped
+    if diff * diff / var <= max_exponent:
+        derivative -= (2 * diff + diff * diff * width_factor / var) / var
+    return derivative
+
+
+_ufunc_signatures = [
+    float32(float32, float32, float32, float32, float32),
+    float64(float64, float64, float64, float64, float64),
+]
+
+
+@vectorize(_ufunc_signatures)
+def _gaussian_likelihood_ufunc(image, prediction, spe_width, ped, max_exponent):
+    return _gaussian_likelihood(image, prediction, spe_width, ped, max_exponent)
+
+
+@vectorize(_ufunc_signatures)
+def _gaussian_likelihood_derivative_ufunc(
+    image, prediction, spe_width, ped, max_exponent
+):
+    return _gaussian_likelihood_derivative(
+        image, prediction, spe_width, ped, max_exponent
+    )
+
+
+@njit()
+def _full_likelihood(image, prediction, spe_width, ped):
+    """
+    Full likelihood for a single pixel, summing all photoelectron numbers
+    with a non-negligible contribution, in log space to avoid overflows.
+    """
+    # both the poisson and the gaussian factor increase towards the
+    # dominant terms, so only photoelectron numbers close to the prediction
+    # or the signal contribute
+    spe_var = spe_width * spe_width
+    width = math.sqrt(ped * ped + max(image, 0.0) * spe_var)
+    poisson_width = 10 * math.sqrt(max(prediction, 0.0)) + 10
+    min_pe = max(min(prediction - poisson_width, image - 10 * width - 10), 0.0)
+    max_pe = max(prediction + poisson_width, image + 10 * width + 10)
+
+    log_prediction = math.log(prediction) if prediction > 0 else 0.0
+    max_term = -np.inf
+    total = 0.0
+    for n in range(int(min_pe), int(max_pe) + 1):
+        if n > 0 and prediction <= 0:
+            break
+
+        var = ped * ped + n * spe_var
+        term = (
+            n * log_prediction
+            - prediction
+            - math.lgamma(n + 1)
+            - 0.5 * math.log(2 * math.pi * var)
+            - (image - n) ** 2 / (2 * var)
+        )
+        if term > max_term:
+            total = total * math.exp(max_term - term) + 1
+            max_term = term
+        else:
+            total += math.exp(term - max_term)
+
+    return -2 * (max_term + math.log(total))
+
+
+@njit(parallel=True)
+def _full_likelihood_table(signal, prediction, spe_width, ped):
+    """Full likelihood on the grid of predictions (rows) and signals (columns)"""
+    table = np.empty((len(prediction), len(signal)))
+    for i in prange(len(prediction)):
+        for j in range(len(signal)):
+            table[i, j] = _full_likelihood(signal[j], prediction[i], spe_width, ped)
+    return table
+
+
+@njit(parallel=True)
+def _mean_full_likelihood_table(prediction, spe_width, ped, n_steps):
+    """
+    Mean of the full likelihood for each prediction, integrated with
+    the trapezoidal rule over +- 10 standard deviations of the signal.
+    """
+    table = np.empty(len(prediction))
+    for i in prange(len(prediction)):
+        width = math.sqrt(ped * ped + prediction[i] * (1 + spe_width * spe_width))
+        step = 20 * width / (n_steps - 1)
+        low = prediction[i] - 10 * width
+
+        total = 0.0
+        for j in range(n_steps):
+            like = _full_likelihood(low + j * step, prediction[i], spe_width, ped)
+            weight = 0.5 if j == 0 or j == n_steps - 1 else 1.0
+            total += weight * like * math.exp(-0.5 * like)
+        table[i] = total * step
+    return table
+
+
+@njit()
+def _grid_position(value, start, step, n_points):
+    """
+    Index of the grid point below value and the interpolation weight of
+    the next one for a regular axis, index is -1 outside of the axis
+    """
+    if n_points == 1:
+        return 0, 0.0
+
+    position = (value - start) / step
+    if not 0 <= position <= n_points - 1:
+        return -1, 0.0
+
+    index = min(int(position), n_points - 2)
+    return index, position - index
+
+
+@njit()
+def _clamped_grid_position(value, start, step, n_points):
+    """
+    Like `_grid_position`, but values outside of the axis are moved to
+    its closest end instead of getting index -1
+    """
+    if n_points == 1:
+        return 0, 0.0
+
+    position = min(max((value - start) / step, 0.0), n_points - 1.0)
+    index = min(int(position), n_points - 2)
+    return index, position - index
+
+
+@njit()
+def _interpolate_likelihood(
+    image,
+    prediction,
+    ped,
+    spe_width,
+    table,
+    signal_start,
+    signal_step,
+    sqrt_prediction_step,
+    log_ped_start,
+    log_ped_step,
+    max_exponent,
+):
+    """Linear interpolation in the likelihood table, gaussian approx outside"""
+    n_ped, n_prediction, n_signal = table.shape
+    likelihood = np.empty(len(image))
+
+    for i in range(len(image)):
+        sqrt_prediction = math.sqrt(prediction[i]) if prediction[i] >= 0 else -1.0
+        i_signal, w_signal = _grid_position(
+            image[i], signal_start, signal_step, n_signal
+        )
+        i_prediction, w_prediction = _grid_position(
+            sqrt_prediction, 0.0, sqrt_prediction_step, n_prediction
+        )
+        if i_signal < 0 or i_prediction < 0:
+            likelihood[i] = _gaussian_likelihood(
+                image[i], prediction[i], spe_width, ped[i], max_exponent
+            )
+            continue
+
+        i_ped, w_ped = 0, 0.0
+        if n_ped > 1:
+            # pedestals are checked to be in the table range up to rounding
+            i_ped, w_ped = _clamped_grid_position(
+                math.log(ped[i]), log_ped_start, log_ped_step, n_ped
+            )
+
+        value = 0.0
+        for d_ped in range(2):
+            weight_ped = w_ped if d_ped else 1 - w_ped
+            if weight_ped == 0:
+                continue
+            for d_prediction in range(2):
+                weight = weight_ped * (
+                    w_prediction if d_prediction else 1 - w_prediction
+                )
+                if weight == 0:
+                    continue
+                row = table[i_ped + d_ped, i_prediction + d_prediction]
+                value += weight * (
+                    (1 - w_signal) * row[i_signal]
+                    + (w_signal * row[i_signal + 1] if w_signal > 0 else 0.0)
+                )
+        likelihood[i] = value
+
+    return likelihood
+
+
+@njit()
+def _interpolate_mean_likelihood(
+    prediction, ped, spe_width, table, sqrt_prediction_step, log_ped_start, log_ped_step
+):
+    """Linear interpolation in the mean likelihood table, gaussian approx outside"""
+    n_ped, n_prediction = table.shape
+    mean_likelihood = np.empty(len(prediction))
+
+    for i in range(len(prediction)):
+        sqrt_prediction = math.sqrt(prediction[i]) if prediction[i] >= 0 else -1.0
+        i_prediction, w_prediction = _grid_position(
+            sqrt_prediction, 0.0, sqrt_prediction_step, n_prediction
+        )
+        if i_prediction < 0:
+            mean_likelihood[i] = (
+                1
+                + math.log(2 * math.pi)
+                + math.log(ped[i] ** 2 + prediction[i] * (1 + spe_width ** 2))
+            )
+            continue
+
+        i_ped, w_ped = 0, 0.0
+        if n_ped > 1:
+            # pedestals are checked to be in the table range up to rounding
+            i_ped, w_ped = _clamped_grid_position(
+                math.log(ped[i]), log_ped_start, log_ped_step, n_ped
+            )
+
+        value = 0.0
+        for d_ped in range(2):
+            weight_ped = w_ped if d_ped else 1 - w_ped
+            if weight_ped == 0:
+                continue
+            row = table[i_ped + d_ped]
+            value += weight_ped * (1 - w_prediction) * row[i_prediction]
+            if w_prediction > 0:
+                value += weight_ped * w_prediction * row[i_prediction + 1]
+        mean_likelihood[i] = value
+
+    return mean_likelihood
+
+
 def poisson_likelihood_gaussian(image, prediction, spe_width, ped):
     """
     Calculate likelihood of prediction given the measured signal, gaussian approx from
@@ -76,17 +361,50 @@ def poisson_likelihood_gaussian(image, prediction, spe_width, ped):
     spe_width = np.asarray(spe_width)
     ped = np.asarray(ped)
 
-    sq = 1.0 / np.sqrt(2 * np.pi * (ped ** 2 + prediction * (1 + spe_width ** 2)))
+    return _gaussian_likelihood_ufunc(
+        image,
+        prediction,
+        spe_width,
+        ped,
+        _max_exponent(image, prediction, spe_width, ped),
+    )
 
-    diff = (image - prediction) ** 2
-    denom = 2 * (ped ** 2 + prediction * (1 + spe_width ** 2))
-    expo = np.asarray(np.exp(-1 * diff / denom))
 
-    # If we are outside of the range of datatype, fix to lower bound
-    min_prob = np.finfo(expo.dtype).tiny
-    expo[expo < min_prob] = min_prob
+def poisson_likelihood_gaussian_derivative(image, prediction, spe_width, ped):
+    """
+    Derivative of the likelihood in the gaussian approximation
+    (`poisson_likelihood_gaussian`) with respect to the prediction.
 
-    return -2 * np.log(sq * expo)
+    Used to calculate analytic gradients of likelihood fits with the
+    chain rule.
+
+    Parameters
+    ----------
+    image: ndarray
+        Pixel amplitudes from image
+    prediction: ndarray
+        Predicted pixel amplitudes from model
+    spe_width: ndarray
+        width of single p.e. distributio
+    ped: ndarray
+        width of pedestal
+
+    Returns
+    -------
+    ndarray: derivative of the likelihood for each pixel
+    """
+    image = np.asarray(image)
+    prediction = np.asarray(prediction)
+    spe_width = np.asarray(spe_width)
+    ped = np.asarray(ped)
+
+    return _gaussian_likelihood_derivative_ufunc(
+        image,
+        prediction,
+        spe_width,
+        ped,
+        _max_exponent(image, prediction, spe_width, ped),
+    )
 
 
 def poisson_likelihood_full(
@@ -374,3 +692,251 @@ def chi_squared(image, prediction, ped, error_factor=2.9):
     chi_square *= 1.0 / error_factor
 
     return chi_square
+
+
+class PixelLikelihoodTable:
+    """
+    Lookup tables of the full pixel likelihood (`poisson_likelihood_full`)
+    and its mean (`mean_poisson_likelihood_full`) for a camera with a fixed
+    single p.e. width.
+
+    The likelihood is tabulated on a regular grid of the signal, of the
+    square root of the prediction (the likelihood changes fastest at small
+    predictions) and of the logarithm of the pedestal width and evaluated
+    with linear interpolation. A single pedestal width gives a 2D table,
+    which can only be used for that pedestal width.
+    The interpolation error depends mostly on the relative step of the
+    pedestal widths, it is about 0.2 for steps of 10% and 0.06 for steps
+    of 5% (e.g. ``np.geomspace(0.5, 3, 38)``).
+    Outside of the signal and prediction ranges of the table, the
+    gaussian approximation is used, as in `poisson_likelihood`.
+
+    Unlike `poisson_likelihood_full`, the tables sum the contributions of
+    all photoelectron numbers relevant for both the signal and the
+    prediction, so they are also correct for predictions much larger
+    than the signal.
+
+    Building the tables takes a few seconds per pedestal width, so they are
+    stored in the ctapipe cache directory (see
+    `ctapipe.utils.datasets.get_cache_dir`) and read from there when a
+    table with the same parameters is requested again.
+
+    Parameters
+    ----------
+    spe_width: float
+        width of single p.e. distribution
+    pedestal: float or array-like
+        width of the pedestal, several values must be evenly spaced
+        in logarithm
+    signal_range: tuple(float, float)
+        range of the pixel amplitudes in the table
+    signal_step: float
+        grid step of the pixel amplitudes
+    max_prediction: float
+        largest predicted amplitude in the table
+    sqrt_prediction_step: float
+        grid step of the square root of the predicted amplitude
+    cache: bool
+        If True, read the tables from or write them to the cache directory
+    cache_dir: str or Path
+        directory for the cached tables, defaults to the ctapipe cache
+        directory
+    """
+
+    #: increase when the computation of the tables changes
+    version = 1
+
+    #: number of signal values used for the integration of the mean likelihood
+    n_integration_steps = 401
+
+    def __init__(
+        self,
+        spe_width,
+        pedestal,
+        signal_range=(-10.0, 60.0),
+        signal_step=0.1,
+        max_prediction=60.0,
+        sqrt_prediction_step=0.025,
+        cache=True,
+        cache_dir=None,
+    ):
+        self._max_exponent = _max_exponent(np.float64)
+        self.spe_width = float(spe_width)
+        self.pedestal = np.atleast_1d(np.asarray(pedestal, dtype=np.float64))
+        if self.pedestal.ndim != 1 or np.any(self.pedestal <= 0):
+            raise ValueError("pedestal must be a positive value or 1D array")
+
+        self._log_pedestal_step = 0.0
+        if len(self.pedestal) > 1:
+            steps = np.diff(np.log(self.pedestal))
+            self._log_pedestal_step = steps.mean()
+            if self._log_pedestal_step <= 0 or not np.allclose(
+                steps, self._log_pedestal_step
+            ):
+                raise ValueError(
+                    "pedestal values must be increasing and evenly spaced in logarithm"
+                )
+
+        self.signal_step = float(signal_step)
+        n_signal = int(round((signal_range[1] - signal_range[0]) / signal_step)) + 1
+        self.signal = signal_range[0] + self.signal_step * np.arange(n_signal)
+
+        self.sqrt_prediction_step = float(sqrt_prediction_step)
+        n_prediction = int(np.ceil(np.sqrt(max_prediction) / sqrt_prediction_step)) + 1
+        self.prediction = (self.sqrt_prediction_step * np.arange(n_prediction)) ** 2
+
+        path = self.cache_path(cache_dir) if cache else None
+        tables = self._read_tables(path) if path is not None else None
+
+        if tables is None:
+            tables = self._compute_tables()
+            if path is not None:
+                self._write_tables(path, *tables)
+
+        self._likelihood, self._mean_likelihood = tables
+
+    def cache_path(self, cache_dir=None):
+        """Path of the cache file for tables with the parameters of this table"""
+        parameters = dict(
+            version=self.version,
+            spe_width=self.spe_width,
+            pedestal=self.pedestal.tolist(),
+            signal=[self.signal[0], self.signal_step, len(self.signal)],
+            prediction=[self.sqrt_prediction_step, len(self.prediction)],
+            n_integration_steps=self.n_integration_steps,
+        )
+        key = hashlib.sha1(json.dumps(parameters).encode()).hexdigest()
+        cache_dir = Path(cache_dir) if cache_dir is not None else get_cache_dir()
+        return cache_dir / f"pixel_likelihood_table_{key}.npz"
+
+    def _compute_tables(self):
+        likelihood = np.empty(
+            (len(self.pedestal), len(self.prediction), len(self.signal))
+        )
+        mean_likelihood = np.empty((len(self.pedestal), len(self.prediction)))
+
+        for i, ped in enumerate(self.pedestal):
+            likelihood[i] = _full_likelihood_table(
+                self.signal, self.prediction, self.spe_width, ped
+            )
+            mean_likelihood[i] = _mean_full_likelihood_table(
+                self.prediction, self.spe_width, ped, self.n_integration_steps
+            )
+
+        return likelihood, mean_likelihood
+
+    def _read_tables(self, path):
+        """Tables from the cache file, None if it does not exist or is not usable"""
+        try:
+            with np.load(path) as data:
+                likelihood = data["likelihood"]
+                mean_likelihood = data["mean_likelihood"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+        shape = (len(self.pedestal), len(self.prediction), len(self.signal))
+        if likelihood.shape != shape or mean_likelihood.shape != shape[:2]:
+            return None
+        return likelihood, mean_likelihood
+
+    @staticmethod
+    def _write_tables(path, likelihood, mean_likelihood):
+        # write to a temporary file first, so that concurrent processes
+        # never read incomplete tables
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, likelihood=likelihood, mean_likelihood=mean_likelihood)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _pedestal_array(self, ped, shape):
+        """Broadcast the pedestal widths and check they are covered by the table"""
+        if ped is None:
+            if len(self.pedestal) > 1:
+                raise ValueError("ped is required for tables with several pedestals")
+            ped = self.pedestal[0]
+
+        ped = np.asarray(ped, dtype=np.float64)
+        low, high = self.pedestal[0] * (1 - 1e-5), self.pedestal[-1] * (1 + 1e-5)
+        if not np.all((ped >= low) & (ped <= high)):
+            raise ValueError(
+                f"Pedestal widths outside of the table range "
+                f"[{self.pedestal[0]}, {self.pedestal[-1]}]"
+            )
+        return np.ascontiguousarray(np.broadcast_to(ped, shape)).ravel()
+
+    def likelihood(self, image, prediction, ped=None):
+        """
+        Likelihood of the prediction given the measured signal, like
+        `poisson_likelihood_full` with the single p.e. width of the table.
+
+        Parameters
+        ----------
+        image: ndarray
+            Pixel amplitudes from image
+        prediction: ndarray
+            Predicted pixel amplitudes from model
+        ped: ndarray or None
+            width of pedestal, optional for tables of a single pedestal width
+
+        Returns
+        -------
+        ndarray: likelihood for each pixel
+        """
+        image, prediction = np.broadcast_arrays(
+            np.asarray(image, dtype=np.float64),
+            np.asarray(prediction, dtype=np.float64),
+        )
+        shape = image.shape
+        ped = self._pedestal_array(ped, shape)
+
+        like = _interpolate_likelihood(
+            np.ascontiguousarray(image).ravel(),
+            np.ascontiguousarray(prediction).ravel(),
+            ped,
+            self.spe_width,
+            self._likelihood,
+            self.signal[0],
+            self.signal_step,
+            self.sqrt_prediction_step,
+            np.log(self.pedestal[0]),
+            self._log_pedestal_step,
+            self._max_exponent,
+        )
+        return like.reshape(shape)
+
+    def mean_likelihood(self, prediction, ped=None):
+        """
+        Mean likelihood for a given expectation value of pixel intensity,
+        like `mean_poisson_likelihood_full` with the single p.e. width of
+        the table.
+
+        Parameters
+        ----------
+        prediction: ndarray
+            Predicted pixel amplitudes from model
+        ped: ndarray or None
+            width of pedestal, optional for tables of a single pedestal width
+
+        Returns
+        -------
+        ndarray: mean likelihood for each pixel
+        """
+        prediction = np.asarray(prediction, dtype=np.float64)
+        shape = prediction.shape
+        ped = self._pedestal_array(ped, shape)
+
+        mean_like = _interpolate_mean_likelihood(
+            np.ascontiguousarray(prediction).ravel(),
+            ped,
+            self.spe_width,
+            self._mean_likelihood,
+            self.sqrt_prediction_step,
+            np.log(self.pedestal[0]),
+            self._log_pedestal_step,
+        )
+        return mean_like.reshape(shape)
@@ -80,6 +80,16 @@ def test_hillas_selected():
     compare_hillas(results, results_selected)
 
 
+def test_hillas_geometry_view():
+    """ a GeometryView gives the same result as a sliced CameraGeometry """
+    geom, image, clean_mask = create_sample_image()
+
+    results_sliced = hillas_parameters(geom[clean_mask], image[clean_mask])
+    results_view = hillas_parameters(geom.select(clean_mask), image[clean_mask])
+
+    compare_hillas(results_sliced, results_view)
+
+
 def test_hillas_failure():
     geom, image = create_sample_image_zeros(psi="0d")
     blank_image = zeros_like(image)
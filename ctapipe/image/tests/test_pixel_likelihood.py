@@ -1,5 +1,14 @@
 import numpy as np
-from ctapipe.image import poisson_likelihood_full, poisson_likelihood_gaussian
+import pytest
+from numpy.testing import assert_allclose
+from ctapipe.image import (
+    poisson_likelihood_full,
+    poisson_likelihood_gaussian,
+    poisson_likelihood_gaussian_derivative,
+    mean_poisson_likelihood_full,
+    mean_poisson_likelihood_gaussian,
+    PixelLikelihoodTable,
+)
 
 
 def test_full_likelihood():
@@ -41,3 +50,125 @@ def test_full_likelihood():
     # Check thats in large signal case the full expectation is equal to the
     # gaussian approximation (to 5%)
     assert np.all(np.abs((full_like_large - gaus_like_large) / full_like_large) < 0.05)
+
+
+def test_gaussian_likelihood_derivative():
+    """
+    Test the analytic derivative of the gaussian approximation against
+    finite differences
+    """
+    spe = 0.5
+    pedestal = 1.5
+    image = np.array([0.0, 1.0, 5.0, 40.0, 100.0])
+    prediction = np.array([1.0, 0.5, 8.0, 50.0, 90.0])
+
+    derivative = poisson_likelihood_gaussian_derivative(
+        image, prediction, spe, pedestal
+    )
+    step = 1e-6
+    expected = (
+        poisson_likelihood_gaussian(image, prediction + step, spe, pedestal)
+        - poisson_likelihood_gaussian(image, prediction - step, spe, pedestal)
+    ) / (2 * step)
+    assert_allclose(derivative, expected, rtol=1e-6)
+
+
+def test_gaussian_likelihood_clipping():
+    """
+    Test the gaussian approximation keeps the datatype of the input and
+    clips the probability at the smallest number of the datatype
+    """
+    for dtype in (np.float32, np.float64):
+        image = np.array([0.0, 5.0, 1e4], dtype=dtype)
+        prediction = np.array([1.0, 4.0, 1.0], dtype=dtype)
+        like = poisson_likelihood_gaussian(image, prediction, 0.5, 1.0)
+        assert like.dtype == dtype
+
+        var = 1.0 + prediction * 1.25
+        expected = np.log(2 * np.pi * var) + (image - prediction) ** 2 / var
+        expected[2] = np.log(2 * np.pi * var[2]) - 2 * np.log(np.finfo(dtype).tiny)
+        assert_allclose(like, expected, rtol=1e-5)
+
+
+def test_likelihood_table(tmp_path):
+    """
+    Test the interpolated likelihood tables against the full calculations
+    and that tables are read from the cache
+    """
+    spe = 0.5
+    pedestal = 1.2
+    grid = dict(signal_range=(-5, 25), max_prediction=20, cache_dir=tmp_path)
+    table = PixelLikelihoodTable(spe, pedestal, **grid)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    rng = np.random.RandomState(0)
+    image = rng.uniform(-4, 20, 200)
+    prediction = rng.uniform(0, 15, 200)
+    # the full likelihood only sums photoelectrons up to the largest signal
+    expected = poisson_likelihood_full(
+        np.append(image, 40), np.append(prediction, 1), spe, pedestal, dtype=np.float64
+    )[:-1]
+    like = table.likelihood(image, prediction)
+    close = np.abs(image - prediction) < 5 * np.sqrt(pedestal ** 2 + 1.25 * prediction)
+    assert_allclose(like[close], expected[close], rtol=0, atol=5e-3)
+    assert_allclose(like, expected, rtol=1e-3)
+
+    # outside of the table, the gaussian approximation is used
+    assert_allclose(
+        table.likelihood([50.0, 100.0], [40.0, 110.0]),
+        poisson_likelihood_gaussian([50.0, 100.0], [40.0, 110.0], spe, pedestal),
+    )
+
+    prediction = np.array([0.0, 0.5, 2.0, 10.0, 100.0])
+    mean_like = table.mean_likelihood(prediction)
+    expected = mean_poisson_likelihood_full(prediction[:-1], spe, pedestal)
+    assert_allclose(mean_like[:-1], expected, rtol=0.05)
+    assert mean_like[-1] == mean_poisson_likelihood_gaussian(100.0, spe, pedestal)
+
+    with pytest.raises(ValueError):
+        table.likelihood(image, prediction[0], ped=1.0)
+
+    # a second table with the same parameters is read from the cache
+    cached = PixelLikelihoodTable(spe, pedestal, **grid)
+    assert len(list(tmp_path.iterdir())) == 1
+    assert np.all(
+        cached.likelihood(image, prediction[0])
+        == table.likelihood(image, prediction[0])
+    )
+
+
+def test_likelihood_table_pedestals(tmp_path):
+    """ Test interpolation between pedestal widths """
+    spe = 0.5
+    table = PixelLikelihoodTable(
+        spe,
+        np.geomspace(0.5, 2.0, 29),
+        signal_range=(-5, 15),
+        max_prediction=10,
+        cache=False,
+    )
+
+    rng = np.random.RandomState(1)
+    image = rng.uniform(-3, 12, 100)
+    prediction = rng.uniform(0, 8, 100)
+    ped = rng.uniform(0.5, 2.0, 100)
+
+    expected = [
+        poisson_likelihood_full([i, 40], [p, 1], spe, pd, dtype=np.float64)[0]
+        for i, p, pd in zip(image, prediction, ped)
+    ]
+    assert_allclose(table.likelihood(image, prediction, ped), expected, atol=0.05)
+
+    # pedestals at the lower edge of the table and just below it,
+    # within the tolerance of the range check, use the first pedestal
+    ped = np.array([0.5, 0.5 * (1 - 1e-6)])
+    image, prediction = np.array([2.0, 2.0]), np.array([3.0, 3.0])
+    expected = poisson_likelihood_full([2.0, 40], [3.0, 1], spe, 0.5, dtype=np.float64)
+    assert_allclose(table.likelihood(image, prediction, ped), expected[0], atol=0.05)
+    expected = mean_poisson_likelihood_full(prediction, spe, 0.5)
+    assert_allclose(table.mean_likelihood(prediction, ped), expected, rtol=0.05)
+
+    with pytest.raises(ValueError):
+        table.likelihood(image, prediction, 3.0)
+    with pytest.raises(ValueError):
+        PixelLikelihoodTable(spe, [0.5, 1.0, 2.0, 2.5], cache=False)
@@ -21,8 +21,8 @@ def timing_parameters(geom, image, peak_time, hillas_parameters, cleaning_mask=N
 
     Parameters
     ----------
-    geom: ctapipe.instrument.CameraGeometry
-        Camera geometry
+    geom: ctapipe.instrument.CameraGeometry or ctapipe.instrument.GeometryView
+        Camera geometry or a selection of its pixels
     image : array_like
         Pixel values
     peak_time : array_like
@@ -42,7 +42,7 @@ def timing_parameters(geom, image, peak_time, hillas_parameters, cleaning_mask=N
 
     if cleaning_mask is not None:
         image = image[cleaning_mask]
-        geom = geom[cleaning_mask]
+        geom = geom.select(cleaning_mask)
         peak_time = peak_time[cleaning_mask]
 
     if (image < 0).any():
@@ -1,4 +1,4 @@
-from .camera import CameraDescription, CameraGeometry, CameraReadout
+from .camera import CameraDescription, CameraGeometry, CameraReadout, GeometryView
 from .atmosphere import get_atmosphere_profile_functions
 from .telescope import TelescopeDescription
 from .optics import OpticsDescription
@@ -10,6 +10,7 @@ __all__ = [
     "CameraDescription",
     "CameraGeometry",
     "CameraReadout",
+    "GeometryView",
     "get_atmosphere_profile_functions",
     "TelescopeDescription",
     "OpticsDescription",
@@ -1,10 +1,11 @@
 from .description import CameraDescription
-from .geometry import CameraGeometry, UnknownPixelShapeWarning
+from .geometry import CameraGeometry, GeometryView, UnknownPixelShapeWarning
 from .readout import CameraReadout
 
 __all__ = [
     "CameraDescription",
     "CameraGeometry",
+    "GeometryView",
     "UnknownPixelShapeWarning",
     "CameraReadout",
 ]
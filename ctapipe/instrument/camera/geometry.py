@@ -2,7 +2,11 @@
 """
 Utilities for reading or working with Camera geometry files
 """
+import hashlib
 import logging
+import os
+import tempfile
+from zipfile import BadZipFile
 
 import numpy as np
 from astropy import units as u
@@ -13,15 +17,18 @@ from scipy.spatial import cKDTree as KDTree
 from scipy.sparse import lil_matrix, csr_matrix
 import warnings
 
-from ctapipe.utils import get_table_dataset
+from ctapipe.utils import get_table_dataset, get_cache_dir
 from ctapipe.utils.linalg import rotation_matrix_2d
 from ctapipe.coordinates import CameraFrame
 
 
-__all__ = ["CameraGeometry", "UnknownPixelShapeWarning"]
+__all__ = ["CameraGeometry", "GeometryView", "UnknownPixelShapeWarning"]
 
 logger = logging.getLogger(__name__)
 
+# increase when the content of the cache files changes
+_CACHE_VERSION = 1
+
 
 class CameraGeometry:
     """`CameraGeometry` is a class that stores information about a
@@ -65,7 +72,12 @@ class CameraGeometry:
     cam_rotation: overall camera rotation with units
     """
 
-    _geometry_cache = {}  # dictionary CameraGeometry instances for speed
+    _geometry_cache = {}  # dictionary of geometry tables read by from_name for speed
+
+    #: Store derived data (neighbors, border masks) in the ctapipe cache directory
+    #: (see `ctapipe.utils.datasets.get_cache_dir`), so that they are computed
+    #: only once for each camera and not in every process.
+    use_disk_cache = True
 
     def __init__(
         self,
@@ -217,6 +229,25 @@ class CameraGeometry:
             apply_derotation=False,
         )
 
+    def select(self, selection):
+        """
+        Cheap selection of a subset of the pixels, e.g. the pixels surviving
+        the image cleaning.
+
+        In contrast to slicing with ``geom[selection]``, no new
+        `CameraGeometry` is constructed, see `GeometryView`.
+
+        Parameters
+        ----------
+        selection: array-like
+            boolean mask or indices of the selected pixels
+
+        Returns
+        -------
+        GeometryView
+        """
+        return GeometryView(self, selection)
+
     @classmethod
     def guess_pixel_area(cls, pix_x, pix_y, pix_type):
         """
@@ -342,8 +373,12 @@ class CameraGeometry:
         tabname = "{camera_name}{verstr}.camgeom".format(
             camera_name=camera_name, verstr=verstr
         )
-        table = get_table_dataset(tabname, role="dl0.tel.svc.camera")
-        return CameraGeometry.from_table(table)
+        if tabname not in cls._geometry_cache:
+            cls._geometry_cache[tabname] = get_table_dataset(
+                tabname, role="dl0.tel.svc.camera"
+            )
+        # geometries can be modified in place, so do not share the data
+        return CameraGeometry.from_table(cls._geometry_cache[tabname].copy())
 
     def to_table(self):
         """ convert this to an `astropy.table.Table` """
@@ -409,6 +444,58 @@ class CameraGeometry:
     def __str__(self):
         return self.camera_name
 
+    def _cache_key(self):
+        """Hash of all inputs of the derived data stored in the disk cache"""
+        sha = hashlib.sha1(f"{_CACHE_VERSION} {self.pix_type}".encode())
+        for values in (self.pix_x.to_value(u.m), self.pix_y.to_value(u.m)):
+            sha.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        if self._neighbors is not None:
+            sha.update(self._neighbors.indices.tobytes())
+            sha.update(self._neighbors.indptr.tobytes())
+        return sha.hexdigest()
+
+    @lazyproperty
+    def _disk_cache(self):
+        """Path of the cache file and the arrays it contains"""
+        if not self.use_disk_cache:
+            return None, {}
+
+        path = get_cache_dir() / "camera_geometry" / f"{self._cache_key()}.npz"
+        try:
+            with np.load(path) as data:
+                return path, dict(data)
+        except (OSError, ValueError, BadZipFile):
+            return path, {}
+
+    def _read_cache(self, *names):
+        """Arrays from the disk cache, None if not all of them are stored"""
+        _, arrays = self._disk_cache
+        if not all(name in arrays for name in names):
+            return None
+        return tuple(arrays[name] for name in names)
+
+    def _write_cache(self, **new_arrays):
+        """Add arrays to the disk cache"""
+        path, arrays = self._disk_cache
+        if path is None:
+            return
+
+        arrays.update(new_arrays)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write to a temporary file first, so that concurrent processes
+            # never read an incomplete file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".npz")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, **arrays)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        except OSError as err:
+            logger.warning(f"Could not write camera geometry cache {path}: {err}")
+
     @lazyproperty
     def neighbors(self):
         """A list of the neighbors pixel_ids for each pixel"""
@@ -430,12 +517,29 @@ class CameraGeometry:
         Calculate the neighbors of pixels using
         a kdtree for nearest neighbor lookup.
 
+        Results are stored in the disk cache, see `use_disk_cache`.
+
         Parameters
         ----------
         diagonal: bool
             If rectangular geometry, also add diagonal neighbors
         """
-        neighbors = lil_matrix((self.n_pixels, self.n_pixels), dtype=bool)
+        name = "neighbors_diagonal" if diagonal else "neighbors"
+        cached = self._read_cache(f"{name}_indices", f"{name}_indptr")
+        if cached is not None:
+            indices, indptr = cached
+            return csr_matrix(
+                (np.ones(len(indices), dtype=bool), indices, indptr),
+                shape=(self.n_pixels, self.n_pixels),
+            )
+
+        neighbors = self._calc_pixel_neighbors(diagonal)
+        self._write_cache(
+            **{f"{name}_indices": neighbors.indices, f"{name}_indptr": neighbors.indptr}
+        )
+        return neighbors
+
+    def _calc_pixel_neighbors(self, diagonal):
 
         if self.pix_type.startswith("hex"):
             max_neighbors = 6
@@ -461,19 +565,27 @@ class CameraGeometry:
                 radius = 1.5
                 norm = 1
 
-        for i, pixel in enumerate(self._kdtree.data):
-            # as the pixel itself is in the tree, look for max_neighbors + 1
-            distances, neighbor_candidates = self._kdtree.query(
-                pixel, k=max_neighbors + 1, p=norm
-            )
+        # as the pixel itself is in the tree, look for max_neighbors + 1
+        # neighbors of all pixels at once
+        distances, neighbor_candidates = self._kdtree.query(
+            self._kdtree.data, k=min(max_neighbors + 1, self.n_pixels), p=norm
+        )
 
-            # remove self-reference
-            distances = distances[1:]
-            neighbor_candidates = neighbor_candidates[1:]
+        # remove self-reference
+        distances = distances.reshape(self.n_pixels, -1)[:, 1:]
+        neighbor_candidates = neighbor_candidates.reshape(self.n_pixels, -1)[:, 1:]
 
-            # remove too far away pixels
-            inside_max_distance = distances < radius * np.min(distances)
-            neighbors[i, neighbor_candidates[inside_max_distance]] = True
+        # remove too far away pixels
+        min_distance = np.min(distances, axis=1, initial=np.inf)
+        inside_max_distance = distances < radius * min_distance[:, np.newaxis]
+        rows = np.repeat(np.arange(self.n_pixels), inside_max_distance.sum(axis=1))
+        neighbors = csr_matrix(
+            (
+                np.ones(len(rows), dtype=bool),
+                (rows, neighbor_candidates[inside_max_distance]),
+            ),
+            shape=(self.n_pixels, self.n_pixels),
+        )
 
         # filter annoying deprecation warning from within scipy
         # scipy still uses np.matrix in scipy.sparse, but we do not
@@ -485,7 +597,7 @@ class CameraGeometry:
                     "Neighbor matrix is not symmetric. Is camera geometry irregular?"
                 )
 
-        return neighbors.tocsr()
+        return neighbors
 
     @lazyproperty
     def neighbor_matrix_where(self):
@@ -508,6 +620,11 @@ class CameraGeometry:
 
         Note this is *not* recalculated if the CameraGeometry is modified.
 
+        Unlike the neighbor matrices, this is not stored in the disk cache
+        (see `use_disk_cache`): it only takes elementwise products of the pixel
+        positions, which is faster than reading it back, while it would make
+        the cache files, which are always read as a whole, much larger.
+
         this matrix M can be multiplied by an image and normalized by the sum to
         get the moments:
 
@@ -645,21 +762,23 @@ class CameraGeometry:
         if width in self.border_cache:
             return self.border_cache[width]
 
-        # filter annoying deprecation warning from within scipy
-        # scipy still uses np.matrix in scipy.sparse, but we do not
-        # explicitly use any feature of np.matrix, so we can ignore this here
-        with warnings.catch_warnings():
-            warnings.filterwarnings("ignore", category=PendingDeprecationWarning)
+        cached = self._read_cache(f"border_mask_{width}")
+        if cached is not None:
+            self.border_cache[width] = cached[0]
+            return cached[0]
 
-            if width == 1:
-                n_neighbors = self.neighbor_matrix_sparse.sum(axis=1).A1
-                max_neighbors = n_neighbors.max()
-                mask = n_neighbors < max_neighbors
-            else:
-                n = self.neighbor_matrix
-                mask = (n & self.get_border_pixel_mask(width - 1)).any(axis=1)
+        neighbors = self.neighbor_matrix_sparse
+        if width == 1:
+            n_neighbors = np.diff(neighbors.indptr)
+            max_neighbors = n_neighbors.max()
+            mask = n_neighbors < max_neighbors
+        else:
+            # pixels with a neighbor in the border of width - 1
+            inner_border = self.get_border_pixel_mask(width - 1)
+            mask = neighbors.dot(inner_border.astype(np.int64)) > 0
 
         self.border_cache[width] = mask
+        self._write_cache(**{f"border_mask_{width}": mask})
         return mask
 
     def position_to_pix_index(self, x, y):
@@ -757,5 +876,100 @@ class CameraGeometry:
         raise ValueError(f"Unknown pixel_shape {pixel_shape}")
 
 
+class GeometryView:
+    """
+    Lightweight selection of pixels of a `CameraGeometry`,
+    as returned by `CameraGeometry.select`.
+
+    Only the indices of the selected pixels and their unit-stripped
+    coordinates are stored, the other pixel attributes are selected from the
+    parent geometry on access. This avoids the overhead of constructing a new
+    `CameraGeometry` for every image, e.g. when computing image parameters
+    on the pixels surviving the cleaning.
+
+    Image parameter functions like `~ctapipe.image.hillas_parameters`
+    accept a `GeometryView` in place of a `CameraGeometry`.
+
+    Parameters
+    ----------
+    geometry: CameraGeometry
+        the full camera geometry
+    selection: array-like
+        boolean mask or indices of the selected pixels
+
+    Attributes
+    ----------
+    index: np.ndarray
+        indices of the selected pixels in the parent geometry
+    x: np.ndarray
+        x coordinates of the selected pixels, in ``unit``
+    y: np.ndarray
+        y coordinates of the selected pixels, in ``unit``
+    unit: astropy.units.Unit
+        unit of the pixel coordinates
+    """
+
+    __slots__ = ("geometry", "index", "x", "y", "unit", "n_pixels")
+
+    def __init__(self, geometry, selection):
+        index = np.asanyarray(selection)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+
+        self.geometry = geometry
+        self.index = index
+        self.unit = geometry.pix_x.unit
+        self.x = geometry.pix_x.value[index]
+        self.y = geometry.pix_y.to_value(self.unit)[index]
+        self.n_pixels = len(index)
+
+    @property
+    def pix_x(self):
+        return u.Quantity(self.x, self.unit, copy=False)
+
+    @property
+    def pix_y(self):
+        return u.Quantity(self.y, self.unit, copy=False)
+
+    @property
+    def pix_area(self):
+        return self.geometry.pix_area[self.index]
+
+    @property
+    def pix_id(self):
+        return self.geometry.pix_id[self.index]
+
+    @property
+    def camera_name(self):
+        return self.geometry.camera_name
+
+    @property
+    def pix_type(self):
+        return self.geometry.pix_type
+
+    @property
+    def pix_rotation(self):
+        return self.geometry.pix_rotation
+
+    @property
+    def cam_rotation(self):
+        return self.geometry.cam_rotation
+
+    def __len__(self):
+        return self.n_pixels
+
+    def select(self, selection):
+        """Select a subset of the pixels of this view, see `CameraGeometry.select`"""
+        return GeometryView(self.geometry, self.index[selection])
+
+    __getitem__ = select
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}"
+            f"({self.geometry.camera_name}, n_pixels={self.n_pixels})"
+        )
+
+
 class UnknownPixelShapeWarning(UserWarning):
     pass
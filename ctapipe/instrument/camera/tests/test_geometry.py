@@ -359,3 +359,57 @@ def test_guess_radius():
 
     lst_cam = CameraGeometry.from_name("CHEC")
     assert u.isclose(lst_cam.guess_radius(), 0.16 * u.m, rtol=0.05)
+
+
+def test_select():
+    """ Check that a cheap pixel selection behaves like a sliced camera """
+    from ctapipe.instrument import GeometryView
+
+    geom = CameraGeometry.make_rectangular(10, 10)
+    mask = np.zeros(geom.n_pixels, dtype=bool)
+    mask[[5, 7, 8, 20, 42]] = True
+
+    view = geom.select(mask)
+    assert isinstance(view, GeometryView)
+    assert len(view) == view.n_pixels == 5
+    assert np.all(view.index == [5, 7, 8, 20, 42])
+    assert view.unit == geom.pix_x.unit
+    assert np.all(view.x == geom.pix_x.value[mask])
+    assert np.all(view.pix_y == geom.pix_y[mask])
+    assert np.all(view.pix_area == geom.pix_area[mask])
+    assert np.all(view.pix_id == geom.pix_id[mask])
+    assert view.pix_type == geom.pix_type
+
+    # selecting from a view selects from the parent geometry
+    subview = view.select([1, 3])
+    assert np.all(subview.index == [7, 20])
+    assert np.all(subview.pix_x == geom.pix_x[[7, 20]])
+    assert np.all(view[view.x > 0].index == view.index[view.x > 0])
+
+
+def test_disk_cache(tmp_path, monkeypatch):
+    """ derived data is stored in and read from the cache directory """
+    monkeypatch.setenv("CTAPIPE_CACHE_DIR", str(tmp_path))
+
+    geom = CameraGeometry.make_rectangular(20, 20)
+    neighbors = geom.neighbor_matrix_sparse
+    border = geom.get_border_pixel_mask(2)
+    assert len(list((tmp_path / "camera_geometry").iterdir())) == 1
+
+    # a new geometry with the same pixels uses the cached data
+    cached = CameraGeometry.make_rectangular(20, 20)
+    assert cached._read_cache("neighbors_indices", "border_mask_2") is not None
+    assert (cached.neighbor_matrix_sparse != neighbors).nnz == 0
+    assert np.all(cached.get_border_pixel_mask(2) == border)
+
+    # other pixel positions give another cache file
+    other = CameraGeometry.make_rectangular(21, 20)
+    assert other._read_cache("neighbors_indices") is None
+    other.neighbor_matrix_sparse
+    assert len(list((tmp_path / "camera_geometry").iterdir())) == 2
+
+    # the cache can be switched off
+    monkeypatch.setattr(CameraGeometry, "use_disk_cache", False)
+    uncached = CameraGeometry.make_rectangular(20, 20)
+    assert uncached._read_cache("neighbors_indices") is None
+    assert (uncached.neighbor_matrix_sparse != neighbors).nnz == 0
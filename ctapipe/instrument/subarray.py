@@ -5,8 +5,10 @@ Description of Arrays or Subarrays of telescopes
 __all__ = ["SubarrayDescription"]
 
 from collections import defaultdict
+from pathlib import PurePath
 
 import numpy as np
+import tables
 from astropy import units as u
 from astropy.coordinates import SkyCoord
 from astropy.table import Table
@@ -15,7 +17,56 @@ from astropy.utils import lazyproperty
 import ctapipe
 
 from ..coordinates import GroundFrame
-from . import TelescopeDescription
+from .camera import CameraDescription, CameraGeometry, CameraReadout
+from .optics import OpticsDescription
+from .telescope import TelescopeDescription
+
+#: HDF5 group the instrument description is written to by `SubarrayDescription.to_hdf`
+INSTRUMENT_GROUP = "/configuration/instrument"
+
+
+def _write_table(h5file, where, name, table):
+    """
+    write an `astropy.table.Table` as a PyTables table, storing the units
+    as ``<column>_UNIT`` and the table meta as attributes, like the
+    `~ctapipe.io.HDF5TableWriter` does.
+    """
+    columns = []
+    for col in table.itercols():
+        values = np.asarray(col)
+        if values.dtype.kind == "U":
+            values = np.char.encode(values, "utf-8")
+        columns.append(values)
+
+    array = np.rec.fromarrays(columns, names=table.colnames)
+    h5table = h5file.create_table(where, name, obj=array, createparents=True)
+
+    for col in table.itercols():
+        if col.unit is not None:
+            h5table.attrs[f"{col.name}_UNIT"] = col.unit.to_string("vounit")
+    for key, val in table.meta.items():
+        h5table.attrs[key] = val
+
+
+def _read_table(h5file, path):
+    """ read a table written by `_write_table` back as an `astropy.table.Table`"""
+    node = h5file.get_node(path)
+    array = node.read()
+    attrs = {key: node.attrs[key] for key in node.attrs._f_list("user")}
+
+    table = Table()
+    for name in array.dtype.names:
+        values = array[name]
+        if values.dtype.kind == "S":
+            values = np.char.decode(values, "utf-8")
+        table[name] = values
+
+        unit = attrs.pop(f"{name}_UNIT", None)
+        if unit is not None:
+            table[name].unit = u.Unit(unit, format="vounit")
+
+    table.meta.update(attrs)
+    return table
 
 
 class SubarrayDescription:
@@ -45,6 +96,20 @@ class SubarrayDescription:
         array of tel_ids
     tel_indices: dict
         dict mapping tel_id to index in array attributes
+    tel_index_array: np.ndarray
+        array mapping tel_id to index in array attributes
+    tel_position_array: np.ndarray
+        (n_tels, 3) telescope positions in m
+    tel_focal_length_array: np.ndarray
+        equivalent focal length of each telescope in m
+    tel_mirror_area_array: np.ndarray
+        mirror area of each telescope in m²
+    tel_n_pixels_array: np.ndarray
+        number of camera pixels of each telescope
+    camera_names: tuple
+        sorted names of the cameras in the subarray
+    tel_camera_index_array: np.ndarray
+        index into ``camera_names`` of the camera of each telescope
     """
 
     def __init__(self, name, tel_positions=None, tel_descriptions=None):
@@ -103,12 +168,62 @@ class SubarrayDescription:
     @lazyproperty
     def tel_coords(self):
         """ returns telescope positions as astropy.coordinates.SkyCoord"""
+        pos_x, pos_y, pos_z = self.tel_position_array.T * u.m
+        return SkyCoord(x=pos_x, y=pos_y, z=pos_z, frame=GroundFrame())
 
-        pos_x = np.array([p[0].to("m").value for p in self.positions.values()]) * u.m
-        pos_y = np.array([p[1].to("m").value for p in self.positions.values()]) * u.m
-        pos_z = np.array([p[2].to("m").value for p in self.positions.values()]) * u.m
+    @lazyproperty
+    def tel_position_array(self):
+        """(n_tels, 3) array of the telescope positions in m, in the order
+        of ``tel_ids``"""
+        positions = np.zeros((self.num_tels, 3))
+        for index, tel_id in enumerate(self.tel_ids):
+            positions[index] = u.Quantity(self.positions[tel_id]).to_value(u.m)
+        return positions
 
-        return SkyCoord(x=pos_x, y=pos_y, z=pos_z, frame=GroundFrame())
+    @lazyproperty
+    def tel_focal_length_array(self):
+        """ equivalent focal length in m of each telescope in ``tel_ids``"""
+        return np.array(
+            [
+                self.tels[tel_id].optics.equivalent_focal_length.to_value(u.m)
+                for tel_id in self.tel_ids
+            ],
+            dtype=np.float64,
+        )
+
+    @lazyproperty
+    def tel_mirror_area_array(self):
+        """ mirror area in m² of each telescope in ``tel_ids``"""
+        return np.array(
+            [
+                self.tels[tel_id].optics.mirror_area.to_value(u.m ** 2)
+                for tel_id in self.tel_ids
+            ],
+            dtype=np.float64,
+        )
+
+    @lazyproperty
+    def tel_n_pixels_array(self):
+        """ number of camera pixels of each telescope in ``tel_ids``"""
+        return np.array(
+            [self.tels[tel_id].camera.geometry.n_pixels for tel_id in self.tel_ids],
+            dtype=np.int64,
+        )
+
+    @lazyproperty
+    def camera_names(self):
+        """ sorted tuple of the names of the cameras in this subarray"""
+        return tuple(sorted({tel.camera.camera_name for tel in self.tels.values()}))
+
+    @lazyproperty
+    def tel_camera_index_array(self):
+        """ index into ``camera_names`` of the camera of each telescope
+        in ``tel_ids``, a numeric code for the camera type"""
+        codes = {name: code for code, name in enumerate(self.camera_names)}
+        return np.array(
+            [codes[self.tels[tel_id].camera.camera_name] for tel_id in self.tel_ids],
+            dtype=np.int64,
+        )
 
     @lazyproperty
     def tel_ids(self):
@@ -128,11 +243,11 @@ class SubarrayDescription:
         telescope, this array maps the tel_id to a flat index starting at 0 for
         the first telescope. `tel_index = tel_id_to_index_array[tel_id]`
         If the tel_ids are not contiguous, gaps will be filled in by -1.
-        For a more compact representation use the `tel_indices`
+        For a more compact representation use the `tel_indices`.
+        Being a plain integer array, it can also be used inside numba functions.
         """
-        idx = np.zeros(np.max(self.tel_ids) + 1, dtype=int) - 1  # start with -1
-        for key, val in self.tel_indices.items():
-            idx[key] = val
+        idx = np.full(np.max(self.tel_ids) + 1, -1, dtype=np.int64)
+        idx[self.tel_ids] = np.arange(self.num_tels)
         return idx
 
     def tel_ids_to_indices(self, tel_ids):
@@ -248,6 +363,170 @@ class SubarrayDescription:
         tab.meta.update(meta)
         return tab
 
+    def to_hdf(self, h5file, overwrite=False):
+        """
+        write the SubarrayDescription to an HDF5 file using PyTables.
+
+        The telescope layout and the optics are written as one table each,
+        the geometry and readout of each camera type only once, referenced
+        by the ``camera_type`` column of the layout table.
+        All tables are placed below ``/configuration/instrument``.
+
+        Parameters
+        ----------
+        h5file: str, pathlib.Path or tables.File
+            output file name or an already opened, writable file
+        overwrite: bool
+            if True, replace an instrument description already in the file,
+            otherwise an `IOError` is raised in that case
+        """
+        if isinstance(h5file, (str, PurePath)):
+            with tables.open_file(h5file, mode="a") as f:
+                self.to_hdf(f, overwrite=overwrite)
+            return
+
+        if INSTRUMENT_GROUP in h5file:
+            if not overwrite:
+                raise IOError(
+                    f"File {h5file.filename} already contains {INSTRUMENT_GROUP}"
+                    ", use overwrite=True to replace it"
+                )
+            h5file.remove_node(INSTRUMENT_GROUP, recursive=True)
+
+        optics_types = list(dict.fromkeys(tel.optics for tel in self.tels.values()))
+        optics_index = {optics: index for index, optics in enumerate(optics_types)}
+
+        layout = self.to_table(kind="subarray")
+        layout["optics_index"] = np.array(
+            [optics_index[tel.optics] for tel in self.tels.values()], dtype=np.int32
+        )
+        _write_table(h5file, f"{INSTRUMENT_GROUP}/subarray", "layout", layout)
+
+        # optional values that are not known are stored as -1 or nan
+        optics = Table(
+            dict(
+                name=[o.name for o in optics_types],
+                num_mirrors=np.array(
+                    [o.num_mirrors for o in optics_types], dtype=np.int32
+                ),
+                num_mirror_tiles=np.array(
+                    [
+                        -1 if o.num_mirror_tiles is None else o.num_mirror_tiles
+                        for o in optics_types
+                    ],
+                    dtype=np.int32,
+                ),
+                mirror_area=u.Quantity(
+                    [
+                        np.nan
+                        if o.mirror_area is None
+                        else o.mirror_area.to_value(u.m ** 2)
+                        for o in optics_types
+                    ],
+                    u.m ** 2,
+                ),
+                equivalent_focal_length=u.Quantity(
+                    [o.equivalent_focal_length.to_value(u.m) for o in optics_types],
+                    u.m,
+                ),
+            ),
+            meta=dict(TAB_TYPE="optics"),
+        )
+        _write_table(h5file, f"{INSTRUMENT_GROUP}/telescope", "optics", optics)
+
+        cameras = {tel.camera.camera_name: tel.camera for tel in self.tels.values()}
+        where = f"{INSTRUMENT_GROUP}/telescope/camera"
+        for camera_name, camera in cameras.items():
+            geometry = camera.geometry.to_table()
+            _write_table(h5file, where, f"geometry_{camera_name}", geometry)
+            readout = camera.readout.to_table()
+            _write_table(h5file, where, f"readout_{camera_name}", readout)
+
+    @classmethod
+    def from_hdf(cls, h5file):
+        """
+        read a SubarrayDescription written by `SubarrayDescription.to_hdf`
+
+        Parameters
+        ----------
+        h5file: str, pathlib.Path or tables.File
+            input file name or an already opened file
+
+        Returns
+        -------
+        SubarrayDescription
+        """
+        if isinstance(h5file, (str, PurePath)):
+            with tables.open_file(h5file, mode="r") as f:
+                return cls.from_hdf(f)
+
+        layout = _read_table(h5file, f"{INSTRUMENT_GROUP}/subarray/layout")
+        optics_table = _read_table(h5file, f"{INSTRUMENT_GROUP}/telescope/optics")
+
+        optics_types = [
+            OpticsDescription(
+                name=row["name"],
+                num_mirrors=int(row["num_mirrors"]),
+                num_mirror_tiles=(
+                    None
+                    if row["num_mirror_tiles"] < 0
+                    else int(row["num_mirror_tiles"])
+                ),
+                mirror_area=(
+                    None
+                    if np.isnan(row["mirror_area"])
+                    else row["mirror_area"] * optics_table["mirror_area"].unit
+                ),
+                equivalent_focal_length=(
+                    row["equivalent_focal_length"]
+                    * optics_table["equivalent_focal_length"].unit
+                ),
+            )
+            for row in optics_table
+        ]
+
+        cameras = {}
+        for camera_name in np.unique(layout["camera_type"]):
+            where = f"{INSTRUMENT_GROUP}/telescope/camera"
+            geometry = _read_table(h5file, f"{where}/geometry_{camera_name}")
+            readout = _read_table(h5file, f"{where}/readout_{camera_name}")
+            cameras[camera_name] = CameraDescription(
+                camera_name=camera_name,
+                geometry=CameraGeometry.from_table(geometry),
+                readout=CameraReadout.from_table(readout),
+            )
+
+        # telescopes of the same type share their description
+        telescope_types = {}
+        tel_descriptions = {}
+        tel_positions = {}
+        positions = u.Quantity(
+            [
+                layout["pos_x"].quantity,
+                layout["pos_y"].quantity,
+                layout["pos_z"].quantity,
+            ]
+        ).T
+        for row, position in zip(layout, positions):
+            key = (row["name"], row["type"], row["optics_index"], row["camera_type"])
+            if key not in telescope_types:
+                telescope_types[key] = TelescopeDescription(
+                    name=row["name"],
+                    tel_type=row["type"],
+                    optics=optics_types[row["optics_index"]],
+                    camera=cameras[row["camera_type"]],
+                )
+
+            tel_id = int(row["tel_id"])
+            tel_descriptions[tel_id] = telescope_types[key]
+            tel_positions[tel_id] = position
+
+        return cls(
+            name=layout.meta.get("SUBARRAY", "Unknown"),
+            tel_positions=tel_positions,
+            tel_descriptions=tel_descriptions,
+        )
+
     def select_subarray(self, name, tel_ids):
         """
         return a new SubarrayDescription that is a sub-array of this one
@@ -1,5 +1,6 @@
 """ Tests for SubarrayDescriptions """
 import numpy as np
+import pytest
 from astropy import units as u
 from astropy.coordinates import SkyCoord
 
@@ -104,3 +105,129 @@ def test_get_tel_ids_for_type(example_subarray):
     for teltype in types:
         assert len(sub.get_tel_ids_for_type(teltype)) > 0
         assert len(sub.get_tel_ids_for_type(str(teltype))) > 0
+
+
+def test_tel_arrays():
+    """ Check the per-telescope arrays are aligned with tel_ids """
+    sub = example_subarray(5).select_subarray("gaps", [1, 3, 5])
+    sub.tels[5] = TelescopeDescription.from_name(
+        optics_name="LST", camera_name="LSTCam"
+    )
+
+    assert sub.tel_position_array.shape == (3, 3)
+    for index, tel_id in enumerate(sub.tel_ids):
+        tel = sub.tel[tel_id]
+        assert np.allclose(
+            sub.tel_position_array[index], sub.positions[tel_id].to_value(u.m)
+        )
+        assert sub.tel_focal_length_array[index] == (
+            tel.optics.equivalent_focal_length.to_value(u.m)
+        )
+        assert sub.tel_mirror_area_array[index] == (
+            tel.optics.mirror_area.to_value(u.m ** 2)
+        )
+        assert sub.tel_n_pixels_array[index] == tel.camera.geometry.n_pixels
+        camera_index = sub.tel_camera_index_array[index]
+        assert sub.camera_names[camera_index] == tel.camera.camera_name
+
+    assert sub.camera_names == ("LSTCam", "NectarCam")
+    assert np.all(sub.tel_index_array == [-1, 0, -1, 1, -1, 2])
+    assert u.allclose(sub.tel_coords.x, sub.tel_position_array[:, 0] * u.m)
+
+
+def test_hdf(tmp_path):
+    """ Check writing and reading the SubarrayDescription to and from HDF5 """
+    import tables
+
+    sub = example_subarray(5)
+    sub.tels[5] = TelescopeDescription.from_name(
+        optics_name="LST", camera_name="LSTCam"
+    )
+    path = tmp_path / "subarray.h5"
+    sub.to_hdf(path)
+
+    with tables.open_file(path) as f:
+        cameras = f.root.configuration.instrument.telescope.camera
+        assert set(cameras._v_children) == {
+            "geometry_LSTCam",
+            "readout_LSTCam",
+            "geometry_NectarCam",
+            "readout_NectarCam",
+        }
+
+    # writing again is only possible with overwrite
+    with pytest.raises(IOError):
+        sub.to_hdf(path)
+    sub.to_hdf(path, overwrite=True)
+
+    read = SubarrayDescription.from_hdf(path)
+    assert read.name == sub.name
+    assert np.all(read.tel_ids == sub.tel_ids)
+    assert np.allclose(read.tel_position_array, sub.tel_position_array)
+    assert read.telescope_types == sub.telescope_types
+    assert read.tel[1] is read.tel[2]
+
+    for tel_id, tel in sub.tel.items():
+        read_tel = read.tel[tel_id]
+        assert str(read_tel) == str(tel)
+        assert read_tel.optics == tel.optics
+        assert read_tel.optics.name == tel.optics.name
+        assert read_tel.camera.camera_name == tel.camera.camera_name
+        assert u.allclose(read_tel.camera.geometry.pix_x, tel.camera.geometry.pix_x)
+        assert read_tel.camera.geometry.pix_type == tel.camera.geometry.pix_type
+        assert np.allclose(
+            read_tel.camera.readout.reference_pulse_shape,
+            tel.camera.readout.reference_pulse_shape,
+        )
+
+    # also works with an already opened file
+    with tables.open_file(path) as f:
+        assert SubarrayDescription.from_hdf(f).num_tels == sub.num_tels
+
+
+def test_hdf_default_optics(tmp_path):
+    """ optics without the optional mirror area and number of tiles """
+    from ctapipe.instrument import CameraGeometry, CameraReadout
+
+    geometry = CameraGeometry(
+        camera_name="test",
+        pix_id=np.arange(3),
+        pix_x=[0.0, 0.1, 0.2] * u.m,
+        pix_y=[0.0, 0.0, 0.1] * u.m,
+        pix_area=np.full(3, 0.01) * u.m ** 2,
+        pix_type="hexagon",
+    )
+    readout = CameraReadout(
+        camera_name="test",
+        sampling_rate=1 * u.GHz,
+        reference_pulse_shape=np.ones((1, 5)),
+        reference_pulse_sample_width=1 * u.ns,
+    )
+    optics = [
+        OpticsDescription("default", num_mirrors=1, equivalent_focal_length=10 * u.m),
+        OpticsDescription(
+            "full",
+            num_mirrors=2,
+            equivalent_focal_length=5 * u.m,
+            mirror_area=4 * u.m ** 2,
+            num_mirror_tiles=10,
+        ),
+    ]
+    camera = CameraDescription("test", geometry=geometry, readout=readout)
+    sub = SubarrayDescription(
+        "test",
+        tel_positions={1: [0, 0, 0] * u.m, 2: [10, 0, 0] * u.m},
+        tel_descriptions={
+            tel_id: TelescopeDescription("MST", "MST", optics=o, camera=camera)
+            for tel_id, o in zip((1, 2), optics)
+        },
+    )
+    path = tmp_path / "subarray.h5"
+    sub.to_hdf(path)
+    read = SubarrayDescription.from_hdf(path)
+
+    assert read.tel[1].optics.mirror_area is None
+    assert read.tel[1].optics.num_mirror_tiles is None
+    assert read.tel[1].optics == optics[0]
+    assert u.isclose(read.tel[2].optics.mirror_area, 4 * u.m ** 2)
+    assert read.tel[2].optics.num_mirror_tiles == 10
@@ -10,7 +10,7 @@ from astropy.units import Quantity
 
 import ctapipe
 from .tableio import TableWriter, TableReader
-from ..core import Container
+from ..core import Container, ContainerBatch
 
 __all__ = ["HDF5TableWriter", "HDF5TableReader"]
 
@@ -29,6 +29,7 @@ PYTABLES_TYPE_MAP = {
     "uint32": tables.UInt32Col,
     "uint64": tables.UInt64Col,
     "bool": tables.BoolCol,
+    "bool_": tables.BoolCol,
 }
 
 
@@ -309,6 +310,66 @@ class HDF5TableWriter(TableWriter):
 
         self._append_row(table_name, containers)
 
+    def write_batch(self, table_name, batches):
+        """
+        Write all rows of the given `~ctapipe.core.ContainerBatch` or batches
+        to a table in one call.
+        Tables are compatible with the ones created by `write()`, so single
+        containers and batches can be written to the same table.
+
+        Parameters
+        ----------
+        table_name: str
+            name of table to write to
+        batches: `ctapipe.core.ContainerBatch` or `Iterable[ctapipe.core.ContainerBatch]`
+            batches to write, all need the same number of rows.
+            Nothing is written if no batches are given.
+        """
+        if isinstance(batches, ContainerBatch):
+            batches = [batches]
+        else:
+            batches = list(batches)
+
+        if len(batches) == 0:
+            return
+
+        n_rows = len(batches[0])
+        if any(len(batch) != n_rows for batch in batches):
+            raise ValueError("All batches written to one table need the same length")
+
+        if n_rows == 0:
+            return
+
+        if table_name not in self._schemas:
+            self._setup_new_table(table_name, [batch[0] for batch in batches])
+
+        table = self._tables[table_name]
+        rows = np.empty(n_rows, dtype=table.dtype)
+
+        for batch in batches:
+            for colname, column in batch.items(add_prefix=self.add_prefix):
+                if colname not in table.colnames:
+                    continue
+
+                # unit and time conversions work on whole columns,
+                # other transforms are applied value by value
+                transform = self._transforms[table_name].get(colname)
+                vectorized = getattr(transform, "func", transform) in (
+                    tr_convert_and_strip_unit,
+                    tr_time_to_float,
+                )
+                if column.dtype == object or (transform and not vectorized):
+                    column = [
+                        self._apply_col_transform(table_name, colname, value)
+                        for value in column
+                    ]
+                elif transform is not None:
+                    column = transform(column)
+
+                rows[colname] = column
+
+        table.append(rows)
+
 
 class HDF5TableReader(TableReader):
     """
@@ -531,6 +531,69 @@ def test_write_default_container(cls):
                     raise
 
 
+def test_write_batch(tmp_path):
+    """ writing a batch gives the same table as writing its rows """
+    from ctapipe.core import ContainerBatch
+
+    containers = [
+        HillasParametersContainer(
+            x=i * u.m, y=-i * u.m, intensity=10.0 * i, psi=i * u.deg
+        )
+        for i in range(5)
+    ]
+    enums = [WithIntEnum(event_type=WithIntEnum.EventType(i % 3 + 1)) for i in range(5)]
+
+    with HDF5TableWriter(tmp_path / "rows.h5", "data", add_prefix=True) as writer:
+        for hillas, enum_container in zip(containers, enums):
+            writer.write("table", [hillas, enum_container])
+
+    batches = [
+        ContainerBatch.from_containers(containers),
+        ContainerBatch.from_containers(enums),
+    ]
+    with HDF5TableWriter(tmp_path / "batch.h5", "data", add_prefix=True) as writer:
+        writer.write_batch("table", batches)
+        # rows and batches can be mixed
+        writer.write("table", [containers[0], enums[0]])
+
+    with tables.open_file(tmp_path / "rows.h5") as f:
+        expected = f.root.data.table[:]
+        expected_attrs = {k: f.root.data.table.attrs[k] for k in ["hillas_x_UNIT"]}
+    with tables.open_file(tmp_path / "batch.h5") as f:
+        table = f.root.data.table
+        assert table.attrs["hillas_x_UNIT"] == expected_attrs["hillas_x_UNIT"]
+        result = table[:]
+
+    assert len(result) == 6
+    assert result.dtype == expected.dtype
+    for name in expected.dtype.names:
+        assert np.array_equal(result[name][:5], expected[name], equal_nan=True)
+        assert np.array_equal(result[name][5], expected[name][0], equal_nan=True)
+
+
+def test_write_batch_iterable(tmp_path):
+    """ batches can be given by any iterable, also an empty one """
+    from ctapipe.core import ContainerBatch
+
+    containers = [HillasParametersContainer(x=i * u.m) for i in range(3)]
+    enums = [WithIntEnum(event_type=WithIntEnum.EventType(1)) for i in range(3)]
+
+    with HDF5TableWriter(tmp_path / "batch.h5", "data", add_prefix=True) as writer:
+        writer.write_batch("empty", [])
+        writer.write_batch("empty", iter(()))
+        writer.write_batch(
+            "table", (ContainerBatch.from_containers(c) for c in (containers, enums)),
+        )
+
+    with tables.open_file(tmp_path / "batch.h5") as f:
+        assert "empty" not in f.root.data
+        table = f.root.data.table[:]
+
+    assert len(table) == 3
+    assert np.array_equal(table["hillas_x"], [0.0, 1.0, 2.0])
+    assert np.all(table["withintenum_event_type"] == 1)
+
+
 if __name__ == "__main__":
 
     import logging
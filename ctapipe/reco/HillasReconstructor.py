@@ -10,21 +10,31 @@ from ctapipe.reco.reco_algorithms import (
     InvalidWidthException,
     TooFewTelescopesException,
 )
+from ctapipe.reco.batch import (
+    group_by_event,
+    event_index_from_offsets,
+    pair_indices,
+    sum_by_event,
+)
 from ctapipe.containers import ReconstructedShowerContainer
 from itertools import combinations
 
 from ctapipe.coordinates import (
-    CameraFrame,
-    GroundFrame,
-    TiltedGroundFrame,
-    project_to_ground,
     MissingFrameAttributeWarning,
+    altaz_to_fov,
+    camera_to_altaz,
+    camera_to_horizon_cartesian,
+    fov_to_camera,
+    shower_trans_matrix,
+    ground_to_tilted_positions,
+    tilted_to_ground_positions,
 )
 from astropy.coordinates import (
     SkyCoord,
     spherical_to_cartesian,
     cartesian_to_spherical,
 )
+from astropy.table import Table
 import warnings
 
 import numpy as np
@@ -87,6 +97,53 @@ def line_line_intersection_3d(uvw_vectors, origins):
     return np.linalg.inv(S) @ C
 
 
+def line_line_intersection_3d_batch(uvw_vectors, origins, event_index, n_events):
+    """
+    Intersection of many lines in 3d for many events at once,
+    see `line_line_intersection_3d`.
+
+    Parameters
+    ----------
+    uvw_vectors: np.ndarray
+        (n_lines, dim) array of unit direction vectors
+    origins: np.ndarray
+        (n_lines, dim) array of points on the lines
+    event_index: np.ndarray
+        event each line belongs to
+    n_events: int
+        number of events
+
+    Returns
+    -------
+    np.ndarray:
+        (n_events, dim) array of intersection points, nan for events
+        without a unique solution
+    """
+    dim = uvw_vectors.shape[1]
+    norm_matrix = np.einsum("ni,nj->nij", uvw_vectors, uvw_vectors) - np.eye(dim)
+    S = sum_by_event(norm_matrix, event_index, n_events)
+    C = sum_by_event(
+        np.einsum("nij,nj->ni", norm_matrix, origins), event_index, n_events
+    )
+
+    result = np.full((n_events, dim), np.nan)
+    solvable = np.abs(np.linalg.det(S)) > 1e-12
+    result[solvable] = np.linalg.solve(S[solvable], C[solvable])
+    return result
+
+
+def _normalise_rows(vectors):
+    """ normalise an (n, 3) array of vectors to unit length """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return vectors / np.linalg.norm(vectors, axis=1)[:, np.newaxis]
+
+
+def _column_to_value(table, name, unit):
+    """ values of a table column in the given unit, plain arrays are assumed
+    to already be in that unit"""
+    return u.Quantity(table[name], unit, copy=False).to_value(unit)
+
+
 class HillasReconstructor(Reconstructor):
     """
     class that reconstructs the direction of an atmospheric shower
@@ -195,6 +252,160 @@ class HillasReconstructor(Reconstructor):
 
         return result
 
+    def predict_table(self, parameters, subarray, array_pointing):
+        """
+        Reconstruct the direction, core position and h_max of many events at
+        once from a table of telescope-wise hillas parameters.
+
+        This gives the same results as calling `predict` for every event
+        (for parallel pointing), but does all computations on arrays
+        for all events without creating coordinate frames or `HillasPlane`
+        objects per telescope.
+
+        Rows with invalid (nan or zero width) hillas parameters are ignored,
+        events with fewer than two valid telescopes are returned with
+        ``is_valid=False`` and nan values.
+
+        Parameters
+        ----------
+        parameters: astropy.table.Table
+            one row per telescope event, with the columns ``event_id``,
+            ``tel_id``, ``hillas_x``, ``hillas_y``, ``hillas_psi``,
+            ``hillas_intensity``, ``hillas_length`` and ``hillas_width`` as
+            written by ``ctapipe-stage1-process``. Events are identified by
+            ``(obs_id, event_id)`` if an ``obs_id`` column is present.
+            Columns without units are assumed to be in m and deg.
+        subarray : ctapipe.instrument.SubarrayDescription
+            subarray information
+        array_pointing: SkyCoord[AltAz]
+            pointing direction of the array, either a scalar or one per row
+            of ``parameters``. For events with different pointings in their
+            rows, the pointing of the first row is used for the core position.
+
+        Returns
+        -------
+        astropy.table.Table:
+            one row per event, sorted by (obs_id, ) event_id, with the columns
+            of `~ctapipe.containers.ReconstructedShowerContainer` except the
+            uncertainties not estimated by this class and ``tel_ids``
+        """
+        n_rows = len(parameters)
+        obs_id = parameters["obs_id"] if "obs_id" in parameters.colnames else None
+        order, offsets = group_by_event(parameters["event_id"], obs_id)
+        n_events = len(offsets) - 1
+        event_index = event_index_from_offsets(offsets)
+
+        def sorted_column(name, unit):
+            return _column_to_value(parameters, name, unit)[order]
+
+        x = sorted_column("hillas_x", u.m)
+        y = sorted_column("hillas_y", u.m)
+        psi = np.deg2rad(sorted_column("hillas_psi", u.deg))
+        intensity = sorted_column("hillas_intensity", u.dimensionless_unscaled)
+        length = sorted_column("hillas_length", u.m)
+        width = sorted_column("hillas_width", u.m)
+
+        azimuth = np.broadcast_to(array_pointing.az.to_value(u.rad), n_rows)[order]
+        altitude = np.broadcast_to(array_pointing.alt.to_value(u.rad), n_rows)[order]
+
+        tel_index = subarray.tel_ids_to_indices(np.asanyarray(parameters["tel_id"]))
+        tel_index = tel_index[order]
+        focal_lengths = subarray.tel_focal_length_array
+        tel_positions = subarray.tel_position_array
+
+        # only use valid telescope images of events with at least two of them
+        valid = np.isfinite(width) & (width != 0)
+        for values in (x, y, psi, intensity, length):
+            valid &= np.isfinite(values)
+        n_valid = np.bincount(event_index[valid], minlength=n_events)
+        is_valid = n_valid >= 2
+        use = valid & is_valid[event_index]
+
+        reco_events = np.flatnonzero(is_valid)
+        n_reco = len(reco_events)
+        reco_offsets = np.append(0, np.cumsum(n_valid[reco_events]))
+        reco_index = event_index_from_offsets(reco_offsets)
+
+        x, y, psi = x[use], y[use], psi[use]
+        intensity, length, width = intensity[use], length[use], width[use]
+        azimuth, altitude, tel_index = azimuth[use], altitude[use], tel_index[use]
+        focal_length = focal_lengths[tel_index]
+        position = tel_positions[tel_index]
+
+        # great circles through the cog and a second point on the main axis
+        a = camera_to_horizon_cartesian(x, y, focal_length, azimuth, altitude)
+        b = camera_to_horizon_cartesian(
+            x + 0.1 * np.cos(psi),
+            y + 0.1 * np.sin(psi),
+            focal_length,
+            azimuth,
+            altitude,
+        )
+        c = np.cross(np.cross(a, b), a)
+        norm = _normalise_rows(np.cross(a, c))
+        weight = intensity * (length / width)
+
+        # direction: weighted sum of the crossings of all pairs of planes
+        first, second, pair_event = pair_indices(reco_offsets)
+        crossings = np.cross(norm[first], norm[second])
+        crossings[crossings[:, 2] < 0] *= -1
+        crossings *= (weight[first] * weight[second])[:, np.newaxis]
+
+        direction = _normalise_rows(sum_by_event(crossings, pair_event, n_reco))
+        cos_off_angle = np.einsum(
+            "ij,ij->i", direction[pair_event], _normalise_rows(crossings)
+        )
+        off_angle = np.arccos(np.clip(cos_off_angle, -1.0, 1.0))
+        n_pairs = np.bincount(pair_event, minlength=n_reco)
+        err_est_dir = np.bincount(pair_event, off_angle, minlength=n_reco) / n_pairs
+
+        alt = np.arctan2(direction[:, 2], np.hypot(direction[:, 0], direction[:, 1]))
+        lon = np.arctan2(direction[:, 1], direction[:, 0]) % (2 * np.pi)
+
+        # core position: intersection of the main axes in the tilted frame
+        event_start = reco_offsets[:-1]
+        trans = shower_trans_matrix(azimuth, altitude)
+        position_tilted = np.einsum("nij,nj->ni", trans[:, :2], position)
+        uv_vectors = np.column_stack([np.cos(psi), np.sin(psi)])
+        core_tilted = line_line_intersection_3d_batch(
+            uv_vectors, position_tilted, reco_index, n_reco
+        )
+
+        event_trans = trans[event_start]
+        core_ground = np.einsum("nji,nj->ni", event_trans[:, :2], core_tilted)
+        core_x = core_ground[:, 0] - (
+            event_trans[:, 2, 0] * core_ground[:, 2] / event_trans[:, 2, 2]
+        )
+        core_y = core_ground[:, 1] - (
+            event_trans[:, 2, 1] * core_ground[:, 2] / event_trans[:, 2, 2]
+        )
+
+        # h_max: intersection of the cog directions
+        h_max = np.linalg.norm(
+            line_line_intersection_3d_batch(a, position, reco_index, n_reco), axis=1
+        )
+
+        def per_event(values, unit=None):
+            result = np.full(n_events, np.nan)
+            result[reco_events] = values
+            return result if unit is None else u.Quantity(result, unit, copy=False)
+
+        table = Table()
+        if obs_id is not None:
+            table["obs_id"] = np.asanyarray(obs_id)[order][offsets[:-1]]
+        table["event_id"] = np.asanyarray(parameters["event_id"])[order][offsets[:-1]]
+        table["alt"] = per_event(alt, u.rad).to(u.deg)
+        table["az"] = per_event(-lon, u.rad).to(u.deg)
+        table["core_x"] = per_event(core_x, u.m)
+        table["core_y"] = per_event(core_y, u.m)
+        table["h_max"] = per_event(h_max, u.m)
+        table["alt_uncert"] = per_event(err_est_dir, u.rad).to(u.deg)
+        table["average_intensity"] = per_event(
+            np.bincount(reco_index, intensity, minlength=n_reco) / n_valid[is_valid]
+        )
+        table["is_valid"] = is_valid
+        return table
+
     def initialize_hillas_planes(
         self, hillas_dict, subarray, telescopes_pointings, array_pointing
     ):
@@ -217,41 +428,40 @@ class HillasReconstructor(Reconstructor):
         self.hillas_planes = {}
         k = next(iter(telescopes_pointings))
         horizon_frame = telescopes_pointings[k].frame
+        array_az = array_pointing.az.to_value(u.rad)
+        array_alt = array_pointing.alt.to_value(u.rad)
         for tel_id, moments in hillas_dict.items():
             # we just need any point on the main shower axis a bit away from the cog
-            p2_x = moments.x + 0.1 * u.m * np.cos(moments.psi)
-            p2_y = moments.y + 0.1 * u.m * np.sin(moments.psi)
+            psi = moments.psi.to_value(u.rad)
+            x = moments.x.to_value(u.m)
+            y = moments.y.to_value(u.m)
+            x = np.array([x, x + 0.1 * np.cos(psi)])
+            y = np.array([y, y + 0.1 * np.sin(psi)])
             focal_length = subarray.tel[tel_id].optics.equivalent_focal_length
-
-            pointing = SkyCoord(
-                alt=telescopes_pointings[tel_id].alt,
-                az=telescopes_pointings[tel_id].az,
-                frame=horizon_frame,
+            focal_length = focal_length.to_value(u.m)
+
+            pointing = telescopes_pointings[tel_id]
+            az, alt = camera_to_altaz(
+                x,
+                y,
+                focal_length,
+                pointing.az.to_value(u.rad),
+                pointing.alt.to_value(u.rad),
             )
-
-            camera_frame = CameraFrame(
-                focal_length=focal_length, telescope_pointing=pointing
+            cog_coord, p2_coord = (
+                SkyCoord(alt=alt[i] * u.rad, az=az[i] * u.rad, frame=horizon_frame)
+                for i in range(2)
             )
 
-            cog_coord = SkyCoord(x=moments.x, y=moments.y, frame=camera_frame,)
-            cog_coord = cog_coord.transform_to(horizon_frame)
-
-            p2_coord = SkyCoord(x=p2_x, y=p2_y, frame=camera_frame)
-            p2_coord = p2_coord.transform_to(horizon_frame)
-
             # re-project from sky to a "fake"-parallel-pointing telescope
             # then recalculate the psi angle
             if self.divergent_mode:
-                camera_frame_parallel = CameraFrame(
-                    focal_length=focal_length, telescope_pointing=array_pointing
-                )
-                cog_sky_to_parallel = cog_coord.transform_to(camera_frame_parallel)
-                p2_sky_to_parallel = p2_coord.transform_to(camera_frame_parallel)
+                fov_lon, fov_lat = altaz_to_fov(az, alt, array_az, array_alt)
+                x_parallel, y_parallel = fov_to_camera(fov_lon, fov_lat, focal_length)
                 angle_psi_corr = np.arctan2(
-                    cog_sky_to_parallel.y - p2_sky_to_parallel.y,
-                    cog_sky_to_parallel.x - p2_sky_to_parallel.x,
+                    y_parallel[0] - y_parallel[1], x_parallel[0] - x_parallel[1],
                 )
-                self.corrected_angle_dict[tel_id] = angle_psi_corr
+                self.corrected_angle_dict[tel_id] = u.Quantity(angle_psi_corr, u.rad)
 
             circle = HillasPlane(
                 p1=cog_coord,
@@ -325,27 +535,21 @@ class HillasReconstructor(Reconstructor):
         z = np.zeros(len(psi))
         uvw_vectors = np.column_stack([np.cos(psi).value, np.sin(psi).value, z])
 
-        tilted_frame = TiltedGroundFrame(pointing_direction=array_pointing)
-        ground_frame = GroundFrame()
+        azimuth = array_pointing.az.to_value(u.rad)
+        altitude = array_pointing.alt.to_value(u.rad)
 
-        positions = [
-            (
-                SkyCoord(*plane.pos, frame=ground_frame)
-                .transform_to(tilted_frame)
-                .cartesian.xyz
-            )
-            for plane in self.hillas_planes.values()
-        ]
+        positions = u.Quantity(
+            [plane.pos for plane in self.hillas_planes.values()]
+        ).to_value(u.m)
+        x_tilt, y_tilt = ground_to_tilted_positions(*positions.T, azimuth, altitude)
+        positions = np.column_stack([x_tilt, y_tilt, np.zeros(len(x_tilt))])
 
         core_position = line_line_intersection_3d(uvw_vectors, positions)
 
-        core_pos_tilted = SkyCoord(
-            x=core_position[0] * u.m, y=core_position[1] * u.m, frame=tilted_frame
+        core_x, core_y, _ = tilted_to_ground_positions(
+            core_position[0], core_position[1], azimuth, altitude, project=True
         )
-
-        core_pos = project_to_ground(core_pos_tilted)
-
-        return core_pos.x, core_pos.y
+        return u.Quantity(core_x, u.m), u.Quantity(core_y, u.m)
 
     def estimate_h_max(self):
         """
@@ -3,11 +3,11 @@
 
 """
 import math
+from multiprocessing import Pool
 
 import numpy as np
 import numpy.ma as ma
 from astropy import units as u
-from astropy.coordinates import SkyCoord, AltAz
 from iminuit import Minuit
 from scipy.optimize import minimize, least_squares
 from scipy.stats import norm
@@ -17,8 +17,14 @@ from ctapipe.coordinates import (
     TiltedGroundFrame,
     GroundFrame,
     project_to_ground,
+    altaz_to_fov,
+    fov_to_altaz,
+)
+from ctapipe.image import (
+    poisson_likelihood_gaussian,
+    poisson_likelihood_gaussian_derivative,
+    mean_poisson_likelihood_gaussian,
 )
-from ctapipe.image import poisson_likelihood_gaussian, mean_poisson_likelihood_gaussian
 from ctapipe.instrument import get_atmosphere_profile_functions
 from ctapipe.containers import (
     ReconstructedShowerContainer,
@@ -32,6 +38,9 @@ from ctapipe.utils.template_network_interpolator import (
 
 __all__ = ["ImPACTReconstructor", "energy_prior", "xmax_prior", "guess_shower_depth"]
 
+# reconstructor instance of a worker process of ImPACTReconstructor.predict_batch
+_worker_reconstructor = None
+
 
 def guess_shower_depth(energy):
     """
@@ -98,6 +107,10 @@ class ImPACTReconstructor(Reconstructor):
     }
     spe = 0.5  # Also hard code single p.e. distribution width
 
+    # Step sizes of the finite difference likelihood gradient, used by
+    # gradient based minimisers if no analytic gradient is available
+    gradient_step = np.array([1e-6, 1e-6, 0.1, 0.1, 1e-3, 1e-3])
+
     def __init__(
         self,
         root_dir=".",
@@ -106,8 +119,21 @@ class ImPACTReconstructor(Reconstructor):
         template_scale=1.0,
         xmax_offset=0,
         use_time_gradient=False,
+        use_gradient=False,
     ):
 
+        # keep the configuration to set up identical reconstructors
+        # in the worker processes of predict_batch
+        self._init_kwargs = dict(
+            root_dir=root_dir,
+            minimiser=minimiser,
+            prior=prior,
+            template_scale=template_scale,
+            xmax_offset=xmax_offset,
+            use_time_gradient=use_time_gradient,
+            use_gradient=use_gradient,
+        )
+
         # First we create a dictionary of image template interpolators
         # for each telescope type
         self.root_dir = root_dir
@@ -155,6 +181,9 @@ class ImPACTReconstructor(Reconstructor):
         self.xmax_offset = xmax_offset
         self.use_time_gradient = use_time_gradient
 
+        # Pass the likelihood gradient to the minimiser
+        self.use_gradient = use_gradient
+
     def initialise_templates(self, tel_type):
         """Check if templates for a given telescope type has been initialised
         and if not do it and add to the dictionary
@@ -227,22 +256,28 @@ class ImPACTReconstructor(Reconstructor):
 
         Parameters
         ----------
-        source_x: float
+        source_x: float or ndarray
             Event source position in nominal frame
-        source_y: float
+        source_y: float or ndarray
             Event source position in nominal frame
-        core_x: float
+        core_x: float or ndarray
             Event core position in telescope tilted frame
-        core_y: float
+        core_y: float or ndarray
             Event core position in telescope tilted frame
         zen: float
             Zenith angle of event
 
         Returns
         -------
-        float: Depth of maximum of air shower
+        float or ndarray: Depth of maximum of air shower, one value for each
+        set of positions if arrays are given
 
         """
+        # Positions are broadcast against the telescopes along the last axis
+        source_x = np.asanyarray(source_x)[..., np.newaxis]
+        source_y = np.asanyarray(source_y)[..., np.newaxis]
+        core_x = np.asanyarray(core_x)[..., np.newaxis]
+        core_y = np.asanyarray(core_y)[..., np.newaxis]
 
         # Calculate displacement of image centroid from source position (in
         # rad)
@@ -258,7 +293,7 @@ class ImPACTReconstructor(Reconstructor):
         # sqrt may not be the best option...
 
         # Take weighted mean of estimates
-        mean_height = np.sum(height * weight) / np.sum(weight)
+        mean_height = np.sum(height * weight, axis=-1) / np.sum(weight)
         # This value is height above telescope in the tilted system,
         # we should convert to height above ground
         mean_height *= np.cos(zen)
@@ -266,8 +301,9 @@ class ImPACTReconstructor(Reconstructor):
         # Add on the height of the detector above sea level
         mean_height += 2150
 
-        if mean_height > 100000 or np.isnan(mean_height):
-            mean_height = 100000
+        mean_height = np.where(
+            (mean_height > 100000) | np.isnan(mean_height), 100000, mean_height
+        )
 
         # Lookup this height in the depth tables, the convert Hmax to Xmax
         x_max = self.thickness_profile(mean_height)
@@ -276,6 +312,56 @@ class ImPACTReconstructor(Reconstructor):
 
         return x_max + self.xmax_offset
 
+    def _shower_max_gradient(self, source_x, source_y, core_x, core_y, zen):
+        """Derivatives of `get_shower_max` with respect to source_x, source_y,
+        core_x and core_y, stacked along a new last axis.
+        The derivative is 0 where the height is out of range of the
+        atmosphere profile."""
+        source_x = np.asanyarray(source_x)[..., np.newaxis]
+        source_y = np.asanyarray(source_y)[..., np.newaxis]
+        core_x = np.asanyarray(core_x)[..., np.newaxis]
+        core_y = np.asanyarray(core_y)[..., np.newaxis]
+
+        disp_x = self.peak_x - source_x
+        disp_y = self.peak_y - source_y
+        disp = np.sqrt(disp_x ** 2 + disp_y ** 2)
+        delta_x = self.tel_pos_x - core_x
+        delta_y = self.tel_pos_y - core_y
+        impact = np.sqrt(delta_x ** 2 + delta_y ** 2)
+
+        weight = np.power(self.peak_amp, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_height = np.sum(impact / disp * weight, axis=-1) / np.sum(weight)
+            mean_height = mean_height * np.cos(zen) + 2150
+
+            # derivatives of the height estimates impact / disp
+            height_gradient = np.stack(
+                (
+                    impact * disp_x / disp ** 3,
+                    impact * disp_y / disp ** 3,
+                    -delta_x / (impact * disp),
+                    -delta_y / (impact * disp),
+                ),
+                axis=-1,
+            )
+        # the impact distance is not differentiable at the telescope position
+        height_gradient[~np.isfinite(height_gradient)] = 0
+        mean_gradient = np.sum(
+            height_gradient * weight[:, np.newaxis], axis=-2
+        ) / np.sum(weight)
+
+        # x_max = thickness(mean_height) / cos(zen), the cosines cancel and
+        # the derivative of the tabulated profile is the slope of the table
+        valid = mean_height < 100000
+        height = np.where(valid, mean_height, 10000.0)
+        slope = self.thickness_profile(height + 0.5) - self.thickness_profile(
+            height - 0.5
+        )
+
+        return np.where(
+            valid[..., np.newaxis], slope[..., np.newaxis] * mean_gradient, 0
+        )
+
     @staticmethod
     def rotate_translate(pixel_pos_x, pixel_pos_y, x_trans, y_trans, phi):
         """
@@ -395,125 +481,389 @@ class ImPACTReconstructor(Reconstructor):
         float: Likelihood the model represents the camera image at this position
 
         """
-        # First we add units back onto everything.  Currently not
-        # handled very well, maybe in future we could just put
-        # everything in the correct units when loading in the class
-        # and ignore them from then on
+        parameters = np.array(
+            [[source_x, source_y, core_x, core_y, energy, x_max_scale]],
+            dtype=np.float64,
+        )
+
+        if self.array_return and not goodness_of_fit:
+            like, _, _, _ = self._pixel_likelihood(parameters, with_priors=True)
+            return like[0][self.valid_pixels]
+
+        return self.get_likelihood_batch(parameters, goodness_of_fit)[0]
+
+    def get_likelihood_batch(self, parameters, goodness_of_fit=False):
+        """Get the likelihood for many test positions at once, e.g. for
+        scanning a list of seeds or for numerical gradients.
+
+        Parameters
+        ----------
+        parameters: array-like
+            (n_positions, 6) array of (source_x, source_y, core_x, core_y,
+            energy, x_max_scale), in the units of `get_likelihood`
+        goodness_of_fit: boolean
+            Determines whether expected likelihood should be subtracted from result
+
+        Returns
+        -------
+        ndarray: likelihood of each test position
+        """
+        parameters = np.array(parameters, dtype=np.float64, ndmin=2)
+        like, prediction, time_chi2, _ = self._pixel_likelihood(
+            parameters, with_priors=not goodness_of_fit
+        )
+
+        if goodness_of_fit:
+            expected = mean_poisson_likelihood_gaussian(
+                prediction, self.spe, self.pixel_ped
+            )
+            return np.sum(np.where(self.valid_pixels, like - expected, 0), axis=(1, 2))
+
+        final_sum = like.sum(axis=(1, 2))
+        if self.use_time_gradient:
+            final_sum += time_chi2.sum(axis=1)
+
+        return final_sum
+
+    def select_seed(self, seed_list):
+        """Select the seed with the best likelihood from a list of seeds as
+        created by `spread_line_seed`, evaluating all of them in one batch
+
+        Parameters
+        ----------
+        seed_list: list
+            list of (seed, step, limits) tuples
+
+        Returns
+        -------
+        tuple: (seed, step, limits) of the most likely seed
+        """
+        if len(seed_list) == 1:
+            return seed_list[0]
+
+        like = self.get_likelihood_batch([seed[0] for seed in seed_list])
+        return seed_list[int(np.argmin(like))]
+
+    def get_likelihood_gradient(self, parameters, step):
+        """Central finite difference gradient of the likelihood, with all
+        shifted test positions evaluated in a single batch
+
+        Parameters
+        ----------
+        parameters: array-like
+            (6, ) test position, see `get_likelihood_batch`
+        step: array-like
+            (6, ) step size for each parameter
+
+        Returns
+        -------
+        ndarray: gradient of the likelihood with respect to the parameters
+        """
+        parameters = np.asarray(parameters, dtype=np.float64)
+        shift = np.diag(np.asarray(step, dtype=np.float64))
+        like = self.get_likelihood_batch(
+            np.concatenate([parameters + shift, parameters - shift])
+        )
+        n_parameters = len(parameters)
+        return (like[:n_parameters] - like[n_parameters:]) / (2 * np.diag(shift))
+
+    @property
+    def has_analytic_gradient(self):
+        """True if the analytic likelihood gradient is available for the
+        current event, this requires templates on a regular grid and no
+        time gradient term in the likelihood"""
+        return not self.use_time_gradient and all(
+            self.prediction[tel_type].has_gradient for tel_type in self._tel_type_masks
+        )
+
+    def get_likelihood_and_gradient(self, parameters):
+        """Get the likelihood and its gradient for many test positions at once.
+
+        The gradient is calculated analytically if possible (see
+        `has_analytic_gradient`), otherwise with central finite differences
+        as in `get_likelihood_gradient`.
+
+        Parameters
+        ----------
+        parameters: array-like
+            (n_positions, 6) array of (source_x, source_y, core_x, core_y,
+            energy, x_max_scale), in the units of `get_likelihood`
+
+        Returns
+        -------
+        like: ndarray
+            likelihood of each test position
+        gradient: ndarray
+            (n_positions, 6) gradient of the likelihood
+        """
+        parameters = np.array(parameters, dtype=np.float64, ndmin=2)
+
+        if self.has_analytic_gradient:
+            like, _, _, gradient = self._pixel_likelihood(
+                parameters, with_priors=True, with_gradient=True
+            )
+            return like.sum(axis=(1, 2)), gradient
+
+        like = self.get_likelihood_batch(parameters)
+        gradient = np.array(
+            [self.get_likelihood_gradient(p, self.gradient_step) for p in parameters]
+        )
+        return like, gradient
+
+    def _pixel_likelihood(self, parameters, with_priors, with_gradient=False):
+        """Pixel-wise likelihood for an (n_positions, 6) array of test positions.
+
+        All quantities are plain float64 arrays of shape
+        (n_positions, n_telescopes, n_pixels), padding pixels and pixels
+        without signal have a likelihood of 0.
+
+        If ``with_gradient`` is set, the analytic gradient of the summed
+        likelihood (without the time gradient term) with respect to the
+        six parameters is calculated with the chain rule from the derivatives
+        of the pixel likelihood, of the template interpolation and of the
+        shower geometry.
+
+        Returns
+        -------
+        like, prediction, time_chi2, gradient
+            gradient is an (n_positions, 6) array if ``with_gradient`` is set,
+            else None
+        """
+        source_x, source_y, core_x, core_y, energy, x_max_scale = parameters.T
+        n_positions = len(parameters)
 
-        zenith = (np.pi / 2) - self.array_direction.alt.to(u.rad).value
-        azimuth = self.array_direction.az
+        zenith = (np.pi / 2) - self.array_direction.alt.to_value(u.rad)
 
         # Geometrically calculate the depth of maximum given this test position
-        x_max = self.get_shower_max(source_x, source_y, core_x, core_y, zenith)
-        x_max *= x_max_scale
+        shower_max = self.get_shower_max(source_x, source_y, core_x, core_y, zenith)
+        x_max = shower_max * x_max_scale
 
         # Calculate expected Xmax given this energy
         x_max_exp = guess_shower_depth(energy)  # / np.cos(20*u.deg)
 
-        # Convert to binning of Xmax
-        x_max_bin = x_max - x_max_exp
-
-        # Check for range
-        if x_max_bin > 200:
-            x_max_bin = 200
-        if x_max_bin < -100:
-            x_max_bin = -100
+        # Convert to binning of Xmax and check for range
+        x_max_bin = np.clip(x_max - x_max_exp, -100, 200)
 
         # Calculate impact distance for all telescopes
-        impact = np.sqrt(
-            (self.tel_pos_x - core_x) ** 2 + (self.tel_pos_y - core_y) ** 2
-        )
+        delta_x = self.tel_pos_x - core_x[:, np.newaxis]
+        delta_y = self.tel_pos_y - core_y[:, np.newaxis]
+        impact = np.sqrt(delta_x ** 2 + delta_y ** 2)
         # And the expected rotation angle
-        phi = np.arctan2((self.tel_pos_x - core_x), (self.tel_pos_y - core_y)) * u.rad
+        phi = np.arctan2(delta_x, delta_y)
 
         # Rotate and translate all pixels such that they match the
         # template orientation
         pix_y_rot, pix_x_rot = self.rotate_translate(
-            self.pixel_x, self.pixel_y, source_x, source_y, phi
+            self.pixel_x_dense,
+            self.pixel_y_dense,
+            source_x[:, np.newaxis, np.newaxis],
+            source_y[:, np.newaxis, np.newaxis],
+            phi,
         )
 
-        # In the interpolator class we can gain speed advantages by using masked arrays
-        # so we need to make sure here everything is masked
-        prediction = ma.zeros(self.image.shape)
-        prediction.mask = ma.getmask(self.image)
-
-        time_gradients = np.zeros((self.image.shape[0], 2))
-
-        # Loop over all telescope types and get prediction
-        for tel_type in np.unique(self.tel_types).tolist():
-            type_mask = self.tel_types == tel_type
-            prediction[type_mask] = self.image_prediction(
-                tel_type,
-                energy * np.ones_like(impact[type_mask]),
-                impact[type_mask],
-                x_max_bin * np.ones_like(impact[type_mask]),
-                -np.rad2deg(pix_x_rot[type_mask]),
-                np.rad2deg(pix_y_rot[type_mask]),
+        prediction = np.zeros((n_positions,) + self.valid_pixels.shape)
+        time_gradients = np.zeros((n_positions, len(self.tel_types), 2))
+        if with_gradient:
+            template_gradient = np.zeros(prediction.shape + (5,))
+
+        # Loop over all telescope types and get prediction for all test
+        # positions at once
+        energy_tel = np.broadcast_to(energy[:, np.newaxis], impact.shape)
+        x_max_tel = np.broadcast_to(x_max_bin[:, np.newaxis], impact.shape)
+        for tel_type, type_mask in self._tel_type_masks.items():
+            n_pixels = self.valid_pixels.shape[1]
+            template_args = (
+                energy_tel[:, type_mask].ravel(),
+                impact[:, type_mask].ravel(),
+                x_max_tel[:, type_mask].ravel(),
+                -np.rad2deg(pix_x_rot[:, type_mask].reshape(-1, n_pixels)),
+                np.rad2deg(pix_y_rot[:, type_mask].reshape(-1, n_pixels)),
             )
+            if with_gradient:
+                values, gradient = self.prediction[tel_type].gradient(*template_args)
+                template_gradient[:, type_mask] = gradient.reshape(
+                    n_positions, -1, n_pixels, 5
+                )
+            else:
+                values = self.image_prediction(tel_type, *template_args)
+            prediction[:, type_mask] = values.reshape(n_positions, -1, n_pixels)
 
             if self.use_time_gradient:
-                time_gradients[type_mask] = self.predict_time(
+                time_gradients[:, type_mask] = self.predict_time(
                     tel_type,
-                    energy * np.ones_like(impact[type_mask]),
-                    impact[type_mask],
-                    x_max_bin * np.ones_like(impact[type_mask]),
-                )
+                    energy_tel[:, type_mask].ravel(),
+                    impact[:, type_mask].ravel(),
+                    x_max_tel[:, type_mask].ravel(),
+                ).reshape(n_positions, -1, 2)
 
+        time_chi2 = None
         if self.use_time_gradient:
-            time_mask = np.logical_and(np.invert(ma.getmask(self.image)), self.time > 0)
-            weight = np.sqrt(self.image) * time_mask
+            time_mask = self.valid_pixels & (self.pixel_time > 0)
+            # pixels with negative amplitude (after pedestal subtraction)
+            # do not contribute to the time gradient fit
+            weight = np.sqrt(np.clip(self.pixel_image, 0, None)) * time_mask
             rv = norm()
 
             sx = pix_x_rot * weight
             sxx = pix_x_rot * pix_x_rot * weight
 
-            sy = self.time * weight
-            sxy = self.time * pix_x_rot * weight
-            d = weight.sum(axis=1) * sxx.sum(axis=1) - sx.sum(axis=1) * sx.sum(axis=1)
+            sy = self.pixel_time * weight
+            sxy = self.pixel_time * pix_x_rot * weight
+            d = weight.sum(axis=-1) * sxx.sum(axis=-1) - sx.sum(axis=-1) ** 2
             time_fit = (
-                weight.sum(axis=1) * sxy.sum(axis=1) - sx.sum(axis=1) * sy.sum(axis=1)
+                weight.sum(axis=-1) * sxy.sum(axis=-1)
+                - sx.sum(axis=-1) * sy.sum(axis=-1)
             ) / d
             time_fit /= -1 * (180 / math.pi)
-            chi2 = -2 * np.log(
-                rv.pdf((time_fit - time_gradients.T[0]) / time_gradients.T[1])
+            time_chi2 = -2 * np.log(
+                rv.pdf((time_fit - time_gradients[..., 0]) / time_gradients[..., 1])
             )
 
         # Likelihood function will break if we find a NaN or a 0
-        prediction[np.isnan(prediction)] = 1e-8
-        prediction[prediction < 1e-8] = 1e-8
+        floored = ~(prediction >= 1e-8)
+        prediction[floored] = 1e-8
         prediction *= self.template_scale
 
         # Get likelihood that the prediction matched the camera image
-        like = poisson_likelihood_gaussian(self.image, prediction, self.spe, self.ped)
-        like[np.isnan(like)] = 1e9
-        like *= np.invert(ma.getmask(self.image))
-        like = ma.MaskedArray(like, mask=ma.getmask(self.image))
-
-        array_like = like
-        if goodness_of_fit:
-            return np.sum(
-                like - mean_poisson_likelihood_gaussian(prediction, self.spe, self.ped)
+        like = poisson_likelihood_gaussian(
+            self.pixel_image, prediction, self.spe, self.pixel_ped
+        )
+        broken = np.isnan(like)
+        like[broken] = 1e9
+
+        gradient = None
+        if with_gradient:
+            # derivative of the likelihood with respect to the template values
+            like_derivative = poisson_likelihood_gaussian_derivative(
+                self.pixel_image, prediction, self.spe, self.pixel_ped
+            )
+            like_derivative *= self.template_scale
+            like_derivative[floored | broken | ~self.valid_pixels] = 0
+
+            gradient = self._chain_gradient(
+                like_derivative[..., np.newaxis] * template_gradient,
+                parameters,
+                shower_max,
+                x_max - x_max_exp,
+                delta_x,
+                delta_y,
+                impact,
+                phi,
+                pix_x_rot,
+                pix_y_rot,
+                zenith,
             )
 
-        prior_pen = 0
-        # Add prior penalities if we have them
-        array_like += 1e-8
-        if "energy" in self.priors:
-            prior_pen += energy_prior(energy, index=-1)
-        if "xmax" in self.priors:
-            prior_pen += xmax_prior(energy, x_max)
+        if with_priors:
+            prior_pen = np.zeros(n_positions)
+            # Add prior penalities if we have them
+            like += 1e-8
+            if "energy" in self.priors:
+                prior_pen += energy_prior(energy, index=-1)
+            if "xmax" in self.priors:
+                prior_pen += xmax_prior(energy, x_max)
 
-        array_like += prior_pen / float(len(array_like))
+            like += (prior_pen / len(self.tel_types))[:, np.newaxis, np.newaxis]
 
-        if self.array_return:
-            array_like = array_like.ravel()
-            return array_like[np.invert(ma.getmask(array_like))]
+            if with_gradient:
+                gradient += self._prior_gradient(
+                    parameters, shower_max, x_max - x_max_exp, zenith
+                ) * (np.count_nonzero(self.valid_pixels) / len(self.tel_types))
 
-        final_sum = array_like.sum()
-        if self.use_time_gradient:
-            final_sum += chi2.sum()  # * np.sum(ma.getmask(self.image))
+        like[:, ~self.valid_pixels] = 0
 
-        return final_sum
+        return like, prediction, time_chi2, gradient
+
+    def _chain_gradient(
+        self,
+        template_gradient,
+        parameters,
+        shower_max,
+        x_max_diff,
+        delta_x,
+        delta_y,
+        impact,
+        phi,
+        pix_x_rot,
+        pix_y_rot,
+        zenith,
+    ):
+        """Gradient of the likelihood with respect to the parameters from its
+        (n_positions, n_telescopes, n_pixels, 5) derivatives with respect to
+        the template coordinates energy, impact, xmax bin and the two
+        rotated pixel coordinates (in deg).
+        """
+        source_x, source_y, core_x, core_y, energy, x_max_scale = parameters.T
+        to_deg = 180 / np.pi
+
+        # sums over the pixels of each telescope
+        d_energy, d_impact, d_x_max, d_pix_x, d_pix_y = np.moveaxis(
+            template_gradient.sum(axis=2), -1, 0
+        )
+        # derivatives with respect to the rotation angle phi: the template
+        # coordinates are (-pix_x_rot, pix_y_rot) with d/dphi of
+        # (pix_x_rot, pix_y_rot) = (-pix_y_rot, pix_x_rot)
+        d_phi = to_deg * np.sum(
+            template_gradient[..., 3] * pix_y_rot
+            + template_gradient[..., 4] * pix_x_rot,
+            axis=2,
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            impact_x = np.where(impact > 0, -delta_x / impact, 0)
+            impact_y = np.where(impact > 0, -delta_y / impact, 0)
+            phi_x = np.where(impact > 0, -delta_y / impact ** 2, 0)
+            phi_y = np.where(impact > 0, delta_x / impact ** 2, 0)
+
+        sin_phi, cos_phi = np.sin(phi), np.cos(phi)
+        gradient = np.stack(
+            (
+                to_deg * np.sum(sin_phi * d_pix_x + cos_phi * d_pix_y, axis=1),
+                to_deg * np.sum(cos_phi * d_pix_x - sin_phi * d_pix_y, axis=1),
+                np.sum(impact_x * d_impact + phi_x * d_phi, axis=1),
+                np.sum(impact_y * d_impact + phi_y * d_phi, axis=1),
+                np.sum(d_energy, axis=1),
+                np.zeros(len(parameters)),
+            ),
+            axis=-1,
+        )
+
+        # the xmax bin depends on all parameters, but is clipped to the
+        # range of the templates
+        in_range = (x_max_diff > -100) & (x_max_diff < 200)
+        x_max_bin_gradient = (
+            self._x_max_gradient(parameters, shower_max, zenith)
+            * in_range[:, np.newaxis]
+        )
+        gradient += np.sum(d_x_max, axis=1)[:, np.newaxis] * x_max_bin_gradient
+
+        return gradient
+
+    def _x_max_gradient(self, parameters, shower_max, zenith):
+        """(n_positions, 6) gradient of x_max - guess_shower_depth(energy)"""
+        source_x, source_y, core_x, core_y, energy, x_max_scale = parameters.T
+        gradient = np.zeros(parameters.shape)
+        gradient[:, :4] = x_max_scale[:, np.newaxis] * self._shower_max_gradient(
+            source_x, source_y, core_x, core_y, zenith
+        )
+        gradient[:, 4] = -93 / (energy * np.log(10))
+        gradient[:, 5] = shower_max
+        return gradient
+
+    def _prior_gradient(self, parameters, shower_max, x_max_diff, zenith):
+        """(n_positions, 6) gradient of the prior penalty"""
+        energy = parameters[:, 4]
+        gradient = np.zeros(parameters.shape)
+        if "energy" in self.priors:
+            # derivative of energy_prior(energy, index=-1)
+            gradient[:, 4] += 2 / energy
+        if "xmax" in self.priors:
+            # derivative of xmax_prior(energy, x_max) with the default width
+            width = 100
+            gradient += (2 * x_max_diff / width ** 2)[
+                :, np.newaxis
+            ] * self._x_max_gradient(parameters, shower_max, zenith)
+        return gradient
 
     def get_likelihood_min(self, x):
         """Wrapper class around likelihood function for use with scipy
@@ -534,20 +884,67 @@ class ImPACTReconstructor(Reconstructor):
 
         return val
 
+    def get_likelihood_gradient_min(self, x):
+        """Wrapper around the likelihood gradient for use with scipy
+        minimisers
+
+        Parameters
+        ----------
+        x: ndarray
+            Array of minimisation parameters
+
+        Returns
+        -------
+        ndarray: Likelihood gradient at test position
+
+        """
+        return self.get_likelihood_and_gradient(x)[1][0]
+
+    def get_likelihood_gradient_minuit(
+        self,
+        source_x,
+        source_y,
+        core_x,
+        core_y,
+        energy,
+        x_max_scale,
+        goodness_of_fit=False,
+    ):
+        """Wrapper around the likelihood gradient for use with minuit,
+        see `get_likelihood` for the parameters
+
+        Returns
+        -------
+        list: Likelihood gradient with respect to all parameters,
+        including the fixed ``goodness_of_fit``
+
+        """
+        gradient = self.get_likelihood_and_gradient(
+            [source_x, source_y, core_x, core_y, energy, x_max_scale]
+        )[1][0]
+        return list(gradient) + [0.0]
+
     def get_likelihood_nlopt(self, x, grad):
-        """Wrapper class around likelihood function for use with scipy
+        """Wrapper class around likelihood function for use with nlopt
         minimisers
 
         Parameters
         ----------
         x: ndarray
             Array of minimisation parameters
+        grad: ndarray
+            Array to fill with the likelihood gradient, if requested by
+            the minimiser
 
         Returns
         -------
         float: Likelihood value of test position
 
         """
+        if grad.size > 0:
+            like, gradient = self.get_likelihood_and_gradient(x)
+            grad[:] = gradient[0]
+            return like[0]
 
         val = self.get_likelihood(x[0], x[1], x[2], x[3], x[4], x[5])
         return val
@@ -656,6 +1053,20 @@ class ImPACTReconstructor(Reconstructor):
         self.image[mask] = ma.masked
         self.time[mask] = ma.masked
 
+        # Dense copies of the padded arrays with a boolean mask of the valid
+        # pixels, these are used in the likelihood evaluation as masked
+        # arrays are slow
+        self.valid_pixels = np.invert(ma.filled(mask, True))
+        self.pixel_x_dense = ma.getdata(self.pixel_x).astype(np.float64)
+        self.pixel_y_dense = ma.getdata(self.pixel_y).astype(np.float64)
+        self.pixel_image = ma.getdata(self.image).astype(np.float64)
+        self.pixel_time = ma.getdata(self.time).astype(np.float64)
+        self.pixel_ped = ma.getdata(self.ped).astype(np.float64)
+        self._tel_type_masks = {
+            tel_type: self.tel_types == tel_type
+            for tel_type in np.unique(self.tel_types).tolist()
+        }
+
         self.array_direction = array_direction
         self.nominal_frame = NominalFrame(origin=self.array_direction)
 
@@ -688,11 +1099,14 @@ class ImPACTReconstructor(Reconstructor):
         """
         self.reset_interpolator()
 
-        horizon_seed = SkyCoord(az=shower_seed.az, alt=shower_seed.alt, frame=AltAz())
-        nominal_seed = horizon_seed.transform_to(self.nominal_frame)
-
-        source_x = nominal_seed.fov_lon.to_value(u.rad)
-        source_y = nominal_seed.fov_lat.to_value(u.rad)
+        array_az = self.array_direction.az.to_value(u.rad)
+        array_alt = self.array_direction.alt.to_value(u.rad)
+        source_x, source_y = altaz_to_fov(
+            u.Quantity(shower_seed.az).to_value(u.rad),
+            u.Quantity(shower_seed.alt).to_value(u.rad),
+            array_az,
+            array_alt,
+        )
         ground = GroundFrame(x=shower_seed.core_x, y=shower_seed.core_y, z=0 * u.m)
         tilted = ground.transform_to(
             TiltedGroundFrame(pointing_direction=self.array_direction)
@@ -701,17 +1115,19 @@ class ImPACTReconstructor(Reconstructor):
         tilt_y = tilted.y.to(u.m).value
         zenith = 90 * u.deg - self.array_direction.alt
 
-        seeds = spread_line_seed(
-            self.hillas_parameters,
-            self.tel_pos_x,
-            self.tel_pos_y,
-            source_x,
-            source_y,
-            tilt_x,
-            tilt_y,
-            energy_seed.energy.value,
-            shift_frac=[1],
-        )[0]
+        seeds = self.select_seed(
+            spread_line_seed(
+                self.hillas_parameters,
+                self.tel_pos_x,
+                self.tel_pos_y,
+                source_x,
+                source_y,
+                tilt_x,
+                tilt_y,
+                energy_seed.energy.value,
+                shift_frac=[1],
+            )
+        )
 
         # Perform maximum likelihood fit
         fit_params, errors, like = self.minimise(
@@ -726,14 +1142,9 @@ class ImPACTReconstructor(Reconstructor):
 
         # Convert the best fits direction and core to Horizon and ground systems and
         # copy to the shower container
-        nominal = SkyCoord(
-            fov_lon=fit_params[0] * u.rad,
-            fov_lat=fit_params[1] * u.rad,
-            frame=self.nominal_frame,
-        )
-        horizon = nominal.transform_to(AltAz())
-
-        shower_result.alt, shower_result.az = horizon.alt, horizon.az
+        az, alt = fov_to_altaz(fit_params[0], fit_params[1], array_az, array_alt)
+        shower_result.alt = u.Quantity(alt, u.rad).to(u.deg)
+        shower_result.az = u.Quantity(az, u.rad).to(u.deg)
         tilted = TiltedGroundFrame(
             x=fit_params[2] * u.m,
             y=fit_params[3] * u.m,
@@ -774,6 +1185,42 @@ class ImPACTReconstructor(Reconstructor):
 
         return shower_result, energy_result
 
+    def predict_batch(self, events, n_jobs=None, chunksize=1):
+        """Fit many events, distributing them over a pool of worker processes.
+
+        Every worker process creates its own reconstructor with the
+        configuration of this one and loads the templates once. Templates
+        converted with
+        `~ctapipe.utils.template_network_interpolator.convert_template_file`
+        are memory mapped, so that all workers share the same memory.
+
+        Parameters
+        ----------
+        events: iterable of dict
+            one dict per event, containing the arguments of
+            `set_event_properties` (``image``, ``time``, ``pixel_x``,
+            ``pixel_y``, ``type_tel``, ``tel_x``, ``tel_y``,
+            ``array_direction``, ``hillas``) and of `predict`
+            (``shower_seed``, ``energy_seed``)
+        n_jobs: int or None
+            number of worker processes, defaults to the number of CPUs.
+            With ``n_jobs=1``, events are fitted in this process
+        chunksize: int
+            number of events sent to a worker at once
+
+        Returns
+        -------
+        list of (ReconstructedShowerContainer, ReconstructedEnergyContainer):
+            fit results in the order of the input events
+        """
+        if n_jobs == 1:
+            return [_fit_event(event, self) for event in events]
+
+        with Pool(
+            n_jobs, initializer=_init_worker, initargs=(self._init_kwargs,)
+        ) as pool:
+            return pool.map(_fit_event, events, chunksize=chunksize)
+
     def minimise(self, params, step, limits, minimiser_name="minuit", max_calls=0):
         """
 
@@ -798,6 +1245,7 @@ class ImPACTReconstructor(Reconstructor):
 
             self.min = Minuit(
                 self.get_likelihood,
+                grad=self.get_likelihood_gradient_minuit if self.use_gradient else None,
                 print_level=1,
                 source_x=params[0],
                 error_source_x=step[0],
@@ -858,7 +1306,10 @@ class ImPACTReconstructor(Reconstructor):
         elif "nlopt" in minimiser_name:
             import nlopt
 
-            opt = nlopt.opt(nlopt.LN_BOBYQA, 6)
+            if self.use_gradient:
+                opt = nlopt.opt(nlopt.LD_LBFGS, 6)
+            else:
+                opt = nlopt.opt(nlopt.LN_BOBYQA, 6)
             opt.set_min_objective(self.get_likelihood_nlopt)
             opt.set_initial_step(step)
 
@@ -891,6 +1342,7 @@ class ImPACTReconstructor(Reconstructor):
                 self.get_likelihood_min,
                 np.array(params),
                 method=minimiser_name,
+                jac=self.get_likelihood_gradient_min if self.use_gradient else None,
                 bounds=limits,
                 options={"disp": False},
                 tol=1e-5,
@@ -899,6 +1351,24 @@ class ImPACTReconstructor(Reconstructor):
             return np.array(min.x), (0, 0, 0, 0, 0, 0), self.get_likelihood_min(min.x)
 
 
+def _init_worker(reconstructor_kwargs):
+    """Create the reconstructor of a worker process of `ImPACTReconstructor.predict_batch`"""
+    global _worker_reconstructor
+    _worker_reconstructor = ImPACTReconstructor(**reconstructor_kwargs)
+
+
+def _fit_event(event, reconstructor=None):
+    """Fit a single event of `ImPACTReconstructor.predict_batch`"""
+    reconstructor = reconstructor or _worker_reconstructor
+
+    event = dict(event)
+    shower_seed = event.pop("shower_seed")
+    energy_seed = event.pop("energy_seed")
+
+    reconstructor.set_event_properties(**event)
+    return reconstructor.predict(shower_seed, energy_seed)
+
+
 def spread_line_seed(
     hillas,
     tel_x,
@@ -0,0 +1,229 @@
+"""
+Helpers for reconstructing many events at once from telescope-wise tables.
+
+Telescope-wise data (one row per telescope and event) is brought into a
+ragged layout: rows sorted by event, with an ``offsets`` array so that the
+rows of event ``i`` are ``offsets[i]:offsets[i + 1]``.
+"""
+import numpy as np
+
+__all__ = [
+    "group_by_event",
+    "event_index_from_offsets",
+    "pair_indices",
+    "sum_by_event",
+    "mean_by_event",
+    "median_by_event",
+    "std_by_event",
+]
+
+
+def group_by_event(event_id, obs_id=None):
+    """
+    Find the sorting of telescope rows that groups them by event.
+
+    Parameters
+    ----------
+    event_id: array-like
+        event id of each row
+    obs_id: array-like or None
+        observation id of each row, events are identified by
+        ``(obs_id, event_id)`` if given
+
+    Returns
+    -------
+    order: np.ndarray
+        indices that sort the rows by event, keeping the original
+        order of the rows within an event
+    offsets: np.ndarray
+        array of length ``n_events + 1`` with the start of each event
+        in the sorted rows
+    """
+    event_id = np.asanyarray(event_id)
+    if obs_id is None:
+        order = np.argsort(event_id, kind="stable")
+        keys = (event_id[order],)
+    else:
+        obs_id = np.asanyarray(obs_id)
+        order = np.lexsort((event_id, obs_id))
+        keys = (obs_id[order], event_id[order])
+
+    new_event = np.zeros(len(order), dtype=bool)
+    if len(order) > 0:
+        new_event[0] = True
+    for key in keys:
+        new_event[1:] |= key[1:] != key[:-1]
+
+    offsets = np.append(np.flatnonzero(new_event), len(order))
+    return order, offsets
+
+
+def event_index_from_offsets(offsets):
+    """
+    Index of the event for each row of the ragged layout given by ``offsets``
+    """
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def pair_indices(offsets):
+    """
+    All pairs of different rows within each event of the ragged layout.
+
+    Pairs are generated in the same order as
+    ``itertools.combinations(rows_of_event, 2)`` for every event.
+
+    Parameters
+    ----------
+    offsets: np.ndarray
+        start of each event in the rows, length ``n_events + 1``
+
+    Returns
+    -------
+    first: np.ndarray
+        row index of the first member of each pair
+    second: np.ndarray
+        row index of the second member of each pair
+    pair_event: np.ndarray
+        event index of each pair
+    """
+    multiplicity = np.diff(offsets)
+    n_pairs = multiplicity * (multiplicity - 1) // 2
+    pair_offsets = np.append(0, np.cumsum(n_pairs))
+
+    first = np.empty(pair_offsets[-1], dtype=np.int64)
+    second = np.empty(pair_offsets[-1], dtype=np.int64)
+    pair_event = np.repeat(np.arange(len(multiplicity)), n_pairs)
+
+    # events with the same multiplicity share the same pair pattern
+    for n in np.unique(multiplicity[multiplicity > 1]):
+        events = np.flatnonzero(multiplicity == n)
+        i, j = np.triu_indices(n, 1)
+        pair_slots = pair_offsets[events, np.newaxis] + np.arange(len(i))
+        first[pair_slots] = offsets[events, np.newaxis] + i
+        second[pair_slots] = offsets[events, np.newaxis] + j
+
+    return first, second, pair_event
+
+
+def sum_by_event(values, event_index, n_events):
+    """
+    Sum values of rows (or pairs) per event.
+
+    Parameters
+    ----------
+    values: np.ndarray
+        array with the rows along the first axis, further axes are
+        summed independently
+    event_index: np.ndarray
+        event index of each row
+    n_events: int
+        number of events
+
+    Returns
+    -------
+    np.ndarray:
+        array of shape ``(n_events, *values.shape[1:])``
+    """
+    values = np.asanyarray(values, dtype=np.float64)
+    flat = values.reshape(len(values), -1)
+    result = np.empty((n_events, flat.shape[1]))
+    for column in range(flat.shape[1]):
+        result[:, column] = np.bincount(
+            event_index, weights=flat[:, column], minlength=n_events
+        )
+    return result.reshape((n_events,) + values.shape[1:])
+
+
+def mean_by_event(values, event_index, n_events, weights=None):
+    """
+    (Weighted) mean of the values of rows per event.
+
+    Parameters
+    ----------
+    values: np.ndarray
+        array with the rows along the first axis, further axes are
+        averaged independently
+    event_index: np.ndarray
+        event index of each row
+    n_events: int
+        number of events
+    weights: np.ndarray or None
+        weight of each row, all rows have the same weight if not given
+
+    Returns
+    -------
+    np.ndarray:
+        array of shape ``(n_events, *values.shape[1:])``, nan for events
+        without rows
+    """
+    values = np.asanyarray(values, dtype=np.float64)
+    if weights is None:
+        weights = np.ones(len(values))
+    weights = np.asanyarray(weights, dtype=np.float64)
+
+    weighted = values * weights.reshape((-1,) + (1,) * (values.ndim - 1))
+    total = np.bincount(event_index, weights=weights, minlength=n_events)
+    total = total.reshape((-1,) + (1,) * (values.ndim - 1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sum_by_event(weighted, event_index, n_events) / total
+
+
+def median_by_event(values, event_index, n_events):
+    """
+    Median of the values of rows per event.
+
+    Parameters
+    ----------
+    values: np.ndarray
+        one value per row
+    event_index: np.ndarray
+        event index of each row
+    n_events: int
+        number of events
+
+    Returns
+    -------
+    np.ndarray:
+        median per event, nan for events without rows
+    """
+    values = np.asanyarray(values, dtype=np.float64)
+    event_index = np.asanyarray(event_index)
+    order = np.lexsort((values, event_index))
+    sorted_values = values[order]
+
+    counts = np.bincount(event_index, minlength=n_events)
+    starts = np.append(0, np.cumsum(counts)[:-1])
+    has_rows = counts > 0
+    lower = starts[has_rows] + (counts[has_rows] - 1) // 2
+    upper = starts[has_rows] + counts[has_rows] // 2
+
+    median = np.full(n_events, np.nan)
+    median[has_rows] = 0.5 * (sorted_values[lower] + sorted_values[upper])
+    return median
+
+
+def std_by_event(values, event_index, n_events):
+    """
+    Standard deviation (``ddof=0``, as `numpy.std`) of the values of rows
+    per event.
+
+    Parameters
+    ----------
+    values: np.ndarray
+        array with the rows along the first axis, further axes are
+        treated independently
+    event_index: np.ndarray
+        event index of each row
+    n_events: int
+        number of events
+
+    Returns
+    -------
+    np.ndarray:
+        array of shape ``(n_events, *values.shape[1:])``, nan for events
+        without rows
+    """
+    values = np.asanyarray(values, dtype=np.float64)
+    mean = mean_by_event(values, event_index, n_events)
+    variance = mean_by_event((values - mean[event_index]) ** 2, event_index, n_events)
+    return np.sqrt(variance)
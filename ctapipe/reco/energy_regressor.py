@@ -2,6 +2,7 @@ import numpy as np
 
 from astropy import units as u
 
+from .batch import mean_by_event, median_by_event, std_by_event
 from .regressor_classifier_base import RegressorClassifierBase
 from sklearn.ensemble import RandomForestRegressor
 
@@ -69,42 +70,66 @@ class EnergyRegressor(RegressorClassifierBase):
 
         """
 
-        predict_mean = []
-        predict_median = []
-        predict_std = []
-        for evt in event_list:
-            predicts = []
-            weights = []
-            for cam_id, tels in evt.items():
-                try:
-                    t_res = self.model_dict[cam_id].predict(tels).tolist()
-                    predicts += t_res
-                except KeyError:
-                    # QUESTION if there is no trained classifier for
-                    # `cam_id`, raise an error or just pass this
-                    # camera type?
-                    raise KeyError(
-                        "cam_id '{}' in event_list but no model defined: {}".format(
-                            cam_id, [k for k in self.model_dict]
-                        )
-                    )
-
-                try:
-                    # if a `namedtuple` is provided, we can weight the different images
-                    # using some of the provided features
-                    weights += [t.sum_signal_cam / t.impact_dist for t in tels]
-                except AttributeError:
-                    # otherwise give every image the same weight
-                    weights += [1] * len(tels)
-
-            predict_mean.append(np.average(predicts, weights=weights))
-            predict_median.append(np.median(predicts))
-            predict_std.append(np.std(predicts))
+        features, event_index, weights = self._flatten_event_list(event_list)
+        return self._predict_statistics(features, event_index, weights, len(event_list))
+
+    def predict_table(
+        self, table, feature_columns, cam_id_column="cam_id", weight_column=None
+    ):
+        """Predict the quantity of many events at once from a table with one
+        row per telescope event.
+
+        Every model is called only once with the features of all rows of
+        its camera identifier, the predictions are then combined per event
+        like in `.predict_by_event`.
+
+        Parameters
+        ----------
+        table : astropy.table.Table
+            one row per telescope event, with an ``event_id`` column, the
+            camera identifier and the feature columns. Events are identified
+            by ``(obs_id, event_id)`` if an ``obs_id`` column is present.
+        feature_columns : list of strings
+            names of the feature columns in the order the models were
+            trained with
+        cam_id_column : string
+            name of the column with the camera identifier of each row
+        weight_column : string or None
+            name of a column with the weight of each row for the mean.
+            If None, ``sum_signal_cam / impact_dist`` is used if these
+            columns are present, otherwise all rows have the same weight.
 
+        Returns
+        -------
+        astropy.table.Table :
+            one row per event, sorted by (obs_id, ) event_id, with the
+            ``mean``, ``median`` and ``std`` of the predictions of the
+            telescopes of each event
+
+        Raises
+        ------
+        KeyError:
+            if there is a camera identifier in `table` that is not a
+            key in the regressor dictionary
+        """
+        features, event_index, weights, events = self._flatten_table(
+            table, feature_columns, cam_id_column, weight_column
+        )
+        statistics = self._predict_statistics(
+            features, event_index, weights, len(events)
+        )
+        for name, values in statistics.items():
+            events[name] = values
+        return events
+
+    def _predict_statistics(self, features, event_index, weights, n_events):
+        predicts, event_index, weights = self._predict_flat(
+            features, event_index, weights
+        )
         return {
-            "mean": np.array(predict_mean) * self.unit,
-            "median": np.array(predict_median) * self.unit,
-            "std": np.array(predict_std) * self.unit,
+            "mean": mean_by_event(predicts, event_index, n_events, weights) * self.unit,
+            "median": median_by_event(predicts, event_index, n_events) * self.unit,
+            "std": std_by_event(predicts, event_index, n_events) * self.unit,
         }
 
     def predict_by_telescope_type(self, event_list):
@@ -131,7 +156,7 @@ class EnergyRegressor(RegressorClassifierBase):
         return predict_list_dict
 
     @classmethod
-    def load(cls, path, cam_id_list, unit=u.TeV):
+    def load(cls, path, cam_id_list, unit=u.TeV, mmap_mode=None):
         """this is only here to overwrite the unit argument with an astropy
         quantity
 
@@ -150,6 +175,9 @@ class EnergyRegressor(RegressorClassifierBase):
             scikit-learn regressor do not work with units. so append
             this one to the predictions. assuming that the models
             where trained with consistent units. (default: u.TeV)
+        mmap_mode : None or {'r', 'r+', 'c'}, optional
+            memory map the arrays of the models,
+            cf. `RegressorClassifierBase.load`
 
         Returns
         -------
@@ -158,4 +186,4 @@ class EnergyRegressor(RegressorClassifierBase):
             quantity you have trained for
 
         """
-        return super().load(path, cam_id_list, unit)
+        return super().load(path, cam_id_list, unit, mmap_mode=mmap_mode)
@@ -4,6 +4,7 @@ import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 
+from .batch import mean_by_event
 from .regressor_classifier_base import RegressorClassifierBase
 
 __all__ = ["proba_drifting", "EventClassifier"]
@@ -30,35 +31,62 @@ class EventClassifier(RegressorClassifierBase):
         super().__init__(model=classifier, cam_id_list=cam_id_list, **kwargs)
 
     def predict_proba_by_event(self, X):
-        predict_proba = []
-        for evt in X:
-            tel_probas = None
-            tel_weights = []
-            for cam_id, tels in evt.items():
-                these_probas = self.model_dict[cam_id].predict_proba(tels)
-                if tel_probas is not None:
-                    tel_probas = np.append(these_probas, tel_probas, axis=0)
-                else:
-                    tel_probas = these_probas
-                try:
-                    # if a `namedtuple` is provided, we can weight the
-                    # different images using some of the provided features
-                    tel_weights += [t.sum_signal_cam / t.impact_dist for t in tels]
-                except AttributeError:
-                    # otherwise give every image the same weight
-                    tel_weights += [1] * len(tels)
-
-            predict_proba.append(
-                np.average(proba_drifting(tel_probas), weights=tel_weights, axis=0)
-            )
-
-        return np.array(predict_proba)
+        features, event_index, weights = self._flatten_event_list(X)
+        return self._predict_proba(features, event_index, weights, len(X))
 
     def predict_by_event(self, X):
         proba = self.predict_proba_by_event(X)
         predictions = self.classes_[np.argmax(proba, axis=1)]
         return predictions
 
+    def predict_proba_table(
+        self, table, feature_columns, cam_id_column="cam_id", weight_column=None
+    ):
+        """Predict the class probabilities of many events at once from a
+        table with one row per telescope event.
+
+        Every model is called only once with the features of all rows of
+        its camera identifier, the probabilities are then combined per
+        event like in `.predict_proba_by_event`.
+
+        Parameters
+        ----------
+        table : astropy.table.Table
+            one row per telescope event, with an ``event_id`` column, the
+            camera identifier and the feature columns. Events are identified
+            by ``(obs_id, event_id)`` if an ``obs_id`` column is present.
+        feature_columns : list of strings
+            names of the feature columns in the order the models were
+            trained with
+        cam_id_column : string
+            name of the column with the camera identifier of each row
+        weight_column : string or None
+            name of a column with the weight of each row. If None,
+            ``sum_signal_cam / impact_dist`` is used if these columns are
+            present, otherwise all rows have the same weight.
+
+        Returns
+        -------
+        astropy.table.Table :
+            one row per event, sorted by (obs_id, ) event_id, with the
+            averaged probabilities in the ``proba`` column (one entry per
+            class in `.classes_`) and the most probable class in the
+            ``prediction`` column
+        """
+        features, event_index, weights, events = self._flatten_table(
+            table, feature_columns, cam_id_column, weight_column
+        )
+        proba = self._predict_proba(features, event_index, weights, len(events))
+        events["proba"] = proba
+        events["prediction"] = self.classes_[np.argmax(proba, axis=1)]
+        return events
+
+    def _predict_proba(self, features, event_index, weights, n_events):
+        tel_probas, event_index, weights = self._predict_flat(
+            features, event_index, weights, method="predict_proba"
+        )
+        return mean_by_event(proba_drifting(tel_probas), event_index, n_events, weights)
+
     def compute_Qfactor(self, proba, labels: int, nbins):
         """
         Compute Q-factor for each gammaness (bin edges are 0 - 1)
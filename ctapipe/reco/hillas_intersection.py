@@ -2,31 +2,32 @@
 """
 
 TODO:
-- Speed tests, need to be certain the looping on all telescopes is not killing
-performance
 - Introduce new weighting schemes
 - Make intersect_lines code more readable
 
 """
 import numpy as np
-import itertools
 import astropy.units as u
 from ctapipe.reco.reco_algorithms import (
     Reconstructor,
     InvalidWidthException,
     TooFewTelescopesException,
 )
+from ctapipe.reco.batch import group_by_event, event_index_from_offsets, pair_indices
+from ctapipe.reco.HillasReconstructor import _column_to_value
 from ctapipe.containers import ReconstructedShowerContainer
 from ctapipe.instrument import get_atmosphere_profile_functions
 
-from astropy.coordinates import SkyCoord
+from astropy.table import Table
 from ctapipe.coordinates import (
-    NominalFrame,
-    CameraFrame,
-    TiltedGroundFrame,
-    project_to_ground,
-    GroundFrame,
     MissingFrameAttributeWarning,
+    camera_to_fov,
+    camera_to_horizon_cartesian,
+    fov_to_altaz,
+    fov_to_fov,
+    shower_trans_matrix,
+    ground_to_tilted_positions,
+    tilted_to_ground_positions,
 )
 import copy
 import warnings
@@ -125,24 +126,22 @@ class HillasIntersection(Reconstructor):
                 tel_id: array_pointing for tel_id in hillas_dict.keys()
             }
 
-        tilted_frame = TiltedGroundFrame(pointing_direction=array_pointing)
+        array_az = array_pointing.az.to_value(u.rad)
+        array_alt = array_pointing.alt.to_value(u.rad)
 
-        ground_positions = subarray.tel_coords
-        grd_coord = GroundFrame(
-            x=ground_positions.x, y=ground_positions.y, z=ground_positions.z
+        tilt_x, tilt_y = ground_to_tilted_positions(
+            *subarray.tel_position_array.T, array_az, array_alt
         )
-
-        tilt_coord = grd_coord.transform_to(tilted_frame)
-
+        tel_index = subarray.tel_index_array
         tel_x = {
-            tel_id: tilt_coord.x[tel_id - 1] for tel_id in list(hillas_dict.keys())
+            tel_id: u.Quantity(tilt_x[tel_index[tel_id]], u.m)
+            for tel_id in hillas_dict.keys()
         }
         tel_y = {
-            tel_id: tilt_coord.y[tel_id - 1] for tel_id in list(hillas_dict.keys())
+            tel_id: u.Quantity(tilt_y[tel_index[tel_id]], u.m)
+            for tel_id in hillas_dict.keys()
         }
 
-        nom_frame = NominalFrame(origin=array_pointing)
-
         hillas_dict_mod = copy.deepcopy(hillas_dict)
 
         for tel_id, hillas in hillas_dict_mod.items():
@@ -150,15 +149,23 @@ class HillasIntersection(Reconstructor):
             assert hillas.x.to(u.m).unit == u.Unit("m")
 
             focal_length = subarray.tel[tel_id].optics.equivalent_focal_length
+            pointing = telescopes_pointings[tel_id]
 
-            camera_frame = CameraFrame(
-                telescope_pointing=telescopes_pointings[tel_id],
-                focal_length=focal_length,
+            fov_lon, fov_lat = camera_to_fov(
+                hillas.x.to_value(u.m),
+                hillas.y.to_value(u.m),
+                focal_length.to_value(u.m),
             )
-            cog_coords = SkyCoord(x=hillas.x, y=hillas.y, frame=camera_frame)
-            cog_coords_nom = cog_coords.transform_to(nom_frame)
-            hillas.x = cog_coords_nom.fov_lat
-            hillas.y = cog_coords_nom.fov_lon
+            fov_lon, fov_lat = fov_to_fov(
+                fov_lon,
+                fov_lat,
+                pointing.az.to_value(u.rad),
+                pointing.alt.to_value(u.rad),
+                array_az,
+                array_alt,
+            )
+            hillas.x = u.Quantity(fov_lat, u.rad)
+            hillas.y = u.Quantity(fov_lon, u.rad)
 
         src_x, src_y, err_x, err_y = self.reconstruct_nominal(hillas_dict_mod)
         core_x, core_y, core_err_x, core_err_y = self.reconstruct_tilted(
@@ -168,16 +175,15 @@ class HillasIntersection(Reconstructor):
         err_x *= u.rad
         err_y *= u.rad
 
-        nom = SkyCoord(fov_lon=src_x * u.rad, fov_lat=src_y * u.rad, frame=nom_frame)
-        # nom = sky_pos.transform_to(nom_frame)
-        sky_pos = nom.transform_to(array_pointing.frame)
-        tilt = SkyCoord(x=core_x * u.m, y=core_y * u.m, frame=tilted_frame,)
-        grd = project_to_ground(tilt)
+        src_az, src_alt = fov_to_altaz(src_x, src_y, array_az, array_alt)
+        ground_x, ground_y, _ = tilted_to_ground_positions(
+            core_x, core_y, array_az, array_alt, project=True
+        )
         x_max = self.reconstruct_xmax(
-            nom.fov_lon,
-            nom.fov_lat,
-            tilt.x,
-            tilt.y,
+            src_x * u.rad,
+            src_y * u.rad,
+            core_x * u.m,
+            core_y * u.m,
             hillas_dict_mod,
             tel_x,
             tel_y,
@@ -187,10 +193,10 @@ class HillasIntersection(Reconstructor):
         src_error = np.sqrt(err_x ** 2 + err_y ** 2)
 
         result = ReconstructedShowerContainer(
-            alt=sky_pos.altaz.alt.to(u.rad),
-            az=sky_pos.altaz.az.to(u.rad),
-            core_x=grd.x,
-            core_y=grd.y,
+            alt=u.Quantity(src_alt, u.rad),
+            az=u.Quantity(src_az, u.rad),
+            core_x=u.Quantity(ground_x, u.m),
+            core_y=u.Quantity(ground_y, u.m),
             core_uncert=u.Quantity(np.sqrt(core_err_x ** 2 + core_err_y ** 2), u.m),
             tel_ids=[h for h in hillas_dict_mod.keys()],
             average_intensity=np.mean([h.intensity for h in hillas_dict_mod.values()]),
@@ -204,6 +210,162 @@ class HillasIntersection(Reconstructor):
 
         return result
 
+    def predict_table(self, parameters, subarray, array_pointing):
+        """
+        Reconstruct the direction, core position and h_max of many events at
+        once from a table of telescope-wise hillas parameters.
+
+        This gives the same results as calling `predict` for every event
+        (for parallel pointing), but computes the crossings of all pairs of
+        images of all events on arrays, without coordinate frames or
+        python loops over the telescopes.
+
+        Rows with invalid (nan or zero width) hillas parameters are ignored,
+        events with fewer than two valid telescopes are returned with
+        ``is_valid=False`` and nan values.
+
+        Parameters
+        ----------
+        parameters: astropy.table.Table
+            one row per telescope event, with the columns ``event_id``,
+            ``tel_id``, ``hillas_x``, ``hillas_y``, ``hillas_psi``,
+            ``hillas_intensity`` and ``hillas_width`` as written by
+            ``ctapipe-stage1-process``. Events are identified by
+            ``(obs_id, event_id)`` if an ``obs_id`` column is present.
+            Columns without units are assumed to be in m and deg.
+        subarray : ctapipe.instrument.SubarrayDescription
+            subarray information
+        array_pointing: SkyCoord[AltAz]
+            pointing direction of the array, either a scalar or one per row
+            of ``parameters``. For events with different pointings in their
+            rows, the pointing of the first row is used.
+
+        Returns
+        -------
+        astropy.table.Table:
+            one row per event, sorted by (obs_id, ) event_id, with the columns
+            of `~ctapipe.containers.ReconstructedShowerContainer` except
+            ``tel_ids``, ``h_max_uncert`` and ``goodness_of_fit``
+        """
+        n_rows = len(parameters)
+        obs_id = parameters["obs_id"] if "obs_id" in parameters.colnames else None
+        order, offsets = group_by_event(parameters["event_id"], obs_id)
+        n_events = len(offsets) - 1
+        event_index = event_index_from_offsets(offsets)
+
+        def sorted_column(name, unit):
+            return _column_to_value(parameters, name, unit)[order]
+
+        x = sorted_column("hillas_x", u.m)
+        y = sorted_column("hillas_y", u.m)
+        psi = np.deg2rad(sorted_column("hillas_psi", u.deg))
+        intensity = sorted_column("hillas_intensity", u.dimensionless_unscaled)
+        width = sorted_column("hillas_width", u.m)
+
+        azimuth = np.broadcast_to(array_pointing.az.to_value(u.rad), n_rows)[order]
+        altitude = np.broadcast_to(array_pointing.alt.to_value(u.rad), n_rows)[order]
+
+        tel_index = subarray.tel_ids_to_indices(np.asanyarray(parameters["tel_id"]))
+        tel_index = tel_index[order]
+        focal_lengths = subarray.tel_focal_length_array
+        tel_positions = subarray.tel_position_array
+
+        # only use valid telescope images of events with at least two of them
+        valid = np.isfinite(width) & (width != 0)
+        for values in (x, y, psi, intensity):
+            valid &= np.isfinite(values)
+        n_valid = np.bincount(event_index[valid], minlength=n_events)
+        is_valid = n_valid >= 2
+        use = valid & is_valid[event_index]
+
+        reco_events = np.flatnonzero(is_valid)
+        n_reco = len(reco_events)
+        reco_offsets = np.append(0, np.cumsum(n_valid[reco_events]))
+        reco_index = event_index_from_offsets(reco_offsets)
+
+        x, y, psi, intensity = x[use], y[use], psi[use], intensity[use]
+        tel_index = tel_index[use]
+        event_start = np.flatnonzero(use)[reco_offsets[:-1]]
+        event_azimuth = azimuth[event_start]
+        event_altitude = altitude[event_start]
+
+        # cog in the nominal frame, x along altitude and y along azimuth
+        focal_length = focal_lengths[tel_index]
+        cog_x = x / focal_length
+        cog_y = y / focal_length
+
+        # telescope positions in the tilted frame of each event
+        trans = shower_trans_matrix(event_azimuth, event_altitude)
+        tel_tilted = np.einsum(
+            "nij,nj->ni", trans[reco_index, :2], tel_positions[tel_index]
+        )
+        tel_x = tel_tilted[:, 0]
+        tel_y = tel_tilted[:, 1]
+
+        src_x, src_y, err_x, err_y = self.intersect_all_pairs(
+            cog_x, cog_y, psi, intensity, reco_offsets
+        )
+        core_x, core_y, core_err_x, core_err_y = self.intersect_all_pairs(
+            tel_x, tel_y, psi, intensity, reco_offsets
+        )
+
+        # the nominal frame offsets are the camera positions for unit focal length
+        direction = camera_to_horizon_cartesian(
+            src_y, src_x, 1.0, event_azimuth, event_altitude
+        )
+        alt = np.arctan2(direction[:, 2], np.hypot(direction[:, 0], direction[:, 1]))
+        az = np.arctan2(-direction[:, 1], direction[:, 0]) % (2 * np.pi)
+
+        # project the core from the tilted frame onto the ground
+        core_ground = np.einsum(
+            "nji,nj->ni", trans[:, :2], np.column_stack([core_x, core_y])
+        )
+        ground_x = (
+            core_ground[:, 0] - trans[:, 2, 0] * core_ground[:, 2] / trans[:, 2, 2]
+        )
+        ground_y = (
+            core_ground[:, 1] - trans[:, 2, 1] * core_ground[:, 2] / trans[:, 2, 2]
+        )
+
+        height = get_shower_height(
+            src_x[reco_index],
+            src_y[reco_index],
+            cog_x,
+            cog_y,
+            core_x[reco_index],
+            core_y[reco_index],
+            tel_x,
+            tel_y,
+        )
+        h_max = self.mean_height_above_ground(
+            height, intensity, reco_index, n_reco, np.pi / 2 - event_altitude
+        )
+
+        src_error = np.sqrt(err_x ** 2 + err_y ** 2)
+
+        def per_event(values, unit=None):
+            result = np.full(n_events, np.nan)
+            result[reco_events] = values
+            return result if unit is None else u.Quantity(result, unit, copy=False)
+
+        table = Table()
+        if obs_id is not None:
+            table["obs_id"] = np.asanyarray(obs_id)[order][offsets[:-1]]
+        table["event_id"] = np.asanyarray(parameters["event_id"])[order][offsets[:-1]]
+        table["alt"] = per_event(alt, u.rad).to(u.deg)
+        table["az"] = per_event(az, u.rad).to(u.deg)
+        table["core_x"] = per_event(ground_x, u.m)
+        table["core_y"] = per_event(ground_y, u.m)
+        table["core_uncert"] = per_event(np.hypot(core_err_x, core_err_y), u.m)
+        table["h_max"] = per_event(h_max, u.m)
+        table["alt_uncert"] = per_event(src_error, u.rad).to(u.deg)
+        table["az_uncert"] = per_event(src_error, u.rad).to(u.deg)
+        table["average_intensity"] = per_event(
+            np.bincount(reco_index, intensity, minlength=n_reco) / n_valid[is_valid]
+        )
+        table["is_valid"] = is_valid
+        return table
+
     def reconstruct_nominal(self, hillas_parameters):
         """
         Perform event reconstruction by simple Hillas parameter intersection
@@ -222,54 +384,17 @@ class HillasIntersection(Reconstructor):
         if len(hillas_parameters) < 2:
             return None  # Throw away events with < 2 images
 
-        # Find all pairs of Hillas parameters
-        combos = itertools.combinations(list(hillas_parameters.values()), 2)
-        hillas_pairs = list(combos)
-
         # Copy parameters we need to a numpy array to speed things up
-        h1 = list(
-            map(
-                lambda h: [
-                    h[0].psi.to_value(u.rad),
-                    h[0].x.to_value(u.rad),
-                    h[0].y.to_value(u.rad),
-                    h[0].intensity,
-                ],
-                hillas_pairs,
-            )
-        )
-        h1 = np.array(h1)
-        h1 = np.transpose(h1)
-
-        h2 = list(
-            map(
-                lambda h: [
-                    h[1].psi.to_value(u.rad),
-                    h[1].x.to_value(u.rad),
-                    h[1].y.to_value(u.rad),
-                    h[1].intensity,
-                ],
-                hillas_pairs,
-            )
+        hillas = list(hillas_parameters.values())
+        x = np.array([h.x.to_value(u.rad) for h in hillas])
+        y = np.array([h.y.to_value(u.rad) for h in hillas])
+        psi = np.array([h.psi.to_value(u.rad) for h in hillas])
+        intensity = np.array([h.intensity for h in hillas], dtype=np.float64)
+
+        result = self.intersect_all_pairs(
+            x, y, psi, intensity, offsets=np.array([0, len(hillas)])
         )
-        h2 = np.array(h2)
-        h2 = np.transpose(h2)
-
-        # Perform intersection
-        sx, sy = self.intersect_lines(h1[1], h1[2], h1[0], h2[1], h2[2], h2[0])
-
-        # Weight by chosen method
-        weight = self._weight_method(h1[3], h2[3])
-        # And sin of interception angle
-        weight *= self.weight_sin(h1[0], h2[0])
-
-        # Make weighted average of all possible pairs
-        x_pos = np.average(sx, weights=weight)
-        y_pos = np.average(sy, weights=weight)
-        var_x = np.average((sx - x_pos) ** 2, weights=weight)
-        var_y = np.average((sy - y_pos) ** 2, weights=weight)
-
-        return x_pos, y_pos, np.sqrt(var_x), np.sqrt(var_y)
+        return tuple(r[0] for r in result)
 
     def reconstruct_tilted(self, hillas_parameters, tel_x, tel_y):
         """
@@ -293,58 +418,78 @@ class HillasIntersection(Reconstructor):
         """
         if len(hillas_parameters) < 2:
             return None  # Throw away events with < 2 images
-        hill_list = list()
-        tx = list()
-        ty = list()
 
         # Need to loop here as dict is unordered
-        for tel in hillas_parameters.keys():
-            hill_list.append(hillas_parameters[tel])
-            tx.append(tel_x[tel])
-            ty.append(tel_y[tel])
+        tel_ids = list(hillas_parameters.keys())
+        tx = np.array([tel_x[tel].to_value(u.m) for tel in tel_ids])
+        ty = np.array([tel_y[tel].to_value(u.m) for tel in tel_ids])
+        psi = np.array([hillas_parameters[tel].psi.to_value(u.rad) for tel in tel_ids])
+        intensity = np.array(
+            [hillas_parameters[tel].intensity for tel in tel_ids], dtype=np.float64
+        )
 
-        # Find all pairs of Hillas parameters
-        hillas_pairs = list(itertools.combinations(hill_list, 2))
-        tel_x = list(itertools.combinations(tx, 2))
-        tel_y = list(itertools.combinations(ty, 2))
+        result = self.intersect_all_pairs(
+            tx, ty, psi, intensity, offsets=np.array([0, len(tel_ids)])
+        )
+        return tuple(r[0] for r in result)
 
-        tx = np.zeros((len(tel_x), 2))
-        ty = np.zeros((len(tel_y), 2))
-        for i, _ in enumerate(tel_x):
-            tx[i][0], tx[i][1] = tel_x[i][0].to_value(u.m), tel_x[i][1].to_value(u.m)
-            ty[i][0], ty[i][1] = tel_y[i][0].to_value(u.m), tel_y[i][1].to_value(u.m)
+    def intersect_all_pairs(self, x, y, psi, intensity, offsets):
+        """
+        Weighted average of the crossing points of all pairs of lines
+        within each event, for many events at once.
 
-        tel_x = np.array(tx)
-        tel_y = np.array(ty)
+        Lines of all events are stored consecutively, the lines of event ``i``
+        are ``offsets[i]:offsets[i + 1]``.
 
-        # Copy parameters we need to a numpy array to speed things up
-        hillas1 = map(
-            lambda h: [h[0].psi.to_value(u.rad), h[0].intensity], hillas_pairs
-        )
-        hillas1 = np.array(list(hillas1))
-        hillas1 = np.transpose(hillas1)
+        Parameters
+        ----------
+        x: ndarray
+            X position of a point on each line
+        y: ndarray
+            Y position of a point on each line
+        psi: ndarray
+            Rotation angle of each line in rad
+        intensity: ndarray
+            Image intensity used for the weighting of each line
+        offsets: ndarray
+            Start of each event in the line arrays, length ``n_events + 1``
 
-        hillas2 = map(
-            lambda h: [h[1].psi.to_value(u.rad), h[1].intensity], hillas_pairs
-        )
-        hillas2 = np.array(list(hillas2))
-        hillas2 = np.transpose(hillas2)
+        Returns
+        -------
+        (ndarray, ndarray, ndarray, ndarray):
+            weighted mean X, weighted mean Y and the weighted standard deviations
+            of the crossing points in X and Y per event, nan for events without
+            a valid pair of lines
+        """
+        n_events = len(offsets) - 1
+        first, second, pair_event = pair_indices(offsets)
 
         # Perform intersection
-        crossing_x, crossing_y = self.intersect_lines(
-            tel_x[:, 0], tel_y[:, 0], hillas1[0], tel_x[:, 1], tel_y[:, 1], hillas2[0]
+        sx, sy = self.intersect_lines(
+            x[first], y[first], psi[first], x[second], y[second], psi[second]
         )
 
         # Weight by chosen method
-        weight = self._weight_method(hillas1[1], hillas2[1])
+        weight = self._weight_method(intensity[first], intensity[second])
         # And sin of interception angle
-        weight *= self.weight_sin(hillas1[0], hillas2[0])
+        weight *= self.weight_sin(psi[first], psi[second])
 
         # Make weighted average of all possible pairs
-        x_pos = np.average(crossing_x, weights=weight)
-        y_pos = np.average(crossing_y, weights=weight)
-        var_x = np.average((crossing_x - x_pos) ** 2, weights=weight)
-        var_y = np.average((crossing_y - y_pos) ** 2, weights=weight)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sum_weights = np.bincount(pair_event, weight, minlength=n_events)
+            x_pos = np.bincount(pair_event, weight * sx, minlength=n_events)
+            x_pos /= sum_weights
+            y_pos = np.bincount(pair_event, weight * sy, minlength=n_events)
+            y_pos /= sum_weights
+
+            var_x = np.bincount(
+                pair_event, weight * (sx - x_pos[pair_event]) ** 2, minlength=n_events
+            )
+            var_x /= sum_weights
+            var_y = np.bincount(
+                pair_event, weight * (sy - y_pos[pair_event]) ** 2, minlength=n_events
+            )
+            var_y /= sum_weights
 
         return x_pos, y_pos, np.sqrt(var_x), np.sqrt(var_y)
 
@@ -405,18 +550,9 @@ class HillasIntersection(Reconstructor):
             np.array(tx),
             np.array(ty),
         )
-        weight = np.array(amp)
-        mean_height = np.sum(height * weight) / np.sum(weight)
-
-        # This value is height above telescope in the tilted system,
-        # we should convert to height above ground
-        mean_height *= np.cos(zen)
-
-        # Add on the height of the detector above sea level
-        mean_height += 2100  # TODO: replace with instrument info
-
-        if mean_height > 100000 or np.isnan(mean_height):
-            mean_height = 100000
+        mean_height = self.mean_height_above_ground(
+            height, np.array(amp), np.zeros(len(height), dtype=int), 1, zen
+        )[0]
 
         mean_height *= u.m
         # Lookup this height in the depth tables, the convert Hmax to Xmax
@@ -426,6 +562,46 @@ class HillasIntersection(Reconstructor):
 
         return mean_height
 
+    @staticmethod
+    def mean_height_above_ground(height, intensity, event_index, n_events, zen):
+        """
+        Intensity weighted average of the telescope-wise shower heights
+        per event, converted to height above sea level
+
+        Parameters
+        ----------
+        height: ndarray
+            Height of the shower above each telescope in the tilted system in m
+        intensity: ndarray
+            Intensity of each image, used as weight
+        event_index: ndarray
+            Event index of each telescope
+        n_events: int
+            Number of events
+        zen: float, ndarray or Quantity
+            Zenith angle of the shower (per event), in rad if not a Quantity
+
+        Returns
+        -------
+        ndarray:
+            Height of shower maximum above sea level in m per event
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_height = np.bincount(
+                event_index, height * intensity, minlength=n_events
+            ) / np.bincount(event_index, intensity, minlength=n_events)
+
+        # This value is height above telescope in the tilted system,
+        # we should convert to height above ground
+        mean_height *= np.cos(u.Quantity(zen, u.rad)).to_value(u.one)
+
+        # Add on the height of the detector above sea level
+        mean_height += 2100  # TODO: replace with instrument info
+
+        invalid = ~(mean_height <= 100000)
+        mean_height[invalid] = 100000
+        return mean_height
+
     @staticmethod
     def intersect_lines(xp1, yp1, phi1, xp2, yp2, phi2):
         """
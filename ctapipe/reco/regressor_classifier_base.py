@@ -3,8 +3,11 @@ from copy import deepcopy
 import numpy as np
 
 from astropy import units as u
+from astropy.table import Table
 from sklearn.preprocessing import StandardScaler
 
+from .batch import group_by_event, event_index_from_offsets
+
 
 class RegressorClassifierBase:
     """This class collects one model for every camera type -- given by
@@ -217,6 +220,137 @@ class RegressorClassifierBase:
 
         return self
 
+    def _get_model(self, cam_id):
+        try:
+            return self.model_dict[cam_id]
+        except KeyError:
+            # QUESTION if there is no trained model for `cam_id`, raise an
+            # error or just pass this camera type?
+            raise KeyError(
+                "cam_id '{}' in X but no model defined: {}".format(
+                    cam_id, [k for k in self.model_dict]
+                )
+            )
+
+    @staticmethod
+    def _flatten_event_list(event_list):
+        """Collect the telescope-wise features of all events in `event_list`
+        per camera identifier, together with the index of the event and the
+        weight of every telescope.
+
+        Images are weighted with ``sum_signal_cam / impact_dist`` if the
+        features are `namedtuple` with these fields, otherwise all images
+        have the same weight.
+
+        Parameters
+        ----------
+        event_list : list of "events"
+            cf. `.reshuffle_event_list` under Notes
+
+        Returns
+        -------
+        features, event_index, weights : dictionaries of lists
+            mapping the camera identifiers to the features, event indices
+            and weights of all telescopes of that type
+        """
+        features, event_index, weights = {}, {}, {}
+        for index, evt in enumerate(event_list):
+            for cam_id, tels in evt.items():
+                features.setdefault(cam_id, []).extend(tels)
+                event_index.setdefault(cam_id, []).extend([index] * len(tels))
+                try:
+                    # if a `namedtuple` is provided, we can weight the
+                    # different images using some of the provided features
+                    tel_weights = [t.sum_signal_cam / t.impact_dist for t in tels]
+                except AttributeError:
+                    # otherwise give every image the same weight
+                    tel_weights = [1] * len(tels)
+                weights.setdefault(cam_id, []).extend(tel_weights)
+
+        return features, event_index, weights
+
+    @staticmethod
+    def _flatten_table(table, feature_columns, cam_id_column, weight_column):
+        """Split a table with one row per telescope event into the features,
+        event indices and weights per camera identifier, cf.
+        `._flatten_event_list`.
+
+        If ``weight_column`` is None, images are weighted with
+        ``sum_signal_cam / impact_dist`` if these columns are present,
+        otherwise all images have the same weight.
+
+        Returns
+        -------
+        features, event_index, weights : dictionaries of arrays
+            mapping the camera identifiers to the features, event indices
+            and weights of all rows of that type
+        events : astropy.table.Table
+            the ``obs_id`` (if present) and ``event_id`` of each event,
+            sorted by (obs_id, ) event_id
+        """
+        obs_id = table["obs_id"] if "obs_id" in table.colnames else None
+        order, offsets = group_by_event(table["event_id"], obs_id)
+        row_event_index = np.empty(len(table), dtype=np.int64)
+        row_event_index[order] = event_index_from_offsets(offsets)
+
+        events = Table()
+        first_rows = order[offsets[:-1]]
+        if obs_id is not None:
+            events["obs_id"] = np.asanyarray(obs_id)[first_rows]
+        events["event_id"] = np.asanyarray(table["event_id"])[first_rows]
+
+        X = np.column_stack([np.asarray(table[col]) for col in feature_columns])
+
+        if weight_column is not None:
+            row_weights = np.asarray(table[weight_column], dtype=np.float64)
+        elif {"sum_signal_cam", "impact_dist"}.issubset(table.colnames):
+            row_weights = np.asarray(table["sum_signal_cam"], dtype=np.float64)
+            row_weights = row_weights / np.asarray(table["impact_dist"])
+        else:
+            row_weights = np.ones(len(table))
+
+        cam_ids = np.asanyarray(table[cam_id_column])
+        if cam_ids.dtype.kind == "S":
+            cam_ids = np.char.decode(cam_ids, "utf-8")
+
+        features, event_index, weights = {}, {}, {}
+        for cam_id in np.unique(cam_ids):
+            mask = cam_ids == cam_id
+            cam_id = cam_id.item()
+            features[cam_id] = X[mask]
+            event_index[cam_id] = row_event_index[mask]
+            weights[cam_id] = row_weights[mask]
+
+        return features, event_index, weights, events
+
+    def _predict_flat(self, features, event_index, weights, method="predict"):
+        """Call `method` of every model once on all the features of its
+        camera identifier.
+
+        Returns
+        -------
+        predictions, event_index, weights : np.ndarray
+            the concatenated predictions of all models with the event
+            index and weight of each of them
+        """
+        predictions, indices, all_weights = [], [], []
+        for cam_id, cam_features in features.items():
+            if len(cam_features) == 0:
+                continue
+            model = self._get_model(cam_id)
+            predictions.append(getattr(model, method)(cam_features))
+            indices.append(np.asarray(event_index[cam_id], dtype=np.int64))
+            all_weights.append(np.asarray(weights[cam_id], dtype=np.float64))
+
+        if not predictions:
+            return np.empty(0), np.empty(0, dtype=np.int64), np.empty(0)
+
+        return (
+            np.concatenate(predictions),
+            np.concatenate(indices),
+            np.concatenate(all_weights),
+        )
+
     # def predict(self, X, cam_id=None):
     #     """
     #     In the tradition of scikit-learn, `.predict` takes a "list of feature-lists" and
@@ -249,9 +383,12 @@ class RegressorClassifierBase:
     #
     #     return self.model_dict[cam_id].predict(X)*self.energy_unit
 
-    def save(self, path):
+    def save(self, path, compress=0):
         """saves the models in `.reg_dict` each in a separate pickle to disk
 
+        The numpy arrays of the models are stored uncompressed by default,
+        so they can be memory mapped by `.load` with ``mmap_mode``.
+
         TODO: investigate more stable containers to write out models
         than joblib dumps
 
@@ -261,6 +398,9 @@ class RegressorClassifierBase:
             Path to store the different models.  Expects to contain
             `{cam_id}` or at least an empty `{}` to replace it with
             the keys in `.reg_dict`.
+        compress : int or bool
+            compression level passed to `joblib.dump`. Compressed models
+            are smaller on disk but cannot be memory mapped when loading.
 
         """
 
@@ -270,16 +410,16 @@ class RegressorClassifierBase:
             try:
                 # assume that there is a `{cam_id}` keyword to replace
                 # in the string
-                joblib.dump(model, path.format(cam_id=cam_id))
+                joblib.dump(model, path.format(cam_id=cam_id), compress=compress)
             except IndexError:
                 # if not, assume there is a naked `{}` somewhere left
                 # if not, format won't do anything, so it doesn't
                 # break but will overwrite every pickle with the
                 # following one
-                joblib.dump(model, path.format(cam_id))
+                joblib.dump(model, path.format(cam_id), compress=compress)
 
     @classmethod
-    def load(cls, path, cam_id_list, unit=1):
+    def load(cls, path, cam_id_list, unit=1, mmap_mode=None):
         """Load the pickled dictionary of model from disk, create a husk
         `cls` instance and fill the model dictionary.
 
@@ -299,6 +439,17 @@ class RegressorClassifierBase:
             units. so append this one to the predictions in case you
             deal with unified targets (like energy).  assuming that
             the models where trained with consistent units.  clf
+        mmap_mode : None or {'r', 'r+', 'c'}, optional
+            if given, the numpy arrays of the models are memory mapped
+            from the files written by `.save` instead of being read into
+            memory, see `joblib.load`. With ``'r'`` the arrays are
+            read-only and the pages are shared by all processes loading
+            the same files. Models that copy their arrays when
+            unpickling (e.g. the trees of scikit-learn forests) still
+            profit from the faster loading without an intermediate copy.
+
+        Returns
+        -------
         self : RegressorClassifierBase
             in derived classes, this will return a ready-to-use
             instance of that class to predict any problem you have
@@ -316,12 +467,16 @@ class RegressorClassifierBase:
             try:
                 # assume that there is a `{cam_id}` keyword to replace
                 # in the string
-                self.model_dict[key] = joblib.load(path.format(cam_id=key))
+                self.model_dict[key] = joblib.load(
+                    path.format(cam_id=key), mmap_mode=mmap_mode
+                )
             except IndexError:
                 # if not, assume there is a naked `{}` somewhere left
                 # if not, format won't do anything, so it doesn't matter
                 # though this will load the same model for every `key`
-                self.model_dict[key] = joblib.load(path.format(key))
+                self.model_dict[key] = joblib.load(
+                    path.format(key), mmap_mode=mmap_mode
+                )
 
         return self
 
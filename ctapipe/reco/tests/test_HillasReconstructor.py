@@ -223,3 +223,85 @@ def test_invalid_events():
         hillas_dict_zero_width[tel_id]["width"] = np.nan * u.m
         with pytest.raises(InvalidWidthException):
             fit.predict(hillas_dict_nan_width, subarray, tel_azimuth, tel_altitude)
+
+
+def test_predict_table(example_subarray):
+    """ the table based reconstruction gives the same results as predict """
+    from astropy.table import Table
+    from ctapipe.containers import HillasParametersContainer
+
+    rng = np.random.RandomState(0)
+    tel_ids = example_subarray.tel_ids[:5]
+    n_events = 10
+    array_pointing = SkyCoord(alt=70 * u.deg, az=10 * u.deg, frame=AltAz())
+
+    rows = []
+    for event_id in range(n_events):
+        n_tels = rng.randint(1, len(tel_ids) + 1)
+        for tel_id in rng.choice(tel_ids, n_tels, replace=False):
+            width = rng.uniform(0.01, 0.05)
+            rows.append(
+                dict(
+                    event_id=event_id,
+                    tel_id=tel_id,
+                    hillas_x=rng.uniform(-0.5, 0.5),
+                    hillas_y=rng.uniform(-0.5, 0.5),
+                    hillas_psi=rng.uniform(-90, 90),
+                    hillas_intensity=rng.uniform(100, 1000),
+                    hillas_length=width * rng.uniform(1, 3),
+                    # one invalid image
+                    hillas_width=np.nan if event_id == 3 else width,
+                )
+            )
+    # shuffle rows to check grouping by event
+    parameters = Table(rows=[rows[i] for i in rng.permutation(len(rows))])
+    parameters["hillas_x"].unit = u.m
+    parameters["hillas_y"].unit = u.m
+    parameters["hillas_psi"].unit = u.deg
+    parameters["hillas_length"].unit = u.m
+    parameters["hillas_width"].unit = u.m
+
+    reconstructor = HillasReconstructor()
+    result = reconstructor.predict_table(parameters, example_subarray, array_pointing)
+    assert len(result) == n_events
+    assert np.all(result["event_id"] == np.arange(n_events))
+
+    for event_result in result:
+        event = parameters[parameters["event_id"] == event_result["event_id"]]
+        hillas_dict = {
+            row["tel_id"]: HillasParametersContainer(
+                x=row["hillas_x"] * u.m,
+                y=row["hillas_y"] * u.m,
+                psi=row["hillas_psi"] * u.deg,
+                intensity=row["hillas_intensity"],
+                length=row["hillas_length"] * u.m,
+                width=row["hillas_width"] * u.m,
+            )
+            for row in event
+        }
+
+        if len(event) < 2 or np.any(np.isnan(event["hillas_width"])):
+            assert not event_result["is_valid"]
+            assert np.isnan(event_result["alt"])
+            continue
+
+        expected = HillasReconstructor().predict(
+            hillas_dict, example_subarray, array_pointing
+        )
+        assert event_result["is_valid"]
+        for key in ("alt", "az", "core_x", "core_y", "h_max", "alt_uncert"):
+            unit = result[key].unit
+            assert u.isclose(
+                event_result[key] * unit, expected[key], rtol=1e-6, atol=1e-6 * unit
+            )
+        assert np.isclose(event_result["average_intensity"], expected.average_intensity)
+
+    # columns without units are interpreted as m and deg
+    for col in parameters.itercols():
+        col.unit = None
+    result_no_units = reconstructor.predict_table(
+        parameters, example_subarray, array_pointing
+    )
+    valid = result["is_valid"]
+    assert np.allclose(result_no_units["alt"][valid], result["alt"][valid])
+    assert np.allclose(result_no_units["core_x"][valid], result["core_x"][valid])
@@ -181,3 +181,207 @@ class TestImPACT:
 
         like = self.impact_reco.get_likelihood(0, 0, 0, 100, 1, 0)
         assert like is not np.nan and like > 0
+
+
+def write_test_templates(path, regular=True):
+    """ simple gaussian templates for the LST, on a regular grid if regular """
+    import gzip
+    import pickle
+
+    y, x = np.mgrid[0:40, 0:30]
+    templates = {
+        (energy, impact, xmax): 50
+        * energy
+        * np.exp(-((x - 15) ** 2 + (y - 20) ** 2) / 30)
+        for energy in (0.1, 1.0, 10.0, 100.0)
+        for impact in np.arange(0, 550, 50.0)
+        for xmax in np.arange(-100, 250, 50.0)
+    }
+    if not regular:
+        templates.pop((100.0, 500.0, 200.0))
+
+    with gzip.open(path / "LST_05deg.template.gz", "wb") as f:
+        pickle.dump(templates, f)
+
+    # time gradient and its uncertainty
+    time_templates = {key: np.array([0.5, 2.0]) for key in templates}
+    with gzip.open(path / "LST_05deg_time.template.gz", "wb") as f:
+        pickle.dump(time_templates, f)
+    return path
+
+
+@pytest.fixture(scope="module")
+def template_dir(tmp_path_factory):
+    """ simple gaussian templates for the LST on a regular grid """
+    return write_test_templates(tmp_path_factory.mktemp("templates"))
+
+
+def make_test_event(rng):
+    """ random three telescope event for the gaussian test templates """
+    event = {
+        key: {}
+        for key in (
+            "image",
+            "time",
+            "pixel_x",
+            "pixel_y",
+            "type_tel",
+            "tel_x",
+            "tel_y",
+            "hillas",
+        )
+    }
+    for tel_id, n_pixels in zip((1, 2, 3), (100, 80, 120)):
+        image = rng.poisson(5, n_pixels).astype(float)
+        event["image"][tel_id] = image
+        event["time"][tel_id] = rng.uniform(0, 10, n_pixels)
+        event["pixel_x"][tel_id] = rng.uniform(-2, 2, n_pixels) * u.deg
+        event["pixel_y"][tel_id] = rng.uniform(-2, 2, n_pixels) * u.deg
+        event["type_tel"][tel_id] = "LSTCam"
+        event["tel_x"][tel_id] = rng.uniform(-100, 100) * u.m
+        event["tel_y"][tel_id] = rng.uniform(-100, 100) * u.m
+        event["hillas"][tel_id] = HillasParametersContainer(
+            x=rng.uniform(-1, 1) * u.deg,
+            y=rng.uniform(-1, 1) * u.deg,
+            intensity=image.sum(),
+        )
+    event["array_direction"] = SkyCoord(alt=70 * u.deg, az=0 * u.deg, frame=AltAz())
+    return event
+
+
+def test_likelihood_batch(template_dir):
+    """ batched likelihood evaluation gives the same result as single calls """
+    rng = np.random.RandomState(0)
+    impact_reco = ImPACTReconstructor(root_dir=str(template_dir), prior="energy")
+
+    event = make_test_event(rng)
+    impact_reco.set_event_properties(**event)
+    # padding and empty pixels are not valid
+    assert impact_reco.valid_pixels.sum() == sum(
+        np.count_nonzero(i) for i in event["image"].values()
+    )
+
+    parameters = np.array(
+        [
+            (0.01, -0.005, 20.0, -30.0, 1.5, 1.0),
+            (-0.02, 0.01, -50.0, 10.0, 3.0, 1.2),
+            (0.0, 0.0, 0.0, 0.0, 0.5, 0.8),
+        ]
+    )
+    for goodness_of_fit in (False, True):
+        batch = impact_reco.get_likelihood_batch(parameters, goodness_of_fit)
+        single = [
+            impact_reco.get_likelihood(*p, goodness_of_fit=goodness_of_fit)
+            for p in parameters
+        ]
+        assert_allclose(batch, single, rtol=1e-12)
+
+    # best seed is selected
+    seeds = [(p, None, None) for p in parameters]
+    best = impact_reco.select_seed(seeds)
+    assert np.all(best[0] == parameters[np.argmin(batch)])
+
+    # numerical gradient matches single finite differences
+    step = np.array([1e-4, 1e-4, 0.5, 0.5, 0.01, 0.01])
+    gradient = impact_reco.get_likelihood_gradient(parameters[0], step)
+    for i in range(6):
+        shift = np.zeros(6)
+        shift[i] = step[i]
+        expected = (
+            impact_reco.get_likelihood(*(parameters[0] + shift))
+            - impact_reco.get_likelihood(*(parameters[0] - shift))
+        ) / (2 * step[i])
+        assert_allclose(gradient[i], expected, rtol=1e-8)
+
+
+def test_predict_batch(template_dir):
+    """ fitting events in worker processes gives the same results in input order """
+    rng = np.random.RandomState(1)
+    impact_reco = ImPACTReconstructor(root_dir=str(template_dir))
+
+    events = []
+    for _ in range(4):
+        event = make_test_event(rng)
+        event["shower_seed"] = ReconstructedShowerContainer(
+            alt=70.2 * u.deg, az=0.3 * u.deg, core_x=10 * u.m, core_y=-20 * u.m
+        )
+        event["energy_seed"] = ReconstructedEnergyContainer(energy=1.5 * u.TeV)
+        events.append(event)
+
+    serial = impact_reco.predict_batch(events, n_jobs=1)
+    parallel = impact_reco.predict_batch(events, n_jobs=2)
+
+    assert len(parallel) == len(events)
+    for (shower, energy), (expected_shower, expected_energy) in zip(parallel, serial):
+        assert u.isclose(shower.alt, expected_shower.alt)
+        assert u.isclose(shower.core_x, expected_shower.core_x)
+        assert u.isclose(energy.energy, expected_energy.energy)
+
+
+def test_likelihood_analytic_gradient(template_dir):
+    """ analytic likelihood gradient agrees with finite differences """
+    rng = np.random.RandomState(2)
+    impact_reco = ImPACTReconstructor(root_dir=str(template_dir), prior="energy,xmax")
+
+    impact_reco.set_event_properties(**make_test_event(rng))
+    assert impact_reco.has_analytic_gradient
+
+    parameters = np.array(
+        [
+            (0.011, -0.0053, 20.3, -30.1, 1.53, 1.01),
+            (-0.021, 0.012, -50.2, 10.1, 3.1, 1.2),
+        ]
+    )
+    like, gradient = impact_reco.get_likelihood_and_gradient(parameters)
+    assert_allclose(like, impact_reco.get_likelihood_batch(parameters))
+
+    step = np.array([1e-7, 1e-7, 1e-4, 1e-4, 1e-6, 1e-6])
+    for p, g in zip(parameters, gradient):
+        expected = impact_reco.get_likelihood_gradient(p, step)
+        assert_allclose(g, expected, rtol=1e-5, atol=1e-3)
+
+
+def test_likelihood_gradient_not_on_grid(tmp_path):
+    """ templates not on a grid use finite differences of the likelihood """
+    rng = np.random.RandomState(2)
+    template_dir = write_test_templates(tmp_path, regular=False)
+    impact_reco = ImPACTReconstructor(root_dir=str(template_dir))
+
+    impact_reco.set_event_properties(**make_test_event(rng))
+    assert not impact_reco.has_analytic_gradient
+
+    parameters = np.array(
+        [
+            (0.011, -0.0053, 20.3, -30.1, 1.53, 1.01),
+            (-0.021, 0.012, -50.2, 10.1, 3.1, 1.2),
+        ]
+    )
+    like, gradient = impact_reco.get_likelihood_and_gradient(parameters)
+    assert_allclose(like, impact_reco.get_likelihood_batch(parameters))
+    for p, g in zip(parameters, gradient):
+        expected = impact_reco.get_likelihood_gradient(p, impact_reco.gradient_step)
+        assert_allclose(g, expected)
+
+
+def test_likelihood_time_gradient_negative_pixels(template_dir):
+    """ negative pixel amplitudes do not spoil the time gradient likelihood """
+    rng = np.random.RandomState(4)
+    impact_reco = ImPACTReconstructor(
+        root_dir=str(template_dir), use_time_gradient=True
+    )
+
+    event = make_test_event(rng)
+    for image in event["image"].values():
+        image[::7] = -rng.uniform(0.5, 3, len(image[::7]))
+    impact_reco.set_event_properties(**event)
+    assert np.any(impact_reco.pixel_image[impact_reco.valid_pixels] < 0)
+
+    parameters = np.array(
+        [(0.01, -0.005, 20.0, -30.0, 1.5, 1.0), (-0.02, 0.01, -50.0, 10.0, 3.0, 1.2)]
+    )
+    like = impact_reco.get_likelihood_batch(parameters)
+    assert np.all(np.isfinite(like))
+
+    step = np.array([1e-4, 1e-4, 0.5, 0.5, 0.01, 0.01])
+    gradient = impact_reco.get_likelihood_gradient(parameters[0], step)
+    assert np.all(np.isfinite(gradient))
@@ -0,0 +1,81 @@
+from itertools import combinations
+
+import numpy as np
+
+from ctapipe.reco.batch import (
+    group_by_event,
+    event_index_from_offsets,
+    pair_indices,
+    sum_by_event,
+    mean_by_event,
+    median_by_event,
+    std_by_event,
+)
+
+
+def test_group_by_event():
+    obs_id = np.array([2, 1, 1, 2, 1, 1])
+    event_id = np.array([5, 7, 3, 5, 7, 7])
+    order, offsets = group_by_event(event_id, obs_id)
+
+    assert np.all(offsets == [0, 1, 4, 6])
+    assert np.all(obs_id[order] == [1, 1, 1, 1, 2, 2])
+    assert np.all(event_id[order] == [3, 7, 7, 7, 5, 5])
+    # original order is kept within an event
+    assert np.all(order[1:4] == [1, 4, 5])
+
+    order, offsets = group_by_event(event_id)
+    assert np.all(offsets == [0, 1, 3, 6])
+
+    order, offsets = group_by_event(np.array([], dtype=int))
+    assert np.all(offsets == [0])
+
+
+def test_pair_indices():
+    offsets = np.array([0, 3, 4, 6, 10])
+    first, second, pair_event = pair_indices(offsets)
+
+    expected = []
+    for event, (start, stop) in enumerate(zip(offsets[:-1], offsets[1:])):
+        expected.extend((i, j, event) for i, j in combinations(range(start, stop), 2))
+    assert list(zip(first, second, pair_event)) == expected
+
+    event_index = event_index_from_offsets(offsets)
+    assert np.all(event_index == [0, 0, 0, 1, 2, 2, 3, 3, 3, 3])
+
+
+def test_sum_by_event():
+    values = np.arange(12).reshape(6, 2)
+    event_index = np.array([0, 0, 2, 2, 2, 0])
+    result = sum_by_event(values, event_index, 4)
+    assert result.shape == (4, 2)
+    assert np.all(result == [[12, 15], [0, 0], [18, 21], [0, 0]])
+
+
+def test_mean_median_std_by_event():
+    rng = np.random.RandomState(0)
+    event_index = rng.randint(0, 5, 40)
+    event_index[event_index == 3] = 4
+    values = rng.normal(size=40)
+    weights = rng.uniform(0.5, 2, 40)
+
+    mean = mean_by_event(values, event_index, 6, weights)
+    median = median_by_event(values, event_index, 6)
+    std = std_by_event(values, event_index, 6)
+
+    for event in range(6):
+        mask = event_index == event
+        if not mask.any():
+            assert np.isnan(mean[event])
+            assert np.isnan(median[event])
+            assert np.isnan(std[event])
+            continue
+        assert np.isclose(mean[event], np.average(values[mask], weights=weights[mask]))
+        assert np.isclose(median[event], np.median(values[mask]))
+        assert np.isclose(std[event], np.std(values[mask]))
+
+    # further axes are averaged independently
+    values = np.column_stack([values, 2 * values])
+    mean = mean_by_event(values, event_index, 6)
+    assert mean.shape == (6, 2)
+    assert np.allclose(mean[0], np.array([1, 2]) * np.mean(values[event_index == 0, 0]))
@@ -4,6 +4,7 @@ import numpy as np
 from numpy.testing import assert_allclose
 
 from astropy import units as u
+from astropy.table import Table
 
 from ctapipe.reco.energy_regressor import EnergyRegressor
 
@@ -46,3 +47,46 @@ def test_predict_by_event():
         [{"FlashCam": [[1, 10]]}, {"FlashCam": [[2, 20]]}, {"FlashCam": [[3, 30]]}]
     )
     assert_allclose(prediction["mean"].value, [1, 2, 3], rtol=0.2)
+
+
+def test_predict_table():
+    reg, cam_id_list = test_prepare_model()
+
+    table = Table(
+        {
+            "obs_id": [1, 1, 1, 2, 1, 1],
+            "event_id": [3, 1, 3, 1, 1, 3],
+            "cam_id": [
+                "ASTRICam",
+                "FlashCam",
+                "FlashCam",
+                "ASTRICam",
+                "ASTRICam",
+                "ASTRICam",
+            ],
+            "a": [10, 1, 2, 30, 20, 9],
+            "b": [1, 10, 20, 3, 2, 0.9],
+        }
+    )
+    prediction = reg.predict_table(table, ["a", "b"])
+
+    assert np.all(prediction["obs_id"] == [1, 1, 2])
+    assert np.all(prediction["event_id"] == [1, 3, 1])
+    assert prediction["mean"].unit == u.TeV
+
+    # same as the event-wise prediction
+    event_list = [
+        {"FlashCam": [[1, 10]], "ASTRICam": [[20, 2]]},
+        {"ASTRICam": [[10, 1], [9, 0.9]], "FlashCam": [[2, 20]]},
+        {"ASTRICam": [[30, 3]]},
+    ]
+    expected = reg.predict_by_event(event_list)
+    for key in ("mean", "median", "std"):
+        assert u.allclose(prediction[key].quantity, expected[key])
+
+    # weights for the mean
+    table["weight"] = [1, 1, 0, 1, 1, 0]
+    prediction = reg.predict_table(table, ["a", "b"], weight_column="weight")
+    single = reg.predict_by_event([{"ASTRICam": [[10, 1]]}])
+    assert u.isclose(prediction["mean"].quantity[1], single["mean"][0])
+    assert u.allclose(prediction["median"].quantity, expected["median"])
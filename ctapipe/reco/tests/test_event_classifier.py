@@ -1,6 +1,8 @@
 from tempfile import TemporaryDirectory
 
 import numpy as np
+import pytest
+from astropy.table import Table
 from sklearn.neural_network import MLPClassifier
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
@@ -226,3 +228,50 @@ def test_Qfactor():
 
     assert Q.size != 0
     assert Q.size == gammaness.size
+
+
+def test_predict_proba_table():
+    clf, cam_id_list = test_prepare_model()
+
+    table = Table(
+        {
+            "event_id": [2, 1, 2, 3],
+            "cam_id": ["ASTRICam", "FlashCam", "FlashCam", "ASTRICam"],
+            "a": [10, 1, 2, 3],
+            "b": [1, 10, 20, 30],
+        }
+    )
+    prediction = clf.predict_proba_table(table, ["a", "b"])
+    assert np.all(prediction["event_id"] == [1, 2, 3])
+    assert prediction["proba"].shape == (3, 2)
+
+    # same as the event-wise prediction
+    event_list = [
+        {"FlashCam": [[1, 10]]},
+        {"ASTRICam": [[10, 1]], "FlashCam": [[2, 20]]},
+        {"ASTRICam": [[3, 30]]},
+    ]
+    assert np.allclose(prediction["proba"], clf.predict_proba_by_event(event_list))
+    assert np.all(prediction["prediction"] == clf.predict_by_event(event_list))
+
+    # unknown camera types are an error
+    table["cam_id"][0] = "LSTCam"
+    with pytest.raises(KeyError):
+        clf.predict_proba_table(table, ["a", "b"])
+
+
+def test_load_mmap():
+    clf, cam_id_list, scaler = test_prepare_model_MLP()
+    x = scaler["ASTRICam"].transform(np.array([[10, 1], [2, 20]], dtype=float))
+
+    with TemporaryDirectory() as d:
+        temp_path = "/".join([d, "clf_{cam_id}.pkl"])
+        clf.save(temp_path)
+        loaded = EventClassifier.load(temp_path, cam_id_list, mmap_mode="r")
+
+        model = loaded.model_dict["ASTRICam"]
+        assert isinstance(model.coefs_[0], np.memmap)
+        assert not model.coefs_[0].flags.writeable
+
+        expected = clf.predict_proba_by_event([{"ASTRICam": x}])
+        assert np.allclose(loaded.predict_proba_by_event([{"ASTRICam": x}]), expected)
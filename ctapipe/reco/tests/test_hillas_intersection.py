@@ -294,3 +294,104 @@ def test_reconstruction():
         assert fit_result.is_valid
 
     assert reconstructed_events > 0
+
+
+def test_intersect_all_pairs():
+    """ batched intersection of several events gives the per event results """
+    hill_inter = HillasIntersection()
+    rng = np.random.RandomState(0)
+
+    multiplicities = [2, 5, 3, 1, 4]
+    offsets = np.append(0, np.cumsum(multiplicities))
+    x, y = rng.uniform(-100, 100, (2, offsets[-1]))
+    psi = rng.uniform(-np.pi / 2, np.pi / 2, offsets[-1])
+    intensity = rng.uniform(100, 1000, offsets[-1])
+
+    result = hill_inter.intersect_all_pairs(x, y, psi, intensity, offsets)
+
+    for i, (start, stop) in enumerate(zip(offsets[:-1], offsets[1:])):
+        if stop - start < 2:
+            assert np.all(np.isnan([r[i] for r in result]))
+            continue
+
+        hillas_dict = {
+            tel_id: HillasParametersContainer(
+                psi=psi[row] * u.rad, intensity=intensity[row]
+            )
+            for tel_id, row in enumerate(range(start, stop))
+        }
+        expected = hill_inter.reconstruct_tilted(
+            hillas_dict,
+            tel_x={
+                tel_id: x[row] * u.m for tel_id, row in enumerate(range(start, stop))
+            },
+            tel_y={
+                tel_id: y[row] * u.m for tel_id, row in enumerate(range(start, stop))
+            },
+        )
+        assert_allclose([r[i] for r in result], expected)
+
+
+def test_predict_table(example_subarray):
+    """ the table based reconstruction gives the same results as predict """
+    from astropy.table import Table
+
+    rng = np.random.RandomState(0)
+    tel_ids = example_subarray.tel_ids[:5]
+    n_events = 10
+    array_pointing = SkyCoord(alt=70 * u.deg, az=10 * u.deg, frame=AltAz())
+
+    rows = []
+    for event_id in range(n_events):
+        n_tels = rng.randint(1, len(tel_ids) + 1)
+        for tel_id in rng.choice(tel_ids, n_tels, replace=False):
+            rows.append(
+                dict(
+                    event_id=event_id,
+                    tel_id=tel_id,
+                    hillas_x=rng.uniform(-0.5, 0.5),
+                    hillas_y=rng.uniform(-0.5, 0.5),
+                    hillas_psi=rng.uniform(-90, 90),
+                    hillas_intensity=rng.uniform(100, 1000),
+                    # one invalid image
+                    hillas_width=np.nan if event_id == 3 else 0.02,
+                )
+            )
+    # shuffle rows to check grouping by event
+    parameters = Table(rows=[rows[i] for i in rng.permutation(len(rows))])
+    parameters["hillas_x"].unit = u.m
+    parameters["hillas_y"].unit = u.m
+    parameters["hillas_psi"].unit = u.deg
+    parameters["hillas_width"].unit = u.m
+
+    hill_inter = HillasIntersection()
+    result = hill_inter.predict_table(parameters, example_subarray, array_pointing)
+    assert len(result) == n_events
+    assert np.all(result["event_id"] == np.arange(n_events))
+
+    for event_result in result:
+        event = parameters[parameters["event_id"] == event_result["event_id"]]
+        if len(event) < 2 or np.any(np.isnan(event["hillas_width"])):
+            assert not event_result["is_valid"]
+            assert np.isnan(event_result["alt"])
+            continue
+
+        hillas_dict = {
+            row["tel_id"]: HillasParametersContainer(
+                x=row["hillas_x"] * u.m,
+                y=row["hillas_y"] * u.m,
+                psi=row["hillas_psi"] * u.deg,
+                intensity=row["hillas_intensity"],
+                width=row["hillas_width"] * u.m,
+            )
+            for row in event
+        }
+        expected = hill_inter.predict(hillas_dict, example_subarray, array_pointing)
+
+        assert event_result["is_valid"]
+        for key in ("alt", "az", "core_x", "core_y", "core_uncert", "h_max"):
+            unit = result[key].unit
+            assert u.isclose(
+                event_result[key] * unit, expected[key], rtol=1e-6, atol=1e-6 * unit
+            )
+        assert np.isclose(event_result["average_intensity"], expected.average_intensity)
@@ -36,6 +36,14 @@ class ChargeResolutionGenerator(Tool):
         directory_ok=False,
         help="Path to store the output HDF5 file",
     ).tag(config=True)
+    merge_files = List(
+        Path(exists=True, directory_ok=False),
+        default_value=[],
+        help=(
+            "Output files of other (e.g. parallel) runs of this tool, "
+            "whose results are combined with the result of this run"
+        ),
+    ).tag(config=True)
     extractor_product = traits.create_class_enum_trait(
         ImageExtractor, default_value="NeighborPeakWindowSum"
     )
@@ -47,6 +55,7 @@ class ChargeResolutionGenerator(Tool):
             T="SimTelEventSource.allowed_tels",
             extractor="ChargeResolutionGenerator.extractor_product",
             O="ChargeResolutionGenerator.output_path",
+            merge="ChargeResolutionGenerator.merge_files",
         )
     )
 
@@ -100,6 +109,13 @@ class ChargeResolutionGenerator(Tool):
                 self.calculator.add(pixels, true_charge, measured_charge)
 
     def finish(self):
+        for path in self.merge_files:
+            self.log.info(f"Merging charge resolution file: {path}")
+            with pd.HDFStore(path, "r") as store:
+                df_p = store["charge_resolution_pixel"]
+            self.calculator.merge(ChargeResolutionCalculator.from_dataframe(df_p))
+            Provenance().add_input_file(str(path))
+
         df_p, df_c = self.calculator.finish()
 
         output_directory = os.path.dirname(self.output_path)
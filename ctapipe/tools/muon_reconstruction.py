@@ -1,18 +1,22 @@
+from collections import defaultdict
+from multiprocessing import Pool
+
 from tqdm import tqdm
 import numpy as np
-from astropy.coordinates import SkyCoord
+from astropy import units as u
 from ctapipe.containers import TelEventIndexContainer
 
 from ctapipe.calib import CameraCalibrator
 from ctapipe.core import Provenance
 from ctapipe.core import Tool, ToolConfigurationError
 from ctapipe.core import traits
+from ctapipe.core.traits import TelescopePatternList
 from ctapipe.io import EventSource
 from ctapipe.io import HDF5TableWriter
 from ctapipe.image.cleaning import TailcutsImageCleaner
-from ctapipe.coordinates import TelescopeFrame, CameraFrame
+from ctapipe.coordinates import camera_to_fov
 from ctapipe.image import ImageExtractor
-from ctapipe.containers import MuonParametersContainer
+from ctapipe.containers import MuonParametersContainer, MuonRingContainer
 from ctapipe.instrument import CameraGeometry
 
 from ctapipe.image.muon import (
@@ -24,6 +28,24 @@ from ctapipe.image.muon import (
     mean_squared_error,
 )
 
+# intensity fitter of a worker process, created once per process by _init_worker
+_worker_fitter = None
+
+
+def _init_worker(subarray, fitter_kwargs):
+    global _worker_fitter
+    _worker_fitter = MuonIntensityFitter(subarray=subarray, **fitter_kwargs)
+
+
+def _fit_intensity(task, fitter=None):
+    """Run the intensity fit of one muon candidate"""
+    if fitter is None:
+        fitter = _worker_fitter
+    tel_id, ring, image, pedestal = task
+    return fitter(
+        tel_id, ring.center_x, ring.center_y, ring.radius, image, pedestal=pedestal
+    )
+
 
 class MuonAnalysis(Tool):
     """
@@ -69,6 +91,27 @@ class MuonAnalysis(Tool):
         help="Pedestal noise rms", default_value=1.1,
     ).tag(config=True)
 
+    batch_size = traits.Int(
+        default_value=0,
+        min=0,
+        help=(
+            "Number of muon candidates (telescope events surviving the cleaning)"
+            " to collect before fitting them together. Ring fits of all candidates"
+            " of the same telescope type are done at once, intensity fits are"
+            " distributed to ``n_jobs`` processes."
+            " 0 processes every telescope event on its own."
+        ),
+    ).tag(config=True)
+
+    n_jobs = traits.Int(
+        default_value=1,
+        min=1,
+        help=(
+            "Number of processes for the intensity fits (at least 1),"
+            " only used if batch_size > 0"
+        ),
+    ).tag(config=True)
+
     extractor_name = traits.create_class_enum_trait(
         ImageExtractor, default_value="GlobalPeakWindowSum",
     ).tag(config=True)
@@ -88,6 +131,8 @@ class MuonAnalysis(Tool):
         "output": "MuonAnalysis.output",
         "max-events": "EventSource.max_events",
         "allowed-tels": "EventSource.allowed_tels",
+        "batch-size": "MuonAnalysis.batch_size",
+        "n-jobs": "MuonAnalysis.n_jobs",
     }
 
     flags = {
@@ -129,34 +174,151 @@ class MuonAnalysis(Tool):
         self.pixels_in_tel_frame = {}
         self.field_of_view = {}
         self.pixel_widths = {}
+        self.candidates = []
+        self._pool = None
 
         for p in ["min_pixels", "pedestal", "ratio_width", "completeness_threshold"]:
             getattr(self, p).attach_subarray(self.source.subarray)
 
     def start(self):
-        for event in tqdm(self.source, desc="Processing events: "):
-            self.process_array_event(event)
+        if self.batch_size > 0 and self.n_jobs != 1:
+            self._pool = Pool(
+                self.n_jobs,
+                initializer=_init_worker,
+                initargs=(self.source.subarray, self._intensity_fitter_kwargs()),
+            )
+
+        try:
+            for event in tqdm(self.source, desc="Processing events: "):
+                self.process_array_event(event)
+            self.process_candidates()
+        finally:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool = None
 
     def process_array_event(self, event):
         self.calib(event)
 
         for tel_id, dl1 in event.dl1.tel.items():
-            self.process_telescope_event(event.index, tel_id, dl1)
+            if self.batch_size > 0:
+                self.add_candidate(event.index, tel_id, dl1)
+            else:
+                self.process_telescope_event(event.index, tel_id, dl1)
 
         self.writer.write("sim/event/subarray/shower", [event.index, event.mc])
 
+        if self.batch_size > 0 and len(self.candidates) >= self.batch_size:
+            self.process_candidates()
+
     def process_telescope_event(self, event_index, tel_id, dl1):
         event_id = event_index.event_id
+        image = dl1.image
+
+        clean_mask = self.clean_image(event_id, tel_id, image)
+        if clean_mask is None:
+            return
+
+        x, y = self.get_pixel_coords(tel_id)
+
+        # iterative ring fit.
+        # First use cleaning pixels, then only pixels close to the ring
+        # three iterations seems to be enough for most rings
+        mask = clean_mask
+        for i in range(3):
+            ring = self.ring_fitter(x, y, image, mask)
+            dist = np.sqrt((x - ring.center_x) ** 2 + (y - ring.center_y) ** 2)
+            mask = np.abs(dist - ring.radius) / ring.radius < 0.4
+
+        if not self.check_ring(event_id, tel_id, ring, mask):
+            return
+
+        parameters = self.calculate_muon_parameters(tel_id, image, clean_mask, ring)
+
+        # intensity_fitter does not support a mask yet, set ignored pixels to 0
+        image[~mask] = 0
 
+        result = _fit_intensity(
+            (tel_id, ring, image, self.pedestal.tel[tel_id]), self.intensity_fitter
+        )
+
+        tel_event_index = TelEventIndexContainer(**event_index, tel_id=tel_id,)
+        self.write_muon(tel_event_index, ring, parameters, result)
+
+    def add_candidate(self, event_index, tel_id, dl1):
+        """Store a telescope event passing the cleaning for batch processing"""
+        clean_mask = self.clean_image(event_index.event_id, tel_id, dl1.image)
+        if clean_mask is None:
+            return
+
+        # the event source reuses its containers, so store copies
+        tel_event_index = TelEventIndexContainer(**event_index, tel_id=tel_id,)
+        self.candidates.append((tel_event_index, tel_id, dl1.image.copy(), clean_mask))
+
+    def process_candidates(self):
+        """Fit and write all muon candidates collected by `add_candidate`"""
+        candidates, self.candidates = self.candidates, []
+        if len(candidates) == 0:
+            return
+
+        # all telescopes of the same type share the pixel coordinates
+        by_type = defaultdict(list)
+        for i, (_, tel_id, _, _) in enumerate(candidates):
+            by_type[str(self.source.subarray.tel[tel_id])].append(i)
+
+        rings = [None] * len(candidates)
+        masks = [None] * len(candidates)
+        for indices in by_type.values():
+            x, y = self.get_pixel_coords(candidates[indices[0]][1])
+            images = np.array([candidates[i][2] for i in indices])
+            mask = np.array([candidates[i][3] for i in indices])
+
+            # same iterative ring fit as in `process_telescope_event`
+            for _ in range(3):
+                batch = self.ring_fitter.fit_batch(x, y, images, mask)
+                center_x = batch.center_x[:, np.newaxis]
+                center_y = batch.center_y[:, np.newaxis]
+                radius = batch.radius[:, np.newaxis]
+                dist = np.sqrt((x - center_x) ** 2 + (y - center_y) ** 2)
+                mask = np.abs(dist - radius) / radius < 0.4
+
+            for j, i in enumerate(indices):
+                rings[i] = MuonRingContainer(**{k: v[j] for k, v in batch.items()})
+                masks[i] = mask[j]
+
+        accepted = []
+        tasks = []
+        for (tel_event_index, tel_id, image, clean_mask), ring, mask in zip(
+            candidates, rings, masks
+        ):
+            if not self.check_ring(tel_event_index.event_id, tel_id, ring, mask):
+                continue
+
+            parameters = self.calculate_muon_parameters(tel_id, image, clean_mask, ring)
+            image[~mask] = 0
+
+            accepted.append((tel_event_index, ring, parameters))
+            tasks.append((tel_id, ring, image, self.pedestal.tel[tel_id]))
+
+        if self._pool is None:
+            results = (_fit_intensity(task, self.intensity_fitter) for task in tasks)
+        else:
+            chunksize = max(1, len(tasks) // (4 * self.n_jobs))
+            results = self._pool.imap(_fit_intensity, tasks, chunksize=chunksize)
+
+        for (tel_event_index, ring, parameters), result in zip(accepted, results):
+            self.write_muon(tel_event_index, ring, parameters, result)
+
+    def clean_image(self, event_id, tel_id, image):
+        """Return the cleaning mask or None if the event is not processed"""
         if self.source.subarray.tel[tel_id].optics.num_mirrors != 1:
             self.log.warn(
                 f"Skipping non-single mirror telescope {tel_id}"
                 " set --allowed_tels to get rid of this warning"
             )
-            return
+            return None
 
         self.log.debug(f"Processing event {event_id}, telescope {tel_id}")
-        image = dl1.image
         clean_mask = self.cleaning(tel_id, image)
 
         if np.count_nonzero(clean_mask) <= self.min_pixels.tel[tel_id]:
@@ -164,25 +326,18 @@ class MuonAnalysis(Tool):
                 f"Skipping event {event_id}-{tel_id}:"
                 f" has less then {self.min_pixels.tel[tel_id]} pixels after cleaning"
             )
-            return
+            return None
 
-        x, y = self.get_pixel_coords(tel_id)
-
-        # iterative ring fit.
-        # First use cleaning pixels, then only pixels close to the ring
-        # three iterations seems to be enough for most rings
-        mask = clean_mask
-        for i in range(3):
-            ring = self.ring_fitter(x, y, image, mask)
-            dist = np.sqrt((x - ring.center_x) ** 2 + (y - ring.center_y) ** 2)
-            mask = np.abs(dist - ring.radius) / ring.radius < 0.4
+        return clean_mask
 
+    def check_ring(self, event_id, tel_id, ring, mask):
+        """Check that the ring fit succeeded with enough pixels on the ring"""
         if np.count_nonzero(mask) <= self.min_pixels.tel[tel_id]:
             self.log.debug(
                 f"Skipping event {event_id}-{tel_id}:"
                 f" Less then {self.min_pixels.tel[tel_id]} pixels on ring"
             )
-            return
+            return False
 
         if np.isnan(
             [ring.radius.value, ring.center_x.value, ring.center_y.value]
@@ -190,35 +345,31 @@ class MuonAnalysis(Tool):
             self.log.debug(
                 f"Skipping event {event_id}-{tel_id}: Ring fit did not succeed"
             )
-            return
+            return False
 
-        parameters = self.calculate_muon_parameters(tel_id, image, clean_mask, ring)
-
-        # intensity_fitter does not support a mask yet, set ignored pixels to 0
-        image[~mask] = 0
-
-        result = self.intensity_fitter(
-            tel_id,
-            ring.center_x,
-            ring.center_y,
-            ring.radius,
-            image,
-            pedestal=self.pedestal.tel[tel_id],
-        )
+        return True
 
+    def write_muon(self, tel_event_index, ring, parameters, result):
         self.log.info(
             f"Muon fit: r={ring.radius:.2f}"
             f", width={result.width:.4f}"
             f", efficiency={result.optical_efficiency:.2%}",
         )
 
-        tel_event_index = TelEventIndexContainer(**event_index, tel_id=tel_id,)
-
         self.writer.write(
             "dl1/event/telescope/parameters/muons",
             [tel_event_index, ring, parameters, result],
         )
 
+    def _intensity_fitter_kwargs(self):
+        """Configuration of the intensity fitter to recreate it in worker processes"""
+        config = self.intensity_fitter.get_current_config()["MuonIntensityFitter"]
+        # telescope parameters are stored as UserList, convert for pickling
+        return {
+            key: list(value) if isinstance(value, TelescopePatternList) else value
+            for key, value in config.items()
+        }
+
     def calculate_muon_parameters(self, tel_id, image, clean_mask, ring):
         fov_radius = self.get_fov(tel_id)
         x, y = self.get_pixel_coords(tel_id)
@@ -292,16 +443,18 @@ class MuonAnalysis(Tool):
         if tel_id not in self.pixels_in_tel_frame:
             telescope = self.source.subarray.tel[tel_id]
             cam = telescope.camera.geometry
-            camera_frame = CameraFrame(
-                focal_length=telescope.optics.equivalent_focal_length,
-                rotation=cam.cam_rotation,
+            fov_lon, fov_lat = camera_to_fov(
+                cam.pix_x.to_value(u.m),
+                cam.pix_y.to_value(u.m),
+                telescope.optics.equivalent_focal_length.to_value(u.m),
+                cam.cam_rotation.to_value(u.rad),
+            )
+            self.pixels_in_tel_frame[tel_id] = (
+                u.Quantity(fov_lon, u.rad),
+                u.Quantity(fov_lat, u.rad),
             )
-            cam_coords = SkyCoord(x=cam.pix_x, y=cam.pix_y, frame=camera_frame)
-            tel_coord = cam_coords.transform_to(TelescopeFrame())
-            self.pixels_in_tel_frame[tel_id] = tel_coord
 
-        coords = self.pixels_in_tel_frame[tel_id]
-        return coords.fov_lon, coords.fov_lat
+        return self.pixels_in_tel_frame[tel_id]
 
     def finish(self):
         Provenance().add_output_file(
@@ -55,7 +55,10 @@ PROV = Provenance()
 #   (meaning readers need to update scripts)
 # - increase the minor number if new columns or datasets are added
 # - increase the patch number if there is a small bugfix to the model.
-DL1_DATA_MODEL_VERSION = "v1.0.0"
+#
+# v2.0.0: /configuration/instrument is written by SubarrayDescription.to_hdf,
+#         as PyTables tables with _UNIT attributes instead of astropy tables
+DL1_DATA_MODEL_VERSION = "v2.0.0"
 
 
 def write_reference_metadata_headers(obs_id, subarray, writer):
@@ -381,37 +384,7 @@ class Stage1ProcessorTool(Tool):
             subarray description
         """
         self.log.debug("Writing instrument configuration")
-        serialize_meta = True
-
-        subarray.to_table().write(
-            self.output_path,
-            path="/configuration/instrument/subarray/layout",
-            serialize_meta=serialize_meta,
-            append=True,
-        )
-        subarray.to_table(kind="optics").write(
-            self.output_path,
-            path="/configuration/instrument/telescope/optics",
-            append=True,
-            serialize_meta=serialize_meta,
-        )
-        for telescope_type in subarray.telescope_types:
-            ids = set(subarray.get_tel_ids_for_type(telescope_type))
-            if len(ids) > 0:  # only write if there is a telescope with this camera
-                tel_id = list(ids)[0]
-                camera = subarray.tel[tel_id].camera
-                camera.geometry.to_table().write(
-                    self.output_path,
-                    path=f"/configuration/instrument/telescope/camera/geometry_{camera}",
-                    append=True,
-                    serialize_meta=serialize_meta,
-                )
-                camera.readout.to_table().write(
-                    self.output_path,
-                    path=f"/configuration/instrument/telescope/camera/readout_{camera}",
-                    append=True,
-                    serialize_meta=serialize_meta,
-                )
+        subarray.to_hdf(self.output_path)
 
     def _write_processing_statistics(self):
         """ write out the event selection stats, etc. """
@@ -454,7 +427,7 @@ class Stage1ProcessorTool(Tool):
 
         # parameterize the event if all criteria pass:
         if all(image_criteria):
-            geom_selected = geometry[signal_pixels]
+            geom_selected = geometry.select(signal_pixels)
 
             hillas = hillas_parameters(geom=geom_selected, image=image_selected,)
             leakage = leakage_parameters(
@@ -702,11 +675,6 @@ class Stage1ProcessorTool(Tool):
 
     def start(self):
 
-        # FIXME: this uses astropy tables hdf5 io, internally using h5py,
-        # and must thus be done before the table writer opens the file or it might lead
-        # to "Resource temporary unavailable" if h5py and tables are not linked
-        # against the same libhdf (happens when using the pre-build pip wheels)
-        # should be replaced by writing the table using tables
         self._write_instrument_configuration(self.event_source.subarray)
 
         with HDF5TableWriter(
@@ -10,6 +10,7 @@ import matplotlib as mpl
 
 import tempfile
 import pandas as pd
+import pytest
 import tables
 
 from ctapipe.utils import get_dataset_path
@@ -112,6 +113,44 @@ def test_muon_reconstruction(tmpdir):
     assert run_tool(MuonAnalysis(), ["--help-all"]) == 0
 
 
+def test_muon_reconstruction_batch(tmp_path):
+    from ctapipe.tools.muon_reconstruction import MuonAnalysis
+
+    tables_by_mode = []
+    for name, options in [
+        ("single", []),
+        ("batch", ["--batch-size=10", "--n-jobs=2"]),
+    ]:
+        output = tmp_path / f"muons_{name}.hdf5"
+        argv = [f"--input={LST_MUONS}", f"--output={output}", "--overwrite"]
+        assert run_tool(MuonAnalysis(), argv=argv + options) == 0
+
+        with tables.open_file(output) as f:
+            tables_by_mode.append(f.root.dl1.event.telescope.parameters.muons[:])
+
+    single, batch = tables_by_mode
+    # candidates are written in the order of the input events
+    assert np.all(single["event_id"] == batch["event_id"])
+    assert np.all(single["tel_id"] == batch["tel_id"])
+    assert np.allclose(single["muonring_radius"], batch["muonring_radius"])
+    # intensity fits done by the worker processes
+    for column in [
+        "muonefficiency_impact",
+        "muonefficiency_width",
+        "muonefficiency_optical_efficiency",
+    ]:
+        assert np.allclose(single[column], batch[column], equal_nan=True)
+
+
+def test_muon_reconstruction_n_jobs():
+    from traitlets import TraitError
+    from ctapipe.tools.muon_reconstruction import MuonAnalysis
+
+    for n_jobs in (0, -1):
+        with pytest.raises(TraitError):
+            MuonAnalysis(n_jobs=n_jobs)
+
+
 def test_display_summed_images(tmpdir):
     from ctapipe.tools.display_summed_images import ImageSumDisplayerTool
 
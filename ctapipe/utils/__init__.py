@@ -2,11 +2,13 @@
 from .fitshistogram import Histogram
 from .table_interpolator import TableInterpolator
 from .unstructured_interpolator import UnstructuredInterpolator
+from .grid_interpolator import GridInterpolator
 from .datasets import (
     find_all_matching_datasets,
     get_table_dataset,
     get_dataset_path,
     find_in_path,
+    get_cache_dir,
 )
 from .astro import get_bright_stars
 from .CutFlow import CutFlow, PureCountingCut, UndefinedCut
@@ -16,10 +18,12 @@ __all__ = [
     "Histogram",
     "TableInterpolator",
     "UnstructuredInterpolator",
+    "GridInterpolator",
     "find_all_matching_datasets",
     "get_table_dataset",
     "get_dataset_path",
     "find_in_path",
+    "get_cache_dir",
     "get_bright_stars",
     "CutFlow",
     "PureCountingCut",
@@ -3,6 +3,7 @@ import json
 import logging
 import os
 import re
+from pathlib import Path
 
 import yaml
 from astropy.table import Table
@@ -20,7 +21,12 @@ from ..core import Provenance
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["get_dataset_path", "find_in_path", "find_all_matching_datasets"]
+__all__ = [
+    "get_dataset_path",
+    "find_in_path",
+    "find_all_matching_datasets",
+    "get_cache_dir",
+]
 
 
 def get_searchpath_dirs(searchpath=os.getenv("CTAPIPE_SVC_PATH")):
@@ -30,6 +36,31 @@ def get_searchpath_dirs(searchpath=os.getenv("CTAPIPE_SVC_PATH")):
     return os.path.expandvars(searchpath).split(":")
 
 
+def get_cache_dir():
+    """
+    Directory for files that ctapipe computes once and reuses, e.g.
+    lookup tables.
+
+    This is the directory given by the environment variable
+    ``CTAPIPE_CACHE_DIR`` if set, otherwise ``ctapipe`` inside
+    ``XDG_CACHE_HOME`` (defaulting to ``~/.cache``).
+    The directory is created if it does not exist.
+
+    Returns
+    -------
+    pathlib.Path:
+        the cache directory
+    """
+    cache_dir = os.getenv("CTAPIPE_CACHE_DIR")
+    if not cache_dir:
+        xdg_cache = os.getenv("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+        cache_dir = os.path.join(xdg_cache, "ctapipe")
+
+    cache_dir = Path(os.path.expandvars(cache_dir)).expanduser()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
 def find_all_matching_datasets(pattern, searchpath=None, regexp_group=None):
     """
     Returns a list of resource names (or substrings) matching the given 
@@ -0,0 +1,371 @@
+"""
+Multilinear interpolation between values (e.g. image templates) defined on a
+regular grid of interpolation points.
+
+This is the fast path for the typical template libraries, which are filled on
+a complete (energy, impact, xmax) grid. Instead of locating the enclosing
+simplex of a Delaunay triangulation, the enclosing grid cell is found by
+index arithmetic on each axis, and all templates are stored in one
+contiguous array so that the pixel values of all cell corners can be
+looked up at once.
+"""
+import itertools
+
+import numpy as np
+import numpy.ma as ma
+
+__all__ = ["GridInterpolator", "find_regular_grid"]
+
+
+def find_regular_grid(keys, decimals=6):
+    """
+    Check if a set of points forms a complete rectilinear grid
+
+    Parameters
+    ----------
+    keys: array-like
+        (n_points, n_dimensions) array of point coordinates
+    decimals: int
+        Coordinates are rounded to this number of decimals before
+        comparing them, to allow for floating point noise in the keys
+
+    Returns
+    -------
+    axes: list[ndarray]
+        sorted unique coordinates along each dimension
+    indices: ndarray
+        (n_points, n_dimensions) grid index of each point
+
+    Raises
+    ------
+    ValueError
+        if the points do not fill a grid, i.e. some grid points are
+        missing or given more than once
+    """
+    keys = np.round(np.asanyarray(keys, dtype=np.float64), decimals)
+    if keys.ndim != 2:
+        raise ValueError("keys must be an array of shape (n_points, n_dimensions)")
+
+    axes = [np.unique(column) for column in keys.T]
+    indices = np.column_stack(
+        [np.searchsorted(axis, column) for axis, column in zip(axes, keys.T)]
+    )
+
+    n_grid_points = np.prod([len(axis) for axis in axes])
+    n_unique = len(np.unique(indices, axis=0))
+    if n_grid_points != len(keys) or n_unique != len(keys):
+        raise ValueError(
+            f"{len(keys)} points do not form a regular grid"
+            f" of {n_grid_points} points"
+        )
+
+    return axes, indices
+
+
+class GridInterpolator:
+    """
+    Multilinear interpolation between values given on a complete rectilinear
+    grid of interpolation points.
+
+    This class has the same interface as
+    `~ctapipe.utils.UnstructuredInterpolator` for numpy array values,
+    including the bilinear lookup of 2d images (templates) at a set of
+    evaluation points, but uses direct index arithmetic on the grid axes
+    instead of a Delaunay triangulation.
+
+    Points outside the grid are evaluated at the closest point on the grid
+    boundary.
+    """
+
+    def __init__(self, interpolation_points, bounds=None, dtype=None, decimals=6):
+        """
+        Parameters
+        ----------
+        interpolation_points: dict
+            Dictionary of interpolation points (stored as key) and values
+        bounds: tuple
+            ((x_min, x_max), (y_min, y_max)) range covered by the image values,
+            only needed for evaluating images at ``eval_points``
+        dtype: numpy dtype
+            dtype of the stored values
+        decimals: int
+            precision used to detect the grid, see `find_regular_grid`
+
+        Raises
+        ------
+        ValueError
+            if the interpolation points do not form a regular grid
+        """
+        values = np.array(list(interpolation_points.values()), dtype=dtype)
+        self._setup(list(interpolation_points.keys()), values, bounds, decimals)
+
+    @classmethod
+    def from_arrays(cls, keys, values, bounds=None, decimals=6):
+        """
+        Create the interpolator from arrays of interpolation points and values.
+
+        If the values are already sorted in grid order (C order of the grid
+        axes), the array is used as is, without copying it. This allows using
+        read-only memory mapped arrays, see
+        `~ctapipe.utils.template_network_interpolator.convert_template_file`.
+
+        Parameters
+        ----------
+        keys: array-like
+            (n_points, n_dimensions) interpolation points
+        values: ndarray
+            (n_points, ...) values at the interpolation points
+        bounds: tuple
+            ((x_min, x_max), (y_min, y_max)) range covered by the image values,
+            only needed for evaluating images at ``eval_points``
+        decimals: int
+            precision used to detect the grid, see `find_regular_grid`
+        """
+        interpolator = cls.__new__(cls)
+        interpolator._setup(keys, values, bounds, decimals)
+        return interpolator
+
+    def _setup(self, keys, values, bounds, decimals):
+        self.axes, indices = find_regular_grid(keys, decimals=decimals)
+
+        self.grid_shape = tuple(len(axis) for axis in self.axes)
+        self._num_dimensions = len(self.grid_shape)
+
+        # store values of all grid points in one contiguous array,
+        # indexed by the flattened grid index
+        self._strides = np.cumprod((self.grid_shape + (1,))[:0:-1])[::-1]
+        flat_index = indices @ self._strides
+        if np.all(flat_index == np.arange(len(flat_index))):
+            self.values = values
+        else:
+            self.values = np.empty(values.shape, dtype=values.dtype)
+            self.values[flat_index] = values
+
+        # offsets of the corners of a grid cell, axes with a single point
+        # only have one corner
+        self._corners = np.array(
+            list(
+                itertools.product(*[(0, 1) if n > 1 else (0,) for n in self.grid_shape])
+            )
+        )
+        self._bounds = bounds
+
+    def reset(self):
+        """
+        Nothing is remembered between calls, only for compatibility with
+        `~ctapipe.utils.UnstructuredInterpolator`
+        """
+
+    def cell_weights(self, points):
+        """
+        Flat grid indices and multilinear weights of the corners of the
+        grid cells containing the given points
+
+        Parameters
+        ----------
+        points: array-like
+            (n_points, n_dimensions) points to interpolate at
+
+        Returns
+        -------
+        index: ndarray
+            (n_points, n_corners) flat grid index of the cell corners, with
+            2**n_dimensions corners, not counting axes with a single point
+        weights: ndarray
+            (n_points, n_corners) interpolation weight of the cell corners
+        """
+        index, weights, _ = self._cell_weights(points)
+        return index, weights
+
+    def _cell_weights(self, points, gradient=False):
+        """
+        `cell_weights`, optionally also returning the (n_points, n_corners,
+        n_dimensions) derivatives of the weights with respect
+        to the point coordinates. The derivative is 0 along axes on which the
+        point lies outside of the grid, as these coordinates are clipped.
+        """
+        points = np.array(points, dtype=np.float64, ndmin=2)
+
+        lower = np.zeros(points.shape, dtype=np.int64)
+        fraction = np.zeros(points.shape)
+        inverse_spacing = np.zeros(points.shape)
+        for dim, axis in enumerate(self.axes):
+            if len(axis) == 1:
+                continue
+            coordinate = np.clip(points[:, dim], axis[0], axis[-1])
+            i = np.searchsorted(axis, coordinate, side="right") - 1
+            i = np.clip(i, 0, len(axis) - 2)
+            lower[:, dim] = i
+            spacing = axis[i + 1] - axis[i]
+            fraction[:, dim] = (coordinate - axis[i]) / spacing
+            inside = (points[:, dim] >= axis[0]) & (points[:, dim] <= axis[-1])
+            inverse_spacing[:, dim] = np.where(inside, 1 / spacing, 0)
+
+        index = (lower[:, np.newaxis, :] + self._corners) @ self._strides
+        upper_corner = self._corners.astype(bool)
+        factors = np.where(
+            upper_corner, fraction[:, np.newaxis, :], 1 - fraction[:, np.newaxis, :],
+        )
+        weights = np.prod(factors, axis=-1)
+
+        if not gradient:
+            return index, weights, None
+
+        # d/dx_d of the product of the factors of all axes: the factor of
+        # axis d is replaced by its derivative +-1 / spacing
+        factor_derivatives = np.where(
+            upper_corner,
+            inverse_spacing[:, np.newaxis, :],
+            -inverse_spacing[:, np.newaxis, :],
+        )
+        weight_gradient = np.empty(factors.shape)
+        for dim in range(self._num_dimensions):
+            others = np.delete(factors, dim, axis=-1)
+            weight_gradient[..., dim] = factor_derivatives[..., dim] * np.prod(
+                others, axis=-1
+            )
+
+        return index, weights, weight_gradient
+
+    def __call__(self, points, eval_points=None):
+        """
+        Interpolate the values at the given points
+
+        Parameters
+        ----------
+        points: array-like
+            (n_points, n_dimensions) points to interpolate at
+        eval_points: ndarray or masked array
+            (n_points, n_eval, 2) positions at which the interpolated images
+            are evaluated, if None the interpolated values are returned
+
+        Returns
+        -------
+        ndarray:
+            (n_points, ...) interpolated values, or (n_points, n_eval)
+            interpolated image values if ``eval_points`` is given
+        """
+        index, weights = self.cell_weights(points)
+
+        if eval_points is None:
+            return np.einsum("ij,ij...->i...", weights, self.values[index])
+
+        return self._image_interpolation(index, weights, eval_points)
+
+    def gradient(self, points, eval_points=None):
+        """
+        Interpolate the values at the given points together with their
+        derivatives with respect to the point coordinates and, for images,
+        to the evaluation positions.
+
+        As the interpolation is multilinear, the derivatives are those of the
+        linear interpolation inside the grid cell (and image pixel) containing
+        the point, they are 0 outside of the grid (and image bounds).
+
+        Parameters
+        ----------
+        points: array-like
+            (n_points, n_dimensions) points to interpolate at
+        eval_points: ndarray or masked array
+            (n_points, n_eval, 2) positions at which the interpolated images
+            are evaluated, if None the interpolated values are returned
+
+        Returns
+        -------
+        values: ndarray
+            interpolated values, same as the result of calling the interpolator
+        point_gradient: ndarray
+            (n_points, ..., n_dimensions) or (n_points, n_eval, n_dimensions)
+            derivatives of the values with respect to the point coordinates
+        eval_gradient: ndarray or None
+            (n_points, n_eval, 2) derivatives of the image values with respect
+            to the evaluation positions, None if ``eval_points`` is not given
+        """
+        index, weights, weight_gradient = self._cell_weights(points, gradient=True)
+
+        if eval_points is None:
+            corner_values = self.values[index]
+            values = np.einsum("ij,ij...->i...", weights, corner_values)
+            point_gradient = np.moveaxis(
+                np.einsum("ijd,ij...->id...", weight_gradient, corner_values), 1, -1
+            )
+            return values, point_gradient, None
+
+        mask, inside, pixel_values, pixel_gradient = self._corner_images(
+            index, eval_points, gradient=True
+        )
+        values = np.einsum("ij,ijk->ik", weights, pixel_values)
+        point_gradient = np.einsum("ijd,ijk->ikd", weight_gradient, pixel_values)
+        eval_gradient = np.einsum("ij,ijkd->ikd", weights, pixel_gradient)
+
+        values[~inside] = 0
+        point_gradient[~inside] = 0
+        eval_gradient[~inside] = 0
+
+        return ma.masked_array(values, mask=mask), point_gradient, eval_gradient
+
+    def _image_interpolation(self, index, weights, eval_points):
+        """
+        Bilinear lookup of the images of all cell corners at the evaluation
+        points, weighted with the multilinear cell weights.
+        Image values outside of ``bounds`` are 0.
+        """
+        mask, inside, pixel_values, _ = self._corner_images(index, eval_points)
+
+        output = np.einsum("ij,ijk->ik", weights, pixel_values)
+        output[~inside] = 0
+
+        return ma.masked_array(output, mask=mask)
+
+    def _corner_images(self, index, eval_points, gradient=False):
+        """
+        Bilinear lookup of the images of the cell corners ``index`` at the
+        evaluation points, optionally with the derivatives of the image values
+        with respect to the evaluation positions.
+
+        Returns
+        -------
+        mask, inside, pixel_values, pixel_gradient
+            mask of the evaluation points, evaluation points inside the image
+            bounds, (n_points, n_corners, n_eval) image values of the corners
+            and (n_points, n_corners, n_eval, 2) their derivatives or None
+        """
+        mask = ma.getmaskarray(eval_points)[..., 0]
+        eval_points = ma.getdata(eval_points)
+        image_shape = self.values.shape[1:]
+
+        pixel_index = []
+        pixel_fraction = []
+        pixel_scale = []
+        inside = ~mask
+        for dim in range(2):
+            low, high = self._bounds[dim]
+            scaled = (eval_points[..., dim] - low) / (high - low)
+            scaled *= image_shape[dim] - 1
+            inside &= (scaled >= 0) & (scaled <= image_shape[dim] - 1)
+
+            i = np.clip(np.floor(scaled).astype(np.int64), 0, image_shape[dim] - 2)
+            pixel_index.append(i[:, np.newaxis, :])
+            pixel_fraction.append((scaled - i)[:, np.newaxis, :])
+            pixel_scale.append((image_shape[dim] - 1) / (high - low))
+
+        flat_index = index[:, :, np.newaxis]
+        fraction_x, fraction_y = pixel_fraction
+        pixel_values = np.zeros(index.shape + eval_points.shape[1:2])
+        pixel_gradient = None
+        if gradient:
+            pixel_gradient = np.zeros(pixel_values.shape + (2,))
+
+        for dx, dy in itertools.product((0, 1), repeat=2):
+            weight_x = fraction_x if dx else 1 - fraction_x
+            weight_y = fraction_y if dy else 1 - fraction_y
+            corner = self.values[flat_index, pixel_index[0] + dx, pixel_index[1] + dy]
+            pixel_values += weight_x * weight_y * corner
+
+            if gradient:
+                sign_x = 1 if dx else -1
+                sign_y = 1 if dy else -1
+                pixel_gradient[..., 0] += sign_x * pixel_scale[0] * weight_y * corner
+                pixel_gradient[..., 1] += sign_y * pixel_scale[1] * weight_x * corner
+
+        return mask, inside, pixel_values, pixel_gradient
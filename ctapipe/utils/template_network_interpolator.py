@@ -1,9 +1,191 @@
-from .unstructured_interpolator import UnstructuredInterpolator
-import numpy as np
-import pickle
+"""
+Interpolators for the ImPACT image and time gradient templates.
+
+Templates are distributed as gzipped pickle files of a dictionary
+``{(energy, impact, xmax): template}``. Reading these requires decompressing
+and unpickling the whole file in every process. `convert_template_file`
+converts them once into an uncompressed store of ``.npy`` files, which is
+then used automatically and loaded as read-only memory map, so that all
+processes on a machine share the same pages of the OS file cache.
+The store records the size and modification time of the template file it was
+created from and is rebuilt when the template file changes.
+"""
 import gzip
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
 import numpy.ma as ma
 
+from .unstructured_interpolator import UnstructuredInterpolator
+from .grid_interpolator import GridInterpolator, find_regular_grid
+
+__all__ = [
+    "TemplateNetworkInterpolator",
+    "TimeGradientInterpolator",
+    "convert_template_file",
+    "load_template_store",
+    "template_store_path",
+]
+
+TEMPLATE_STORE_SUFFIX = ".npystore"
+SOURCE_INFO_FILE = "source.json"
+
+logger = logging.getLogger(__name__)
+
+
+def template_store_path(template_file):
+    """
+    Default path of the memory mappable store for a pickled template file,
+    e.g. ``LST_05deg.template.npystore`` for ``LST_05deg.template.gz``
+    """
+    return Path(template_file).with_suffix(TEMPLATE_STORE_SUFFIX)
+
+
+def _read_pickled_templates(template_file):
+    """ Read keys and stacked values of a gzipped pickle template file """
+    with gzip.open(template_file) as f:
+        input_dict = pickle.load(f)
+
+    keys = np.array(list(input_dict.keys()), dtype=np.float64)
+    values = np.array(list(input_dict.values()))
+    return keys, values
+
+
+def _source_info(template_file):
+    """ size and modification time identifying the version of a template file """
+    stat = os.stat(template_file)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _store_is_current(store_path, template_file):
+    """ Check if the store was created from the current version of the file """
+    try:
+        with open(Path(store_path) / SOURCE_INFO_FILE) as f:
+            return json.load(f) == _source_info(template_file)
+    except (OSError, ValueError):
+        return False
+
+
+def convert_template_file(template_file, store_path=None, overwrite=False):
+    """
+    Convert a gzipped pickle template file into a directory containing
+    the uncompressed arrays ``keys.npy`` and ``values.npy``, and the size and
+    modification time of the template file in ``source.json``.
+
+    Templates on a regular grid are stored in grid order, so that they can
+    be used by `~ctapipe.utils.GridInterpolator` directly from the memory map.
+
+    Parameters
+    ----------
+    template_file: str or Path
+        Location of pickle file containing ImPACT templates
+    store_path: str or Path
+        Output directory, defaults to `template_store_path`
+    overwrite: bool
+        Replace an existing store
+
+    Returns
+    -------
+    Path:
+        path of the created store
+    """
+    store_path = Path(store_path or template_store_path(template_file))
+    if store_path.exists():
+        if not overwrite:
+            raise FileExistsError(f"Template store {store_path} already exists")
+        shutil.rmtree(store_path)
+
+    source_info = _source_info(template_file)
+    keys, values = _read_pickled_templates(template_file)
+    try:
+        _, indices = find_regular_grid(keys)
+        order = np.lexsort(indices.T[::-1])
+        keys, values = keys[order], values[order]
+    except ValueError:
+        pass
+
+    # write into a temporary directory first and move it in place, so that
+    # other processes never see a partially written store
+    tmp_path = Path(tempfile.mkdtemp(dir=store_path.parent, prefix=".tmp_templates"))
+    try:
+        np.save(tmp_path / "keys.npy", keys)
+        np.save(tmp_path / "values.npy", values)
+        with open(tmp_path / SOURCE_INFO_FILE, "w") as f:
+            json.dump(source_info, f)
+        os.replace(tmp_path, store_path)
+    finally:
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path)
+
+    return store_path
+
+
+def load_template_store(store_path, mmap_mode="r"):
+    """
+    Load the keys and (memory mapped) values of a template store
+
+    Parameters
+    ----------
+    store_path: str or Path
+        Template store created by `convert_template_file`
+    mmap_mode: str or None
+        Memory map mode for the values, see `numpy.load`
+
+    Returns
+    -------
+    (ndarray, ndarray):
+        interpolation points and values
+    """
+    store_path = Path(store_path)
+    keys = np.load(store_path / "keys.npy")
+    values = np.load(store_path / "values.npy", mmap_mode=mmap_mode)
+    return keys, values
+
+
+def _read_templates(template_file):
+    """
+    Read a template file, preferring its template store if it exists.
+    ``template_file`` may also be the template store itself.
+    """
+    path = Path(template_file)
+    if path.is_dir():
+        return load_template_store(path)
+
+    store_path = template_store_path(path)
+    if store_path.is_dir():
+        if _store_is_current(store_path, path):
+            return load_template_store(store_path)
+
+        logger.info(f"Template file {path} changed, rebuilding {store_path}")
+        try:
+            convert_template_file(path, store_path, overwrite=True)
+            return load_template_store(store_path)
+        except OSError as err:
+            # e.g. read-only location or a concurrent rebuild
+            logger.warning(f"Could not rebuild template store {store_path}: {err}")
+
+    return _read_pickled_templates(path)
+
+
+def _make_interpolator(keys, values, remember_last, bounds=None):
+    """
+    Use the fast `GridInterpolator` if the templates are given on a regular grid
+    and fall back to the `UnstructuredInterpolator` otherwise
+    """
+    try:
+        return GridInterpolator.from_arrays(keys, values, bounds=bounds)
+    except ValueError:
+        input_dict = dict(zip(map(tuple, keys), values))
+        return UnstructuredInterpolator(
+            input_dict, remember_last=remember_last, bounds=bounds
+        )
+
 
 class TemplateNetworkInterpolator:
     """
@@ -16,13 +198,14 @@ class TemplateNetworkInterpolator:
         Parameters
         ----------
         template_file: str
-            Location of pickle file containing ImPACT NN templates
+            Location of pickle file containing ImPACT NN templates, or of
+            the template store created from it by `convert_template_file`.
+            An existing template store next to the pickle file is used instead.
         """
 
-        file_list = gzip.open(template_file)
-        input_dict = pickle.load(file_list)
-        self.interpolator = UnstructuredInterpolator(
-            input_dict, remember_last=True, bounds=((-5, 1), (-1.5, 1.5))
+        keys, values = _read_templates(template_file)
+        self.interpolator = _make_interpolator(
+            keys, values, remember_last=True, bounds=((-5, 1), (-1.5, 1.5))
         )
 
     def reset(self):
@@ -61,6 +244,53 @@ class TemplateNetworkInterpolator:
 
         return interpolated_value
 
+    @property
+    def has_gradient(self):
+        """True if the templates are interpolated on a regular grid, which
+        provides the analytic derivatives needed by `gradient`"""
+        return isinstance(self.interpolator, GridInterpolator)
+
+    def gradient(self, energy, impact, xmax, xb, yb):
+        """
+        Evaluate interpolated templates and their derivatives with respect to
+        the shower parameters and pixel positions, see `__call__` for the
+        parameters.
+
+        Returns
+        -------
+        values: ndarray
+            Pixel amplitude expectation values
+        gradient: ndarray
+            (..., 5) derivatives of the expectation values with respect to
+            energy, impact, xmax, xb and yb
+
+        Raises
+        ------
+        NotImplementedError
+            if the templates are not given on a regular grid, see `has_gradient`.
+            `ctapipe.reco.ImPACT.ImPACTReconstructor` then uses finite
+            differences of the likelihood instead.
+        """
+        if not self.has_gradient:
+            raise NotImplementedError(
+                "Template gradients are only available for templates on a regular"
+                " grid, check has_gradient before calling gradient"
+            )
+
+        array = np.stack((energy, impact, xmax), axis=-1)
+        points = ma.dstack((xb, yb))
+
+        values, point_gradient, eval_gradient = self.interpolator.gradient(
+            array, points
+        )
+        gradient = np.concatenate((point_gradient, eval_gradient), axis=-1)
+
+        negative = values < 0
+        values[negative] = 0
+        gradient[ma.getdata(negative)] = 0
+
+        return values, gradient
+
 
 class TimeGradientInterpolator:
     """
@@ -73,12 +303,13 @@ class TimeGradientInterpolator:
         Parameters
         ----------
         template_file: str
-            Location of pickle file containing ImPACT NN templates
+            Location of pickle file containing ImPACT NN templates, or of
+            the template store created from it by `convert_template_file`.
+            An existing template store next to the pickle file is used instead.
         """
 
-        file_list = gzip.open(template_file)
-        input_dict = pickle.load(file_list)
-        self.interpolator = UnstructuredInterpolator(input_dict, remember_last=False)
+        keys, values = _read_templates(template_file)
+        self.interpolator = _make_interpolator(keys, values, remember_last=False)
 
     def __call__(self, energy, impact, xmax):
         """
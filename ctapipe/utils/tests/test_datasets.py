@@ -74,3 +74,14 @@ def test_structured_datasets(tmpdir):
     data1 = datasets.get_structured_dataset("data_test")
     assert data1["x"] == [1, 2, 3, 4, 5]
     assert data1["y"] == "test_yaml"
+
+
+def test_cache_dir(tmp_path, monkeypatch):
+    """ check the cache directory is taken from the environment and created """
+    monkeypatch.setenv("CTAPIPE_CACHE_DIR", str(tmp_path / "ctapipe_cache"))
+    assert datasets.get_cache_dir() == tmp_path / "ctapipe_cache"
+    assert (tmp_path / "ctapipe_cache").is_dir()
+
+    monkeypatch.delenv("CTAPIPE_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert datasets.get_cache_dir() == tmp_path / "xdg" / "ctapipe"
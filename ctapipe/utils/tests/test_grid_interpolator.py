@@ -0,0 +1,187 @@
+import gzip
+import pickle
+
+import numpy as np
+import numpy.ma as ma
+import pytest
+from scipy.interpolate import RegularGridInterpolator
+from scipy.ndimage import map_coordinates
+
+from ctapipe.utils import GridInterpolator, UnstructuredInterpolator
+from ctapipe.utils.grid_interpolator import find_regular_grid
+
+
+def make_grid(values_shape=(), rng=None):
+    """ rectilinear grid with non-uniform spacing and random values """
+    rng = rng or np.random.RandomState(0)
+    axes = [np.array([-1.0, 0.0, 0.5, 2.0]), np.linspace(0, 1, 3), np.array([1.0, 3.0])]
+    values = rng.uniform(0, 1, tuple(len(a) for a in axes) + values_shape)
+    points = {
+        (x, y, z): values[i, j, k]
+        for i, x in enumerate(axes[0])
+        for j, y in enumerate(axes[1])
+        for k, z in enumerate(axes[2])
+    }
+    return axes, values, points
+
+
+def test_find_regular_grid():
+    axes, _, points = make_grid()
+    keys = list(points.keys())
+
+    found_axes, indices = find_regular_grid(keys)
+    for axis, found in zip(axes, found_axes):
+        assert np.all(axis == found)
+    assert np.all(
+        np.array(keys) == [[a[i] for a, i in zip(axes, idx)] for idx in indices]
+    )
+
+    # floating point noise is ignored
+    find_regular_grid(np.array(keys) + 1e-10)
+
+    # incomplete grid
+    with pytest.raises(ValueError):
+        find_regular_grid(keys[:-1])
+
+    # duplicated point
+    with pytest.raises(ValueError):
+        find_regular_grid(keys[:-1] + keys[:1])
+
+
+def test_grid_interpolation():
+    """ values on the grid are interpolated like the scipy RegularGridInterpolator """
+    axes, values, points = make_grid(values_shape=(2,))
+    interpolator = GridInterpolator(points)
+    regular_grid = RegularGridInterpolator(axes, values)
+
+    rng = np.random.RandomState(1)
+    test_points = np.column_stack([rng.uniform(a[0], a[-1], 100) for a in axes])
+    assert np.allclose(interpolator(test_points), regular_grid(test_points))
+
+    # grid points are reproduced exactly
+    keys = np.array(list(points.keys()))
+    assert np.allclose(interpolator(keys), list(points.values()))
+
+    # points outside are evaluated on the boundary
+    assert np.allclose(interpolator([[-5, 0, 1]]), interpolator([[-1, 0, 1]]))
+
+
+def test_single_point_axis():
+    """ axes with a single grid point are not interpolated along """
+    points = {(x, y, 0.0): np.array([x + y]) for x in (1.0, 2.0) for y in (0.0, 10.0)}
+    interpolator = GridInterpolator(points)
+
+    _, weights = interpolator.cell_weights([[1.5, 5.0, 0.0]])
+    assert np.isclose(weights.sum(), 1)
+    assert np.allclose(interpolator([[1.5, 5.0, 3.0]]), 6.5)
+
+
+def test_grid_gradient():
+    """ analytic derivatives agree with finite differences """
+    rng = np.random.RandomState(3)
+    axes, _, points = make_grid(values_shape=(20, 30), rng=rng)
+    interpolator = GridInterpolator(points, bounds=((-5, 1), (-1.5, 1.5)))
+
+    test_points = np.column_stack([rng.uniform(a[0], a[-1], 4) for a in axes])
+    eval_points = np.dstack(
+        (rng.uniform(-5, 1, (4, 50)), rng.uniform(-1.5, 1.5, (4, 50)))
+    )
+    values, point_gradient, eval_gradient = interpolator.gradient(
+        test_points, eval_points
+    )
+    assert np.allclose(values, interpolator(test_points, eval_points))
+
+    step = 1e-7
+    for dim in range(3):
+        shift = np.zeros(3)
+        shift[dim] = step
+        expected = (
+            interpolator(test_points + shift, eval_points)
+            - interpolator(test_points - shift, eval_points)
+        ) / (2 * step)
+        assert np.allclose(point_gradient[..., dim], expected, atol=1e-5)
+
+    for dim in range(2):
+        shift = np.zeros(2)
+        shift[dim] = step
+        expected = (
+            interpolator(test_points, eval_points + shift)
+            - interpolator(test_points, eval_points - shift)
+        ) / (2 * step)
+        assert np.allclose(eval_gradient[..., dim], expected, atol=1e-5)
+
+    # without images
+    _, _, points = make_grid(values_shape=(2,))
+    interpolator = GridInterpolator(points)
+    values, point_gradient, eval_gradient = interpolator.gradient(test_points)
+    assert point_gradient.shape == (4, 2, 3)
+    assert eval_gradient is None
+    shift = np.array([step, 0, 0])
+    expected = (
+        interpolator(test_points + shift) - interpolator(test_points - shift)
+    ) / (2 * step)
+    assert np.allclose(point_gradient[..., 0], expected, atol=1e-5)
+
+    # points outside of the grid are clipped, so the derivative vanishes
+    _, point_gradient, _ = interpolator.gradient([[-5.0, 0.5, 2.0]])
+    assert np.all(point_gradient[..., 0] == 0)
+
+
+def test_image_interpolation():
+    """ images are interpolated at the evaluation points """
+    rng = np.random.RandomState(2)
+    axes, values, points = make_grid(values_shape=(20, 30), rng=rng)
+    bounds = ((-5, 1), (-1.5, 1.5))
+
+    grid = GridInterpolator(points, bounds=bounds)
+    unstructured = UnstructuredInterpolator(points, bounds=bounds)
+
+    keys = np.array(list(points.keys()))[:5]
+    pixel_x = rng.uniform(-5, 1, (len(keys), 50))
+    pixel_y = rng.uniform(-1.5, 1.5, (len(keys), 50))
+    mask = rng.uniform(size=pixel_x.shape) < 0.2
+    eval_points = ma.dstack(
+        (ma.masked_array(pixel_x, mask=mask), ma.masked_array(pixel_y, mask=mask))
+    )
+
+    result = grid(keys, eval_points)
+    assert result.shape == pixel_x.shape
+    assert np.all(result.mask == mask)
+
+    # on the grid points, this is a bilinear lookup of the template
+    for i, key in enumerate(keys):
+        image = points[tuple(key)]
+        coordinates = [
+            (pixel_x[i] + 5) / 6 * (image.shape[0] - 1),
+            (pixel_y[i] + 1.5) / 3 * (image.shape[1] - 1),
+        ]
+        expected = map_coordinates(image, coordinates, order=1)
+        assert np.allclose(result[i][~mask[i]], expected[~mask[i]])
+
+    expected = unstructured(keys, eval_points)
+    assert np.allclose(result[~mask], expected[~mask])
+
+    # outside of the bounds the images are 0
+    outside = grid(keys[:1], ma.dstack(([[2.0]], [[0.0]])))
+    assert np.all(outside == 0)
+
+
+def test_template_interpolator_engine(tmp_path):
+    """ the template interpolator only falls back to Delaunay for irregular grids """
+    from ctapipe.utils.template_network_interpolator import TemplateNetworkInterpolator
+
+    _, _, points = make_grid(values_shape=(10, 10))
+    path = tmp_path / "grid.template.gz"
+    with gzip.open(path, "wb") as f:
+        pickle.dump(points, f)
+    assert isinstance(
+        TemplateNetworkInterpolator(str(path)).interpolator, GridInterpolator
+    )
+
+    irregular = dict(list(points.items())[:-1])
+    path = tmp_path / "irregular.template.gz"
+    with gzip.open(path, "wb") as f:
+        pickle.dump(irregular, f)
+    assert isinstance(
+        TemplateNetworkInterpolator(str(path)).interpolator, UnstructuredInterpolator
+    )
@@ -0,0 +1,143 @@
+import gzip
+import os
+import pickle
+
+import numpy as np
+import numpy.ma as ma
+import pytest
+
+from ctapipe.utils import GridInterpolator
+from ctapipe.utils.template_network_interpolator import (
+    TemplateNetworkInterpolator,
+    TimeGradientInterpolator,
+    convert_template_file,
+    load_template_store,
+    template_store_path,
+)
+
+
+def write_templates(path, values_shape, regular=True):
+    rng = np.random.RandomState(0)
+    templates = {
+        (energy, impact, xmax): rng.uniform(0, 1, values_shape)
+        for energy in (-1.0, 0.0, 1.0)
+        for impact in (0.0, 100.0, 200.0, 300.0)
+        for xmax in (-50.0, 0.0, 50.0)
+    }
+    if not regular:
+        templates.pop((1.0, 300.0, 50.0))
+
+    # pickle in a non grid order
+    items = list(templates.items())
+    items = [items[i] for i in rng.permutation(len(items))]
+    with gzip.open(path, "wb") as f:
+        pickle.dump(dict(items), f)
+    return templates
+
+
+def test_template_store(tmp_path):
+    template_file = tmp_path / "test.template.gz"
+    templates = write_templates(template_file, (10, 12))
+
+    store_path = convert_template_file(template_file)
+    assert store_path == template_store_path(template_file)
+    assert store_path.name == "test.template.npystore"
+
+    with pytest.raises(FileExistsError):
+        convert_template_file(template_file)
+    convert_template_file(template_file, overwrite=True)
+
+    keys, values = load_template_store(store_path)
+    assert isinstance(values, np.memmap)
+    assert len(keys) == len(templates)
+    for key, value in zip(keys, values):
+        assert np.all(templates[tuple(key)] == value)
+
+    # the interpolator uses the memory mapped values without copying
+    interpolator = TemplateNetworkInterpolator(str(store_path)).interpolator
+    assert isinstance(interpolator, GridInterpolator)
+    assert isinstance(interpolator.values, np.memmap)
+    assert interpolator.values.mode == "r"
+
+
+def test_stale_template_store(tmp_path):
+    """ the store is rebuilt if the template file changes """
+    template_file = tmp_path / "test.template.gz"
+    write_templates(template_file, (10, 12))
+    store_path = convert_template_file(template_file)
+    values_path = store_path / "values.npy"
+    old_mtime = os.stat(values_path).st_mtime_ns
+
+    # unchanged template file: the store is used as is
+    TemplateNetworkInterpolator(str(template_file))
+    assert os.stat(values_path).st_mtime_ns == old_mtime
+
+    # regenerate the template file with different content
+    rng = np.random.RandomState(5)
+    templates = {
+        (energy, impact, xmax): rng.uniform(0, 1, (10, 12))
+        for energy in (-1.0, 0.0, 1.0)
+        for impact in (0.0, 100.0)
+        for xmax in (-50.0, 0.0, 50.0)
+    }
+    with gzip.open(template_file, "wb") as f:
+        pickle.dump(templates, f)
+    stat = os.stat(template_file)
+    os.utime(template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    interpolator = TemplateNetworkInterpolator(str(template_file)).interpolator
+    keys, values = load_template_store(store_path)
+    assert len(keys) == len(templates)
+    for key, value in zip(keys, values):
+        assert np.all(templates[tuple(key)] == value)
+    assert isinstance(interpolator.values, np.memmap)
+    assert len(interpolator.values) == len(templates)
+
+
+@pytest.mark.parametrize("regular", [True, False])
+def test_template_store_results(tmp_path, regular):
+    """ results are the same from the pickle file and the template store """
+    template_file = tmp_path / "test.template.gz"
+    write_templates(template_file, (10, 12), regular=regular)
+    from_pickle = TemplateNetworkInterpolator(str(template_file))
+
+    convert_template_file(template_file)
+    # the store next to the pickle file is used automatically
+    from_store = TemplateNetworkInterpolator(str(template_file))
+    assert isinstance(from_store.interpolator.values, np.memmap) == regular
+
+    rng = np.random.RandomState(1)
+    n_tels = 4
+    energy = np.full(n_tels, 0.3)
+    impact = rng.uniform(0, 250, n_tels)
+    xmax = rng.uniform(-40, 40, n_tels)
+    pix_x = ma.masked_array(rng.uniform(-5, 1, (n_tels, 20)))
+    pix_y = ma.masked_array(rng.uniform(-1.5, 1.5, (n_tels, 20)))
+
+    assert np.allclose(
+        from_store(energy, impact, xmax, pix_x, pix_y),
+        from_pickle(energy, impact, xmax, pix_x, pix_y),
+    )
+
+
+def test_template_gradient_not_on_grid(tmp_path):
+    """ gradients are only available for templates on a grid """
+    template_file = tmp_path / "test.template.gz"
+    write_templates(template_file, (10, 12), regular=False)
+    interpolator = TemplateNetworkInterpolator(str(template_file))
+    assert not interpolator.has_gradient
+
+    pix = ma.masked_array(np.zeros((1, 3)))
+    with pytest.raises(NotImplementedError, match="has_gradient"):
+        interpolator.gradient([0.3], [100.0], [0.0], pix, pix)
+
+
+def test_time_gradient_store(tmp_path):
+    template_file = tmp_path / "test_time.template.gz"
+    write_templates(template_file, (2,))
+    from_pickle = TimeGradientInterpolator(str(template_file))
+    store_path = convert_template_file(template_file)
+    from_store = TimeGradientInterpolator(str(store_path))
+
+    points = ([0.5, -0.5], [50.0, 120.0], [10.0, -20.0])
+    assert np.allclose(from_store(*points), from_pickle(*points))
@@ -80,6 +80,32 @@ def test_remember_last():
     assert np.all(np.abs(interpolated_points - interpolated_points_mask) < 1e-10)
 
 
+def test_remember_last_sequence():
+    """
+    The cache of recently used simplices gives the same results as locating
+    the points in the full triangulation, also for batches of points moving
+    between calls
+    """
+    rng = np.random.RandomState(0)
+    keys = rng.uniform(0, 1, (200, 3))
+    interpolation_points = {tuple(k): rng.uniform(0, 1, 5) for k in keys}
+
+    cached = UnstructuredInterpolator(
+        interpolation_points, remember_last=True, cache_size=4
+    )
+    plain = UnstructuredInterpolator(interpolation_points)
+
+    points = rng.uniform(0.2, 0.8, (6, 3))
+    for _ in range(20):
+        points += rng.normal(0, 0.02, points.shape)
+        assert np.allclose(cached(points), plain(points))
+    assert len(cached._recent_simplices) <= 4
+
+    cached.reset()
+    assert len(cached._recent_simplices) == 0
+    assert np.allclose(cached(points), plain(points))
+
+
 def test_masked_input():
     """
     Now lets test how well this all works if we pass a masked input
@@ -157,6 +183,21 @@ def test_class_output():
     # Check they give the same answer
     assert np.all(np.abs(unsort_value - lin_nd_val) < 1e-10)
 
+    # one set of evaluation points per interpolated point
+    pts1 = np.random.rand(5, 2)
+    pts2 = np.random.rand(5, 10, 2)
+    interpolator = UnstructuredInterpolator(
+        {
+            key: RegularGridInterpolator((x, x), value)
+            for key, value in interpolation_points.items()
+        }
+    )
+    value = interpolator(pts1, pts2)
+    assert value.shape == (5, 10)
+    for i, point in enumerate(linear_nd(pts1)):
+        expected = RegularGridInterpolator((x, x), point)(pts2[i])
+        assert np.allclose(value[i], expected)
+
 
 def test_out_of_bounds():
     """
@@ -11,12 +11,77 @@ TODO:
 """
 
 import numpy as np
+from numba import njit
 from scipy.spatial import Delaunay
-import time
 from scipy.ndimage import map_coordinates
 import numpy.ma as ma
 
 
+@njit()
+def _contains(transform, simplex, point, eps):
+    """Check if the point is inside the simplex using its barycentric transform"""
+    n_dim = len(point)
+    total = 0.0
+    for j in range(n_dim):
+        b = 0.0
+        for k in range(n_dim):
+            b += transform[simplex, j, k] * (point[k] - transform[simplex, n_dim, k])
+        if b < -eps:
+            return False
+        total += b
+    return total <= 1 + eps
+
+
+@njit()
+def _find_in_simplices(points, transform, candidates):
+    """
+    Index of one of the ``candidates`` simplices containing each point,
+    -1 if none does. Uses the barycentric transforms of
+    `scipy.spatial.Delaunay`. Consecutive points are often in the same
+    simplex, so the simplex of the previous point is checked first.
+    """
+    eps = 100 * np.finfo(np.float64).eps
+    result = np.full(len(points), -1, dtype=np.intp)
+
+    last = -1
+    for i in range(len(points)):
+        if last >= 0 and _contains(transform, last, points[i], eps):
+            result[i] = last
+            continue
+
+        for candidate in candidates:
+            if candidate != last and _contains(transform, candidate, points[i], eps):
+                result[i] = candidate
+                last = candidate
+                break
+
+    return result
+
+
+@njit()
+def _update_recent(recent, used, size):
+    """
+    Move the ``used`` simplices to the front of the list of ``recent``
+    simplices, keeping at most ``size`` of them
+    """
+    result = np.empty(size, dtype=np.intp)
+    n = 0
+    for simplex in np.concatenate((used, recent)):
+        if n == size:
+            break
+        if simplex < 0:
+            continue
+        new = True
+        for j in range(n):
+            if result[j] == simplex:
+                new = False
+                break
+        if new:
+            result[n] = simplex
+            n += 1
+    return result[:n]
+
+
 class UnstructuredInterpolator:
     """
     This class performs linear interpolation between an unstructured set of data
@@ -36,6 +101,7 @@ class UnstructuredInterpolator:
         remember_last=False,
         bounds=None,
         dtype=None,
+        cache_size=16,
     ):
         """
         Parameters
@@ -45,6 +111,17 @@ class UnstructuredInterpolator:
         function_name: str
             Name of class member function to call in the case we are interpolating
             between class predictions, for numpy arrays leave blank
+        remember_last: bool
+            Remember the most recently used simplices and check them first
+            when locating the simplices containing new points, this is fast
+            for repeated calls with points close to each other, e.g. in a fit
+        bounds: tuple
+            ((x_min, x_max), (y_min, y_max)) range covered by image values,
+            only needed for evaluating images at ``eval_points``
+        dtype: numpy dtype
+            dtype of the stored values
+        cache_size: int
+            Number of simplices remembered if ``remember_last`` is set
         """
 
         self.keys = np.array(list(interpolation_points.keys()))
@@ -70,18 +147,43 @@ class UnstructuredInterpolator:
             self._function_name = "__call__"
 
         self._remember = remember_last
-        self._previous_v = 0
-        self._previous_m = 0
-        self._previous_shape = 0
+        self._cache_size = cache_size
+        # indices of the recently used simplices, most recent first
+        self._recent_simplices = np.zeros(0, dtype=np.intp)
         self._bounds = bounds
 
     def reset(self):
         """
         Function used to reset some class values stored after previous event
         """
-        self._previous_v = 0
-        self._previous_m = 0
-        self._previous_shape = 0
+        self._recent_simplices = np.zeros(0, dtype=np.intp)
+
+    def _find_simplex(self, points):
+        """
+        Find the simplices containing the points, first checking the recently
+        used simplices if ``remember_last`` is set.
+
+        Containment in the remembered simplices is tested with the barycentric
+        coordinates from the transforms stored in the triangulation, only the
+        points not contained in any of them are located in the full
+        triangulation. Points outside of the triangulation get index -1.
+        """
+        if not self._remember:
+            return self._tri.find_simplex(points)
+
+        points = np.ascontiguousarray(points, dtype=np.float64)
+        simplex = _find_in_simplices(
+            points, self._tri.transform, self._recent_simplices
+        )
+
+        missing = simplex < 0
+        if np.any(missing):
+            simplex[missing] = self._tri.find_simplex(points[missing])
+
+        self._recent_simplices = _update_recent(
+            self._recent_simplices, simplex, self._cache_size
+        )
+        return simplex
 
     def __call__(self, points, eval_points=None):
 
@@ -92,38 +194,11 @@ class UnstructuredInterpolator:
             points = np.array([points])
 
         # First find simplexes that contain interpolated points
-        # In
-        if self._remember and self._previous_v is not 0:
-
-            previous_keys = self.keys[self._previous_v.ravel()]
-            hull = Delaunay(previous_keys)
-
-            if np.all(eval_points is not None):
-                shape_check = eval_points.shape == self._previous_shape
-            else:
-                shape_check = True
-
-            if np.all(hull.find_simplex(points) >= 0) and shape_check:
-                v = self._previous_v
-                m = self._previous_m
-            else:
-                s = self._tri.find_simplex(points)
-                v = self._tri.vertices[s]
-                m = self._tri.transform[s]
-                self._previous_v = v
-                self._previous_m = m
-                if np.all(eval_points is not None):
-                    self._previous_shape = eval_points.shape
-        else:
-            s = self._tri.find_simplex(points)
-            # get the vertices for each simplex
-            v = self._tri.vertices[s]
-            # get transform matrices for each simplex
-            m = self._tri.transform[s]
-            self._previous_v = v
-            self._previous_m = m
-            if np.all(eval_points is not None):
-                self._previous_shape = eval_points.shape
+        s = self._find_simplex(points)
+        # get the vertices for each simplex
+        v = self._tri.simplices[s]
+        # get transform matrices for each simplex
+        m = self._tri.transform[s]
 
         # Here comes some serious numpy magic, it could be done with a loop but would
         # be pretty inefficient I had to rip this from stack overflow - RDP
@@ -159,45 +234,45 @@ class UnstructuredInterpolator:
 
     def _call_class_function(self, point_num, eval_points):
         """
-        Function to loop over class function and return array of outputs
+        Function to call the class function of all vertices and return array
+        of outputs. The function of every class is called only once, for
+        the evaluation points of all interpolated points using it, so it must
+        evaluate each row of its input independently.
 
         Parameters
         ----------
         point_num: int
             Index of class position in values list
         eval_points: ndarray
-            Inputs used to evaluate class member function
+            Inputs used to evaluate class member function, either shared
+            by all points or one set per interpolated point
 
         Returns
         -------
         ndarray: output from member function
         """
+        three_dim = len(eval_points.shape) > 2
+        vertices, inverse = np.unique(point_num, return_inverse=True)
+        inverse = inverse.reshape(point_num.shape)
 
-        outputs = list()
-        shape = point_num.shape
+        outputs = None
+        for i, vertex in enumerate(vertices):
+            rows, corners = np.nonzero(inverse == i)
+            cls_function = getattr(self.values[vertex], self._function_name)
 
-        three_dim = False
-        if len(eval_points.shape) > 2:
-            first_index = np.arange(point_num.shape[0])[..., np.newaxis] * np.ones_like(
-                point_num
-            )
-            first_index = first_index.ravel()
-            three_dim = True
-
-        num = 0
-        for pt in point_num.ravel():
-            cls = self.values[pt]
-            cls_function = getattr(cls, self._function_name)
-            pt = eval_points
             if three_dim:
-                pt = eval_points[first_index[num]]
-
-            outputs.append(cls_function(pt))
-            num += 1
+                # evaluate the points of all rows using this vertex at once
+                unique_rows, row_index = np.unique(rows, return_inverse=True)
+                pt = eval_points[unique_rows]
+                output = np.asarray(cls_function(pt.reshape(-1, pt.shape[-1])))
+                output = output.reshape(pt.shape[:2] + output.shape[1:])[row_index]
+            else:
+                output = np.asarray(cls_function(eval_points))
 
-        outputs = np.array(outputs)
-        new_shape = (*shape, *outputs.shape[1:])
-        outputs = outputs.reshape(new_shape)
+            if outputs is None:
+                value_shape = output.shape[1:] if three_dim else output.shape
+                outputs = np.empty(point_num.shape + value_shape, dtype=output.dtype)
+            outputs[rows, corners] = output
 
         return outputs
 
@@ -241,7 +316,7 @@ class UnstructuredInterpolator:
             (scaled_points[0] - (self._bounds[0][0]))
             / (self._bounds[0][1] - self._bounds[0][0])
         ) * (vals.shape[-2] - 1)
-        scaled_points[1] += (
+        scaled_points[1] = (
             (scaled_points[1] - (self._bounds[1][0]))
             / (self._bounds[1][1] - self._bounds[1][0])
         ) * (vals.shape[-1] - 1)
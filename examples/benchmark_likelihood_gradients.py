@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Benchmark the ImPACT and muon intensity fits with and without the analytic
+likelihood gradients (``use_gradient``).
+
+Synthetic events are fitted with Minuit. For every setting, the mean number
+of likelihood and gradient calls, the wall time and the final value of the
+negative log likelihood per fit are reported.
+The ImPACT fits use gaussian templates on a regular grid, written to a
+temporary directory, and the default atmosphere profile.
+"""
+import argparse
+import gzip
+import pickle
+import time
+from tempfile import TemporaryDirectory
+
+import astropy.units as u
+import numpy as np
+from astropy.coordinates import AltAz, SkyCoord
+from iminuit import Minuit
+
+from ctapipe.containers import HillasParametersContainer
+from ctapipe.coordinates import CameraFrame, TelescopeFrame
+from ctapipe.image.muon import intensity_fitter
+from ctapipe.instrument import (
+    CameraDescription,
+    CameraGeometry,
+    CameraReadout,
+    OpticsDescription,
+    SubarrayDescription,
+    TelescopeDescription,
+)
+from ctapipe.reco.ImPACT import ImPACTReconstructor
+
+TEL_IDS = (1, 2, 3, 4)
+
+
+def write_templates(path):
+    """ gaussian LST templates on a regular grid """
+    x, y = np.meshgrid(
+        np.linspace(-5, 1, 121), np.linspace(-1.5, 1.5, 61), indexing="ij"
+    )
+    templates = {}
+    for energy in (0.1, 0.3, 1.0, 3.0, 10.0):
+        for impact in np.arange(0, 550, 50.0):
+            for xmax in np.arange(-100, 250, 50.0):
+                x0 = -0.3 - impact / 250
+                length = 0.25 + (xmax + 100) / 1500
+                width = 0.1 + 0.05 * energy ** 0.2
+                templates[(energy, impact, xmax)] = (
+                    200
+                    * energy
+                    * np.exp(
+                        -((x - x0) ** 2) / (2 * length ** 2) - y ** 2 / (2 * width ** 2)
+                    )
+                )
+
+    with gzip.open(f"{path}/LST_05deg.template.gz", "wb") as f:
+        pickle.dump(templates, f)
+
+
+def impact_event(rng, reconstructor, truth):
+    """ event properties for four telescopes with images drawn around truth """
+    event = {
+        key: {}
+        for key in (
+            "image",
+            "time",
+            "pixel_x",
+            "pixel_y",
+            "type_tel",
+            "tel_x",
+            "tel_y",
+            "hillas",
+        )
+    }
+    grid = np.linspace(-2.5, 2.5, 40) * u.deg
+    pixel_x, pixel_y = [a.ravel() for a in np.meshgrid(grid, grid)]
+    for tel_id in TEL_IDS:
+        event["image"][tel_id] = np.ones(len(pixel_x))
+        event["time"][tel_id] = np.zeros(len(pixel_x))
+        event["pixel_x"][tel_id] = pixel_x
+        event["pixel_y"][tel_id] = pixel_y
+        event["type_tel"][tel_id] = "LSTCam"
+        event["tel_x"][tel_id] = rng.uniform(-150, 150) * u.m
+        event["tel_y"][tel_id] = rng.uniform(-150, 150) * u.m
+        event["hillas"][tel_id] = HillasParametersContainer(
+            x=0 * u.deg, y=0 * u.deg, intensity=1.0
+        )
+    event["array_direction"] = SkyCoord(alt=70 * u.deg, az=0 * u.deg, frame=AltAz())
+
+    reconstructor.set_event_properties(**event)
+    _, prediction, _, _ = reconstructor._pixel_likelihood(
+        truth[np.newaxis], with_priors=False
+    )
+    for i, tel_id in enumerate(TEL_IDS):
+        expected = prediction[0, i, : len(pixel_x)]
+        image = rng.poisson(expected) + rng.normal(0, 2.8, len(pixel_x))
+        event["image"][tel_id] = image
+    return event
+
+
+def benchmark_impact(n_events):
+    rng = np.random.RandomState(0)
+    with TemporaryDirectory() as template_dir:
+        write_templates(template_dir)
+
+        reconstructor = ImPACTReconstructor(root_dir=template_dir)
+        events = []
+        for _ in range(n_events):
+            truth = np.array(
+                [
+                    rng.uniform(-0.01, 0.01),
+                    rng.uniform(-0.01, 0.01),
+                    rng.uniform(-80, 80),
+                    rng.uniform(-80, 80),
+                    rng.uniform(0.5, 5),
+                    1.0,
+                ]
+            )
+            events.append((impact_event(rng, reconstructor, truth), truth))
+
+        limits = [[-0.05, 0.05], [-0.05, 0.05], [-500, 500], [-500, 500], [0.1, 10]]
+        limits.append([0.5, 2])
+        for use_gradient in (False, True):
+            reconstructor = ImPACTReconstructor(
+                root_dir=template_dir, use_gradient=use_gradient
+            )
+            calls, duration = [], 0
+            for event, truth in events:
+                reconstructor.set_event_properties(**event)
+                seed = truth * [1, 1, 1, 1, 1.3, 1] + [0.002, -0.002, 15, -15, 0, 0.05]
+                step = [0.001, 0.001, 10, 10, 0.1 * seed[4], 0.05]
+
+                start = time.perf_counter()
+                _, _, like = reconstructor.minimise(seed, step, limits)
+                duration += time.perf_counter() - start
+                minuit = reconstructor.min
+                calls.append((minuit.ncalls, minuit.ngrads, like))
+
+            report("ImPACT", use_gradient, calls, duration)
+
+
+class RecordingMinuit(Minuit):
+    """ Minuit keeping track of its instances, to report their number of calls """
+
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instances.append(self)
+
+
+def benchmark_muon(n_events):
+    geometry = CameraGeometry.make_rectangular(
+        60, 60, range_x=(-1.2, 1.2), range_y=(-1.2, 1.2)
+    )
+    readout = CameraReadout(
+        "test",
+        sampling_rate=1 * u.GHz,
+        reference_pulse_shape=np.ones((1, 2)),
+        reference_pulse_sample_width=1 * u.ns,
+    )
+    optics = OpticsDescription(
+        "LST",
+        num_mirrors=1,
+        equivalent_focal_length=28 * u.m,
+        mirror_area=386 * u.m ** 2,
+        num_mirror_tiles=198,
+    )
+    telescope = TelescopeDescription(
+        "LST", "LST", optics, CameraDescription("test", geometry, readout)
+    )
+    subarray = SubarrayDescription("LSTMono", {0: [0, 0, 0] * u.m}, {0: telescope})
+
+    focal_length = optics.equivalent_focal_length
+    pixels = CameraFrame(
+        x=geometry.pix_x, y=geometry.pix_y, focal_length=focal_length
+    ).transform_to(TelescopeFrame())
+    pixel_diameter = 2 * u.rad * (np.sqrt(geometry.pix_area[0] / np.pi) / focal_length)
+
+    center_x, center_y, radius = 0.8 * u.deg, 0.4 * u.deg, 1.2 * u.deg
+    image = intensity_fitter.image_prediction(
+        np.sqrt(optics.mirror_area / np.pi),
+        hole_radius=0 * u.m,
+        impact_parameter=5 * u.m,
+        phi=0 * u.rad,
+        center_x=center_x,
+        center_y=center_y,
+        radius=radius,
+        ring_width=0.05 * u.deg,
+        pixel_x=pixels.fov_lon,
+        pixel_y=pixels.fov_lat,
+        pixel_diameter=pixel_diameter.to(u.rad),
+    )
+    rng = np.random.RandomState(0)
+    images = [0.5 * image + rng.normal(0, 1.1, len(image)) for _ in range(n_events)]
+    pedestal = np.full(len(image), 1.1)
+
+    intensity_fitter.Minuit = RecordingMinuit
+    for use_gradient in (False, True):
+        fitter = intensity_fitter.MuonIntensityFitter(
+            subarray=subarray, use_gradient=use_gradient
+        )
+        RecordingMinuit.instances.clear()
+
+        start = time.perf_counter()
+        for image in images:
+            fitter(0, center_x, center_y, radius, image, pedestal)
+        duration = time.perf_counter() - start
+
+        calls = [(m.ncalls, m.ngrads, m.fval) for m in RecordingMinuit.instances]
+        report("muon", use_gradient, calls, duration)
+
+
+def report(fit, use_gradient, calls, duration):
+    n_calls, n_gradient_calls, like = np.mean(calls, axis=0)
+    print(
+        f"{fit:6} use_gradient={use_gradient!s:5}"
+        f" calls: {n_calls:.0f}, gradient calls: {n_gradient_calls:.0f},"
+        f" time: {1000 * duration / len(calls):.0f} ms,"
+        f" -log likelihood: {like:.2f} per fit"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fit", choices=["impact", "muon", "both"], default="both")
+    parser.add_argument("--n-events", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.fit in ("impact", "both"):
+        benchmark_impact(args.n_events)
+    if args.fit in ("muon", "both"):
+        benchmark_muon(args.n_events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading the models of an `EnergyRegressor` in several worker
+processes, with and without memory mapping the model arrays.
+
+For every worker, the time to load the models and the increase of the
+resident memory is reported, split into private (anonymous) memory and
+memory backed by the model files, which is shared by all workers
+on the node. Needs ``/proc/self/status``, so this only works on linux.
+"""
+import argparse
+import os
+import time
+from multiprocessing import Pool
+from tempfile import TemporaryDirectory
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.neural_network import MLPRegressor
+
+from ctapipe.reco import EnergyRegressor
+
+CAM_IDS = ["LSTCam", "NectarCam", "FlashCam"]
+
+
+def resident_memory():
+    """ private and file backed resident memory of this process in MiB """
+    memory = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                key, value, _ = line.split()
+                memory[key.rstrip(":")] = int(value) / 1024
+    return memory
+
+
+def load_models(path, mmap_mode):
+    before = resident_memory()
+    start = time.perf_counter()
+    regressor = EnergyRegressor.load(path, CAM_IDS, mmap_mode=mmap_mode)
+    duration = time.perf_counter() - start
+
+    # touch all model data
+    regressor.predict_by_event([{cam_id: [[1, 2, 3, 4]] for cam_id in CAM_IDS}])
+    after = resident_memory()
+    return duration, {key: after[key] - before[key] for key in after}
+
+
+def train(model, n_samples):
+    rng = np.random.RandomState(0)
+    X = rng.uniform(0, 1, (n_samples, 4))
+    y = np.exp(X @ [1.0, 2.0, 0.5, 0.1])
+
+    if model == "forest":
+        regressor = EnergyRegressor(
+            regressor=RandomForestRegressor, cam_id_list=CAM_IDS, n_estimators=50
+        )
+    else:
+        regressor = EnergyRegressor(
+            regressor=MLPRegressor,
+            cam_id_list=CAM_IDS,
+            hidden_layer_sizes=(1024, 1024),
+            max_iter=1,
+        )
+    regressor.fit({c: X for c in CAM_IDS}, {c: y for c in CAM_IDS})
+    return regressor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", choices=["forest", "mlp"], default="forest")
+    parser.add_argument("--n-workers", type=int, default=4)
+    parser.add_argument("--n-samples", type=int, default=20000)
+    args = parser.parse_args()
+
+    regressor = train(args.model, args.n_samples)
+
+    with TemporaryDirectory() as d:
+        path = os.path.join(d, "regressor_{cam_id}.pkl")
+        regressor.save(path)
+        size = sum(os.path.getsize(path.format(cam_id=c)) for c in CAM_IDS)
+        print(f"{args.model}: {size / 1024**2:.1f} MiB on disk")
+
+        for mmap_mode in (None, "r"):
+            # a fresh pool, so every worker loads the models exactly once
+            with Pool(args.n_workers, maxtasksperchild=1) as pool:
+                results = pool.starmap(
+                    load_models, [(path, mmap_mode)] * args.n_workers
+                )
+
+            durations = np.array([duration for duration, _ in results])
+            anon = np.array([memory["RssAnon"] for _, memory in results])
+            shared = np.array([memory["RssFile"] for _, memory in results])
+            print(
+                f"mmap_mode={mmap_mode!s:4}"
+                f" load time: {durations.mean():.3f} s per worker,"
+                f" private memory: {anon.sum():.1f} MiB total,"
+                f" file backed memory: {shared.mean():.1f} MiB per worker (shared)"
+            )
+
+
+if __name__ == "__main__":
+    main()